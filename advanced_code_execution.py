@@ -25,6 +25,8 @@ from rich.table import Table
 from rich.syntax import Syntax
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from code_analysis import PythonAnalysisVisitor
+
 console = Console()
 
 @dataclass
@@ -78,23 +80,14 @@ class CodeAnalyzer:
         return analysis
         
     def _analyze_python_code(self, code: str) -> Dict[str, Any]:
-        """Python kodunu analiz et"""
+        """Python kodunu analiz et (ağaç tek geçişte gezilir)"""
         analysis = {}
         
         try:
-            tree = ast.parse(code)
+            visitor = PythonAnalysisVisitor()
+            visitor.visit(ast.parse(code))
             
-            # Import'ları bul
-            imports = []
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imports.append(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ""
-                    for alias in node.names:
-                        imports.append(f"{module}.{alias.name}")
-                        
+            imports = visitor.imports
             analysis['imports'] = imports
             
             # Güvenlik risklerini kontrol et
@@ -103,13 +96,8 @@ class CodeAnalyzer:
                 if imp in self.dangerous_modules:
                     security_risks.append(f"Dangerous import: {imp}")
                     
-            # Fonksiyon çağrılarını bul
-            functions = []
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Call):
-                    if isinstance(node.func, ast.Name):
-                        functions.append(node.func.id)
-                        
+            # Doğrudan ada yapılan çağrılar (nitelikli çağrılar hariç)
+            functions = [name for name in visitor.calls if "." not in name]
             analysis['functions'] = functions
             
             # Tehlikeli fonksiyonları kontrol et
@@ -0,0 +1,217 @@
+"""
+CortexCLI Asenkron Ollama İstemcisi
+asyncio tabanlı çoklu model sorguları için aiohttp istemcisi
+"""
+
+import asyncio
+import json
+import time
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
+
+import aiohttp
+
+import config
+from ollama_client import (
+    OllamaError, OllamaTimeoutError, OllamaConnectionError, build_generate_payload, cacheable_data, model_tag
+)
+from response_cache import response_cache
+from ollama_router import OllamaRouter, Backend, ollama_router
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class AsyncOllamaClient:
+    """Ollama API'si için asyncio istemcisi (OllamaClient ile aynı hata semantiği)"""
+
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, pool_size: Optional[int] = None,
+                 router: Optional[OllamaRouter] = None):
+        self._base_url = base_url
+        self.router = router or ollama_router
+        self._timeout = timeout
+        self.max_retries = max_retries if max_retries is not None else config.OLLAMA_CONFIG.get("max_retries", 2)
+        self.pool_size = pool_size or config.OLLAMA_CONFIG.get("pool_size", 10)
+        self.model_digests: Dict[str, str] = {}
+        self._digests_at = 0.0
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def base_url(self) -> str:
+        """Aktif Ollama adresi (config.OLLAMA_CONFIG'e göre)"""
+        return (self._base_url or config.OLLAMA_CONFIG["base_url"]).rstrip("/")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Çalışan event loop'a bağlı oturumu oluşturur"""
+        if self._session is None or self._session.closed:
+            timeout = aiohttp.ClientTimeout(
+                total=None,
+                connect=config.OLLAMA_CONFIG.get("connect_timeout", 5),
+                sock_read=self._timeout or config.OLLAMA_CONFIG["timeout"]
+            )
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(timeout=timeout, connector=connector)
+        return self._session
+
+    async def _request(self, method: str, endpoint: str, base_url: Optional[str] = None,
+                       **kwargs) -> aiohttp.ClientResponse:
+        """HTTP isteği yapar; bağlantı kurulamadığında ve 502/503/504'te yeniden dener"""
+        session = self._get_session()
+        attempt = 0
+        while True:
+            try:
+                response = await session.request(method, f"{base_url or self.base_url}{endpoint}", **kwargs)
+            except asyncio.TimeoutError as e:
+                raise OllamaTimeoutError("Yanıt zaman aşımına uğradı") from e
+            except aiohttp.ClientConnectionError as e:
+                # Yalnızca bağlantı kurulamadıysa tekrar denenir; istek gönderildikten sonra kopan
+                # bağlantıda (ör. ServerDisconnectedError) üretim iki kez başlatılmaz (OllamaClient: read=0)
+                if isinstance(e, aiohttp.ClientConnectorError) and attempt < self.max_retries:
+                    attempt += 1
+                    await asyncio.sleep(0.3 * (2 ** (attempt - 1)))
+                    continue
+                raise OllamaConnectionError("Ollama servisine bağlanılamıyor. Ollama çalışıyor mu?") from e
+            except aiohttp.ClientError as e:
+                raise OllamaError(str(e)) from e
+
+            if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                response.release()
+                attempt += 1
+                await asyncio.sleep(0.3 * (2 ** (attempt - 1)))
+                continue
+
+            if response.status >= 400:
+                text = await response.text()
+                response.release()
+                try:
+                    detail = json.loads(text).get("error", text)
+                except ValueError:
+                    detail = text
+                raise OllamaError(f"HTTP {response.status}: {detail}")
+
+            return response
+
+    async def _open(self, method: str, endpoint: str, model: Optional[str] = None,
+                    **kwargs) -> Tuple[aiohttp.ClientResponse, Optional[Backend]]:
+        """İsteği yönlendiricinin seçtiği sunucuya gönderir (OllamaClient._open ile aynı kurallar)"""
+        if self._base_url:
+            return await self._request(method, endpoint, **kwargs), None
+
+        tried = []
+        last_error: OllamaError = OllamaConnectionError("Kullanılabilir Ollama sunucusu yok")
+        while True:
+            backend = self.router.select(model, exclude=tried)
+            if backend is None:
+                raise last_error
+            self.router.acquire(backend)
+            start_time = time.time()
+            try:
+                response = await self._request(method, endpoint, base_url=backend.url, **kwargs)
+            except OllamaTimeoutError:
+                # Yavaş ama ayakta sunucu devre dışı bırakılmaz ve başka sunucuda denenmez
+                self.router.release(backend)
+                raise
+            except OllamaConnectionError as e:
+                self.router.release(backend)
+                self.router.record_failure(backend)
+                tried.append(backend.url)
+                last_error = e
+                continue
+            except BaseException:
+                self.router.release(backend)
+                raise
+            self.router.record_success(backend, time.time() - start_time)
+            return response, backend
+
+    def _close(self, backend: Optional[Backend]) -> None:
+        if backend is not None:
+            self.router.release(backend)
+
+    async def list_models(self) -> List[Dict[str, Any]]:
+        """Yüklü modelleri (/api/tags) döndürür"""
+        response = await self._request("GET", config.OLLAMA_CONFIG["tags_endpoint"])
+        async with response:
+            data = await response.json()
+        models = data.get("models", [])
+        self.model_digests = {model["name"]: model.get("digest", "") for model in models}
+        self._digests_at = time.time()
+        return models
+
+    async def model_digest(self, model: str) -> Optional[str]:
+        """Modelin içerik özetini döndürür (önbellek anahtarı için; katalog TTL'i kadar tutulur)"""
+        if time.time() - self._digests_at >= config.MODEL_CATALOG_CONFIG["ttl"]:
+            try:
+                await self.list_models()
+            except OllamaError:
+                return None
+        return self.model_digests.get(model_tag(model))
+
+    async def _cache_key(self, model: str, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]],
+                         use_cache: Optional[bool], extra: Dict[str, Any]) -> Optional[str]:
+        """İstek önbelleğe uygunsa anahtarını, değilse None döndürür"""
+        if not response_cache.should_cache(options, use_cache):
+            return None
+        return response_cache.make_key(model, prompt, system, options, await self.model_digest(model), extra)
+
+    async def generate(self, model: str, prompt: str, system: Optional[str] = None,
+                       options: Optional[Dict[str, Any]] = None, use_cache: Optional[bool] = None,
+                       **extra) -> Dict[str, Any]:
+        """Tek parça (stream=False) üretim yapar; önbellek yanıtlarında "cached": True bulunur"""
+        cache_key = await self._cache_key(model, prompt, system, options, use_cache, extra)
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                cached["cached"] = True
+                return cached
+
+        payload = build_generate_payload(model, prompt, system, options, False, **extra)
+        try:
+            response, backend = await self._open("POST", config.OLLAMA_CONFIG["api_endpoint"], model, json=payload)
+            try:
+                async with response:
+                    data = await response.json(content_type=None)
+            finally:
+                self._close(backend)
+        except asyncio.TimeoutError as e:
+            raise OllamaTimeoutError("Yanıt zaman aşımına uğradı") from e
+        if data.get("error"):
+            raise OllamaError(data["error"])
+
+        if cache_key:
+            response_cache.put(cache_key, model, cacheable_data(data))
+        return data
+
+    async def generate_stream(self, model: str, prompt: str, system: Optional[str] = None,
+                              options: Optional[Dict[str, Any]] = None, **extra) -> AsyncIterator[Dict[str, Any]]:
+        """NDJSON parçalarını sırayla üretir; son parça done=True taşır"""
+        payload = build_generate_payload(model, prompt, system, options, True, **extra)
+        response, backend = await self._open("POST", config.OLLAMA_CONFIG["api_endpoint"], model, json=payload)
+        async with response:
+            try:
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise OllamaError(data["error"])
+                    yield data
+                    if data.get("done"):
+                        break
+            except asyncio.TimeoutError as e:
+                raise OllamaTimeoutError("Yanıt zaman aşımına uğradı") from e
+            except aiohttp.ClientError as e:
+                raise OllamaConnectionError(f"Akış kesildi: {e}") from e
+            finally:
+                self._close(backend)
+
+    async def close(self):
+        """Bağlantı havuzunu kapatır"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
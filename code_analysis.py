@@ -0,0 +1,393 @@
+"""
+CortexCLI Toplu Kod Analizi
+Dizindeki Python dosyalarını süreç havuzunda tek geçişlik AST ziyaretçisiyle analiz eder; sonuçlar dosya içerik özetine göre önbelleklenir
+"""
+
+import ast
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import config
+from file_walker import file_walker
+
+# Kurallar değiştiğinde önbellekteki eski sonuçlar kullanılmaz
+ANALYZER_VERSION = 1
+
+# Her zaman riskli kabul edilen çağrılar
+RISKY_CALLS = {
+    "eval": "Dinamik kod çalıştırma (eval)",
+    "exec": "Dinamik kod çalıştırma (exec)",
+    "compile": "Dinamik kod derleme (compile)",
+    "__import__": "Dinamik import (__import__)",
+    "os.system": "Kabuk komutu (os.system)",
+    "os.popen": "Kabuk komutu (os.popen)",
+    "pickle.load": "Güvenilmeyen veriyle pickle (pickle.load)",
+    "pickle.loads": "Güvenilmeyen veriyle pickle (pickle.loads)",
+    "marshal.loads": "Güvenilmeyen veriyle marshal (marshal.loads)",
+}
+# shell=True ile çağrıldığında riskli olan subprocess fonksiyonları
+SHELL_CALLS = {"subprocess.run", "subprocess.call", "subprocess.check_call", "subprocess.check_output",
+               "subprocess.Popen"}
+_BRANCH_NODES = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler, ast.IfExp, ast.comprehension)
+
+
+def _dotted_name(node: ast.AST) -> Optional[str]:
+    """Name/Attribute zincirini "a.b.c" biçimine çevirir; çözülemezse None"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+@dataclass
+class Finding:
+    """Güvenlik bulgusu"""
+    path: str
+    line: int
+    rule: str
+    message: str
+
+    @property
+    def location(self) -> str:
+        return f"{self.path}:{self.line}"
+
+
+class PythonAnalysisVisitor(ast.NodeVisitor):
+    """Tek geçişte importları, tanımları, çağrıları, dal sayısını ve güvenlik bulgularını toplar"""
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.imports: List[str] = []           # "modül" veya "modül.ad" (from importları)
+        self.definitions: List[Tuple[str, str, int]] = []  # (tür, nitelikli ad, satır)
+        self.calls: List[str] = []             # Çözülebilen çağrı adları ("open", "os.path.join")
+        self.findings: List[Finding] = []
+        self.branches = 0
+        self._scope: List[str] = []
+        self._in_class: List[bool] = [False]
+
+    def _finding(self, node: ast.AST, rule: str, message: str) -> None:
+        self.findings.append(Finding(self.path, getattr(node, "lineno", 0), rule, message))
+
+    def visit_Import(self, node: ast.Import) -> None:
+        self.imports.extend(alias.name for alias in node.names)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module = node.module or ""
+        self.imports.extend(f"{module}.{alias.name}" for alias in node.names)
+
+    def _visit_definition(self, node: ast.AST, kind: str) -> None:
+        self.definitions.append((kind, ".".join(self._scope + [node.name]), node.lineno))
+        self._scope.append(node.name)
+        self._in_class.append(kind == "class")
+        self.generic_visit(node)
+        self._in_class.pop()
+        self._scope.pop()
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._visit_definition(node, "class")
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_definition(node, "method" if self._in_class[-1] else "function")
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node: ast.Call) -> None:
+        name = _dotted_name(node.func)
+        if name:
+            self.calls.append(name)
+            if name in RISKY_CALLS:
+                self._finding(node, name, RISKY_CALLS[name])
+            elif name in SHELL_CALLS and any(
+                    keyword.arg == "shell" and isinstance(keyword.value, ast.Constant) and keyword.value.value is True
+                    for keyword in node.keywords):
+                self._finding(node, f"{name}(shell=True)", "Kabuk üzerinden komut (shell=True)")
+            elif name == "yaml.load" and not any(keyword.arg == "Loader" for keyword in node.keywords) \
+                    and len(node.args) < 2:
+                self._finding(node, name, "Loader belirtilmeden yaml.load")
+        self.generic_visit(node)
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> None:
+        self.branches += len(node.values) - 1
+        self.generic_visit(node)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        if isinstance(node, _BRANCH_NODES):
+            self.branches += 1
+        super().generic_visit(node)
+
+
+@dataclass
+class FileAnalysis:
+    """Tek bir Python dosyasının analiz sonucu"""
+    path: str
+    content_hash: str
+    lines: int = 0
+    imports: List[str] = field(default_factory=list)
+    definitions: List[Tuple[str, str, int]] = field(default_factory=list)
+    calls: Dict[str, int] = field(default_factory=dict)
+    findings: List[Finding] = field(default_factory=list)
+    complexity: int = 0
+    syntax_error: Optional[str] = None
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        del data["path"]
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, data: str, path: str) -> "FileAnalysis":
+        values = json.loads(data)
+        values["definitions"] = [tuple(item) for item in values["definitions"]]
+        # Bulgular aynı içerikli başka bir yoldan gelmiş olabilir
+        values["findings"] = [Finding(path, item["line"], item["rule"], item["message"])
+                              for item in values["findings"]]
+        return cls(path=path, **values)
+
+
+def analyze_source(path: str, content: str, content_hash: str = "") -> FileAnalysis:
+    """Python kaynağını tek geçişte analiz eder"""
+    result = FileAnalysis(path, content_hash, lines=len(content.splitlines()))
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError) as e:
+        result.syntax_error = str(e)
+        return result
+    visitor = PythonAnalysisVisitor(path)
+    visitor.visit(tree)
+    result.imports = visitor.imports
+    result.definitions = visitor.definitions
+    result.calls = dict(Counter(visitor.calls))
+    result.findings = visitor.findings
+    result.complexity = visitor.branches + 1
+    return result
+
+
+def _analyze_file(abs_path: str, path: str) -> Optional[FileAnalysis]:
+    """Süreç havuzu işçisi: dosyayı okur, içerik özetini çıkarır ve analiz eder"""
+    try:
+        with open(abs_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    content_hash = hashlib.sha1(data).hexdigest()
+    return analyze_source(path, data.decode("utf-8", errors="ignore"), content_hash)
+
+
+@dataclass
+class AnalysisReport:
+    """Bir dizinin birleştirilmiş analiz raporu"""
+    root: str
+    files: List[FileAnalysis] = field(default_factory=list)
+    analyzed: int = 0     # Bu çalıştırmada ayrıştırılan dosyalar
+    cached: int = 0       # Önbellekten gelenler
+    elapsed: float = 0.0
+
+    @property
+    def lines(self) -> int:
+        return sum(item.lines for item in self.files)
+
+    @property
+    def findings(self) -> List[Finding]:
+        return sorted((finding for item in self.files for finding in item.findings),
+                      key=lambda finding: (finding.path, finding.line))
+
+    @property
+    def syntax_errors(self) -> List[FileAnalysis]:
+        return [item for item in self.files if item.syntax_error]
+
+    def definition_counts(self) -> Counter:
+        return Counter(kind for item in self.files for kind, _, _ in item.definitions)
+
+    def top_imports(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """En çok import edilen üst düzey modüller (dosya sayısı)"""
+        counts = Counter()
+        for item in self.files:
+            counts.update({name.split(".")[0] or "." for name in item.imports})
+        return counts.most_common(limit)
+
+    def top_calls(self, limit: int = 10) -> List[Tuple[str, int]]:
+        counts = Counter()
+        for item in self.files:
+            counts.update(item.calls)
+        return counts.most_common(limit)
+
+    def most_complex(self, limit: int = 5) -> List[FileAnalysis]:
+        return sorted(self.files, key=lambda item: (-item.complexity, item.path))[:limit]
+
+    def summary(self) -> str:
+        """Tek satırlık rapor"""
+        return (f"{len(self.files)} Python dosyası, {self.lines} satır, {len(self.findings)} bulgu "
+                f"({self.analyzed} analiz edildi, {self.cached} önbellekten, {self.elapsed:.2f} sn)")
+
+
+class CodeAnalysisEngine:
+    """Dizin analizi: değişmeyen dosyalar (mtime/boyut) okunmaz, aynı içerik yeniden ayrıştırılmaz
+
+    Ayrıştırılacak dosya sayısı eşiği geçerse işler süreç havuzuna dağıtılır.
+    Sonuçlar içerik özetine göre proje indeksi veritabanında saklanır.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or config.PROJECT_INDEX_CONFIG["db_path"]).absolute()
+        self._lock = threading.Lock()
+        self._db_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=MEMORY')
+        if not self._db_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS analysis_files (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER,
+                    size INTEGER,
+                    content_hash TEXT NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS analysis_results (
+                    content_hash TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (content_hash, version)
+                )
+            ''')
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    @staticmethod
+    def _load(conn: sqlite3.Connection, files: List[Tuple[str, str, int, int]]) -> Dict[str, FileAnalysis]:
+        """mtime/boyutu değişmemiş dosyaların önbellekteki sonuçları: mutlak yol -> analiz"""
+        found: Dict[str, FileAnalysis] = {}
+        stats = {abs_path: (rel, mtime_ns, size) for abs_path, rel, mtime_ns, size in files}
+        for start in range(0, len(files), 500):
+            batch = [abs_path for abs_path, _, _, _ in files[start:start + 500]]
+            rows = conn.execute(
+                f'SELECT f.path, f.mtime_ns, f.size, r.data FROM analysis_files f '
+                f'JOIN analysis_results r ON r.content_hash = f.content_hash AND r.version = ? '
+                f'WHERE f.path IN ({",".join("?" * len(batch))})', [ANALYZER_VERSION] + batch
+            ).fetchall()
+            for abs_path, mtime_ns, size, data in rows:
+                rel, current_mtime, current_size = stats[abs_path]
+                if (mtime_ns, size) == (current_mtime, current_size):
+                    found[abs_path] = FileAnalysis.from_json(data, rel)
+        return found
+
+    @staticmethod
+    def _known(conn: sqlite3.Connection, hashes: List[str]) -> Dict[str, str]:
+        """Daha önce analiz edilmiş içerikler: özet -> JSON"""
+        found: Dict[str, str] = {}
+        hashes = list(set(hashes))
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            found.update(conn.execute(
+                f'SELECT content_hash, data FROM analysis_results WHERE version = ? AND content_hash IN '
+                f'({",".join("?" * len(batch))})', [ANALYZER_VERSION] + batch
+            ).fetchall())
+        return found
+
+    def _run(self, jobs: List[Tuple[str, str]],
+             progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, FileAnalysis]:
+        """Dosyaları analiz eder; çok dosya varsa süreç havuzunda"""
+        analysis_config = config.ANALYSIS_CONFIG
+        results: Dict[str, FileAnalysis] = {}
+        workers = analysis_config["workers"] or os.cpu_count() or 1
+        if len(jobs) >= analysis_config["process_pool_min_files"] and workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    mapped = pool.map(_analyze_file, [abs_path for abs_path, _ in jobs],
+                                      [rel for _, rel in jobs], chunksize=analysis_config["chunksize"])
+                    for done, ((abs_path, _), result) in enumerate(zip(jobs, mapped), 1):
+                        if result is not None:
+                            results[abs_path] = result
+                        if progress:
+                            progress(done, len(jobs))
+                return results
+            except (OSError, RuntimeError):
+                # Süreç oluşturulamıyorsa (kısıtlı ortam) aynı süreçte devam et
+                results = {}
+        for done, (abs_path, rel) in enumerate(jobs, 1):
+            result = _analyze_file(abs_path, rel)
+            if result is not None:
+                results[abs_path] = result
+            if progress:
+                progress(done, len(jobs))
+        return results
+
+    def analyze(self, directory: str = ".",
+                progress: Optional[Callable[[int, int], None]] = None) -> AnalysisReport:
+        """Dizindeki (ignore kurallarına uyan) tüm Python dosyalarını analiz eder"""
+        started = time.time()
+        root = os.path.abspath(directory)
+        limit = config.ANALYSIS_CONFIG["max_file_bytes"]
+        walked = file_walker.walk(root, max_entries=None).files
+        files = [(os.path.join(root, *entry.path.split("/")), entry.path, entry.mtime_ns, entry.size)
+                 for entry in walked if entry.name.endswith((".py", ".pyw")) and entry.size <= limit]
+
+        report = AnalysisReport(root)
+        cached: Dict[str, FileAnalysis] = {}
+        analyzed: Dict[str, FileAnalysis] = {}
+        with self._lock:
+            try:
+                conn = self._connect()
+                try:
+                    cached = self._load(conn, files)
+                    # Değişmiş görünen dosyalar: içerik özeti biliniyorsa (dokunulmuş, kopya) ayrıştırılmaz
+                    hashes: Dict[str, str] = {}
+                    for abs_path, _, _, _ in files:
+                        if abs_path not in cached:
+                            try:
+                                with open(abs_path, "rb") as f:
+                                    hashes[abs_path] = hashlib.sha1(f.read()).hexdigest()
+                            except OSError:
+                                continue
+                    known = self._known(conn, list(hashes.values()))
+                    relative = {abs_path: rel for abs_path, rel, _, _ in files}
+                    for abs_path, digest in hashes.items():
+                        if digest in known:
+                            cached[abs_path] = FileAnalysis.from_json(known[digest], relative[abs_path])
+                    analyzed = self._run([(abs_path, relative[abs_path]) for abs_path in hashes
+                                          if abs_path not in cached], progress)
+
+                    stats = {abs_path: (mtime_ns, size) for abs_path, _, mtime_ns, size in files}
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO analysis_files (path, mtime_ns, size, content_hash) '
+                        'VALUES (?, ?, ?, ?)',
+                        [(abs_path, *stats[abs_path], (analyzed.get(abs_path) or cached[abs_path]).content_hash)
+                         for abs_path in hashes if abs_path in cached or abs_path in analyzed]
+                    )
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO analysis_results (content_hash, version, data) VALUES (?, ?, ?)',
+                        [(result.content_hash, ANALYZER_VERSION, result.to_json()) for result in analyzed.values()]
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                # Önbellek kullanılamıyorsa yalnızca analiz edilir
+                cached = {}
+                analyzed = self._run([(abs_path, rel) for abs_path, rel, _, _ in files], progress)
+
+        merged = {**cached, **analyzed}
+        report.files = sorted(merged.values(), key=lambda item: item.path)
+        report.analyzed, report.cached = len(analyzed), len(cached)
+        report.elapsed = time.time() - started
+        return report
+
+
+# Global toplu kod analizi motoru
+analysis_engine = CodeAnalysisEngine()
@@ -0,0 +1,419 @@
+"""
+CortexCLI Kod Getirici (RAG)
+Proje dosyalarını sözdizimsel sınırlardan parçalara bölüp gömme vektörleriyle indeksler ve soruya anlamca en yakın parçaları getirir
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy yoksa anlamsal getirme devre dışı kalır
+    np = None
+
+import config
+from context_packer import context_packer
+from ollama_client import ollama_client, OllamaError, model_tag
+from model_catalog import model_catalog
+from project_index import FileEntry, get_project_index
+from semantic_cache import HashingEmbedder, HASHING_EMBEDDER
+
+
+def available() -> bool:
+    """Anlamsal getirme için numpy kurulu mu?"""
+    return np is not None
+
+
+def _chunk_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class RetrievedChunk:
+    """Soruya anlamca yakın bir kod parçası"""
+    path: str
+    start_line: int
+    end_line: int
+    similarity: float
+
+    @property
+    def label(self) -> str:
+        return f"{self.path}:{self.start_line}-{self.end_line}"
+
+    def overlaps(self, path: str, start_line: int, end_line: int) -> bool:
+        return path == self.path and start_line <= self.end_line and self.start_line <= end_line
+
+
+@dataclass
+class _FileState:
+    mtime_ns: int
+    size: int
+    content_hash: str
+    chunks: List[Tuple[int, int, str]]  # (başlangıç, bitiş, parça özeti)
+
+
+class IVFIndex:
+    """Ters dosya (IVF) bölümlemesi: küresel k-ortalamalar merkezleri ve liste başına satırlar
+
+    Sorguda yalnızca en yakın probe adet listedeki satırlar puanlanır.
+    """
+
+    def __init__(self, matrix: "np.ndarray", lists: int, iterations: int = 8, sample: int = 50):
+        rng = np.random.default_rng(0)
+        lists = max(1, min(lists, len(matrix)))
+        # Merkezler örneklem üzerinde eğitilir, tüm satırlar bir kez atanır
+        training = matrix[rng.choice(len(matrix), min(len(matrix), lists * sample), replace=False)]
+        centroids = training[rng.choice(len(training), lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(training @ centroids.T, axis=1)
+            for i in range(lists):
+                members = training[assignment == i]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[i] = centroid / norm if norm else centroid
+        self.centroids = centroids
+        assignment = np.argmax(matrix @ centroids.T, axis=1)
+        self.lists = [np.flatnonzero(assignment == i) for i in range(lists)]
+
+    def candidates(self, vector: "np.ndarray", probe: int) -> "np.ndarray":
+        nearest = np.argsort(-(self.centroids @ vector))[:probe]
+        return np.concatenate([self.lists[i] for i in nearest])
+
+
+class CodeRetriever:
+    """Tek bir proje kökünün parça gömme indeksi
+
+    Parçalar bağlam paketleyicinin sınırlarıyla (üst düzey tanımlar) aynıdır.
+    Dosyalar içerik özetiyle izlenir; değişen dosyanın yalnızca yeni içerikli
+    parçaları gömülür. Vektörler parça özetine göre SQLite'ta saklanır ve
+    bellekte tek bir numpy matrisinde aranır; parça sayısı büyükse IVF
+    bölümlemesi kullanılır.
+    """
+
+    def __init__(self, root: str = ".", db_path: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.db_path = Path(db_path or config.PROJECT_INDEX_CONFIG["db_path"]).absolute()
+        self._files: Dict[str, _FileState] = {}
+        self._vectors: Dict[str, "np.ndarray"] = {}  # parça özeti -> birim vektör (etkin gömücü)
+        self._vector_sets: Dict[str, Dict[str, "np.ndarray"]] = {}  # gömücü -> vektörleri (geçişte korunur)
+        self._embedder: Optional[str] = None
+        self._ollama_failed_at = 0.0
+        self._matrix = None
+        self._rows: List[Tuple[str, int, int]] = []
+        self._ivf: Optional[IVFIndex] = None
+        self._dirty = True
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._db_ready = False
+        self.embedded = 0  # Gömülen parça sayısı
+
+    @property
+    def enabled(self) -> bool:
+        return config.RETRIEVAL_CONFIG["enabled"] and available()
+
+    # --- Veritabanı ---
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=MEMORY')
+        if not self._db_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS retrieval_files (
+                    root TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    mtime_ns INTEGER,
+                    size INTEGER,
+                    content_hash TEXT NOT NULL,
+                    chunks TEXT NOT NULL,
+                    PRIMARY KEY (root, path)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS retrieval_vectors (
+                    embedder TEXT NOT NULL,
+                    chunk_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (embedder, chunk_hash)
+                )
+            ''')
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _load(self) -> None:
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    'SELECT path, mtime_ns, size, content_hash, chunks FROM retrieval_files WHERE root = ?',
+                    (self.root,)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            rows = []
+        self._files = {
+            path: _FileState(mtime_ns, size, content_hash, [tuple(chunk) for chunk in json.loads(chunks)])
+            for path, mtime_ns, size, content_hash, chunks in rows
+        }
+        self._loaded = True
+
+    def _load_vectors(self, hashes: List[str]) -> None:
+        """Etkin gömücüyle daha önce gömülmüş parçaları diskten alır"""
+        hashes = [digest for digest in set(hashes) if digest not in self._vectors]
+        try:
+            conn = self._connect()
+            try:
+                for start in range(0, len(hashes), 500):
+                    batch = hashes[start:start + 500]
+                    rows = conn.execute(
+                        f'SELECT chunk_hash, vector FROM retrieval_vectors WHERE embedder = ? AND chunk_hash IN '
+                        f'({",".join("?" * len(batch))})', [self._embedder] + batch
+                    ).fetchall()
+                    for digest, blob in rows:
+                        self._vectors[digest] = np.frombuffer(blob, dtype=np.float32)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _save(self, changed: List[str], removed: List[str], vectors: Dict[str, "np.ndarray"]) -> None:
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany('DELETE FROM retrieval_files WHERE root = ? AND path = ?',
+                                 [(self.root, path) for path in removed])
+                rows = []
+                for path in changed:
+                    state = self._files[path]
+                    rows.append((self.root, path, state.mtime_ns, state.size, state.content_hash,
+                                 json.dumps(state.chunks)))
+                conn.executemany(
+                    'INSERT OR REPLACE INTO retrieval_files (root, path, mtime_ns, size, content_hash, chunks) '
+                    'VALUES (?, ?, ?, ?, ?, ?)', rows
+                )
+                conn.executemany(
+                    'INSERT OR REPLACE INTO retrieval_vectors (embedder, chunk_hash, vector) VALUES (?, ?, ?)',
+                    [(self._embedder, digest, vector.astype(np.float32).tobytes())
+                     for digest, vector in vectors.items()]
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    # --- Gömme ---
+
+    def _select_embedder(self) -> str:
+        """Etkin gömücü; Ollama yakın zamanda yanıt vermediyse veya gömme modeli yüklü değilse hashing"""
+        retrieval_config = config.RETRIEVAL_CONFIG
+        hashing = HashingEmbedder(retrieval_config["hashing_dim"]).name
+        if retrieval_config["embedder"] == HASHING_EMBEDDER or (
+                time.time() - self._ollama_failed_at < retrieval_config["ollama_retry_interval"]):
+            return hashing
+        try:
+            installed = model_catalog.has(model_tag(retrieval_config["embedding_model"]))
+        except OllamaError:
+            installed = False
+        if not installed:
+            self._ollama_failed_at = time.time()
+            return hashing
+        return f"ollama-{retrieval_config['embedding_model']}"
+
+    def _use_embedder(self, embedder: str) -> None:
+        if embedder != self._embedder:
+            self._embedder = embedder
+            # Her gömücünün vektörleri bellekte kalır; geri dönüşte yalnızca eksikler diskten okunur
+            self._vectors = self._vector_sets.setdefault(embedder, {})
+            self._dirty = True
+            self._load_vectors([digest for state in self._files.values() for _, _, digest in state.chunks])
+
+    def _embed(self, text: str) -> "np.ndarray":
+        """Etkin gömücüyle birim vektör; Ollama hatası OllamaError olarak yükselir"""
+        retrieval_config = config.RETRIEVAL_CONFIG
+        if self._embedder.startswith(HASHING_EMBEDDER):
+            vector = HashingEmbedder(retrieval_config["hashing_dim"]).embed(text)
+        else:
+            vector = np.asarray(ollama_client.embed(retrieval_config["embedding_model"], text), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    # --- Güncelleme ---
+
+    def _abs(self, path: str) -> str:
+        return os.path.join(self.root, *path.split("/"))
+
+    def refresh(self, time_budget: Optional[float] = -1) -> int:
+        """Değişen dosyaları yeniden parçalar ve eksik parçaları gömer; gömülen parça sayısını döndürür
+
+        time_budget: verilmezse ayarlardaki değer, None sınırsız. Süre hem yeniden
+        parçalamayı hem gömmeyi sınırlar; dolunca kalan dosyalar ve parçalar
+        sonraki çağrılarda işlenir, arama o ana kadar gömülenlerle yapılır.
+        """
+        if not self.enabled:
+            return 0
+        retrieval_config = config.RETRIEVAL_CONFIG
+        if time_budget == -1:
+            time_budget = retrieval_config["time_budget"]
+        deadline = time.time() + time_budget if time_budget else None
+
+        project_index = get_project_index(self.root)
+        entries = [entry for entry in project_index.files()
+                   if entry.language and entry.size <= retrieval_config["max_file_bytes"]]
+        project_index.restat(entries)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._use_embedder(self._select_embedder())
+
+            current = {entry.path: entry for entry in entries}
+            removed = [path for path in self._files if path not in current]
+            for path in removed:
+                del self._files[path]
+            changed = []
+            for entry in entries:
+                state = self._files.get(entry.path)
+                if state is not None and (state.mtime_ns, state.size) == (entry.mtime_ns, entry.size):
+                    continue
+                if deadline and time.time() > deadline:
+                    break  # Kalan dosyalar sonraki yenilemede parçalanır
+                updated = self._rechunk(entry, state)
+                if updated is not None:
+                    self._files[entry.path] = updated
+                    changed.append(entry.path)
+            if removed or changed:
+                self._dirty = True
+
+            # Yalnızca vektörü olmayan (yeni içerikli) parçalar gömülür
+            pending: Dict[str, set] = {}
+            for path, state in self._files.items():
+                for _, _, digest in state.chunks:
+                    if digest not in self._vectors:
+                        pending.setdefault(path, set()).add(digest)
+            self._load_vectors([digest for digests in pending.values() for digest in digests])
+            vectors: Dict[str, "np.ndarray"] = {}
+            try:
+                for path in sorted(pending):
+                    if deadline and time.time() > deadline:
+                        break  # Kalan parçalar sonraki yenilemede gömülür
+                    for chunk in context_packer.chunks_for(self.root, current[path]):
+                        digest = _chunk_hash(chunk.text)
+                        if digest in pending[path] and digest not in self._vectors and digest not in vectors:
+                            vectors[digest] = self._embed(f"{path}\n{chunk.text}")
+            except OllamaError:
+                # Ollama'ya ulaşılamıyor: bir süre hashing gömücüsüyle devam et
+                self._ollama_failed_at = time.time()
+                self._save(changed, removed, vectors)
+                self._use_embedder(self._select_embedder())
+                return len(vectors) + self.refresh(time_budget)
+            self._vectors.update(vectors)
+            self.embedded += len(vectors)
+            if vectors:
+                self._dirty = True
+            if removed or changed or vectors:
+                self._save(changed, removed, vectors)
+            return len(vectors)
+
+    def _rechunk(self, entry: FileEntry, state: Optional[_FileState]) -> Optional[_FileState]:
+        """Dosyanın parçalarını günceller; içerik özeti değişmediyse parçalar korunur"""
+        try:
+            with open(self._abs(entry.path), "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return None
+        if state is not None and state.content_hash == digest:
+            return _FileState(entry.mtime_ns, entry.size, digest, state.chunks)
+        chunks = [(chunk.start_line, chunk.end_line, _chunk_hash(chunk.text))
+                  for chunk in context_packer.chunks_for(self.root, entry)]
+        return _FileState(entry.mtime_ns, entry.size, digest, chunks)
+
+    def _build(self) -> None:
+        """Parça satırlarından arama matrisini (ve gerekirse IVF bölümlemesini) kurar"""
+        rows, vectors = [], []
+        for path in sorted(self._files):
+            for start, end, digest in self._files[path].chunks:
+                vector = self._vectors.get(digest)
+                if vector is not None:
+                    rows.append((path, start, end))
+                    vectors.append(vector)
+        self._rows = rows
+        self._matrix = np.vstack(vectors).astype(np.float32) if vectors else None
+        self._ivf = None
+        min_chunks = config.RETRIEVAL_CONFIG["ivf_min_chunks"]
+        if self._matrix is not None and min_chunks and len(rows) >= min_chunks:
+            self._ivf = IVFIndex(self._matrix, int(len(rows) ** 0.5))
+        self._dirty = False
+
+    # --- Sorgular ---
+
+    def search(self, query: str, top_k: Optional[int] = None, refresh: bool = True) -> List[RetrievedChunk]:
+        """Soruya anlamca en yakın parçalar (benzerliğe göre azalan)"""
+        if not self.enabled or not query or not query.strip():
+            return []
+        retrieval_config = config.RETRIEVAL_CONFIG
+        top_k = top_k or retrieval_config["top_k"]
+        if refresh:
+            self.refresh()
+        with self._lock:
+            if self._embedder is None:
+                return []
+            if self._dirty:
+                self._build()
+            if self._matrix is None:
+                return []
+            try:
+                vector = self._embed(query)
+            except OllamaError:
+                self._ollama_failed_at = time.time()
+                return []
+            if len(vector) != self._matrix.shape[1]:
+                return []
+            if self._ivf is not None:
+                rows = self._ivf.candidates(vector, retrieval_config["ivf_probe"])
+                scores = self._matrix[rows] @ vector
+            else:
+                rows = np.arange(len(self._rows))
+                scores = self._matrix @ vector
+            count = min(top_k, len(scores))
+            best = np.argpartition(-scores, count - 1)[:count]
+            results = [RetrievedChunk(*self._rows[int(rows[i])], float(scores[i])) for i in best
+                       if scores[i] >= retrieval_config["min_similarity"]]
+        return sorted(results, key=lambda chunk: -chunk.similarity)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            chunks = sum(len(state.chunks) for state in self._files.values())
+            return {
+                'enabled': self.enabled,
+                'available': available(),
+                'embedder': self._embedder,
+                'files': len(self._files),
+                'chunks': chunks,
+                'embedded_chunks': sum(1 for state in self._files.values()
+                                       for _, _, digest in state.chunks if digest in self._vectors),
+                'ivf_lists': len(self._ivf.lists) if self._ivf else 0,
+                'embedded': self.embedded
+            }
+
+
+_retrievers: Dict[str, CodeRetriever] = {}
+_retrievers_lock = threading.Lock()
+
+
+def get_retriever(directory: str = ".") -> CodeRetriever:
+    """Dizinin (yoksa oluşturulan) paylaşılan kod getiricisini döndürür"""
+    root = os.path.abspath(directory)
+    with _retrievers_lock:
+        retriever = _retrievers.get(root)
+        if retriever is None:
+            retriever = _retrievers[root] = CodeRetriever(root)
+        return retriever
@@ -32,7 +32,8 @@ DEFAULT_SETTINGS = {
     "multi_line": False,
     "timeout": 60,
     "max_tokens": 2048,
-    "temperature": 0.7
+    "temperature": 0.7,
+    "stream": True
 }
 
 # Sistem prompt şablonları
@@ -62,8 +63,217 @@ SUPPORTED_FILE_EXTENSIONS = [".txt", ".md", ".py", ".js", ".html", ".css", ".jso
 OLLAMA_CONFIG = {
     "base_url": "http://localhost:11434",
     "api_endpoint": "/api/generate",
+    "chat_endpoint": "/api/chat",
     "tags_endpoint": "/api/tags",
-    "timeout": 60
+    "show_endpoint": "/api/show",
+    "version_endpoint": "/api/version",
+    "ps_endpoint": "/api/ps",
+    "embeddings_endpoint": "/api/embeddings",
+    "timeout": 120,
+    "connect_timeout": 5,
+    "max_retries": 2,
+    "pool_size": 10,
+    "coalesce": True,  # Özdeş eşzamanlı istekler tek üretimi paylaşır
+    # Birden fazla Ollama sunucusu: ["http://gpu1:11434", {"url": "http://cpu2:11434", "weight": 0.5}]
+    # Boşsa yalnızca base_url kullanılır
+    "backends": []
+}
+
+# Çoklu sunucu yönlendirme ayarları
+ROUTER_CONFIG = {
+    "policy": "least_outstanding",  # "least_outstanding" veya "latency"
+    "failure_cooldown": 5,          # İlk bağlantı hatasından sonra devre dışı kalma süresi (s)
+    "max_cooldown": 60,             # En uzun devre dışı kalma süresi (s)
+    "sticky_sessions": 10000        # Hatırlanan en fazla sohbet -> sunucu eşlemesi
+}
+
+# LLM yanıt önbelleği ayarları
+RESPONSE_CACHE_CONFIG = {
+    "enabled": True,
+    "db_path": "cortex_cache.db",
+    "memory_entries": 256,
+    "disk_entries": 5000,
+    "ttl": 7 * 24 * 3600,
+    # False: yalnızca temperature 0 olan istekler önbelleğe alınır
+    "cache_nondeterministic": False
+}
+
+# Anlamsal (benzer soru) yanıt önbelleği
+SEMANTIC_CACHE_CONFIG = {
+    "enabled": False,
+    "mode": "answer",                    # "answer": önbellekteki yanıtı döndür, "draft": taslak olarak modele ver
+    "embedder": "ollama",                # "ollama" (/api/embeddings) veya "hashing" (çevrimdışı)
+    "embedding_model": "nomic-embed-text",
+    "threshold": 0.92,                   # Kosinüs benzerliği eşiği
+    "max_entries": 2000,                 # Model + sistem promptu başına kayıt sınırı
+    "hashing_dim": 1024,                 # Hashing vektörleştirici boyutu
+    "ollama_retry_interval": 60          # Ollama'ya ulaşılamazsa bu kadar saniye hashing kullanılır
+}
+
+# Model kataloğu ayarları
+MODEL_CATALOG_CONFIG = {
+    "ttl": 60,            # /api/tags sonucunun geçerlilik süresi (saniye)
+    "health_ttl": 5,      # Sağlık kontrolü sonucunun geçerlilik süresi (saniye)
+    "probe_timeout": 2    # Sağlık kontrolü HTTP zaman aşımı (saniye)
+}
+
+# Çok turlu sohbet (/api/chat) ayarları
+CONVERSATION_CONFIG = {
+    "num_ctx": 8192,            # Modelden istenen bağlam penceresi (token)
+    "response_reserve": 1024,   # Yanıt için ayrılan token payı
+    "summary_max_chars": 1500,  # Pencereden düşen turların özet uzunluğu
+    "chars_per_token": 4,       # Token tahmini için karakter/token oranı
+    "max_sessions": 1000,       # Bellekte tutulan en fazla sohbet oturumu (en uzun süredir kullanılmayan silinir)
+    "session_ttl": 86400        # Bu kadar saniye kullanılmayan oturum silinir
+}
+
+# Sabit bağlam önekinin KV önbelleğiyle yeniden kullanımı
+PREFIX_CACHE_CONFIG = {
+    "enabled": True,
+    "keep_alive": "30m",   # Model (ve KV önbelleği) bellekte kalma süresi
+    "project_ttl": 30      # Proje dosya listesinin yeniden taranma aralığı (saniye)
+}
+
+# Turlar arası bağlam farkları: önekteki dosya düzenlenince yalnızca değişen hunk'lar gönderilir
+CONTEXT_DIFF_CONFIG = {
+    "enabled": True,
+    "context_lines": 3,   # Hunk başına değişmeyen bağlam satırı
+    "max_ratio": 0.5      # Fark, dosyanın tamamının bu oranından büyükse önek yeniden kurulur
+}
+
+# Web sunucusu LLM zamanlayıcısı ayarları
+SCHEDULER_CONFIG = {
+    "default_model_concurrency": 2,  # Model başına aynı anda çalışan istek
+    "model_concurrency": {},         # Modele özel sınırlar: {"qwen2.5:7b": 4}
+    "client_weights": {},            # İstemciye özel adil paylaşım ağırlıkları
+    "max_queue": 100                 # Bekleyebilecek en fazla istek
+}
+
+# Model bellek yönetimi (ön yükleme, keep_alive, sabitleme)
+RESIDENCY_CONFIG = {
+    "preload": True,           # Başlangıçta varsayılan ve aktif modelleri arka planda yükle
+    "keep_alive": "30m",       # Sabitlenmemiş modellerin bellekte kalma süresi
+    "memory_budget_gb": None,  # Yüklü modeller için bellek bütçesi (None: sınırsız)
+    "predict_count": 1,        # Kullanım geçmişinden tahmin edilip önceden yüklenen model sayısı
+    "ps_ttl": 2                # /api/ps sonucunun önbellekte tutulma süresi (s)
+}
+
+# Proje dosya indeksi (bağlam, /find, /tree ve web dosya API'leri)
+PROJECT_INDEX_CONFIG = {
+    "db_path": "cortex_index.db",
+    "sweep_interval": 2,                 # Dizin mtime taramaları arası en az süre (saniye)
+    "watch": False,                      # watchdog kuruluysa dosya sistemi olaylarını dinle
+    "max_files": 20000,                  # Kök başına indekslenecek en fazla dosya
+    "journal_size": 64                   # Türev indekslerin artımlı güncellemesi için tutulan tarama sayısı
+}
+
+# Dizin tarama ayarları (tüm dosya özellikleri tarafından paylaşılır)
+WALKER_CONFIG = {
+    "ignore_files": [".gitignore", ".cortexignore"],
+    "exclude_dirs": [".git", ".hg", ".svn", "node_modules", "__pycache__", "venv", ".venv", "env",
+                     "dist", "build", "site-packages", ".tox", ".mypy_cache", ".pytest_cache"],
+    "include_hidden": False,             # Nokta ile başlayan dosya/dizinleri de tara
+    "max_entries": 50000,                # Tek taramada en fazla girdi (None: sınırsız)
+    "time_budget": 5.0,                  # Tek tarama için süre sınırı (saniye, None: sınırsız)
+    "parallel_threshold": 32,            # Bu kadar dizin içeren seviyeler paralel taranır
+    "workers": 8
+}
+
+# Token bütçeli, ilgiye göre sıralanan bağlam paketleyici
+CONTEXT_PACKER_CONFIG = {
+    "enabled": True,
+    "budget_ratio": 0.5,                 # İstem bütçesinin bağlama ayrılan payı (kalanı geçmiş ve soru için)
+    "overview_tokens": 300,              # Proje dosya listesinin en fazla token'ı
+    "chunk_lines": 40,                   # Tanım sınırlarında bölünemeyen parçaların satır sınırı
+    "max_files": 50,                     # Parçalanıp puanlanacak en fazla aday dosya
+    "max_file_bytes": 200000,            # Bundan büyük dosyalar aday olmaz
+    "recency_half_life": 24,             # Yenilik puanının yarılanma süresi (saat)
+    "weights": {
+        "lexical": 1.0,                  # Soru ile kelime örtüşmesi (BM25)
+        "symbol": 2.0,                   # Soruda adı geçen fonksiyon/sınıf tanımları
+        "recency": 0.5,                  # Yakın zamanda değişen dosyalar
+        "current_file": 1.5,             # /context file ile seçilen dosya
+        "semantic": 2.0,                 # Anlamsal getiricinin benzer bulduğu parçalar (kosinüs benzerliği)
+        "import_graph": 1.5              # Seçili dosyanın import ettiği/onu import eden dosyalar (grafik puanı 0-1)
+    }
+}
+
+# Proje geneli sembol indeksi (tanımlar, importlar)
+SYMBOL_INDEX_CONFIG = {
+    "max_file_bytes": 2000000,           # Bundan büyük dosyalar indekslenmez
+    "process_pool_min_bytes": 262144,    # Bu boyuttan büyük dosyalar ayrı süreçlerde ayrıştırılır
+    "workers": 4
+}
+
+# İçe aktarma grafiği (/context file ile seçilen dosyanın komşuları bağlama eklenir)
+IMPORT_GRAPH_CONFIG = {
+    "enabled": True,
+    "hops": 2,                           # Komşulukta izlenecek en fazla kenar sayısı
+    "max_neighbors": 8                   # Bağlama aday olacak en fazla komşu dosya
+}
+
+# Bellek içi dosya adı indeksi (/find, akıllı dosya navigasyonu; fzf tarzı bulanık sıralama)
+FILENAME_INDEX_CONFIG = {
+    "limit": 20,                         # Varsayılan sonuç sayısı
+    "max_candidates": 1000,              # Ön sıralamaya girecek en fazla aday yol
+    "rescore": 100,                      # fzf puanıyla yeniden sıralanacak en iyi aday sayısı
+    "min_quality": 0.5                   # Doğal dildeki sorgularda kabul edilen en düşük eşleşme kalitesi (0-1)
+}
+
+# Büyük bağlam dosyaları için önbellekli model özetleri (kesilmiş metin yerine)
+FILE_SUMMARY_CONFIG = {
+    "enabled": True,
+    "model": "qwen2.5-coder:1.5b",       # Özetleri üreten küçük model
+    "min_lines": 100,                    # Bundan uzun dosyalar özetlenir
+    "section_chars": 12000,              # Modele tek istekte verilen en fazla kod (karakter)
+    "max_tokens": 300,                   # Bölüm başına özet uzunluğu (num_predict)
+    "max_file_bytes": 500000,            # Bundan büyük dosyalar özetlenmez
+    "keep_unreferenced": 32,             # Hiçbir dosyanın kullanmadığı en yeni bu kadar özet saklanır (geri alınan düzenlemeler)
+    "retry_interval": 300                # Ollama/model hatasından sonra yeni özet denenmeden beklenen süre (saniye)
+}
+
+# Proje geneli metin arama indeksi (trigram; /search, /grep)
+TEXT_INDEX_CONFIG = {
+    "index_dir": ".cortex_search",       # Segment dosyalarının dizini
+    "max_file_bytes": 5242880,           # Bundan büyük dosyalar indekslenmez
+    "segment_files": 2000,               # Bir segmentteki en fazla dosya
+    "max_small_segments": 8,             # Bundan fazla küçük segment birikince birleştirilir
+    "process_pool_min_files": 200,       # Bu kadar dosya değiştiyse trigramlar süreç havuzunda çıkarılır
+    "workers": 4,
+    "budget_batch_files": 200,           # Süre sınırlı yenilemede (web araması) tek seferde indekslenen dosya
+    "page_size": 20,                     # Sayfa başına sonuç satırı
+    "max_page_size": 200,                # Web API'de istemcinin isteyebileceği en büyük sayfa
+    "max_pattern_chars": 256,            # Web API'de kabul edilen en uzun arama ifadesi
+    "web_time_budget": 2.0               # Web API aramalarının süre sınırı (saniye); aşılınca kısmi sayfa döner
+}
+
+# Anlamsal kod getirme (RAG; parça gömmeleri)
+RETRIEVAL_CONFIG = {
+    "enabled": True,
+    "embedder": "ollama",                # "ollama" (/api/embeddings) veya "hashing" (çevrimdışı)
+    "embedding_model": "nomic-embed-text",
+    "hashing_dim": 1024,                 # Hashing vektörleştirici boyutu
+    "ollama_retry_interval": 60,         # Ollama'ya ulaşılamazsa bu kadar saniye hashing kullanılır
+    "max_file_bytes": 200000,            # Bundan büyük dosyalar parçalanmaz
+    "time_budget": 2.0,                  # Soru başına gömmeye ayrılan süre (saniye); kalanlar sonraki soruda
+    "top_k": 8,                          # Getirilen parça sayısı
+    "min_similarity": 0.2,               # Bu benzerliğin altındaki parçalar getirilmez
+    "ivf_min_chunks": 5000,              # Bu kadar parçadan sonra IVF bölümlemesi (0: kapalı)
+    "ivf_probe": 8                       # Sorguda taranan IVF listesi sayısı
+}
+
+# Toplu kod analizi (/context analyze <dizin>)
+ANALYSIS_CONFIG = {
+    "workers": 0,                        # Süreç havuzu boyutu (0: CPU sayısı)
+    "process_pool_min_files": 32,        # Bu kadar dosya analiz edilecekse süreç havuzu kullanılır
+    "chunksize": 16,                     # İşçiye tek seferde gönderilen dosya sayısı
+    "max_file_bytes": 1000000            # Bundan büyük dosyalar analiz edilmez
+}
+
+# Çoklu model sorgu ayarları
+MULTI_MODEL_CONFIG = {
+    "model_timeout": 120,
+    "max_concurrency": 4
 }
 
 OUTPUT_DIR = "output"
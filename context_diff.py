@@ -0,0 +1,114 @@
+"""
+CortexCLI Bağlam Farkları
+Sohbette modele daha önce gönderilen dosya içeriğini hatırlar; dosya düzenlendiğinde tamamı yerine değişen hunk'ları üretir
+"""
+
+import difflib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import config
+from conversation import estimate_tokens
+
+
+@dataclass
+class FileDelta:
+    """Dosyanın modele gönderilmiş haliyle şimdiki hali arasındaki fark"""
+    path: str
+    kind: str              # unchanged, diff, full (fark dosyanın tamamından pahalı)
+    hunks: str             # Birleşik fark gövdesi (@@ başlıklarıyla)
+    added: int
+    removed: int
+    tokens: int            # Farkın modele maliyeti
+    full_tokens: int       # Dosyayı yeniden göndermenin maliyeti
+
+    def render(self) -> str:
+        return (f"=== DEĞİŞİKLİK: {self.path} (yukarıda verilen halinden bu yana, "
+                f"+{self.added}/-{self.removed} satır) ===\n```diff\n{self.hunks}\n```\n")
+
+    def summary(self) -> str:
+        """Tek satırlık rapor"""
+        return (f"{self.path}: +{self.added}/-{self.removed} satır, ~{self.tokens} token "
+                f"(tam dosya ~{self.full_tokens} token)")
+
+
+def diff_text(path: str, old: str, new: str, context_lines: Optional[int] = None,
+              max_ratio: Optional[float] = None) -> FileDelta:
+    """İki içerik arasındaki farkı hesaplar; fark tam dosyanın max_ratio katını aşarsa tür full olur"""
+    diff_config = config.CONTEXT_DIFF_CONFIG
+    context_lines = diff_config["context_lines"] if context_lines is None else context_lines
+    max_ratio = diff_config["max_ratio"] if max_ratio is None else max_ratio
+    full_tokens = estimate_tokens(new)
+    if old == new:
+        return FileDelta(path, "unchanged", "", 0, 0, 0, full_tokens)
+
+    # Dosya adı başlığı render() içinde; ---/+++ satırları atlanır
+    lines = list(difflib.unified_diff(old.splitlines(), new.splitlines(), n=context_lines, lineterm=""))[2:]
+    added = sum(1 for line in lines if line.startswith("+"))
+    removed = sum(1 for line in lines if line.startswith("-"))
+    delta = FileDelta(path, "diff", "\n".join(lines), added, removed, 0, full_tokens)
+    delta.tokens = estimate_tokens(delta.render())
+    if delta.tokens > full_tokens * max_ratio:
+        delta.kind = "full"
+    return delta
+
+
+class ContextDiffTracker:
+    """Modele gönderilmiş dosya içerikleri (mutlak yol -> metin)
+
+    Bağlam öneki kurulurken seçili dosyanın o anki içeriği kaydedilir; sonraki
+    turlarda delta() bu kayda göre birikmiş farkı döndürür. Önek yeniden
+    kurulunca kayıt da yenilenir, böylece farklar her zaman modelin gördüğü
+    metne göredir.
+    """
+
+    def __init__(self):
+        self._sent: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _read(path: str) -> Optional[str]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def remember(self, path: str, text: Optional[str] = None) -> bool:
+        """Dosyanın modele gönderilen halini kaydeder"""
+        text = self._read(path) if text is None else text
+        with self._lock:
+            if text is None:
+                self._sent.pop(os.path.abspath(path), None)
+                return False
+            self._sent[os.path.abspath(path)] = text
+            return True
+
+    def delta(self, path: str, text: Optional[str] = None) -> Optional[FileDelta]:
+        """Kayıtlı halinden bu yana fark; kayıt yoksa veya dosya okunamıyorsa None"""
+        with self._lock:
+            sent = self._sent.get(os.path.abspath(path))
+        if sent is None:
+            return None
+        text = self._read(path) if text is None else text
+        if text is None:
+            return None
+        return diff_text(path, sent, text)
+
+    def forget(self, path: Optional[str] = None) -> None:
+        """Kaydı (yol verilmezse tüm kayıtları) siler"""
+        with self._lock:
+            if path is None:
+                self._sent.clear()
+            else:
+                self._sent.pop(os.path.abspath(path), None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'files': len(self._sent), 'chars': sum(len(text) for text in self._sent.values())}
+
+
+# Global bağlam farkı izleyicisi
+context_diffs = ContextDiffTracker()
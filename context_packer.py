@@ -0,0 +1,332 @@
+"""
+CortexCLI Bağlam Paketleyici
+Proje dosyalarını parçalara bölüp soruyla ilgisine göre puanlar ve modelin token bütçesini en değerli parçalarla doldurur
+"""
+
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+import config
+from conversation import estimate_tokens, prompt_budget
+from project_index import get_project_index, FileEntry
+from symbol_index import get_symbol_index, Symbol
+from import_graph import get_import_graph
+
+_WORD_RE = re.compile(r"[^\W\d_][\w]*", re.UNICODE)
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_DEFINITION_RE = re.compile(
+    r"^(?:async\s+def|def|class|function|async\s+function|export\s+(?:default\s+)?(?:function|class|const)|"
+    r"func|fn|pub\s+fn|interface|struct|impl)\s+([A-Za-z_$][\w$]*)"
+)
+_STOPWORDS = {
+    "the", "and", "for", "with", "this", "that", "what", "how", "why", "does", "from", "into",
+    "bir", "bu", "şu", "ile", "için", "nasıl", "neden", "nedir", "olan", "gibi", "daha", "veya",
+    "ama", "var", "yok", "mi", "mı", "mu", "mü", "ne", "de", "da", "ve", "kod", "dosya"
+}
+# Dosya listesinde öne çıkarılan giriş/yapılandırma dosyaları
+_IMPORTANT_NAMES = ("main", "app", "config", "requirements", "setup", "readme", "package", "pyproject")
+
+
+def tokenize(text: str) -> List[str]:
+    """Kelimeleri küçük harfe çevirir; snake_case ve camelCase tanımlayıcıları parçalarına da ayırır"""
+    terms = []
+    for word in _WORD_RE.findall(text or ""):
+        lower = word.lower()
+        terms.append(lower)
+        parts = [part.lower() for piece in word.split("_") for part in _CAMEL_RE.findall(piece)]
+        if len(parts) > 1:
+            terms.extend(parts)
+    return [term for term in terms if len(term) >= 3 and term not in _STOPWORDS]
+
+
+@dataclass
+class Chunk:
+    """Bir dosyanın ardışık satırlarından oluşan aday bağlam parçası"""
+    path: str            # Proje köküne göreli
+    start_line: int      # 1'den başlar
+    end_line: int
+    text: str
+    symbols: List[str] = field(default_factory=list)
+    terms: Counter = field(default_factory=Counter, repr=False)
+    tokens: int = 0
+    relevance: float = 0.0   # Yalnızca soruya bağlı kısım (örtüşme + sembol)
+    score: float = 0.0
+
+    @property
+    def label(self) -> str:
+        return f"{self.path}:{self.start_line}-{self.end_line}"
+
+    def render(self) -> str:
+        return f"=== DOSYA: {self.path} (satır {self.start_line}-{self.end_line}) ===\n{self.text.rstrip()}\n"
+
+
+@dataclass
+class PackedContext:
+    """Paketleme sonucu: modele gidecek metin ve neyin neden seçildiği"""
+    text: str
+    chunks: List[Chunk]
+    budget: int
+    used_tokens: int
+    candidates: int
+    overview_files: int = 0
+
+    def summary(self) -> str:
+        """Tek satırlık rapor"""
+        files = len({chunk.path for chunk in self.chunks})
+        return (f"{len(self.chunks)} parça / {files} dosya, {self.used_tokens}/{self.budget} token "
+                f"({self.candidates} aday)")
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Seçilen parçaların ayrıntısı"""
+        return [
+            {'chunk': chunk.label, 'tokens': chunk.tokens, 'score': round(chunk.score, 3),
+             'symbols': ", ".join(chunk.symbols[:3])}
+            for chunk in self.chunks
+        ]
+
+
+class ContextPacker:
+    """Soruya göre en alakalı kod parçalarını token bütçesine sığdıran paketleyici
+
+    Puan = kelime örtüşmesi (BM25) + soruda geçen sembol tanımları + dosyanın
+    yeniliği + seçili dosya bonusu. Parçalar puan sırasıyla bütçe dolana kadar
+    eklenir; çıktıda dosya ve satır sırasına dizilir.
+    """
+
+    def __init__(self):
+        self._chunks: "OrderedDict[str, Tuple[int, int, List[Chunk]]]" = OrderedDict()  # yol -> (mtime, boyut, parçalar)
+        self._lock = threading.Lock()
+        self.last: Dict[str, PackedContext] = {}  # Etiket -> son paketleme raporu
+
+    def budget_for(self, model: str) -> int:
+        """Modelin bağlam penceresinden bağlama ayrılan token sayısı"""
+        return int(prompt_budget(model) * config.CONTEXT_PACKER_CONFIG["budget_ratio"])
+
+    # --- Parçalama ---
+
+    def _split(self, path: str, lines: List[str]) -> List[Chunk]:
+        """Dosyayı üst düzey tanım sınırlarından, uzun bölümleri satır sınırından böler"""
+        limit = config.CONTEXT_PACKER_CONFIG["chunk_lines"]
+        starts = [0] + [i for i, line in enumerate(lines) if i and _DEFINITION_RE.match(line)]
+        chunks = []
+        for index, start in enumerate(starts):
+            end = starts[index + 1] if index + 1 < len(starts) else len(lines)
+            for piece in range(start, end, limit):
+                body = lines[piece:min(end, piece + limit)]
+                text = "".join(body)
+                if not text.strip():
+                    continue
+                symbols = [match.group(1) for match in map(_DEFINITION_RE.match, (line.lstrip() for line in body))
+                           if match]
+                chunks.append(Chunk(path, piece + 1, piece + len(body), text, symbols,
+                                    Counter(tokenize(text)), estimate_tokens(text) + 12))
+        return chunks
+
+    def chunks_for(self, root: str, entry: FileEntry) -> List[Chunk]:
+        """Dosyanın parçaları; dosya değişmedikçe önbellekten"""
+        abs_path = os.path.join(root, *entry.path.split("/"))
+        with self._lock:
+            cached = self._chunks.get(abs_path)
+            if cached and cached[0] == entry.mtime_ns and cached[1] == entry.size:
+                self._chunks.move_to_end(abs_path)
+                return cached[2]
+        try:
+            with open(abs_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except (OSError, UnicodeDecodeError):
+            lines = []
+        chunks = self._split(entry.path, lines)
+        with self._lock:
+            self._chunks[abs_path] = (entry.mtime_ns, entry.size, chunks)
+            while len(self._chunks) > 512:
+                self._chunks.popitem(last=False)
+        return chunks
+
+    # --- Puanlama ---
+
+    @staticmethod
+    def _recency(entry: FileEntry, now: float) -> float:
+        age_hours = max(0.0, now - entry.mtime_ns / 1e9) / 3600
+        return 0.5 ** (age_hours / config.CONTEXT_PACKER_CONFIG["recency_half_life"])
+
+    def rank_files(self, entries: List[FileEntry], query_terms: Iterable[str] = ()) -> List[FileEntry]:
+        """Dosyaları adlarının soruyla örtüşmesi, önemi ve yeniliğine göre sıralar (içerik okunmaz)"""
+        terms = set(query_terms)
+        now = time.time()
+
+        def score(entry: FileEntry) -> float:
+            path_terms = set(tokenize(entry.path.replace("/", " ").replace(".", " ")))
+            value = 2.0 * len(terms & path_terms)
+            if any(name in entry.name.lower() for name in _IMPORTANT_NAMES):
+                value += 1.0
+            return value + self._recency(entry, now)
+
+        return sorted(entries, key=lambda entry: (-score(entry), entry.path))
+
+    def _score(self, chunks: List[Chunk], query_terms: List[str], entries: Dict[str, FileEntry],
+               current: Optional[str], definitions: Iterable[Symbol] = (), retrieved: Iterable[Any] = (),
+               related: Optional[Dict[str, float]] = None) -> None:
+        weights = config.CONTEXT_PACKER_CONFIG["weights"]
+        now = time.time()
+        unique_terms = set(query_terms)
+        document_frequency = Counter(term for chunk in chunks for term in unique_terms if term in chunk.terms)
+        average_length = sum(sum(chunk.terms.values()) for chunk in chunks) / len(chunks) if chunks else 1.0
+        defined_in: Dict[str, List[Symbol]] = {}
+        for symbol in definitions:
+            defined_in.setdefault(symbol.path, []).append(symbol)
+        similar_in: Dict[str, List[Any]] = {}
+        for hit in retrieved:
+            similar_in.setdefault(hit.path, []).append(hit)
+        related = related or {}
+
+        for chunk in chunks:
+            lexical = 0.0
+            length = sum(chunk.terms.values()) or 1
+            for term in unique_terms:
+                frequency = chunk.terms.get(term, 0)
+                if not frequency:
+                    continue
+                idf = math.log(1 + (len(chunks) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+                lexical += idf * frequency * 2.2 / (frequency + 1.2 * (0.25 + 0.75 * length / average_length))
+            # Sembol indeksinden soruda adı geçen tanımlar; indekste olmayan diller için parça içi regex
+            hit_names = {symbol.name for symbol in defined_in.get(chunk.path, [])
+                         if chunk.start_line <= symbol.line <= chunk.end_line}
+            for symbol in chunk.symbols:
+                parts = set(tokenize(symbol))
+                if symbol.lower() in unique_terms or (parts and parts <= unique_terms):
+                    hit_names.add(symbol)
+            symbol_hits = len(hit_names)
+            # Anlamsal getiricinin bu satırlarla örtüşen en benzer parçası
+            semantic = max((hit.similarity for hit in similar_in.get(chunk.path, [])
+                            if hit.overlaps(chunk.path, chunk.start_line, chunk.end_line)), default=0.0)
+            chunk.relevance = (weights["lexical"] * lexical + weights["symbol"] * symbol_hits
+                               + weights["semantic"] * semantic
+                               # Seçili dosyanın import ettiği ve onu import eden dosyalar
+                               + weights["import_graph"] * related.get(chunk.path, 0.0))
+            chunk.score = (
+                chunk.relevance
+                + weights["recency"] * self._recency(entries[chunk.path], now)
+                + (weights["current_file"] if chunk.path == current else 0.0)
+                # Aynı puanda dosyanın başı (importlar, modül açıklaması) önce gelsin
+                + 0.01 / chunk.start_line
+            )
+
+    # --- Paketleme ---
+
+    def overview(self, directory: str = ".", query: Optional[str] = None,
+                 max_tokens: Optional[int] = None) -> Tuple[str, int]:
+        """Sıralı dosya listesi ve listeye giren dosya sayısı"""
+        max_tokens = max_tokens or config.CONTEXT_PACKER_CONFIG["overview_tokens"]
+        entries = get_project_index(directory).files()
+        ranked = self.rank_files(entries, tokenize(query or ""))
+        text = f"=== PROJE: {os.path.abspath(directory)} ===\nDOSYA YAPISI:\n"
+        shown = 0
+        for entry in ranked:
+            line = f"- {entry.path}\n"
+            if estimate_tokens(text + line) > max_tokens:
+                break
+            text += line
+            shown += 1
+        if shown < len(entries):
+            text += f"... ve {len(entries) - shown} dosya daha\n"
+        return text, shown
+
+    def pack(self, query: Optional[str], model: str, current_file: Optional[str] = None, directory: str = ".",
+             budget: Optional[int] = None, include_overview: bool = True,
+             exclude: Iterable[str] = (), label: str = "soru", retrieved: Iterable[Any] = ()) -> PackedContext:
+        """Bütçeyi en yüksek puanlı parçalarla doldurur
+
+        query None ise yalnızca seçili dosya paketlenir (turlar arasında sabit
+        kalan önek için). exclude: zaten gönderilmiş parça etiketleri veya dosya
+        yolları (dosyanın tüm parçaları atlanır).
+        retrieved: anlamsal getiricinin (code_retriever) soruya yakın bulduğu parçalar.
+        Seçili dosyanın içe aktarma grafiğindeki komşuları da aday olur.
+        """
+        packer_config = config.CONTEXT_PACKER_CONFIG
+        budget = self.budget_for(model) if budget is None else budget
+        index = get_project_index(directory)
+        root = index.root
+        entries = {entry.path: entry for entry in index.files()}
+        query_terms = tokenize(query or "")
+
+        current = None
+        if current_file:
+            current = os.path.relpath(os.path.abspath(current_file), root).replace(os.sep, "/")
+            if current not in entries:
+                entry = index.get(current_file)
+                current = entry.path if entry else None
+                if entry:
+                    entries[entry.path] = entry
+
+        text, used, overview_files = "", 0, 0
+        if include_overview and budget > 0:
+            text, overview_files = self.overview(directory, query, min(packer_config["overview_tokens"], budget))
+            used = estimate_tokens(text)
+
+        # Aday dosyalar: seçili dosya, grafikteki komşuları ve (soru varsa) ada/yeniliğe göre ön seçilenler
+        candidates = [entries[current]] if current else []
+        related: Dict[str, float] = {}
+        if current and config.IMPORT_GRAPH_CONFIG["enabled"]:
+            for neighbor in get_import_graph(directory).neighbors(os.path.join(root, current)):
+                entry = entries.get(neighbor.path)
+                if entry and entry.size <= packer_config["max_file_bytes"]:
+                    related[neighbor.path] = neighbor.score
+                    candidates.append(entry)
+        definitions: List[Symbol] = []
+        if query is not None:
+            eligible = [entry for entry in entries.values()
+                        if entry.language and entry.size <= packer_config["max_file_bytes"]
+                        and entry.path != current and entry.path not in related]
+            # Soruda adı geçen sembolleri tanımlayan dosyalar, adları eşleşmese de aday olur
+            definitions = get_symbol_index(directory).lookup(query_terms) if query_terms else []
+            # Anlamsal olarak benzer parçaların dosyaları da öncelikli adaydır
+            retrieved = list(retrieved)
+            defining = {symbol.path for symbol in definitions} | {hit.path for hit in retrieved}
+            ranked = self.rank_files(eligible, query_terms)
+            candidates += [entry for entry in ranked if entry.path in defining]
+            candidates += [entry for entry in ranked if entry.path not in defining][:packer_config["max_files"]]
+
+        index.restat(candidates)
+        excluded = set(exclude)
+        chunks = [chunk for entry in candidates for chunk in self.chunks_for(root, entry)
+                  if chunk.label not in excluded and chunk.path not in excluded]
+        self._score(chunks, query_terms, entries, current, definitions, retrieved, related)
+
+        selected: List[Chunk] = []
+        for chunk in sorted(chunks, key=lambda item: -item.score):
+            if chunk.path != current and not chunk.relevance:
+                # Soruyla hiç örtüşmeyen başka dosya parçaları bütçeyi boşa harcamasın
+                continue
+            if used + chunk.tokens > budget:
+                continue
+            selected.append(chunk)
+            used += chunk.tokens
+
+        selected.sort(key=lambda chunk: (chunk.path != current, chunk.path, chunk.start_line))
+        text += "".join("\n" + chunk.render() for chunk in selected)
+        packed = PackedContext(text, selected, budget, used, len(chunks), overview_files)
+        with self._lock:
+            self.last[label] = packed
+        return packed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chunks.clear()
+            self.last.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'cached_files': len(self._chunks),
+                'last': {label: packed.summary() for label, packed in self.last.items()}
+            }
+
+
+# Global bağlam paketleyici
+context_packer = ContextPacker()
@@ -0,0 +1,216 @@
+"""
+CortexCLI Sohbet Yönetimi
+/api/chat için oturum başına mesaj geçmişi ve token bütçeli geçmiş penceresi
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+import config
+from model_catalog import model_catalog
+
+
+def estimate_tokens(text: str) -> int:
+    """Metnin yaklaşık token sayısını tahmin eder"""
+    return math.ceil(len(text or "") / config.CONVERSATION_CONFIG["chars_per_token"])
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    """Bir sohbet mesajının (rol başlığı dahil) yaklaşık token maliyeti"""
+    return estimate_tokens(message.get("content", "")) + 4
+
+
+def context_window(model: str) -> int:
+    """Model için kullanılacak bağlam penceresi (ayar ile /api/show num_ctx değerinin küçüğü)"""
+    num_ctx = config.CONVERSATION_CONFIG["num_ctx"]
+    model_limit = model_catalog.context_length(model)
+    return min(num_ctx, model_limit) if model_limit else num_ctx
+
+
+def prompt_budget(model: str) -> int:
+    """İstem için kullanılabilecek token bütçesi (yanıt payı düşülmüş)"""
+    return max(0, context_window(model) - config.CONVERSATION_CONFIG["response_reserve"])
+
+
+class Conversation:
+    """Tek bir sohbet oturumunun mesaj listesi"""
+
+    def __init__(self, system_prompt: Optional[str] = None):
+        self.system_prompt = system_prompt
+        self.messages: List[Dict[str, str]] = []  # user/assistant sırası
+        self.summary = ""  # Pencereden düşen turların özeti
+
+    def add_exchange(self, user: str, assistant: str) -> None:
+        """Tamamlanan bir turu geçmişe ekler"""
+        self.messages.append({"role": "user", "content": user})
+        self.messages.append({"role": "assistant", "content": assistant})
+
+    def reset(self) -> None:
+        """Geçmişi ve özeti temizler"""
+        self.messages = []
+        self.summary = ""
+
+    @property
+    def turn_count(self) -> int:
+        return len(self.messages) // 2
+
+    def context_window(self, model: str) -> int:
+        """Model için kullanılacak bağlam penceresi (num_ctx)"""
+        return context_window(model)
+
+    def token_budget(self, model: str) -> int:
+        """İstem için kullanılabilecek token bütçesi (yanıt payı düşülmüş)"""
+        return prompt_budget(model)
+
+    def build_messages(self, model: str, user_content: str,
+                       context: Optional[str] = None) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """Bütçeye sığan en yeni turlar ve yeni kullanıcı mesajıyla /api/chat mesajlarını oluşturur
+
+        context verilirse sistem mesajına sabit önek olarak eklenir; değişmediği
+        sürece istek başı birebir aynı kalır ve Ollama KV önbelleğini yeniden kullanır.
+        Bütçeye sığmayan eski turlar özetlenerek geçmişten çıkarılır.
+        Dönen ikinci değer istekte gönderilecek seçeneklerdir (num_ctx).
+        """
+        new_message = {"role": "user", "content": user_content}
+
+        # Düşen turlar özeti büyüttüğü için paketleme, geçmiş sabitlenene kadar tekrarlanır
+        while True:
+            budget = self.token_budget(model) - message_tokens(new_message)
+            budget -= message_tokens({"content": self._system_content(context)})
+
+            # En yeni turdan geriye doğru, kullanıcı/asistan çiftlerini birlikte paketle
+            kept = 0
+            used = 0
+            for start in range(len(self.messages) - 2, -1, -2):
+                cost = sum(message_tokens(message) for message in self.messages[start:start + 2])
+                if used + cost > budget:
+                    break
+                used += cost
+                kept += 2
+
+            dropped = self.messages[:len(self.messages) - kept]
+            if not dropped:
+                break
+            self._summarize(dropped)
+            self.messages = self.messages[len(dropped):]
+
+        messages = []
+        system_content = self._system_content(context)
+        if system_content:
+            messages.append({"role": "system", "content": system_content})
+        messages.extend(self.messages)
+        messages.append(new_message)
+        return messages, {"num_ctx": self.context_window(model)}
+
+    def _system_content(self, context: Optional[str] = None) -> str:
+        # Sıra önemli: en sık değişen kısım (özet) en sonda
+        parts = [self.system_prompt] if self.system_prompt else []
+        if context:
+            parts.append(context)
+        if self.summary:
+            parts.append(f"ÖNCEKİ KONUŞMA ÖZETİ:\n{self.summary}")
+        return "\n\n".join(parts)
+
+    def _summarize(self, dropped: List[Dict[str, str]]) -> None:
+        """Düşen turları (model çağrısı yapmadan) kısa satırlar halinde özete ekler"""
+        labels = {"user": "Kullanıcı", "assistant": "Asistan"}
+        lines = [self.summary] if self.summary else []
+        for message in dropped:
+            first_line = message["content"].strip().split("\n", 1)[0]
+            if len(first_line) > 120:
+                first_line = first_line[:117] + "..."
+            lines.append(f"- {labels.get(message['role'], message['role'])}: {first_line}")
+
+        summary = "\n".join(lines)
+        max_chars = config.CONVERSATION_CONFIG["summary_max_chars"]
+        if len(summary) > max_chars:
+            # En eski satırları at
+            summary = summary[-max_chars:]
+            summary = summary[summary.find("\n") + 1:] if "\n" in summary else summary
+        self.summary = summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"system_prompt": self.system_prompt, "summary": self.summary, "messages": list(self.messages)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Conversation":
+        conversation = cls(data.get("system_prompt"))
+        conversation.summary = data.get("summary", "")
+        conversation.messages = list(data.get("messages", []))
+        return conversation
+
+    @classmethod
+    def from_history(cls, history: List[Dict[str, Any]], system_prompt: Optional[str] = None) -> "Conversation":
+        """Eski biçimli (user/assistant kayıtları) sohbet geçmişinden oluşturur"""
+        conversation = cls(system_prompt)
+        for entry in history:
+            if entry.get("user") and entry.get("assistant"):
+                conversation.add_exchange(entry["user"], entry["assistant"])
+        return conversation
+
+
+class ConversationManager:
+    """Oturum kimliği -> Conversation eşlemesi
+
+    Oturum kimlikleri istemciden gelebildiğinden session_ttl boyunca
+    kullanılmayan oturumlar silinir ve en fazla max_sessions oturum tutulur
+    (en uzun süredir kullanılmayan önce gider). pinned kümesindeki oturumlar
+    (ör. CLI sohbeti) hiç silinmez.
+    """
+
+    def __init__(self):
+        self.sessions: "OrderedDict[str, Conversation]" = OrderedDict()  # Son kullanılan sonda
+        self.pinned: set = set()
+        self._used_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _touch(self, session_id: str) -> None:
+        """Oturumu son kullanılan yapar ve süresi dolan/sınırı aşan oturumları siler (kilit altında)"""
+        now = time.time()
+        self.sessions.move_to_end(session_id)
+        self._used_at[session_id] = now
+        conversation_config = config.CONVERSATION_CONFIG
+        # Sıra kullanım sırasıdır: baştan, sınır içinde kalan ilk taze oturuma kadar silinir
+        for sid in list(self.sessions):
+            if (len(self.sessions) <= conversation_config["max_sessions"]
+                    and now - self._used_at.get(sid, 0.0) <= conversation_config["session_ttl"]):
+                break
+            if sid in self.pinned or sid == session_id:
+                continue
+            del self.sessions[sid]
+            self._used_at.pop(sid, None)
+
+    def get(self, session_id: str, system_prompt: Optional[str] = None) -> Conversation:
+        """Oturumun sohbetini döndürür (yoksa oluşturur)"""
+        with self._lock:
+            conversation = self.sessions.get(session_id)
+            if conversation is None:
+                conversation = self.sessions[session_id] = Conversation(system_prompt)
+            elif system_prompt is not None:
+                conversation.system_prompt = system_prompt
+            self._touch(session_id)
+            return conversation
+
+    def set(self, session_id: str, conversation: Conversation) -> None:
+        with self._lock:
+            self.sessions[session_id] = conversation
+            self._touch(session_id)
+
+    def reset(self, session_id: str) -> None:
+        """Oturum geçmişini temizler"""
+        with self._lock:
+            if session_id in self.sessions:
+                self.sessions[session_id].reset()
+
+    def remove(self, session_id: str) -> None:
+        """Oturumu tamamen kaldırır"""
+        with self._lock:
+            self.sessions.pop(session_id, None)
+            self._used_at.pop(session_id, None)
+
+
+# Global sohbet yöneticisi
+conversation_manager = ConversationManager()
@@ -0,0 +1,301 @@
+"""
+CortexCLI Dosya Özetleri
+Büyük dosyaların küçük bir modelle bir kez üretilen özetleri; içerik özetine göre saklanır, dosya değişince arka planda yenilenir
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from conversation import estimate_tokens
+from model_residency import model_residency
+from ollama_client import OllamaError, ollama_client
+
+# İstem değiştiğinde önbellekteki eski özetler kullanılmaz
+SUMMARY_VERSION = 1
+
+SUMMARY_SYSTEM = (
+    "Sen bir kod özetleyicisisin. Verilen kaynak kodu, başka bir modelin dosyayı görmeden "
+    "üzerinde çalışabileceği kadar öz anlat: amacı, önemli sınıf/fonksiyonlar ve imzaları, "
+    "dış bağımlılıklar, yan etkiler. Kod tekrar etme, madde işaretleri kullan."
+)
+
+
+@dataclass
+class FileSummary:
+    """Dosyanın (veya önceki bir sürümünün) model özeti"""
+    path: str
+    content_hash: str
+    model: str
+    text: str
+    lines: int
+    stale: bool = False   # Dosyanın önceki bir sürümüne ait; güncel özet arka planda hazırlanıyor
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.render())
+
+    def render(self) -> str:
+        note = ", önceki sürümden" if self.stale else ""
+        return f"=== ÖZET: {self.path} ({self.lines} satır, {self.model}{note}) ===\n{self.text.strip()}\n"
+
+
+def _sections(text: str, max_chars: int) -> List[Tuple[int, int, str]]:
+    """Metni satır sınırlarından en fazla max_chars karakterlik bölümlere ayırır: (ilk, son satır, metin)"""
+    sections = []
+    start, body, size = 1, [], 0
+    for number, line in enumerate(text.splitlines(keepends=True), 1):
+        if body and size + len(line) > max_chars:
+            sections.append((start, number - 1, "".join(body)))
+            start, body, size = number, [], 0
+        body.append(line)
+        size += len(line)
+    if body:
+        sections.append((start, start + len(body) - 1, "".join(body)))
+    return sections
+
+
+class SummaryStore:
+    """Eşikten uzun dosyaların özetleri (içerik özeti + model anahtarlı)
+
+    get() hiçbir zaman model beklemez: güncel içeriğin özeti yoksa iş arka plan
+    kuyruğuna alınır ve varsa dosyanın önceki sürümünün özeti döner. Aynı içerik
+    (kopya) yeniden özetlenmez; hiçbir dosyanın kullanmadığı en yeni
+    keep_unreferenced özet de saklandığından geri alınan düzenlemeler çoğunlukla
+    yeniden özetlenmez. Arka plan işi özet modeli bellek bütçesine başka modeli
+    boşaltmadan sığmıyorsa, Ollama'ya ulaşılamıyorsa veya model yoksa
+    retry_interval boyunca yeni iş alınmaz.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or config.PROJECT_INDEX_CONFIG["db_path"]).absolute()
+        self._lock = threading.Lock()
+        self._db_ready = False
+        self._queue: "OrderedDict[str, str]" = OrderedDict()  # içerik özeti -> mutlak yol
+        self._worker: Optional[threading.Thread] = None
+        self._failed_at = 0.0
+        self.generated = 0
+        self.last_error = ""
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=MEMORY')
+        if not self._db_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS file_summaries (
+                    content_hash TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    lines INTEGER,
+                    summary TEXT NOT NULL,
+                    created_at REAL,
+                    PRIMARY KEY (content_hash, model, version)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS summary_files (
+                    path TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL
+                )
+            ''')
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    # --- Okuma ---
+
+    @staticmethod
+    def _read(path: str) -> Optional[Tuple[str, str, str, int]]:
+        """Özetlenecek dosya: (mutlak yol, metin, içerik özeti, satır sayısı); eşik altındaysa None"""
+        summary_config = config.FILE_SUMMARY_CONFIG
+        abs_path = os.path.abspath(path)
+        try:
+            if os.path.getsize(abs_path) > summary_config["max_file_bytes"]:
+                return None
+            with open(abs_path, "rb") as f:
+                data = f.read()
+            text = data.decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+        lines = len(text.splitlines())
+        if lines <= summary_config["min_lines"]:
+            return None
+        return abs_path, text, hashlib.sha1(data).hexdigest(), lines
+
+    def _lookup(self, abs_path: str, digest: str, model: str) -> Tuple[Optional[Tuple[str, int]], Optional[Tuple[str, int]]]:
+        """(güncel içeriğin özeti, dosyanın son özetlenen sürümünün özeti) -> (metin, satır)"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                current = conn.execute(
+                    'SELECT summary, lines FROM file_summaries WHERE content_hash = ? AND model = ? AND version = ?',
+                    (digest, model, SUMMARY_VERSION)
+                ).fetchone()
+                previous = None
+                if current is None:
+                    previous = conn.execute(
+                        'SELECT s.summary, s.lines FROM summary_files f JOIN file_summaries s '
+                        'ON s.content_hash = f.content_hash AND s.model = ? AND s.version = ? WHERE f.path = ?',
+                        (model, SUMMARY_VERSION, abs_path)
+                    ).fetchone()
+                elif conn.execute('SELECT content_hash FROM summary_files WHERE path = ?',
+                                  (abs_path,)).fetchone() != (digest,):
+                    # Aynı içerik başka bir yoldan özetlenmiş (kopya veya geri alınan düzenleme)
+                    self._link(conn, abs_path, digest)
+                    conn.commit()
+                return current, previous
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _link(conn: sqlite3.Connection, abs_path: str, digest: str) -> None:
+        """Dosyayı özetinin içeriğine bağlar; hiçbir dosyanın kullanmadığı özetlerin en yenileri dışındakileri siler"""
+        conn.execute('INSERT OR REPLACE INTO summary_files (path, content_hash) VALUES (?, ?)', (abs_path, digest))
+        conn.execute(
+            'DELETE FROM file_summaries WHERE content_hash NOT IN (SELECT content_hash FROM summary_files) '
+            'AND rowid NOT IN (SELECT rowid FROM file_summaries WHERE content_hash NOT IN '
+            '(SELECT content_hash FROM summary_files) ORDER BY created_at DESC LIMIT ?)',
+            (config.FILE_SUMMARY_CONFIG["keep_unreferenced"],)
+        )
+
+    def get(self, path: str) -> Optional[FileSummary]:
+        """Dosyanın özeti; eşikten kısa, okunamayan dosyalarda veya özet henüz yoksa None
+
+        Güncel içeriğin özeti yoksa arka planda üretilir; o sırada dosyanın önceki
+        sürümünün özeti (stale=True) döner.
+        """
+        summary_config = config.FILE_SUMMARY_CONFIG
+        if not summary_config["enabled"]:
+            return None
+        read = self._read(path)
+        if read is None:
+            return None
+        abs_path, _, digest, lines = read
+        model = summary_config["model"]
+        try:
+            current, previous = self._lookup(abs_path, digest, model)
+        except sqlite3.Error:
+            return None
+        if current:
+            return FileSummary(path, digest, model, current[0], current[1])
+        self._schedule(abs_path, digest)
+        if previous:
+            return FileSummary(path, digest, model, previous[0], previous[1], stale=True)
+        return None
+
+    # --- Üretim ---
+
+    def _generate(self, path: str, text: str, model: str) -> str:
+        """Dosyayı bölüm bölüm özetler; uzun dosyalarda her bölümün satır aralığı belirtilir"""
+        summary_config = config.FILE_SUMMARY_CONFIG
+        sections = _sections(text, summary_config["section_chars"])
+        parts = []
+        for start, end, body in sections:
+            where = f" (satır {start}-{end})" if len(sections) > 1 else ""
+            prompt = f"Dosya: {path}{where}\n\n```\n{body}\n```\n\nBu kodu özetle."
+            data = ollama_client.generate(model, prompt, system=SUMMARY_SYSTEM,
+                                          options={"temperature": 0.2, "num_predict": summary_config["max_tokens"]})
+            response = (data.get("response") or "").strip()
+            parts.append(f"Satır {start}-{end}:\n{response}" if where else response)
+        return "\n\n".join(parts)
+
+    def summarize(self, path: str) -> Optional[FileSummary]:
+        """Güncel içeriğin özetini (yoksa hemen üreterek) döndürür; eşikten kısa dosyalarda None
+
+        Ollama hataları (OllamaError) çağırana iletilir.
+        """
+        read = self._read(path)
+        if read is None:
+            return None
+        abs_path, text, digest, lines = read
+        model = config.FILE_SUMMARY_CONFIG["model"]
+        current, _ = self._lookup(abs_path, digest, model)
+        if current:
+            return FileSummary(path, digest, model, current[0], current[1])
+        summary = self._generate(os.path.relpath(abs_path).replace(os.sep, "/"), text, model)
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO file_summaries (content_hash, model, version, lines, summary, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)', (digest, model, SUMMARY_VERSION, lines, summary, time.time())
+                )
+                self._link(conn, abs_path, digest)
+                conn.commit()
+            finally:
+                conn.close()
+            self.generated += 1
+        return FileSummary(path, digest, model, summary, lines)
+
+    def _schedule(self, abs_path: str, digest: str) -> None:
+        with self._lock:
+            if time.time() - self._failed_at < config.FILE_SUMMARY_CONFIG["retry_interval"]:
+                return
+            if digest in self._queue:
+                return
+            self._queue[digest] = abs_path
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, daemon=True)
+                self._worker.start()
+
+    def _work(self) -> None:
+        # Özetler sırayla üretilir; küçük model sohbet modelinin yanında tek istekle çalışır
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._worker = None
+                    return
+                digest, abs_path = self._queue.popitem(last=False)
+            try:
+                # Dosya kuyruktayken yeniden değiştiyse yeni içerik özetlenir, eskisi atlanır
+                read = self._read(abs_path)
+                if read and read[2] == digest:
+                    # Sohbet modelini bellekten atarak özet üretilmez
+                    if not model_residency.fits(config.FILE_SUMMARY_CONFIG["model"]):
+                        raise OllamaError("Özet modeli bellek bütçesine sığmıyor")
+                    self.summarize(abs_path)
+            except Exception as e:
+                # Model yok, bütçe dolu, Ollama kapalı veya veritabanı kilitli: bir süre yeni iş alınmaz
+                with self._lock:
+                    self._failed_at = time.time()
+                    self.last_error = str(e)
+                    self._queue.clear()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Arka plan kuyruğu boşalana kadar bekler; zaman aşımında False"""
+        with self._lock:
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+            return not worker.is_alive()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = len(self._queue)
+            try:
+                conn = self._connect()
+                try:
+                    stored = conn.execute('SELECT COUNT(*) FROM file_summaries').fetchone()[0]
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                stored = 0
+            return {
+                'model': config.FILE_SUMMARY_CONFIG["model"],
+                'stored': stored,
+                'queued': queued,
+                'generated': self.generated,
+                'last_error': self.last_error
+            }
+
+
+# Global dosya özeti deposu
+summary_store = SummaryStore()
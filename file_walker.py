@@ -0,0 +1,319 @@
+"""
+CortexCLI Dosya Gezgini
+.gitignore/.cortexignore kurallarına uyan, os.scandir tabanlı, bütçeli ve geniş ağaçlarda paralel dizin taraması
+"""
+
+import os
+import posixpath
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import config
+
+
+@dataclass
+class IgnoreRule:
+    """Bir ignore dosyasındaki tek satır (gitignore sözdizimi)"""
+    pattern: str
+    regex: "re.Pattern"
+    base: str            # Kuralın tanımlandığı dizin (kökten göreli)
+    negate: bool = False
+    dir_only: bool = False
+    anchored: bool = False
+
+    def matches(self, path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not path.startswith(self.base + "/"):
+                return False
+            path = path[len(self.base) + 1:]
+        target = path if self.anchored else posixpath.basename(path)
+        return self.regex.match(target) is not None
+
+
+def _translate(pattern: str) -> str:
+    """gitignore glob'unu düzenli ifadeye çevirir (** dizin sınırlarını aşar)"""
+    regex, i, n = "", 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == "*":
+            if pattern.startswith("**/", i):
+                regex += "(?:.*/)?"
+                i += 3
+                continue
+            if pattern.startswith("**", i):
+                regex += ".*"
+                i += 2
+                continue
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                regex += f"[{body.replace(chr(92), chr(92) * 2)}]"
+                i = end
+        elif char == "\\" and i + 1 < n:
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(char)
+        i += 1
+    return regex + r"\Z"
+
+
+def parse_ignore(lines: List[str], base: str = "") -> List[IgnoreRule]:
+    """Ignore dosyası satırlarını kurallara çevirir"""
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n\r")
+        if not line.strip() or line.startswith("#"):
+            continue
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        anchored = "/" in line
+        line = line.lstrip("/")
+        if not line:
+            continue
+        rules.append(IgnoreRule(line, re.compile(_translate(line)), base, negate, dir_only, anchored))
+    return rules
+
+
+class IgnoreRules:
+    """Kökten bir dizine kadar birikmiş ignore kuralları (sonra gelen kural kazanır)"""
+
+    def __init__(self, rules: Optional[List[IgnoreRule]] = None):
+        self.rules = rules or []
+
+    def extend(self, rules: List[IgnoreRule]) -> "IgnoreRules":
+        return IgnoreRules(self.rules + rules) if rules else self
+
+    def is_ignored(self, path: str, is_dir: bool) -> bool:
+        for rule in reversed(self.rules):
+            if rule.matches(path, is_dir):
+                return not rule.negate
+        return False
+
+
+@dataclass
+class WalkEntry:
+    """Taramada görülen dosya veya dizin (stat bir kez alınır)"""
+    path: str            # Kökten göreli, / ayraçlı
+    name: str
+    is_dir: bool
+    size: int
+    mtime_ns: int
+    inode: int
+    depth: int           # Kökün doğrudan içeriği için 0
+
+
+@dataclass
+class DirListing:
+    """Tek bir dizinin süzülmüş içeriği"""
+    path: str
+    mtime_ns: int
+    depth: int
+    files: List[WalkEntry] = field(default_factory=list)
+    dirs: List[WalkEntry] = field(default_factory=list)
+    ignore_state: Tuple = ()  # Dizindeki ignore dosyalarının (ad, mtime_ns, boyut) bilgisi
+    rules: IgnoreRules = field(default_factory=IgnoreRules, repr=False)
+
+
+@dataclass
+class WalkResult:
+    """Tarama sonucu; bütçe aşıldıysa truncated True olur"""
+    listings: List[DirListing]
+    truncated: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def files(self) -> List[WalkEntry]:
+        return [entry for listing in self.listings for entry in listing.files]
+
+    @property
+    def dirs(self) -> List[WalkEntry]:
+        return [entry for listing in self.listings for entry in listing.dirs]
+
+    @property
+    def entries(self) -> List[WalkEntry]:
+        return [entry for listing in self.listings for entry in listing.dirs + listing.files]
+
+
+class FileWalker:
+    """Tüm dosya özelliklerinin paylaştığı dizin gezgini
+
+    Hariç tutulan dizinler (node_modules, build ...) ve ignore kurallarına uyan
+    dizinler hiç açılmadan budanır. Bir seviyede çok sayıda dizin varsa
+    seviye iş parçacığı havuzunda taranır (os.scandir GIL'i bırakır).
+    """
+
+    def __init__(self):
+        self._ignore_cache: Dict[str, Tuple[int, int, List[IgnoreRule]]] = {}  # yol -> (mtime, boyut, kurallar)
+        self._lock = threading.Lock()
+
+    def _read_ignore(self, abs_path: str, base: str, mtime_ns: int, size: int) -> List[IgnoreRule]:
+        """Ignore dosyasını okur; değişmediyse ayrıştırılmış kuralları önbellekten verir"""
+        with self._lock:
+            cached = self._ignore_cache.get(abs_path)
+        if cached and cached[0] == mtime_ns and cached[1] == size:
+            return cached[2]
+        try:
+            with open(abs_path, "r", encoding="utf-8", errors="ignore") as f:
+                rules = parse_ignore(f.readlines(), base)
+        except OSError:
+            rules = []
+        with self._lock:
+            self._ignore_cache[abs_path] = (mtime_ns, size, rules)
+        return rules
+
+    def rules_for(self, root: str, path: str) -> IgnoreRules:
+        """Kökten path dizinine kadar (dahil) geçerli ignore kuralları"""
+        rules = IgnoreRules()
+        parts = [part for part in path.split("/") if part]
+        for depth in range(len(parts) + 1):
+            rel = "/".join(parts[:depth])
+            for name in config.WALKER_CONFIG["ignore_files"]:
+                abs_path = os.path.join(root, *parts[:depth], name)
+                try:
+                    stat = os.stat(abs_path)
+                except OSError:
+                    continue
+                rules = rules.extend(self._read_ignore(abs_path, rel, stat.st_mtime_ns, stat.st_size))
+        return rules
+
+    def _prune(self, name: str, is_dir: bool) -> bool:
+        walker_config = config.WALKER_CONFIG
+        if is_dir and name in walker_config["exclude_dirs"]:
+            return True
+        return name.startswith(".") and not walker_config["include_hidden"]
+
+    def list_dir(self, root: str, path: str = "", rules: Optional[IgnoreRules] = None,
+                 mtime_ns: Optional[int] = None, depth: int = 0) -> Optional[DirListing]:
+        """Tek bir dizini tarar ve kurallara göre süzer; okunamazsa None
+
+        rules üst dizinden devralınan kurallardır; verilmezse diskteki ignore
+        dosyalarından hesaplanır. Dizinin kendi ignore dosyaları eklenir.
+        """
+        root = os.path.abspath(root)
+        abs_dir = os.path.join(root, *path.split("/")) if path else root
+        if rules is None:
+            rules = self.rules_for(root, posixpath.dirname(path)) if path else IgnoreRules()
+        try:
+            if mtime_ns is None:
+                mtime_ns = os.stat(abs_dir).st_mtime_ns
+            with os.scandir(abs_dir) as iterator:
+                raw = list(iterator)
+        except OSError:
+            return None
+
+        ignore_files = config.WALKER_CONFIG["ignore_files"]
+        ignore_state = []
+        for entry in raw:
+            if entry.name in ignore_files and entry.is_file():
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                ignore_state.append((entry.name, stat.st_mtime_ns, stat.st_size))
+                rules = rules.extend(self._read_ignore(entry.path, path, stat.st_mtime_ns, stat.st_size))
+
+        listing = DirListing(path, mtime_ns, depth, ignore_state=tuple(sorted(ignore_state)), rules=rules)
+        for entry in raw:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if not is_dir and not entry.is_file():
+                    continue
+                rel = f"{path}/{entry.name}" if path else entry.name
+                if self._prune(entry.name, is_dir) or rules.is_ignored(rel, is_dir):
+                    continue
+                stat = entry.stat(follow_symlinks=False) if is_dir else entry.stat()
+            except OSError:
+                continue
+            walk_entry = WalkEntry(rel, entry.name, is_dir, stat.st_size, stat.st_mtime_ns, stat.st_ino, depth)
+            (listing.dirs if is_dir else listing.files).append(walk_entry)
+        listing.dirs.sort(key=lambda item: item.name)
+        listing.files.sort(key=lambda item: item.name)
+        return listing
+
+    def walk(self, root: str = ".", path: str = "", max_depth: Optional[int] = None,
+             max_entries: Optional[int] = -1, time_budget: Optional[float] = -1) -> WalkResult:
+        """root altındaki path dizinini genişlik öncelikli tarar
+
+        max_depth: path'in doğrudan içeriği 0. seviyedir; None sınırsız.
+        max_entries / time_budget: verilmezse ayarlardaki değer, None sınırsız.
+        """
+        walker_config = config.WALKER_CONFIG
+        if max_entries == -1:
+            max_entries = walker_config["max_entries"]
+        if time_budget == -1:
+            time_budget = walker_config["time_budget"]
+        started = time.time()
+        deadline = started + time_budget if time_budget else None
+        root = os.path.abspath(root)
+        path = path.strip("/")
+
+        result = WalkResult([])
+        count = 0
+        level: List[Tuple[str, Optional[IgnoreRules], Optional[int]]] = [(path, None, None)]
+        depth = 0
+        executor = None
+        try:
+            while level:
+                listings = []
+                if len(level) >= walker_config["parallel_threshold"] and walker_config["workers"] > 1:
+                    if executor is None:
+                        executor = ThreadPoolExecutor(max_workers=walker_config["workers"])
+                    futures = [executor.submit(self.list_dir, root, rel, rules, mtime, depth)
+                               for rel, rules, mtime in level]
+                    listings = [future.result() for future in futures]
+                else:
+                    for rel, rules, mtime in level:
+                        if deadline and time.time() > deadline:
+                            result.truncated = True
+                            break
+                        listings.append(self.list_dir(root, rel, rules, mtime, depth))
+
+                next_level = []
+                for listing in listings:
+                    if listing is None:
+                        continue
+                    size = len(listing.files) + len(listing.dirs)
+                    if max_entries is not None and count + size > max_entries:
+                        result.truncated = True
+                        break
+                    count += size
+                    result.listings.append(listing)
+                    if max_depth is None or depth < max_depth:
+                        next_level.extend((entry.path, listing.rules, entry.mtime_ns) for entry in listing.dirs)
+
+                if result.truncated or (deadline and time.time() > deadline and next_level):
+                    result.truncated = True
+                    break
+                level = next_level
+                depth += 1
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+        result.elapsed = time.time() - started
+        return result
+
+
+# Global dosya gezgini
+file_walker = FileWalker()
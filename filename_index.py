@@ -0,0 +1,503 @@
+"""
+CortexCLI Dosya Adı İndeksi
+Proje yollarının bellek içi indeksi (yol ağacı, trigramlar, karakter kümeleri) ve fzf tarzı bulanık sıralama
+"""
+
+import fnmatch
+import os
+import posixpath
+import re
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Iterable, Set, Tuple
+
+import config
+from project_index import get_project_index
+
+# fzf puanlama sabitleri (algo.go)
+SCORE_MATCH = 16
+SCORE_GAP_START = -3
+SCORE_GAP_EXTENSION = -1
+BONUS_BOUNDARY = SCORE_MATCH // 2
+BONUS_DELIMITER = BONUS_BOUNDARY + 1
+BONUS_NON_WORD = SCORE_MATCH // 2
+BONUS_CAMEL = BONUS_BOUNDARY + SCORE_GAP_EXTENSION
+BONUS_CONSECUTIVE = -(SCORE_GAP_START + SCORE_GAP_EXTENSION)
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+
+_NON_WORD, _DELIMITER, _LOWER, _UPPER, _NUMBER = range(5)
+_DELIMITERS = "/_-. "
+
+
+def _char_class(char: str) -> int:
+    if char.islower():
+        return _LOWER
+    if char.isupper():
+        return _UPPER
+    if char.isdigit():
+        return _NUMBER
+    return _DELIMITER if char in _DELIMITERS else _NON_WORD
+
+
+def _lower(text: str) -> str:
+    """Uzunluğu koruyan küçük harfe çevirme ('İ'.lower() iki karakterdir; konumlar kaymasın)"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(char.lower()[:1] for char in text)
+
+
+def _bonus(previous: int, current: int) -> int:
+    if current > _DELIMITER:
+        if previous == _DELIMITER:
+            return BONUS_DELIMITER
+        if previous == _NON_WORD:
+            return BONUS_BOUNDARY
+        if (previous == _LOWER and current == _UPPER) or (previous != _NUMBER and current == _NUMBER):
+            return BONUS_CAMEL
+        return 0
+    return BONUS_NON_WORD
+
+
+def fuzzy_match(pattern: str, text: str, lowered: Optional[str] = None) -> Optional[Tuple[int, List[int]]]:
+    """fzf v1 eşleşmesi: (puan, eşleşen konumlar); desen text'in alt dizisi değilse None
+
+    İlk tam eşleşmenin sonundan geriye taranarak en kısa pencere bulunur ve
+    pencere fzf'in sınır, camelCase ve ardışıklık bonuslarıyla puanlanır.
+    Desen küçük harfli verilmelidir (büyük/küçük harf duyarsız eşleşme).
+    """
+    if not pattern:
+        return 0, []
+    lowered = lowered if lowered is not None else _lower(text)
+    end = -1
+    for char in pattern:
+        end = lowered.find(char, end + 1)
+        if end < 0:
+            return None
+    start = end
+    index = len(pattern) - 1
+    while index >= 0:
+        if lowered[start] == pattern[index]:
+            index -= 1
+            if index < 0:
+                break
+        start -= 1
+
+    score, consecutive, first_bonus, in_gap = 0, 0, 0, False
+    previous = _char_class(text[start - 1]) if start > 0 else _DELIMITER
+    positions: List[int] = []
+    index = 0
+    for offset in range(start, end + 1):
+        current = _char_class(text[offset])
+        if lowered[offset] == pattern[index]:
+            positions.append(offset)
+            score += SCORE_MATCH
+            bonus = _bonus(previous, current)
+            if consecutive == 0:
+                first_bonus = bonus
+            else:
+                if bonus >= BONUS_BOUNDARY and bonus > first_bonus:
+                    first_bonus = bonus
+                bonus = max(bonus, first_bonus, BONUS_CONSECUTIVE)
+            score += bonus * BONUS_FIRST_CHAR_MULTIPLIER if index == 0 else bonus
+            in_gap, consecutive = False, consecutive + 1
+            index += 1
+        else:
+            score += SCORE_GAP_EXTENSION if in_gap else SCORE_GAP_START
+            in_gap, consecutive, first_bonus = True, 0, 0
+        previous = current
+    return score, positions
+
+
+def _forward_window(term: str, lowered: str, start: int) -> Optional[int]:
+    """Terimin start'tan itibaren ilk (açgözlü) alt dizi eşleşmesinin uzunluğu; bitişikse terim uzunluğu"""
+    if lowered.find(term, start) >= 0:
+        return len(term)
+    first = position = lowered.find(term[0], start)
+    if position < 0:
+        return None
+    for char in term[1:]:
+        position = lowered.find(char, position + 1)
+        if position < 0:
+            return None
+    return position - first + 1
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _bit_ids(bits: int, limit: int) -> List[int]:
+    """Bit kümesindeki ilk limit kimlik (küçükten büyüğe)"""
+    digits = bin(bits)[:1:-1]
+    ids, position = [], digits.find("1")
+    while position >= 0 and len(ids) < limit:
+        ids.append(position)
+        position = digits.find("1", position + 1)
+    return ids
+
+
+@dataclass
+class FileMatch:
+    """Bulanık aramanın bir sonucu"""
+    path: str
+    score: int
+    positions: List[int] = field(default_factory=list)
+    quality: float = 1.0   # Puanın, sorgunun kendisiyle eşleşme puanına oranı
+
+    @property
+    def name(self) -> str:
+        return posixpath.basename(self.path)
+
+    def highlighted(self, style: str = "bold yellow") -> str:
+        """Eşleşen karakterleri vurgulanmış rich biçimli yol"""
+        marked = set(self.positions)
+        return "".join(f"[{style}]{char}[/{style}]" if i in marked else char.replace("[", "\\[")
+                       for i, char in enumerate(self.path))
+
+
+class _TrieNode:
+    """Yol ağacında bir dizin: alt dizinler ve dosya adı -> kimlik"""
+    __slots__ = ("children", "files")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.files: Dict[str, int] = {}
+
+
+class FilenameIndex:
+    """Tek bir proje kökünün dosya adı indeksi
+
+    Yollar proje indeksinden alınır ve değişiklik günlüğüyle artımlı güncellenir;
+    her sorguda dosya sistemi taranmaz. Adaylar karakter bit kümelerinin
+    kesişimiyle (ve çok sayıdaysa dosya adı trigramlarıyla) daraltılır, ucuz bir
+    regex penceresiyle ön sıralanır ve en iyileri fzf puanıyla sıralanır.
+    """
+
+    def __init__(self, root: str = "."):
+        self.root = os.path.abspath(root)
+        self.generation = -1
+        self._lock = threading.RLock()
+        self.rebuilds = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self._paths: List[Optional[str]] = []
+        self._lowered: List[Optional[str]] = []
+        self._ids: Dict[str, int] = {}
+        self._chars: Dict[str, int] = {}           # karakter -> yol kimliklerinin bit kümesi
+        self._name_chars: Dict[str, int] = {}      # karakter -> dosya adında geçen kimlikler
+        self._trigrams: Dict[str, array] = {}      # dosya adı trigramı -> kimlikler (silinenler dahil)
+        self._trie = _TrieNode()
+        self._dirs: Dict[str, _TrieNode] = {"": self._trie}  # dizin yolu -> düğüm
+        self._scopes: Dict[str, int] = {}          # dizin -> alt ağaç bit kümesi (önbellek)
+        self._live = 0
+
+    # --- Güncelleme ---
+
+    def _build(self, paths: List[str]) -> None:
+        """Tüm yollardan indeksi baştan kurar (bit kümeleri karakter başına toplu oluşturulur)"""
+        self._clear()
+        self.rebuilds += 1
+        self._paths = list(paths)
+        self._lowered = [_lower(path) for path in self._paths]
+        self._ids = {path: path_id for path_id, path in enumerate(self._paths)}
+        names = [lowered[lowered.rfind("/") + 1:] for lowered in self._lowered]
+        self._chars = self._char_bits(self._lowered)
+        self._name_chars = self._char_bits(names)
+        trigrams: Dict[str, List[int]] = {}
+        for path_id, name in enumerate(names):
+            for trigram in _trigrams(name):
+                trigrams.setdefault(trigram, []).append(path_id)
+        self._trigrams = {trigram: array("i", ids) for trigram, ids in trigrams.items()}
+        for path_id, path in enumerate(self._paths):
+            self._trie_insert(path, path_id)
+        self._live = len(self._paths)
+
+    @staticmethod
+    def _char_bits(texts: List[str]) -> Dict[str, int]:
+        """Karakter -> onu içeren metinlerin bit kümesi (bit i = texts[i])"""
+        ordered = texts[::-1]
+        return {char: int("".join(["1" if char in text else "0" for text in ordered]), 2)
+                for char in set("".join(texts))}
+
+    @staticmethod
+    def _to_bits(ids: List[int], size: int) -> int:
+        if not ids:
+            return 0
+        digits = bytearray(b"0" * size)
+        for path_id in ids:
+            digits[size - 1 - path_id] = 49  # "1"
+        return int(digits, 2)
+
+    def _dir_node(self, directory: str) -> _TrieNode:
+        """Dizin düğümü; yoksa üst dizin zinciriyle birlikte oluşturulur"""
+        node = self._dirs.get(directory)
+        if node is None:
+            parent, _, last = directory.rpartition("/")
+            node = self._dirs[directory] = _TrieNode()
+            self._dir_node(parent).children[last] = node
+        return node
+
+    def _trie_insert(self, path: str, path_id: int) -> None:
+        directory, _, name = path.rpartition("/")
+        self._dir_node(directory).files[name] = path_id
+
+    def _trie_remove(self, path: str) -> None:
+        directory, _, name = path.rpartition("/")
+        node = self._dirs.get(directory)
+        if node is None or node.files.pop(name, None) is None:
+            return
+        # Boşalan dizinler ağaçtan çıkarılır
+        while directory and not node.files and not node.children:
+            del self._dirs[directory]
+            directory, _, last = directory.rpartition("/")
+            node = self._dirs[directory]
+            del node.children[last]
+
+    def _add(self, path: str) -> None:
+        if path in self._ids:
+            return
+        path_id = len(self._paths)
+        lowered = _lower(path)
+        self._paths.append(path)
+        self._lowered.append(lowered)
+        self._ids[path] = path_id
+        bit = 1 << path_id
+        name = posixpath.basename(lowered)
+        for char in set(lowered):
+            self._chars[char] = self._chars.get(char, 0) | bit
+        for char in set(name):
+            self._name_chars[char] = self._name_chars.get(char, 0) | bit
+        for trigram in _trigrams(name):
+            self._trigrams.setdefault(trigram, array("i")).append(path_id)
+        self._trie_insert(path, path_id)
+        self._live += 1
+
+    def _remove(self, path: str) -> None:
+        path_id = self._ids.pop(path, None)
+        if path_id is None:
+            return
+        # Trigram listelerinde kimlik kalır; sorguda silinmiş yol olarak atlanır
+        self._paths[path_id] = self._lowered[path_id] = None
+        mask = ~(1 << path_id)
+        lowered = _lower(path)
+        for char in set(lowered):
+            self._chars[char] &= mask
+        for char in set(posixpath.basename(lowered)):
+            self._name_chars[char] &= mask
+        self._trie_remove(path)
+        self._live -= 1
+
+    def refresh(self) -> int:
+        """Proje indeksindeki yol değişikliklerini uygular; eklenen+silinen yol sayısını döndürür"""
+        project_index = get_project_index(self.root)
+        with self._lock:
+            changes = project_index.changes_since(self.generation)
+            if changes is None:
+                paths = project_index.paths()
+                self.generation = project_index.generation
+                self._build(paths)
+                return len(paths)
+            generation, added, dropped = changes
+            if generation == self.generation:
+                return 0
+            for path in dropped:
+                self._remove(path)
+            for path in sorted(added):
+                self._add(path)
+            self.generation = generation
+            self._scopes.clear()
+            # Silinen kimlikler çoğalınca bit kümeleri ve listeler sıkıştırılır
+            if len(self._paths) > 2 * max(self._live, 1024):
+                self._build(sorted(self._ids))
+            return len(added) + len(dropped)
+
+    # --- Sorgular ---
+
+    def _scope_bits(self, directory: str) -> Optional[int]:
+        """Dizin alt ağacındaki dosyaların bit kümesi; dizin yoksa None"""
+        node = self._dirs.get(directory)
+        if node is None:
+            return None
+        bits = self._scopes.get(directory)
+        if bits is None:
+            ids, stack = [], [node]
+            while stack:
+                current = stack.pop()
+                ids.extend(current.files.values())
+                stack.extend(current.children.values())
+            bits = self._scopes[directory] = self._to_bits(ids, len(self._paths))
+        return bits
+
+    def _char_filter(self, table: Dict[str, int], terms: List[str], bits: int) -> int:
+        for char in {char for term in terms for char in term}:
+            bits &= table.get(char, 0)
+            if not bits:
+                break
+        return bits
+
+    def _substring_ids(self, term: str, directory: str, limit: int) -> List[int]:
+        """Dosya adında terimi bitişik içeren kimlikler (en seyrek trigram listesinden)"""
+        postings = [self._trigrams.get(trigram) for trigram in _trigrams(term)]
+        if not postings or any(posting is None for posting in postings):
+            return []
+        prefix = f"{directory}/" if directory else ""
+        ids: Dict[int, None] = {}
+        for path_id in min(postings, key=len):
+            lowered = self._lowered[path_id]
+            if lowered is not None and term in lowered[lowered.rfind("/") + 1:] \
+                    and self._paths[path_id].startswith(prefix):
+                ids[path_id] = None
+                if len(ids) >= limit:
+                    break
+        return list(ids)
+
+    def _candidates(self, terms: List[str], bits: int, directory: str) -> List[Tuple[int, int]]:
+        """Aday (kimlik, katman) çiftleri
+
+        Katman 0: dosya adında en uzun terimi bitişik içerir, 1: tüm karakterler
+        dosya adında, 2: tüm karakterler yolda. Bitişik eşleşmeler fzf'in ardışıklık
+        bonusuyla hemen her zaman öne geçtiğinden yeterince varsa bulanık katmanlara
+        inilmez.
+        """
+        filename_config = config.FILENAME_INDEX_CONFIG
+        # Uzun sorgular hem daha seçicidir hem de regex ön sıralaması daha pahalıdır
+        length = sum(len(term) for term in terms)
+        limit = filename_config["max_candidates"] * 8 // max(8, length)
+        chosen: Dict[int, int] = {}
+        # "src/app.py" gibi terimlerin son bileşeni dosya adında aranır
+        name_terms = [term.rsplit("/", 1)[-1] for term in terms]
+        longest = max(name_terms, key=len)
+        if len(longest) >= 3:
+            chosen.update(dict.fromkeys(self._substring_ids(longest, directory, limit), 0))
+            if len(chosen) >= filename_config["rescore"]:
+                return list(chosen.items())
+        bits = self._char_filter(self._chars, terms, bits)
+        for tier, tier_bits in ((1, self._char_filter(self._name_chars, name_terms, bits)), (2, bits)):
+            if len(chosen) >= limit:
+                break
+            for path_id in _bit_ids(tier_bits, limit):
+                chosen.setdefault(path_id, tier)
+        return list(chosen.items())[:limit]
+
+    def search(self, query: str, limit: Optional[int] = None, directory: str = "",
+               extensions: Optional[Iterable[str]] = None) -> List[FileMatch]:
+        """Sorguya bulanık eşleşen yollar, fzf puanına göre sıralı
+
+        Boşlukla ayrılan terimlerin hepsi eşleşmelidir. directory verilirse yalnızca
+        o alt ağaç aranır; extensions (".py" gibi) sonuçları süzer.
+        """
+        filename_config = config.FILENAME_INDEX_CONFIG
+        limit = limit or filename_config["limit"]
+        terms = _lower(query).split()
+        self.refresh()
+        if not terms:
+            return []
+        extensions = tuple(_lower(extension) for extension in extensions or ())
+        with self._lock:
+            directory = directory.strip("/")
+            if directory in ("", "."):
+                directory, bits = "", (1 << len(self._paths)) - 1
+            else:
+                bits = self._scope_bits(directory)
+                if bits is None:
+                    return []
+            candidates = self._candidates(terms, bits, directory)
+
+            # Ön sıralama: dosya adındaki (yoksa yoldaki) ileri eşleşme penceresinin uzunluğu
+            ranked = []
+            for path_id, tier in candidates:
+                lowered = self._lowered[path_id]
+                if lowered is None or (extensions and not lowered.endswith(extensions)):
+                    continue
+                name_start = lowered.rfind("/") + 1
+                cost = 0
+                for term in terms:
+                    window = _forward_window(term, lowered, name_start) if tier < 2 else None
+                    if window is None:
+                        window = _forward_window(term, lowered, 0)
+                        if window is None:
+                            break
+                        cost += 64
+                    cost += window
+                else:
+                    ranked.append((cost, len(lowered), path_id))
+            ranked.sort()
+            paths = [self._paths[path_id] for _, _, path_id in ranked[:filename_config["rescore"]]]
+
+        # Her terimin kendisiyle eşleşmesi ulaşılabilecek en yüksek puandır
+        ideal = sum(fuzzy_match(term, term)[0] for term in terms) or 1
+        matches = []
+        for path in paths:
+            lowered = _lower(path)
+            name_start = lowered.rfind("/") + 1
+            total, positions = 0, []
+            for term in terms:
+                # Dosya adındaki eşleşme, daha erken biten dizin eşleşmesinden iyi olabilir
+                whole = fuzzy_match(term, path, lowered)
+                if whole is None:
+                    break
+                name = fuzzy_match(term, path[name_start:], lowered[name_start:]) \
+                    if whole[1][0] < name_start else None
+                if name is not None and name[0] >= whole[0]:
+                    whole = (name[0], [name_start + position for position in name[1]])
+                total += whole[0]
+                positions.extend(whole[1])
+            else:
+                matches.append(FileMatch(path, total, sorted(set(positions)), round(total / ideal, 3)))
+        matches.sort(key=lambda match: (-match.score, len(match.path), match.path))
+        return matches[:limit]
+
+    def glob(self, pattern: str, directory: str = "", limit: Optional[int] = None) -> List[str]:
+        """Dosya adı joker desene (*.py, test_?.js) uyan yollar, yola göre sıralı"""
+        self.refresh()
+        matcher = re.compile(fnmatch.translate(_lower(pattern)))
+        with self._lock:
+            node = self._dirs.get(directory.strip("/") if directory not in (".", "./") else "")
+            if node is None:
+                return []
+            found, stack = [], [node]
+            while stack:
+                current = stack.pop()
+                found.extend(self._paths[path_id] for name, path_id in current.files.items()
+                             if matcher.match(_lower(name)))
+                stack.extend(current.children.values())
+        found.sort()
+        return found[:limit] if limit else found
+
+    def complete(self, prefix: str, limit: int = 50) -> List[str]:
+        """Yol öneki için yol ağacındaki sonraki bileşenler (dizinler / ile biter; tarama yapmaz)"""
+        directory, _, partial = prefix.rpartition("/")
+        with self._lock:
+            node = self._dirs.get(directory.strip("/"))
+            if node is None:
+                return []
+            base = f"{directory}/" if directory else ""
+            names = [f"{base}{name}/" for name in node.children if name.startswith(partial)]
+            names += [f"{base}{name}" for name in node.files if name.startswith(partial)]
+        return sorted(names)[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'paths': self._live,
+                'trigrams': len(self._trigrams),
+                'generation': self.generation,
+                'rebuilds': self.rebuilds
+            }
+
+
+_indexes: Dict[str, FilenameIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_filename_index(directory: str = ".") -> FilenameIndex:
+    """Dizinin (yoksa oluşturulan) paylaşılan dosya adı indeksini döndürür"""
+    root = os.path.abspath(directory)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = FilenameIndex(root)
+        return index
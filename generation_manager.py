@@ -0,0 +1,84 @@
+"""
+CortexCLI Üretim Yöneticisi
+Süren LLM üretimlerini izler; klavyeden, /cancel komutuyla veya web arayüzünden iptal edilebilir
+"""
+
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
+
+
+@dataclass
+class GenerationHandle:
+    """Süren tek bir üretim; iptal edilse bile o ana kadarki çıktı korunur"""
+    id: int
+    owner: str
+    model: str
+    started_at: float = field(default_factory=time.time)
+    text: str = ""
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+    def cancel(self) -> None:
+        """Üretimi durdurur; akış bir sonraki kontrolde biter ve bağlantı kapatılır"""
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def append(self, chunk: str) -> None:
+        """Gelen parçayı kısmi çıktıya ekler"""
+        self.text += chunk
+
+
+class GenerationManager:
+    """Sahip (CLI oturumu, web bağlantısı) başına süren üretimlerin kaydı"""
+
+    def __init__(self):
+        self._handles: Dict[int, GenerationHandle] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, owner: str, model: str) -> GenerationHandle:
+        """Yeni bir üretimi kaydeder"""
+        with self._lock:
+            handle = GenerationHandle(next(self._ids), owner, model)
+            self._handles[handle.id] = handle
+            return handle
+
+    def finish(self, handle: GenerationHandle) -> None:
+        """Biten (veya iptal edilen) üretimi kayıttan çıkarır"""
+        with self._lock:
+            self._handles.pop(handle.id, None)
+
+    def cancel(self, owner: Optional[str] = None) -> int:
+        """Sahibin (verilmezse herkesin) süren üretimlerini iptal eder; iptal edilen sayıyı döndürür"""
+        handles = self.active(owner)
+        for handle in handles:
+            handle.cancel()
+        return len(handles)
+
+    def active(self, owner: Optional[str] = None) -> List[GenerationHandle]:
+        """Süren ve henüz iptal edilmemiş üretimler"""
+        with self._lock:
+            return [handle for handle in self._handles.values()
+                    if not handle.cancelled and (owner is None or handle.owner == owner)]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Süren üretimlerin özeti"""
+        return [
+            {
+                'id': handle.id,
+                'owner': handle.owner,
+                'model': handle.model,
+                'elapsed': round(time.time() - handle.started_at, 2),
+                'chars': len(handle.text)
+            }
+            for handle in self.active()
+        ]
+
+
+# Global üretim yöneticisi
+generation_manager = GenerationManager()
@@ -0,0 +1,284 @@
+"""
+CortexCLI İçe Aktarma Grafiği
+Python import ve JS import/require kenarlarından proje içi bağımlılık grafiği; odak dosyanın k adımlık komşuluğu
+"""
+
+import heapq
+import os
+import posixpath
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+import config
+from symbol_index import get_symbol_index
+
+PYTHON_EXTENSIONS = (".py", ".pyw")
+JS_EXTENSIONS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx")
+_JS_WAITING = "/"  # Çözülemeyen göreli JS importlarının bekleme anahtarı
+
+
+@dataclass
+class Neighbor:
+    """Odak dosyanın grafikteki bir komşusu"""
+    path: str
+    hops: int
+    score: float           # Yol üzerindeki kenar güçlerinin çarpımı (0-1)
+    relation: str          # imports, imported_by, both, indirect
+
+    @property
+    def label(self) -> str:
+        titles = {"imports": "import ediyor", "imported_by": "onu import ediyor",
+                  "both": "karşılıklı", "indirect": f"dolaylı ({self.hops} adım)"}
+        return titles.get(self.relation, self.relation)
+
+
+def _python_module_names(path: str, packages: Set[str]) -> List[str]:
+    """Python dosyasının import edilebileceği modül adları
+
+    Tam yol adı (a/b/c.py -> a.b.c) ve __init__.py içermeyen üst dizinler
+    atlanarak oluşan ad (src/pkg/mod.py -> pkg.mod).
+    """
+    stem = posixpath.splitext(path)[0]
+    parts = stem.split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    if not parts:
+        return []
+    names = [".".join(parts)]
+    # Paket zincirinin başı: __init__.py içermeyen ilk üst dizinden sonrası
+    start = len(parts) - 1
+    while start > 0 and "/".join(parts[:start]) in packages:
+        start -= 1
+    if start > 0:
+        names.append(".".join(parts[start:]))
+    return names
+
+
+class ImportGraph:
+    """Tek bir proje kökünün içe aktarma grafiği
+
+    Importlar sembol indeksinden gelir; yalnızca içerik özeti değişen dosyaların
+    kenarları yeniden çözülür. Eklenen/silinen dosyalar, daha önce çözülemeyen
+    importları ve silinen dosyaya giden kenarları yeniden çözdürür. Kenar ağırlığı
+    hedef modülden import edilen ad sayısıdır.
+    """
+
+    def __init__(self, root: str = "."):
+        self.root = os.path.abspath(root)
+        self._hashes: Dict[str, str] = {}
+        self._imports: Dict[str, Tuple[str, List[str]]] = {}   # yol -> (dil, importlar)
+        self._out: Dict[str, Counter] = {}                      # yol -> {hedef: ağırlık}
+        self._in: Dict[str, Counter] = {}                       # hedef -> {kaynak: ağırlık}
+        self._waiting: Dict[str, Set[str]] = {}                 # çözülemeyen modülün ilk adı -> kaynaklar
+        self._waits_on: Dict[str, Set[str]] = {}                # kaynak -> bekleme anahtarları
+        self._modules: Dict[str, str] = {}                      # modül adı -> yol
+        self._paths: Set[str] = set()
+        self._lock = threading.RLock()
+        self.resolved = 0  # Kenarları yeniden çözülen dosya sayısı
+
+    # --- Çözümleme ---
+
+    def _rebuild_modules(self) -> None:
+        packages = {posixpath.dirname(path) for path in self._paths if posixpath.basename(path) == "__init__.py"}
+        modules: Dict[str, str] = {}
+        # Aynı adı taşıyan dosyalardan köke en yakın olan kazanır
+        for path in sorted((path for path in self._paths if path.endswith(PYTHON_EXTENSIONS)),
+                           key=lambda item: (item.count("/"), item)):
+            for name in _python_module_names(path, packages):
+                modules.setdefault(name, path)
+        self._modules = modules
+
+    def _resolve_python(self, source: str, name: str) -> Tuple[Optional[str], Optional[str]]:
+        """Import adını proje dosyasına çözer: (yol, çözülemezse bekleme anahtarı)"""
+        level = len(name) - len(name.lstrip("."))
+        name = name[level:]
+        if level:
+            base = posixpath.dirname(source).split("/") if posixpath.dirname(source) else []
+            if level - 1 > len(base):
+                return None, None
+            base = base[:len(base) - (level - 1)]
+            name = ".".join(part for part in [".".join(base), name] if part)
+        parts = name.split(".")
+        # from a.b import c -> a.b.c; c bir modül değilse a.b
+        for end in range(len(parts), 0, -1):
+            target = self._modules.get(".".join(parts[:end]))
+            if target:
+                return target, None
+        # Aynı ilk adla bir modül eklenirse yeniden denenir (os, typing gibi adlar hiç eklenmez)
+        return None, parts[0]
+
+    def _resolve_js(self, source: str, spec: str) -> Tuple[Optional[str], Optional[str]]:
+        if not spec.startswith("."):
+            return None, None  # node_modules paketi
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(source), spec))
+        candidates = [base] + [base + ext for ext in JS_EXTENSIONS] + [f"{base}/index{ext}" for ext in JS_EXTENSIONS]
+        for candidate in candidates:
+            if candidate in self._paths and candidate != source:
+                return candidate, None
+        return None, _JS_WAITING
+
+    def _resolve(self, path: str) -> None:
+        """Dosyanın giden kenarlarını yeniden çözer"""
+        for target in self._out.pop(path, Counter()):
+            incoming = self._in.get(target)
+            if incoming is not None:
+                incoming.pop(path, None)
+                if not incoming:
+                    del self._in[target]
+        for key in self._waits_on.pop(path, ()):
+            waiting = self._waiting.get(key)
+            if waiting is not None:
+                waiting.discard(path)
+                if not waiting:
+                    del self._waiting[key]
+        if path not in self._imports:
+            return
+        language, imports = self._imports[path]
+        resolve = self._resolve_python if language == "python" else self._resolve_js
+        edges: Counter = Counter()
+        keys: Set[str] = set()
+        for name in imports:
+            target, key = resolve(path, name)
+            if target and target != path:
+                edges[target] += 1
+            elif key is not None:
+                keys.add(key)
+        for key in keys:
+            self._waiting.setdefault(key, set()).add(path)
+        if keys:
+            self._waits_on[path] = keys
+        if edges:
+            self._out[path] = edges
+            for target, weight in edges.items():
+                self._in.setdefault(target, Counter())[path] = weight
+        self.resolved += 1
+
+    # --- Güncelleme ---
+
+    def refresh(self) -> int:
+        """Sembol indeksindeki değişiklikleri grafiğe işler; yeniden çözülen dosya sayısını döndürür"""
+        current = get_symbol_index(self.root).file_imports()
+        with self._lock:
+            resolved_before = self.resolved
+            removed = [path for path in self._hashes if path not in current]
+            changed = [path for path, (digest, _, _) in current.items() if self._hashes.get(path) != digest]
+            if not removed and not changed:
+                return 0
+            added = [path for path in changed if path not in self._hashes]
+
+            for path in removed:
+                del self._hashes[path]
+                self._imports.pop(path, None)
+                self._paths.discard(path)
+            for path in changed:
+                digest, language, imports = current[path]
+                self._hashes[path] = digest
+                self._imports[path] = (language, list(imports))
+                self._paths.add(path)
+
+            to_resolve = set(changed)
+            if added or removed:
+                self._rebuild_modules()
+                # Yeni dosyalar yalnızca kendi adlarını bekleyen importları karşılayabilir
+                packages = {posixpath.dirname(path) for path in self._paths
+                            if posixpath.basename(path) == "__init__.py"}
+                keys = {_JS_WAITING if path.endswith(JS_EXTENSIONS) else name.split(".")[0]
+                        for path in added for name in (_python_module_names(path, packages)
+                                                       if path.endswith(PYTHON_EXTENSIONS) else [""])}
+                for key in keys:
+                    to_resolve |= self._waiting.get(key, set())
+                for path in removed:
+                    to_resolve |= set(self._in.get(path, ()))
+                    to_resolve.add(path)
+                # __init__.py eklenip silinince modül adları değişir; tüm kenarlar yeniden çözülür
+                if any(posixpath.basename(path) == "__init__.py" for path in added + removed):
+                    to_resolve |= set(self._imports)
+            for path in sorted(to_resolve):
+                self._resolve(path)
+            return self.resolved - resolved_before
+
+    # --- Sorgular ---
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def imports_of(self, path: str) -> Dict[str, int]:
+        """Dosyanın import ettiği proje dosyaları ve ağırlıkları"""
+        self.refresh()
+        with self._lock:
+            return dict(self._out.get(self._relative(path), {}))
+
+    def importers_of(self, path: str) -> Dict[str, int]:
+        """Dosyayı import eden proje dosyaları ve ağırlıkları"""
+        self.refresh()
+        with self._lock:
+            return dict(self._in.get(self._relative(path), {}))
+
+    def neighbors(self, path: str, hops: Optional[int] = None, limit: Optional[int] = None) -> List[Neighbor]:
+        """Odak dosyanın k adımlık komşuluğu, kenar ağırlıklarına göre sıralı
+
+        Kenarlar iki yönde de izlenir (import ettikleri ve onu import edenler).
+        Bir kenarın gücü w / (w + 1); komşunun puanı en güçlü yolun çarpımıdır.
+        """
+        graph_config = config.IMPORT_GRAPH_CONFIG
+        hops = graph_config["hops"] if hops is None else hops
+        limit = graph_config["max_neighbors"] if limit is None else limit
+        self.refresh()
+        focus = self._relative(path)
+        with self._lock:
+            best: Dict[str, Tuple[float, int]] = {focus: (1.0, 0)}
+            queue = [(-1.0, 0, focus)]
+            while queue:
+                negative, depth, node = heapq.heappop(queue)
+                if -negative < best[node][0] or depth >= hops:
+                    continue
+                weights = Counter(self._out.get(node, {}))
+                for source, weight in self._in.get(node, {}).items():
+                    weights[source] += weight
+                for other, weight in weights.items():
+                    score = -negative * weight / (weight + 1)
+                    if score > best.get(other, (0.0, 0))[0]:
+                        best[other] = (score, depth + 1)
+                        heapq.heappush(queue, (-score, depth + 1, other))
+
+            outgoing, incoming = self._out.get(focus, {}), self._in.get(focus, {})
+            neighbors = []
+            for other, (score, depth) in best.items():
+                if other == focus:
+                    continue
+                if other in outgoing and other in incoming:
+                    relation = "both"
+                elif other in outgoing:
+                    relation = "imports"
+                elif other in incoming:
+                    relation = "imported_by"
+                else:
+                    relation = "indirect"
+                neighbors.append(Neighbor(other, 1 if relation != "indirect" else depth, round(score, 4), relation))
+        neighbors.sort(key=lambda neighbor: (-neighbor.score, neighbor.hops, neighbor.path))
+        return neighbors[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'files': len(self._imports),
+                'edges': sum(len(edges) for edges in self._out.values()),
+                'waiting_files': len(self._waits_on),
+                'resolved': self.resolved
+            }
+
+
+_graphs: Dict[str, ImportGraph] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_import_graph(directory: str = ".") -> ImportGraph:
+    """Dizinin (yoksa oluşturulan) paylaşılan içe aktarma grafiğini döndürür"""
+    root = os.path.abspath(directory)
+    with _graphs_lock:
+        graph = _graphs.get(root)
+        if graph is None:
+            graph = _graphs[root] = ImportGraph(root)
+        return graph
@@ -0,0 +1,204 @@
+"""
+CortexCLI LLM Zamanlayıcısı
+Model başına eşzamanlılık sınırı, öncelikler ve istemci başına ağırlıklı adil kuyruk
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Callable, Iterator
+
+import config
+
+# Öncelik sınıfları (küçük değer önce çalışır)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+
+class SchedulerFullError(RuntimeError):
+    """Kuyruk dolu; istek kabul edilmedi"""
+
+
+class SchedulerCancelledError(RuntimeError):
+    """İstek slot beklerken iptal edildi ve kuyruktan çıkarıldı"""
+
+
+@dataclass
+class _Ticket:
+    """Kuyrukta bekleyen tek bir LLM isteği"""
+    model: str
+    client_id: str
+    priority: int
+    start_tag: float
+    finish_tag: float
+    seq: int
+    enqueued_at: float = field(default_factory=time.time)
+    on_update: Optional[Callable[[int, float], None]] = None
+    granted: bool = False
+    started_at: Optional[float] = None
+    position: Optional[int] = None  # Son bildirilen kuyruk sırası
+
+    @property
+    def sort_key(self) -> tuple:
+        return (self.priority, self.finish_tag, self.seq)
+
+    @property
+    def wait_time(self) -> float:
+        return (self.started_at or time.time()) - self.enqueued_at
+
+
+class LLMScheduler:
+    """Model başına slot sınırlı, öncelikli ve ağırlıklı adil (start-time fair queuing) zamanlayıcı
+
+    Her istemcinin istekleri sanal zamanda cost / ağırlık kadar yer kaplar; böylece
+    çok istek gönderen bir istemci diğerlerinin önüne geçemez. Aynı öncelik
+    sınıfında en küçük bitiş etiketine sahip istek sıradaki slotu alır.
+    """
+
+    def __init__(self, default_concurrency: Optional[int] = None,
+                 model_concurrency: Optional[Dict[str, int]] = None,
+                 client_weights: Optional[Dict[str, float]] = None,
+                 max_queue: Optional[int] = None):
+        scheduler_config = config.SCHEDULER_CONFIG
+        self.default_concurrency = default_concurrency or scheduler_config["default_model_concurrency"]
+        self.model_concurrency = model_concurrency if model_concurrency is not None else scheduler_config["model_concurrency"]
+        self.client_weights = client_weights if client_weights is not None else scheduler_config["client_weights"]
+        self.max_queue = max_queue or scheduler_config["max_queue"]
+
+        self._cond = threading.Condition()
+        self._waiting: Dict[str, List[_Ticket]] = {}  # model -> bekleyen istekler
+        self._running: Dict[str, int] = {}  # model -> çalışan istek sayısı
+        self._client_finish: Dict[str, float] = {}  # istemci -> son bitiş etiketi
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+
+    def concurrency_limit(self, model: str) -> int:
+        """Model için aynı anda çalışabilecek istek sayısı"""
+        return self.model_concurrency.get(model, self.default_concurrency)
+
+    @contextmanager
+    def slot(self, model: str, client_id: str, priority: int = PRIORITY_INTERACTIVE,
+             cost: float = 1.0, on_update: Optional[Callable[[int, float], None]] = None,
+             cancel: Optional[threading.Event] = None) -> Iterator[float]:
+        """Model için slot alana kadar bekler; blok içinde bekleme süresini verir
+
+        on_update(sıra, bekleme_süresi) kuyruktaki sıra değiştikçe çağrılır;
+        sıra 0 isteğin çalışmaya başladığını bildirir. cancel slot alınmadan
+        set edilirse istek kuyruktan çıkarılır ve SchedulerCancelledError
+        fırlatılır.
+        """
+        ticket = self._enqueue(model, client_id, priority, cost, on_update)
+        try:
+            with self._cond:
+                if cancel is None:
+                    self._cond.wait_for(lambda: ticket.granted)
+                else:
+                    # İptal olayı koşulu uyandırmaz; kısa aralıklarla kontrol edilir
+                    while not ticket.granted and not cancel.is_set():
+                        self._cond.wait(0.1)
+                    if not ticket.granted:
+                        raise SchedulerCancelledError("İstek kuyrukta beklerken iptal edildi")
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+        try:
+            yield ticket.wait_time
+        finally:
+            self._release(model)
+
+    def run(self, fn: Callable[[], Any], model: str, client_id: str, priority: int = PRIORITY_INTERACTIVE,
+            cost: float = 1.0, on_update: Optional[Callable[[int, float], None]] = None,
+            cancel: Optional[threading.Event] = None) -> Any:
+        """fn()'i model slotu alındığında çağıran iş parçacığında çalıştırır"""
+        with self.slot(model, client_id, priority, cost, on_update, cancel):
+            return fn()
+
+    def _enqueue(self, model: str, client_id: str, priority: int, cost: float,
+                 on_update: Optional[Callable[[int, float], None]]) -> _Ticket:
+        with self._cond:
+            if sum(len(tickets) for tickets in self._waiting.values()) >= self.max_queue:
+                raise SchedulerFullError("Sunucu meşgul, lütfen daha sonra tekrar deneyin")
+
+            weight = self.client_weights.get(client_id, 1.0)
+            start_tag = max(self._virtual_time, self._client_finish.get(client_id, 0.0))
+            finish_tag = start_tag + cost / weight
+            self._client_finish[client_id] = finish_tag
+            if len(self._client_finish) > 1000:
+                # Boşta kalan istemcilerin etiketleri artık sırayı etkilemez
+                self._client_finish = {client: tag for client, tag in self._client_finish.items()
+                                       if tag > self._virtual_time}
+
+            ticket = _Ticket(model, client_id, priority, start_tag, finish_tag, next(self._seq),
+                             on_update=on_update)
+            self._waiting.setdefault(model, []).append(ticket)
+            updates = self._dispatch()
+        self._notify(updates)
+        return ticket
+
+    def _cancel(self, ticket: _Ticket) -> None:
+        """Beklerken vazgeçilen isteği kuyruktan çıkarır"""
+        with self._cond:
+            if ticket.granted:
+                self._running[ticket.model] -= 1
+            elif ticket in self._waiting.get(ticket.model, []):
+                self._waiting[ticket.model].remove(ticket)
+            updates = self._dispatch()
+        self._notify(updates)
+
+    def _release(self, model: str) -> None:
+        with self._cond:
+            self._running[model] -= 1
+            updates = self._dispatch()
+        self._notify(updates)
+
+    def _dispatch(self) -> List[tuple]:
+        """Boş slotları sıradaki isteklere verir; bildirilecek (ticket, sıra) listesini döndürür (kilit altında)"""
+        updates = []
+        for model, tickets in self._waiting.items():
+            while tickets and self._running.get(model, 0) < self.concurrency_limit(model):
+                ticket = min(tickets, key=lambda t: t.sort_key)
+                tickets.remove(ticket)
+                ticket.granted = True
+                ticket.started_at = time.time()
+                self._running[model] = self._running.get(model, 0) + 1
+                self._virtual_time = max(self._virtual_time, ticket.start_tag)
+                ticket.position = 0
+                updates.append((ticket, 0))
+
+            for position, ticket in enumerate(sorted(tickets, key=lambda t: t.sort_key), 1):
+                if ticket.position != position:
+                    ticket.position = position
+                    updates.append((ticket, position))
+
+        self._cond.notify_all()
+        return updates
+
+    @staticmethod
+    def _notify(updates: List[tuple]) -> None:
+        """Sıra bilgilerini kilit dışında bildirir"""
+        for ticket, position in updates:
+            if ticket.on_update:
+                try:
+                    ticket.on_update(position, ticket.wait_time)
+                except Exception:
+                    pass
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Model başına çalışan/bekleyen istek sayıları"""
+        with self._cond:
+            models = set(self._waiting) | set(self._running)
+            return {
+                model: {
+                    'running': self._running.get(model, 0),
+                    'waiting': len(self._waiting.get(model, [])),
+                    'limit': self.concurrency_limit(model)
+                }
+                for model in models
+            }
+
+
+# Global LLM zamanlayıcısı
+llm_scheduler = LLMScheduler()
@@ -12,11 +12,11 @@ from rich.panel import Panel
 from rich.text import Text
 from rich.syntax import Syntax
 from rich.table import Table
-import requests
 import json
 import os
+import re
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator
 from pathlib import Path
 import config
 import shutil
@@ -31,12 +31,31 @@ from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.keys import Keys
 import sys
 from rich.markdown import Markdown
+from rich.live import Live
 from rich.progress import Progress
 from plugin_system import PluginManager
 from multi_model import multi_model_manager
 from advanced_code_execution import sandbox_executor, jupyter_integration, code_debugger
 from themes import theme_manager, print_themed, apply_cli_theme
 from user_settings import user_settings, get_user_preferences, get_user_profile, get_user_stats
+from ollama_client import ollama_client, OllamaError, OllamaTimeoutError, OllamaConnectionError, GenerationMetrics
+from response_cache import response_cache
+from semantic_cache import semantic_cache
+from request_coalescer import request_coalescer
+from model_catalog import model_catalog
+from conversation import Conversation, conversation_manager
+from model_residency import model_residency
+from generation_manager import GenerationHandle, generation_manager
+from project_index import get_project_index
+from context_packer import context_packer
+from context_diff import context_diffs
+from file_summaries import summary_store
+from symbol_index import get_symbol_index, extract_symbols, SUPPORTED_LANGUAGES
+from import_graph import get_import_graph
+from filename_index import get_filename_index
+from text_index import get_text_index, search_file
+from code_retriever import get_retriever
+from code_analysis import analysis_engine
 
 app = typer.Typer(help="CortexCLI - CLI LLM Shell")
 console = Console()
@@ -44,6 +63,8 @@ chat_history = []
 current_model = "qwen2.5:7b"
 system_prompt = "Sen yardımcı bir AI asistanısın."
 plugin_manager = PluginManager()
+CLI_SESSION = "cli"  # chat_loop'un sohbet oturumu
+conversation_manager.pinned.add(CLI_SESSION)
 
 # Apply theme colors
 colors = apply_cli_theme()
@@ -54,61 +75,148 @@ current_model = preferences.default_model
 system_prompt = preferences.default_system_prompt
 
 def check_ollama() -> bool:
-    """Ollama'nın yüklü ve çalışır durumda olup olmadığını kontrol eder"""
-    try:
-        # Ollama komutunun varlığını kontrol et
-        if not shutil.which("ollama"):
-            return False
-        
-        # Ollama servisinin çalışıp çalışmadığını kontrol et
-        result = subprocess.run(["ollama", "list"], capture_output=True, text=True, timeout=5)
-        return result.returncode == 0
-    except:
-        return False
+    """Ollama servisinin çalışır durumda olup olmadığını kontrol eder"""
+    return model_catalog.is_healthy()
 
-def get_available_models() -> list:
-    """Ollama'da mevcut modelleri listeler"""
+def get_available_models(refresh: bool = False) -> list:
+    """Ollama'da mevcut modelleri listeler (katalog önbelleğinden)"""
     try:
-        response = requests.get(f"{config.OLLAMA_CONFIG['base_url']}{config.OLLAMA_CONFIG['tags_endpoint']}")
-        if response.status_code == 200:
-            models = response.json().get("models", [])
-            return [model["name"] for model in models]
-    except:
-        pass
-    return []
+        return model_catalog.names(refresh)
+    except OllamaError:
+        return []
 
 def send_to_ollama(model: str, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.7) -> str:
     """Ollama API'sine istek gönderir"""
     try:
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": False,
-            "temperature": temperature,
-            "num_predict": config.get_setting("max_tokens")
-        }
-        
-        if system_prompt:
-            payload["system"] = system_prompt
-            
-        response = requests.post(
-            f"{config.OLLAMA_CONFIG['base_url']}{config.OLLAMA_CONFIG['api_endpoint']}", 
-            json=payload,
-            timeout=config.OLLAMA_CONFIG['timeout']
+        data = ollama_client.generate(
+            model,
+            prompt,
+            system=system_prompt,
+            options={
+                "temperature": temperature,
+                "num_predict": config.get_setting("max_tokens")
+            }
         )
-        response.raise_for_status()
         
         # İstatistik kaydet
         user_settings.record_query(model)
         
-        return response.json()["response"]
-    except requests.exceptions.Timeout:
+        return data.get("response", "")
+    except OllamaTimeoutError:
         return "[HATA] Yanıt zaman aşımına uğradı"
-    except requests.exceptions.ConnectionError:
+    except OllamaConnectionError:
         return "[HATA] Ollama servisine bağlanılamıyor. Ollama çalışıyor mu?"
     except Exception as e:
         return f"[HATA] Beklenmeyen hata: {str(e)}"
 
+def stream_ollama(prompt: str, model: str, system_prompt: Optional[str] = None,
+                  temperature: float = None) -> Iterator[str]:
+    """Ollama API'sinden yanıtı NDJSON parçaları halinde okur ve token'ları üretir"""
+    options = None
+    if temperature is not None:
+        options = {
+            "temperature": temperature,
+            "num_predict": config.get_setting("max_tokens")
+        }
+
+    try:
+        for data in ollama_client.generate_stream(
+            model,
+            prompt,
+            system=system_prompt,
+            options=options
+        ):
+            chunk = data.get("response", "")
+            if chunk:
+                yield chunk
+    except OllamaError as e:
+        raise RuntimeError(f"Ollama API hatası: {e}") from e
+
+def stream_chat(messages: List[Dict[str, str]], model: str, options: Optional[Dict[str, Any]] = None,
+                keep_alive: Optional[str] = None, stats: Optional[Dict[str, Any]] = None,
+                session_id: Optional[str] = None, handle: Optional[GenerationHandle] = None) -> Iterator[str]:
+    """/api/chat yanıtını parça parça okur ve token'ları üretir
+    
+    stats verilirse ilk token süresi (istemci tarafı) ve Ollama metrikleri yazılır.
+    handle verilirse gelen parçalar handle.text'e eklenir ve iptal edilince akış biter.
+    """
+    start_time = time.time()
+    cancel = handle.cancel_event if handle else None
+    try:
+        for data in ollama_client.chat_stream(model, messages, options=options, session_id=session_id,
+                                             cancel=cancel, keep_alive=keep_alive):
+            chunk = (data.get("message") or {}).get("content", "")
+            if chunk:
+                if stats is not None and "ttft" not in stats:
+                    stats["ttft"] = time.time() - start_time
+                if handle:
+                    handle.append(chunk)
+                yield chunk
+            if data.get("done") and stats is not None:
+                stats["metrics"] = GenerationMetrics.from_response(data)
+    except OllamaError as e:
+        raise RuntimeError(f"Ollama API hatası: {e}") from e
+
+def query_chat(messages: List[Dict[str, str]], model: str, options: Optional[Dict[str, Any]] = None,
+               keep_alive: Optional[str] = None, stats: Optional[Dict[str, Any]] = None,
+               session_id: Optional[str] = None) -> str:
+    """/api/chat ile tek parça yanıt alır"""
+    try:
+        data = ollama_client.chat(model, messages, options=options, session_id=session_id,
+                                  keep_alive=keep_alive)
+        if stats is not None:
+            stats["metrics"] = GenerationMetrics.from_response(data)
+            stats["ttft"] = stats["metrics"].ttft
+        return (data.get("message") or {}).get("content", "")
+    except Exception as e:
+        raise RuntimeError(f"Ollama API hatası: {e}")
+
+def format_generation_stats(stats: Dict[str, Any]) -> str:
+    """Tur sonunda gösterilecek kısa performans satırı"""
+    metrics = stats.get("metrics")
+    parts = []
+    if stats.get("ttft") is not None:
+        parts.append(f"ilk token {stats['ttft']:.2f}s")
+    if metrics:
+        if metrics.tokens_per_second:
+            parts.append(f"{metrics.tokens_per_second:.1f} token/s")
+        if metrics.prompt_tokens is not None:
+            parts.append(f"prompt {metrics.prompt_tokens} token ({metrics.prompt_eval_time:.2f}s)")
+        if metrics.load_time >= 0.1:
+            parts.append(f"model yükleme {metrics.load_time:.2f}s")
+    return " · ".join(parts)
+
+def render_stream(chunks: Iterable[str], title: str = None) -> str:
+    """Gelen token'ları Markdown olarak canlı gösterir ve tam metni döndürür"""
+    text = ""
+
+    def renderable():
+        body = Markdown(text) if text else Text("...", style="dim")
+        if title:
+            return Panel(body, title=title, border_style="green")
+        return body
+
+    with Live(renderable(), console=console, refresh_per_second=8, vertical_overflow="visible") as live:
+        for chunk in chunks:
+            text += chunk
+            live.update(renderable())
+
+    return text
+
+def send_to_ollama_stream(model: str, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.7) -> str:
+    """Yanıtı akış halinde gösterir; send_to_ollama ile aynı hata semantiği"""
+    try:
+        response = render_stream(stream_ollama(prompt, model, system_prompt, temperature))
+
+        # İstatistik kaydet
+        user_settings.record_query(model)
+
+        return response
+    except Exception as e:
+        message = f"[HATA] {e}"
+        console.print(f"[red]{message}[/red]")
+        return message
+
 def save_to_history(prompt: str, response: str, model: str, history_file: str):
     """Sohbet geçmişini dosyaya kaydeder"""
     try:
@@ -206,8 +314,12 @@ def list_project_files(directory: str = ".") -> list:
         console.print(f"[red]Dosya listesi alınamadı: {e}[/red]")
         return []
 
-def get_file_context(file_path: str = None, max_lines: int = 100) -> str:
-    """Dosya context'ini alır ve LLM için hazırlar"""
+def get_file_context(file_path: str = None, max_lines: int = 100, summarize: bool = True) -> str:
+    """Dosya context'ini alır ve LLM için hazırlar
+    
+    max_lines'tan uzun dosyalarda, hazırsa dosyanın önbellekli model özeti kesilmiş
+    metnin yerine geçer; özet yoksa arka planda üretilir ve sonraki turlarda kullanılır.
+    """
     context = ""
     
     if file_path and os.path.exists(file_path):
@@ -216,6 +328,11 @@ def get_file_context(file_path: str = None, max_lines: int = 100) -> str:
                 lines = f.readlines()
                 context += f"=== DOSYA: {file_path} ===\n"
                 context += f"Boyut: {len(lines)} satır\n"
+                summary = summary_store.get(file_path) if summarize and len(lines) > max_lines else None
+                if summary:
+                    note = ", dosyanın önceki sürümünden" if summary.stale else ""
+                    context += f"ÖZET ({summary.model}{note}):\n{summary.text.strip()}\n"
+                    return context
                 context += "".join(lines[:max_lines])
                 if len(lines) > max_lines:
                     context += f"\n... ve {len(lines) - max_lines} satır daha\n"
@@ -229,26 +346,13 @@ def get_project_context(directory: str = ".", max_files: int = 10) -> str:
     context = f"=== PROJE: {os.path.abspath(directory)} ===\n"
     context += f"Mevcut dizin: {os.getcwd()}\n\n"
     
-    # Dosya yapısını analiz et
+    # Dosya yapısını analiz et (gizli dosyalar indekste yer almaz)
     try:
-        files = []
-        for root, dirs, filenames in os.walk(directory):
-            # Gizli dosyaları atla
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
-            filenames = [f for f in filenames if not f.startswith('.')]
-            
-            for filename in filenames:
-                rel_path = os.path.relpath(os.path.join(root, filename), directory)
-                files.append(rel_path)
+        entries = get_project_index(directory).files()
+        files = [entry.path.replace('/', os.sep) for entry in entries]
         
-        # En önemli dosyaları seç (config, main, requirements vb.)
-        important_files = []
-        for file in files:
-            if any(keyword in file.lower() for keyword in ['main', 'app', 'config', 'requirements', 'setup', 'readme', 'package']):
-                important_files.append(file)
-        
-        # İlk max_files kadar dosyayı ekle
-        selected_files = important_files[:max_files//2] + files[:max_files//2]
+        # Giriş/yapılandırma dosyaları (main, config, requirements ...) ve yakın zamanda değişenler önce
+        selected_files = [entry.path.replace('/', os.sep) for entry in context_packer.rank_files(entries)[:max_files]]
         
         context += "DOSYA YAPISI:\n"
         for file in selected_files:
@@ -263,142 +367,63 @@ def get_project_context(directory: str = ".", max_files: int = 10) -> str:
     return context
 
 def analyze_code_structure(file_path: str) -> str:
-    """Kod yapısını analiz eder"""
+    """Kod yapısını analiz eder (sembol indeksinden; yalnızca değişen dosyalar yeniden ayrıştırılır)"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
         analysis = f"=== KOD ANALİZİ: {file_path} ===\n"
         
-        # Dosya türünü belirle
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext == '.py':
-            analysis += analyze_python_structure(content)
-        elif ext in ['.js', '.ts', '.jsx', '.tsx']:
-            analysis += analyze_javascript_structure(content)
-        elif ext in ['.html', '.htm']:
-            analysis += analyze_html_structure(content)
-        elif ext in ['.css', '.scss', '.sass']:
-            analysis += analyze_css_structure(content)
+        symbols = get_symbol_index('.').file_symbols(file_path)
+        if symbols is None:
+            raise FileNotFoundError(file_path)
+        if symbols.language in SUPPORTED_LANGUAGES:
+            analysis += symbols.summary()
         else:
-            analysis += f"Dosya türü: {ext}\nSatır sayısı: {len(content.splitlines())}\n"
+            ext = os.path.splitext(file_path)[1].lower()
+            analysis += f"Dosya türü: {ext}\nSatır sayısı: {symbols.line_count}\n"
         
         return analysis
         
     except Exception as e:
         return f"Kod analizi hatası: {e}"
 
+def get_related_files_context(file_path: str) -> str:
+    """Dosyanın import ettiği ve onu import eden proje dosyaları (içe aktarma grafiğinden)"""
+    if not config.IMPORT_GRAPH_CONFIG["enabled"]:
+        return ""
+    neighbors = get_import_graph('.').neighbors(file_path)
+    if not neighbors:
+        return ""
+    context = f"=== İLGİLİ DOSYALAR: {file_path} ===\n"
+    for neighbor in neighbors:
+        context += f"- {neighbor.path} ({neighbor.label})\n"
+    return context
+
 def analyze_python_structure(content: str) -> str:
     """Python kod yapısını analiz eder"""
-    import ast
-    
-    analysis = "Dil: Python\n"
-    lines = content.splitlines()
-    analysis += f"Satır sayısı: {len(lines)}\n"
-    
-    try:
-        tree = ast.parse(content)
-        
-        # Import'ları bul
-        imports = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.append(alias.name)
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module or ""
-                for alias in node.names:
-                    imports.append(f"{module}.{alias.name}")
-        
-        if imports:
-            analysis += f"Import'lar: {', '.join(imports[:10])}\n"
-        
-        # Fonksiyonları bul
-        functions = []
-        classes = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                functions.append(node.name)
-            elif isinstance(node, ast.ClassDef):
-                classes.append(node.name)
-        
-        if functions:
-            analysis += f"Fonksiyonlar: {', '.join(functions[:10])}\n"
-        if classes:
-            analysis += f"Sınıflar: {', '.join(classes[:10])}\n"
-            
-    except SyntaxError:
-        analysis += "Syntax hatası var\n"
-    except Exception as e:
-        analysis += f"AST analizi hatası: {e}\n"
-    
-    return analysis
+    return extract_symbols("", content, "python").summary()
 
 def analyze_javascript_structure(content: str) -> str:
     """JavaScript kod yapısını analiz eder"""
-    analysis = "Dil: JavaScript\n"
-    lines = content.splitlines()
-    analysis += f"Satır sayısı: {len(lines)}\n"
-    
-    # Basit regex analizi
-    import re
-    
-    # Import/require'ları bul
-    imports = re.findall(r'(?:import|require)\s*\(?[\'"]([^\'"]+)[\'"]', content)
-    if imports:
-        analysis += f"Import'lar: {', '.join(imports[:10])}\n"
-    
-    # Fonksiyonları bul
-    functions = re.findall(r'(?:function|const|let|var)\s+(\w+)\s*[=\(]', content)
-    if functions:
-        analysis += f"Fonksiyonlar: {', '.join(functions[:10])}\n"
-    
-    # Class'ları bul
-    classes = re.findall(r'class\s+(\w+)', content)
-    if classes:
-        analysis += f"Sınıflar: {', '.join(classes[:10])}\n"
-    
-    return analysis
+    return extract_symbols("", content, "javascript").summary()
 
 def analyze_html_structure(content: str) -> str:
     """HTML yapısını analiz eder"""
-    analysis = "Dil: HTML\n"
-    lines = content.splitlines()
-    analysis += f"Satır sayısı: {len(lines)}\n"
-    
-    import re
-    
-    # Tag'leri bul
-    tags = re.findall(r'<(\w+)', content)
-    tag_counts = {}
-    for tag in tags:
-        tag_counts[tag] = tag_counts.get(tag, 0) + 1
-    
-    if tag_counts:
-        analysis += "Kullanılan tag'ler:\n"
-        for tag, count in sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:10]:
-            analysis += f"  - {tag}: {count} kez\n"
-    
-    return analysis
+    return extract_symbols("", content, "html").summary()
 
 def analyze_css_structure(content: str) -> str:
     """CSS yapısını analiz eder"""
-    analysis = "Dil: CSS\n"
-    lines = content.splitlines()
-    analysis += f"Satır sayısı: {len(lines)}\n"
-    
-    import re
+    return extract_symbols("", content, "css").summary()
+
+def create_context_aware_prompt(user_prompt: str, current_file: str = None, include_project: bool = True,
+                                model: str = None) -> str:
+    """Context-aware prompt oluşturur
     
-    # Selector'ları bul
-    selectors = re.findall(r'([.#]?\w+(?:[^\n{]*?))\s*{', content)
-    if selectors:
-        analysis += f"Selector'lar: {', '.join(selectors[:10])}\n"
+    Model verilirse bağlam, modelin token bütçesine soruyla en ilgili parçalarla doldurulur.
+    """
+    if model and config.CONTEXT_PACKER_CONFIG["enabled"]:
+        packed = context_packer.pack(user_prompt, model, current_file, include_overview=include_project,
+                                     retrieved=get_retriever('.').search(user_prompt))
+        return f"{packed.text}\n\nKULLANICI SORUSU: {user_prompt}\n\n{CONTEXT_INSTRUCTIONS}"
     
-    return analysis
-
-def create_context_aware_prompt(user_prompt: str, current_file: str = None, include_project: bool = True) -> str:
-    """Context-aware prompt oluşturur"""
     context_prompt = ""
     
     # Proje context'i ekle
@@ -409,29 +434,326 @@ def create_context_aware_prompt(user_prompt: str, current_file: str = None, incl
     if current_file and os.path.exists(current_file):
         context_prompt += get_file_context(current_file) + "\n\n"
         context_prompt += analyze_code_structure(current_file) + "\n\n"
+        context_prompt += get_related_files_context(current_file) + "\n"
     
     # Kullanıcı prompt'unu ekle
     context_prompt += f"KULLANICI SORUSU: {user_prompt}\n\n"
-    context_prompt += "Lütfen yukarıdaki dosya yapısını ve kodları dikkate alarak yanıt ver. "
-    context_prompt += "Eğer kod değişikliği öneriyorsan, hangi dosyada değişiklik yapılacağını belirt. "
-    context_prompt += "Dosya yollarını tam olarak kullan."
+    context_prompt += CONTEXT_INSTRUCTIONS
     
     return context_prompt
 
+CONTEXT_INSTRUCTIONS = (
+    "Lütfen yukarıdaki dosya yapısını ve kodları dikkate alarak yanıt ver. "
+    "Eğer kod değişikliği öneriyorsan, hangi dosyada değişiklik yapılacağını belirt. "
+    "Dosya yollarını tam olarak kullan."
+)
+
+# Son oluşturulan bağlam öneki: anahtar, önek, paketleme, oluşturulma zamanı; seçili dosyanın
+# öneğe girdiğinden beri değiştiyse durumu (yol, mtime, boyut) ve o haline göre farkı
+_context_prefix_cache: Dict[str, Any] = {"key": None, "prefix": "", "packed": None, "built_at": 0.0,
+                                         "file_state": None, "generation": 0, "delta": None}
+
+def _prefix_is_current(key: tuple, file_state: Optional[tuple], current_file: Optional[str]) -> bool:
+    """Önbellekteki önek kullanılabilir mi; seçili dosya düzenlendiyse farkını günceller"""
+    cache = _context_prefix_cache
+    if cache["key"] != key:
+        return False
+    if cache["file_state"] != file_state:
+        delta = context_diffs.delta(current_file) if config.CONTEXT_DIFF_CONFIG["enabled"] else None
+        if delta is None or delta.kind == "full":
+            return False
+        cache.update(file_state=file_state, delta=delta if delta.kind == "diff" else None)
+    if time.time() - cache["built_at"] < config.PREFIX_CACHE_CONFIG["project_ttl"]:
+        return True
+    # Fark öneğin eski dosya içeriğine göredir; dosya listesi değişmedikçe önek korunur
+    if cache["delta"] is not None:
+        index = get_project_index('.')
+        index.refresh()
+        if index.generation == cache["generation"]:
+            cache["built_at"] = time.time()
+            return True
+    return False
+
+def create_context_prefix(current_file: str = None, include_project: bool = True, model: str = None) -> str:
+    """Turlar arasında değişmeyen proje/dosya bağlamını döndürür
+    
+    Önek, proje ve mevcut dosya değişmedikçe birebir aynı kalır; böylece Ollama
+    önceki isteğin KV önbelleğini yeniden kullanır ve yalnızca yeni soruyu işler.
+    Seçili dosya düzenlendiğinde önek korunur ve create_relevant_context yalnızca
+    değişen hunk'ları ekler; fark dosyanın tamamından pahalıysa önek yeniden kurulur.
+    """
+    file_state = None
+    if current_file and os.path.exists(current_file):
+        stat = os.stat(current_file)
+        file_state = (os.path.abspath(current_file), stat.st_mtime_ns, stat.st_size)
+    
+    packing = bool(model and config.CONTEXT_PACKER_CONFIG["enabled"])
+    key = (os.getcwd(), include_project, file_state[0] if file_state else None, model if packing else None)
+    cache = _context_prefix_cache
+    if _prefix_is_current(key, file_state, current_file):
+        return cache["prefix"]
+    
+    # Farklar bu kurulumda öneğe giren içeriğe göre hesaplanır
+    context_diffs.forget()
+    if file_state:
+        context_diffs.remember(current_file)
+    cache.update(key=key, file_state=file_state, delta=None)
+    
+    if packing:
+        # Soruya bağlı olmayan kısım: dosya listesi ve seçili dosya (bütçenin yarısı)
+        summary = summary_store.get(current_file) if file_state else None
+        budget = context_packer.budget_for(model) // 2 - (summary.tokens if summary else 0)
+        packed = context_packer.pack(None, model, current_file, budget=budget,
+                                     include_overview=include_project, label="önek")
+        prefix = packed.text
+        current = os.path.relpath(file_state[0]).replace(os.sep, "/") if file_state else None
+        shown = sum(chunk.end_line - chunk.start_line + 1 for chunk in packed.chunks if chunk.path == current)
+        if summary and shown < summary.lines:
+            # Bütçeye sığmayan kısım dahil tüm dosyanın özeti
+            prefix += "\n" + summary.render()
+            packed.used_tokens += summary.tokens
+            packed.budget += summary.tokens
+        prefix = f"{prefix}\n\n{CONTEXT_INSTRUCTIONS}"
+        cache.update(prefix=prefix, packed=packed, built_at=time.time(), generation=get_project_index('.').generation)
+        return prefix
+    
+    prefix = ""
+    if include_project:
+        prefix += get_project_context() + "\n\n"
+    if file_state:
+        prefix += get_file_context(current_file) + "\n\n"
+        prefix += analyze_code_structure(current_file) + "\n\n"
+        prefix += get_related_files_context(current_file) + "\n"
+    prefix += CONTEXT_INSTRUCTIONS
+    
+    cache.update(prefix=prefix, packed=None, built_at=time.time(), generation=get_project_index('.').generation)
+    return prefix
+
+def create_relevant_context(user_prompt: str, current_file: str = None, model: str = None) -> str:
+    """Önek dışında kalan bütçeyi soruyla ilgili parçalarla doldurup kullanıcı mesajını oluşturur
+    
+    Seçili dosya öneğe girdikten sonra düzenlendiyse değişen hunk'lar da eklenir.
+    """
+    delta = _context_prefix_cache["delta"]
+    changes = delta.render().rstrip() if delta else ""
+    prefix_packed = _context_prefix_cache["packed"]
+    if not model or not config.CONTEXT_PACKER_CONFIG["enabled"] or prefix_packed is None:
+        return f"{changes}\n\nKULLANICI SORUSU: {user_prompt}" if changes else user_prompt
+    budget = context_packer.budget_for(model) - prefix_packed.used_tokens - (delta.tokens if delta else 0)
+    exclude = [chunk.label for chunk in prefix_packed.chunks]
+    if delta:
+        # Düzenlenen dosyanın güncel parçaları farkla zaten anlatılıyor
+        exclude.append(os.path.relpath(os.path.abspath(current_file)).replace(os.sep, "/"))
+    packed = context_packer.pack(user_prompt, model, current_file, budget=budget, include_overview=False,
+                                 exclude=exclude, retrieved=get_retriever('.').search(user_prompt))
+    context = "\n\n".join(part for part in (packed.text if packed.chunks else "", changes) if part)
+    if not context:
+        return user_prompt
+    return f"{context}\n\nKULLANICI SORUSU: {user_prompt}"
+
+def show_definitions(name: str) -> None:
+    """Sembolün proje içindeki tanımlarını listeler"""
+    definitions = get_symbol_index('.').define(name)
+    if not definitions:
+        console.print(f"[yellow]'{name}' için tanım bulunamadı[/yellow]")
+        return
+    table = Table(title=f"📍 {name} tanımları")
+    table.add_column("Sembol", style="cyan")
+    table.add_column("Tür", style="magenta")
+    table.add_column("Konum", style="green")
+    for symbol in definitions:
+        qualified = f"{symbol.parent}.{symbol.name}" if symbol.parent else symbol.name
+        table.add_row(qualified, symbol.kind, f"{symbol.location}-{symbol.end_line}")
+    console.print(table)
+
+def show_search_results(pattern: str, target: str = '.', regex: bool = False, page: int = 1) -> None:
+    """/search ve /grep: tek dosyada doğrudan, dizinde metin indeksi üzerinden satır araması"""
+    page_size = config.TEXT_INDEX_CONFIG["page_size"]
+    offset = (max(page, 1) - 1) * page_size
+    # /search büyük/küçük harf duyarsız, /grep (regex) duyarlıdır
+    case_sensitive = regex
+    try:
+        if os.path.isfile(target):
+            all_hits = search_file(target, pattern, regex, case_sensitive)
+            hits, has_more = all_hits[offset:offset + page_size], len(all_hits) > offset + page_size
+            caption = f"{len(all_hits)} satır"
+        else:
+            rel = os.path.relpath(os.path.abspath(target)).replace(os.sep, "/")
+            index, path = (get_text_index(target), "") if rel.startswith("..") else (get_text_index('.'), "" if rel == "." else rel)
+            result = index.search(pattern, regex, case_sensitive, offset=offset, limit=page_size, path=path)
+            hits, has_more = result.hits, result.has_more
+            caption = f"{result.candidates} aday dosya, {result.scanned} okundu, {result.elapsed:.2f} sn"
+            warn_truncated(index.root)
+    except re.error as e:
+        console.print(f"[red]Geçersiz regex: {e}[/red]")
+        return
+    except OSError as e:
+        console.print(f"[red]Arama hatası: {e}[/red]")
+        return
+
+    if not hits:
+        console.print(f"[yellow]'{pattern}' için sonuç bulunamadı[/yellow]")
+        return
+    table = Table(title=f"🔍 {'Regex Arama' if regex else 'Arama Sonuçları'}: {pattern} (sayfa {page})",
+                  caption=caption)
+    table.add_column("Konum", style="cyan", no_wrap=True)
+    table.add_column("Satır", style="white")
+    for hit in hits:
+        table.add_row(hit.location, hit.text)
+    console.print(table)
+    if has_more:
+        command = '/grep' if regex else '/search'
+        console.print(f"[dim]Sonraki sayfa: {command} {pattern} {target} --page {page + 1}[/dim]")
+
+def warn_truncated(directory: str = ".") -> None:
+    """Proje indeksi max_files sınırına takıldıysa aramanın bazı dosyaları kaçırabileceğini bildirir"""
+    if get_project_index(directory).truncated:
+        console.print(f"[yellow]⚠️ Proje indeksi {config.PROJECT_INDEX_CONFIG['max_files']} dosya sınırında "
+                      f"kesildi; bazı dosyalar aramada yok (PROJECT_INDEX_CONFIG['max_files'])[/yellow]")
+
+def show_retrieval(query: str = None) -> None:
+    """/context rag: soru verilirse getirilen parçaları, verilmezse indeksi tamamlayıp durumunu gösterir"""
+    retriever = get_retriever('.')
+    if not retriever.enabled:
+        console.print("[yellow]Anlamsal getirme kapalı (RETRIEVAL_CONFIG veya numpy eksik)[/yellow]")
+        return
+    if query:
+        retrieved = retriever.search(query)
+        if not retrieved:
+            console.print(f"[yellow]'{query}' için benzer parça bulunamadı[/yellow]")
+            return
+        table = Table(title=f"🧭 Benzer parçalar: {query}")
+        table.add_column("Parça", style="cyan")
+        table.add_column("Benzerlik", style="magenta")
+        for chunk in retrieved:
+            table.add_row(chunk.label, f"{chunk.similarity:.3f}")
+        console.print(table)
+        return
+    with console.status("[cyan]Parçalar gömülüyor...[/cyan]"):
+        embedded = retriever.refresh(time_budget=None)
+    stats = retriever.stats()
+    console.print(f"[green]✅ {embedded} parça gömüldü[/green] · {stats['embedded_chunks']}/{stats['chunks']} parça, "
+                  f"{stats['files']} dosya, gömücü: {stats['embedder']}"
+                  + (f", IVF listeleri: {stats['ivf_lists']}" if stats['ivf_lists'] else ""))
+
+def show_file_matches(query: str) -> bool:
+    """/find: dosya adı indeksinde fzf tarzı sıralı sonuçlar; yeterince iyi eşleşme yoksa False"""
+    index = get_filename_index('.')
+    started = time.perf_counter()
+    matches = [match for match in index.search(query)
+               if match.quality >= config.FILENAME_INDEX_CONFIG["min_quality"]]
+    elapsed = (time.perf_counter() - started) * 1000
+    warn_truncated('.')
+    if not matches:
+        return False
+    table = Table(title=f"🔍 Dosya Arama: {query}",
+                  caption=f"{index.stats()['paths']} yol, {elapsed:.1f} ms")
+    table.add_column("Dosya", style="cyan")
+    table.add_column("Puan", style="green", justify="right")
+    for match in matches:
+        table.add_row(match.highlighted(), str(match.score))
+    console.print(table)
+    return True
+
+def show_import_graph(file_path: str) -> None:
+    """/context graph: dosyanın içe aktarma grafiğindeki komşuları"""
+    graph = get_import_graph('.')
+    neighbors = graph.neighbors(file_path)
+    if not neighbors:
+        console.print(f"[yellow]{file_path} için proje içi import ilişkisi bulunamadı[/yellow]")
+        return
+    stats = graph.stats()
+    table = Table(title=f"🕸️ İçe aktarma komşuları: {file_path}",
+                  caption=f"{stats['files']} dosya, {stats['edges']} kenar")
+    table.add_column("Dosya", style="cyan")
+    table.add_column("İlişki", style="magenta")
+    table.add_column("Puan", style="green")
+    for neighbor in neighbors:
+        table.add_row(neighbor.path, neighbor.label, f"{neighbor.score:.3f}")
+    console.print(table)
+
+def show_file_summary(file_path: str) -> None:
+    """Dosyanın önbellekli model özetini gösterir; yoksa hemen üretir"""
+    summary_config = config.FILE_SUMMARY_CONFIG
+    try:
+        with console.status(f"[cyan]{summary_config['model']} ile özetleniyor...[/cyan]"):
+            summary = summary_store.summarize(file_path)
+    except OllamaError as e:
+        console.print(f"[red]❌ Özet üretilemedi ({summary_config['model']}): {e}[/red]")
+        return
+    if summary is None:
+        console.print(f"[yellow]{file_path} {summary_config['min_lines']} satırdan kısa veya okunamıyor; "
+                      f"bağlama tamamı eklenir[/yellow]")
+        return
+    stats = summary_store.stats()
+    console.print(Panel(summary.text, title=f"📝 {file_path} ({summary.lines} satır, {summary.model})",
+                        subtitle=f"{stats['stored']} özet kayıtlı", border_style="blue"))
+
+def show_directory_analysis(directory: str) -> None:
+    """/context analyze <dizin>: dizindeki Python dosyalarının birleştirilmiş analiz raporu"""
+    with console.status("[cyan]Dosyalar analiz ediliyor...[/cyan]") as status:
+        report = analysis_engine.analyze(
+            directory, progress=lambda done, total: status.update(f"[cyan]Analiz: {done}/{total} dosya[/cyan]"))
+    if not report.files:
+        console.print(f"[yellow]{directory} altında Python dosyası bulunamadı[/yellow]")
+        return
+
+    definitions = report.definition_counts()
+    overview = Table(title=f"🔍 Kod Analizi: {directory}", caption=report.summary())
+    overview.add_column("Özellik", style="cyan")
+    overview.add_column("Değer", style="green")
+    overview.add_row("Sınıflar", str(definitions.get("class", 0)))
+    overview.add_row("Fonksiyonlar", str(definitions.get("function", 0)))
+    overview.add_row("Metotlar", str(definitions.get("method", 0)))
+    overview.add_row("En çok import", ", ".join(f"{name} ({count})" for name, count in report.top_imports(8)))
+    overview.add_row("En çok çağrı", ", ".join(f"{name} ({count})" for name, count in report.top_calls(8)))
+    overview.add_row("En karmaşık", ", ".join(f"{item.path} ({item.complexity})" for item in report.most_complex()))
+    if report.syntax_errors:
+        overview.add_row("Sözdizimi hatası", ", ".join(item.path for item in report.syntax_errors[:5]))
+    console.print(overview)
+
+    findings = report.findings
+    if findings:
+        table = Table(title=f"⚠️ Güvenlik bulguları ({len(findings)})")
+        table.add_column("Konum", style="cyan", no_wrap=True)
+        table.add_column("Kural", style="magenta")
+        table.add_column("Açıklama", style="yellow")
+        for finding in findings[:20]:
+            table.add_row(finding.location, finding.rule, finding.message)
+        console.print(table)
+        if len(findings) > 20:
+            console.print(f"[dim]... ve {len(findings) - 20} bulgu daha[/dim]")
+
+def show_context_report() -> None:
+    """Son bağlam paketlemelerinde nelerin gönderildiğini gösterir"""
+    if not context_packer.last:
+        console.print("[yellow]Henüz bağlam paketlenmedi[/yellow]")
+        return
+    for label, packed in context_packer.last.items():
+        table = Table(title=f"📦 Bağlam ({label}): {packed.summary()}")
+        table.add_column("Parça", style="cyan")
+        table.add_column("Token", style="yellow")
+        table.add_column("Puan", style="magenta")
+        table.add_column("Semboller", style="green")
+        for row in packed.rows():
+            table.add_row(row['chunk'], str(row['tokens']), str(row['score']), row['symbols'])
+        console.print(table)
+        if packed.overview_files:
+            console.print(f"[dim]Dosya listesinde {packed.overview_files} dosya[/dim]")
+
 def smart_file_navigation(query: str) -> str:
     """Akıllı dosya navigasyonu"""
     try:
-        # Query'de dosya adı geçiyorsa bul
-        import re
-        file_patterns = re.findall(r'\b\w+\.(?:py|js|ts|jsx|tsx|html|css|json|yaml|yml|md|txt)\b', query)
+        # Query'de dosya adı/yolu geçiyorsa bellek içi dosya adı indeksinde bulanık ara
+        file_patterns = re.findall(r'[\w./-]*\w\.\w+|\w[\w.-]*/[\w./-]+', query)
         
         if file_patterns:
+            index = get_filename_index('.')
             for pattern in file_patterns:
-                # Dosyayı bul
-                for root, dirs, files in os.walk('.'):
-                    if pattern in files:
-                        file_path = os.path.join(root, pattern)
-                        return f"Bulunan dosya: {file_path}\n" + get_file_context(file_path)
+                matches = index.search(pattern, limit=1)
+                if matches and matches[0].quality >= config.FILENAME_INDEX_CONFIG["min_quality"]:
+                    file_path = os.path.join('.', matches[0].path.replace('/', os.sep))
+                    return f"Bulunan dosya: {file_path}\n" + get_file_context(file_path, summarize=False)
         
         # Klasör arama
         folder_patterns = re.findall(r'\b(?:src|lib|test|docs|config|build|dist)\b', query)
@@ -440,6 +762,12 @@ def smart_file_navigation(query: str) -> str:
                 if os.path.exists(pattern):
                     return f"Bulunan klasör: {pattern}\n" + get_project_context(pattern)
         
+        # Ad geçmiyorsa ("token doğrulaması nerede?") anlamca en yakın kod parçaları
+        retrieved = get_retriever('.').search(query)
+        if retrieved:
+            lines = [f"{chunk.label}  (benzerlik {chunk.similarity:.2f})" for chunk in retrieved]
+            return "İlgili kod parçaları:\n" + "\n".join(lines)
+        
         return "Dosya/klasör bulunamadı."
         
     except Exception as e:
@@ -456,7 +784,8 @@ def shell(
     temperature: float = typer.Option(config.get_setting("temperature"), help="Yaratıcılık seviyesi (0.0-1.0)"),
     file_input: Optional[str] = typer.Option(None, help="Dosya içeriğini prompt'a ekle"),
     auto_save: bool = typer.Option(False, help="Kod bloklarını otomatik kaydet"),
-    output_dir: str = typer.Option("output", help="Çıktı dosyaları için dizin")
+    output_dir: str = typer.Option("output", help="Çıktı dosyaları için dizin"),
+    stream: bool = typer.Option(config.get_setting("stream"), help="Yanıtı token token akış halinde göster")
 ):
     """CortexCLI Shell'i başlatır"""
     
@@ -480,8 +809,7 @@ def shell(
         raise typer.Exit(1)
     
     # Model mevcut mu kontrol et
-    available_models = get_available_models()
-    if selected_model not in available_models:
+    if not model_catalog.has(selected_model):
         console.print(Panel(
             f"[yellow]⚠️  Model {selected_model} yüklü değil![/yellow]\n\n"
             f"Yüklemek için: ollama pull {selected_model}",
@@ -557,14 +885,19 @@ def shell(
                 prompt = f"Dosya içeriği:\n{file_content}\n\nSoru: {prompt}"
             
             # Yanıt al
-            console.print("[dim]🤔 Düşünüyor...[/dim]")
-            response = send_to_ollama(selected_model, prompt, final_system_prompt, temperature)
-            
-            # Yanıtı formatla ve göster
-            formatted_response = format_code_response(response)
-            console.print(f"[bold green]🤖 Yanıt:[/bold green]")
-            console.print(formatted_response)
-            console.print()  # Boş satır
+            if stream:
+                console.print(f"[bold green]🤖 Yanıt:[/bold green]")
+                response = send_to_ollama_stream(selected_model, prompt, final_system_prompt, temperature)
+                console.print()  # Boş satır
+            else:
+                console.print("[dim]🤔 Düşünüyor...[/dim]")
+                response = send_to_ollama(selected_model, prompt, final_system_prompt, temperature)
+                
+                # Yanıtı formatla ve göster
+                formatted_response = format_code_response(response)
+                console.print(f"[bold green]🤖 Yanıt:[/bold green]")
+                console.print(formatted_response)
+                console.print()  # Boş satır
             
             # Kod bloklarını otomatik kaydet
             if auto_save:
@@ -691,6 +1024,7 @@ def install_model(model_name: str):
             text=True,
             check=True
         )
+        model_catalog.invalidate()
         console.print(f"[green]✅ {model} başarıyla yüklendi![/green]")
     except subprocess.CalledProcessError as e:
         console.print(f"[red]❌ Model yüklenemedi: {e.stderr}[/red]")
@@ -714,7 +1048,8 @@ def list_presets():
 def quick_chat(
     prompt: str = typer.Argument(..., help="Hızlı soru"),
     model: str = typer.Option(config.get_setting("model"), help="Model seç"),
-    temperature: float = typer.Option(config.get_setting("temperature"), help="Yaratıcılık seviyesi")
+    temperature: float = typer.Option(config.get_setting("temperature"), help="Yaratıcılık seviyesi"),
+    stream: bool = typer.Option(config.get_setting("stream"), help="Yanıtı token token akış halinde göster")
 ):
     """Tek seferlik hızlı soru-cevap"""
     
@@ -727,6 +1062,11 @@ def quick_chat(
         console.print(f"[red]❌ Desteklenmeyen model: {model}[/red]")
         raise typer.Exit(1)
     
+    if stream:
+        console.print(f"[bold green]🤖 Yanıt:[/bold green]")
+        send_to_ollama_stream(selected_model, prompt, temperature=temperature)
+        return
+    
     console.print(f"[dim]🤔 {selected_model} düşünüyor...[/dim]")
     response = send_to_ollama(selected_model, prompt, temperature=temperature)
     
@@ -756,6 +1096,7 @@ def setup_smart_model() -> bool:
                     task = progress.add_task("Model yükleniyor...", total=None)
                     subprocess.run(["ollama", "pull", best_model], check=True)
                     progress.update(task, completed=True)
+                model_catalog.invalidate()
                 
                 current_model = best_model
                 console.print(f"[green]✅ Model başarıyla yüklendi: {best_model}[/green]")
@@ -1223,7 +1564,7 @@ class CortexCompleter(Completer):
             '/save': 'Sohbet geçmişini kaydet',
             '/load': 'Sohbet geçmişini yükle',
             '/model': 'Model değiştir',
-            '/models': 'Kullanılabilir modelleri listele',
+            '/models': 'Kullanılabilir modelleri listele (refresh: yenile)',
             '/system': 'Sistem promptunu değiştir',
             '/read': 'Dosya oku',
             '/write': 'Dosya yaz',
@@ -1238,6 +1579,7 @@ class CortexCompleter(Completer):
             '/troubleshoot': 'Sorun giderme',
             '/config': 'Yapılandırmayı göster',
             '/reset': 'Sohbet geçmişini sıfırla',
+            '/cancel': 'Süren üretimleri iptal et',
             '/voice': 'Ses komutları yönetimi',
             '/voice-start': 'Ses dinlemeyi başlat',
             '/voice-stop': 'Ses dinlemeyi durdur',
@@ -1249,7 +1591,10 @@ class CortexCompleter(Completer):
             '/smart': 'Akıllı dosya işlemleri',
             '/context': 'Bağlam analizi',
             '/stats': 'Kullanım istatistikleri',
-            '/add-suggestion': 'Yeni kod önerisi ekle'
+            '/add-suggestion': 'Yeni kod önerisi ekle',
+            '/cache': 'Yanıt önbelleği (stats, clear, on, off, semantic)',
+            '/resident': 'Bellekteki modeller (list, pin, unpin, load, unload)',
+            '/where': 'Sembolün tanımlandığı yeri bul'
         }
         
         self.file_commands = ['/read', '/write', '/delete', '/rename']
@@ -1259,8 +1604,18 @@ class CortexCompleter(Completer):
         word = document.get_word_before_cursor()
         line = document.text_before_cursor
         
+        # Sembol adı tamamlama (indeks zaten yüklüyse; yazarken tarama yapılmaz)
+        if line.startswith('/where '):
+            for name in get_symbol_index('.').complete(word):
+                yield Completion(name, start_position=-len(word), display=name, display_meta='sembol')
+        # Dosya yolu tamamlama (dosya adı indeksi yüklüyse)
+        elif any(line.startswith(f"{command} ") for command in self.file_commands + ['/context file']):
+            prefix = document.get_word_before_cursor(WORD=True)
+            for path in get_filename_index('.').complete(prefix):
+                yield Completion(path, start_position=-len(prefix), display=path,
+                                 display_meta='dizin' if path.endswith('/') else 'dosya')
         # Komut başlangıcı kontrolü
-        if line.startswith('/'):
+        elif line.startswith('/'):
             # Komut tamamlama
             for cmd, desc in self.commands.items():
                 if cmd.startswith(word):
@@ -1443,81 +1798,25 @@ def handle_file_commands(command: str, args: List[str]) -> bool:
         
     elif command == '/tree':
         """Dosya ağacını gösterir"""
-        try:
-            import subprocess
-            result = subprocess.run(['tree', '-I', '__pycache__|*.pyc|.git'], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                console.print(Panel(result.stdout, title="🌳 Dosya Ağacı", border_style="green"))
-            else:
-                # tree komutu yoksa manuel ağaç oluştur
-                console.print(Panel(build_file_tree('.'), title="🌳 Dosya Ağacı", border_style="green"))
-        except:
-            console.print(Panel(build_file_tree('.'), title="🌳 Dosya Ağacı", border_style="green"))
-        return True
-        
-    elif command == '/search':
-        """Dosya içeriğinde arama yapar"""
-        if len(args) < 2:
-            console.print("[red]Kullanım: /search <pattern> <dosya_yolu>[/red]")
-            return True
-            
-        pattern = args[0]
-        file_path = args[1]
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            matches = []
-            for i, line in enumerate(lines, 1):
-                if pattern.lower() in line.lower():
-                    matches.append((i, line.strip()))
-            
-            if matches:
-                result = f"'{pattern}' için {len(matches)} sonuç bulundu:\n\n"
-                for line_num, line in matches[:10]:  # İlk 10 sonuç
-                    result += f"{line_num}: {line}\n"
-                if len(matches) > 10:
-                    result += f"\n... ve {len(matches) - 10} sonuç daha"
-                
-                console.print(Panel(result, title=f"🔍 Arama Sonuçları: {file_path}", border_style="blue"))
-            else:
-                console.print(f"[yellow]'{pattern}' için sonuç bulunamadı[/yellow]")
-                
-        except Exception as e:
-            console.print(f"[red]Arama hatası: {e}[/red]")
+        console.print(Panel(build_file_tree('.'), title="🌳 Dosya Ağacı", border_style="green"))
         return True
         
-    elif command == '/grep':
-        """Regex ile dosya arama"""
-        if len(args) < 2:
-            console.print("[red]Kullanım: /grep <regex_pattern> <dosya_yolu>[/red]")
+    elif command in ('/search', '/grep'):
+        """Dosyada veya proje genelinde (metin indeksiyle) satır araması"""
+        page = 1
+        if '--page' in args:
+            position = args.index('--page')
+            try:
+                page = int(args[position + 1])
+            except (IndexError, ValueError):
+                console.print("[red]--page bir sayı olmalı[/red]")
+                return True
+            args = args[:position] + args[position + 2:]
+        if not args:
+            usage = "<regex_pattern>" if command == '/grep' else "<pattern>"
+            console.print(f"[red]Kullanım: {command} {usage} [dosya_veya_dizin] [--page N][/red]")
             return True
-            
-        import re
-        pattern = args[0]
-        file_path = args[1]
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            matches = re.findall(pattern, content, re.MULTILINE)
-            
-            if matches:
-                result = f"'{pattern}' için {len(matches)} eşleşme bulundu:\n\n"
-                for i, match in enumerate(matches[:10], 1):
-                    result += f"{i}: {match}\n"
-                if len(matches) > 10:
-                    result += f"\n... ve {len(matches) - 10} eşleşme daha"
-                
-                console.print(Panel(result, title=f"🔍 Regex Arama: {file_path}", border_style="blue"))
-            else:
-                console.print(f"[yellow]'{pattern}' için eşleşme bulunamadı[/yellow]")
-                
-        except Exception as e:
-            console.print(f"[red]Regex arama hatası: {e}[/red]")
+        show_search_results(args[0], args[1] if len(args) > 1 else '.', command == '/grep', page)
         return True
         
     elif command == '/diff':
@@ -1594,34 +1893,24 @@ Değiştirilme: {modified}
     return False
 
 def build_file_tree(directory: str, max_depth: int = 3, current_depth: int = 0) -> str:
-    """Manuel dosya ağacı oluşturur"""
-    if current_depth > max_depth:
-        return ""
-    
-    tree = ""
+    """Proje indeksinden dosya ağacı oluşturur"""
     try:
-        items = sorted(os.listdir(directory))
-        for i, item in enumerate(items):
-            if item.startswith('.'):
-                continue
-                
-            is_last = i == len(items) - 1
-            prefix = "└── " if is_last else "├── "
-            indent = "    " * current_depth
-            
-            full_path = os.path.join(directory, item)
-            if os.path.isdir(full_path):
-                tree += f"{indent}{prefix}{item}/\n"
-                if current_depth < max_depth:
-                    tree += build_file_tree(full_path, max_depth, current_depth + 1)
-            else:
-                tree += f"{indent}{prefix}{item}\n"
-                
-    except PermissionError:
-        tree += f"{indent}└── [Erişim reddedildi]\n"
+        root = get_project_index(directory).tree(max_depth=max_depth + 1)
     except Exception as e:
-        tree += f"{indent}└── [Hata: {e}]\n"
-    
+        return f"└── [Hata: {e}]\n"
+    return _render_tree(root['children'], current_depth)
+
+def _render_tree(children: List[Dict[str, Any]], depth: int) -> str:
+    """İndeks ağacını girintili metne çevirir"""
+    tree = ""
+    for i, child in enumerate(children):
+        prefix = "└── " if i == len(children) - 1 else "├── "
+        indent = "    " * depth
+        if child['type'] == 'directory':
+            tree += f"{indent}{prefix}{child['name']}/\n"
+            tree += _render_tree(child['children'], depth + 1)
+        else:
+            tree += f"{indent}{prefix}{child['name']}\n"
     return tree
 
 def execute_code(code: str, language: str = "python") -> str:
@@ -1754,15 +2043,22 @@ def show_advanced_help(*args):
                 "/exit, /quit": ("Uygulamadan çıkış yapar.", ""),
                 "/clear": ("Ekranı temizler.", ""),
                 "/config": ("Yapılandırmayı gösterir.", ""),
+                "/cancel": ("Süren üretimleri iptal eder; yanıt sırasında Ctrl+C aynı işi yapar.", "Gelen kısım korunur"),
             }
         },
         "model": {
             "desc": "Model yönetimi ve LLM komutları",
             "commands": {
                 "/model <ad>": ("Modeli değiştirir.", "Örnek: /model qwen2.5:7b"),
-                "/models": ("Kullanılabilir modelleri listeler.", ""),
+                "/models": ("Kullanılabilir modelleri boyut ve parametre bilgisiyle listeler.", "Örnek: /models refresh (kataloğu yeniler)"),
                 "/system <prompt>": ("Sistem promptunu değiştirir.", "Örnek: /system Sen bir Python uzmanısın."),
                 "/install <model>": ("Model yükler.", "Örnek: /install llama2:7b"),
+                "/cache stats|clear": ("Yanıt önbelleği istatistiklerini gösterir / temizler.", "Örnek: /cache stats"),
+                "/cache on|off": ("Temperature 0 dışındaki istekler için önbelleği açar/kapatır.", ""),
+                "/cache semantic on|off|answer|draft|clear": ("Benzer sorular için anlamsal önbelleği yönetir (web sohbeti).", "Örnek: /cache semantic draft"),
+                "/resident": ("Bellekte yüklü modelleri ve kalan sürelerini gösterir.", ""),
+                "/resident pin|unpin [model]": ("Modeli süresiz bellekte tutar / normal süreye döndürür.", "Örnek: /resident pin qwen2.5:7b"),
+                "/resident load|unload [model]": ("Modeli hemen belleğe yükler / bellekten çıkarır.", ""),
             }
         },
         "context": {
@@ -1773,9 +2069,16 @@ def show_advanced_help(*args):
                 "/context off": ("Context-aware modu kapatır.", ""),
                 "/context file <dosya>": ("Context dosyasını ayarlar.", "Örnek: /context file main.py"),
                 "/context clear": ("Context dosyasını temizler.", ""),
+                "/context prefix on|off": ("Sabit proje bağlamını KV önbelleğiyle yeniden kullanmayı açar/kapatır.", ""),
+                "/context diff on|off": ("Düzenlenen context dosyası için tamamı yerine yalnızca değişen satırları göndermeyi açar/kapatır.", ""),
                 "/context project": ("Proje context'ini gösterir.", ""),
-                "/context analyze <dosya>": ("Dosya kod analizi yapar.", "Örnek: /context analyze app.py"),
-                "/find <pattern>": ("Akıllı dosya arama yapar.", "Örnek: /find main.py"),
+                "/context report": ("Son istekte gönderilen bağlam parçalarını, token ve puanlarını gösterir.", ""),
+                "/context graph [dosya]": ("Dosyanın import ettiği ve onu import eden dosyaları gösterir.", "Örnek: /context graph llm_shell.py"),
+                "/context rag [soru]": ("Anlamsal kod indeksini tamamlar veya soruya en yakın parçaları gösterir.", "Örnek: /context rag token doğrulaması nerede"),
+                "/context summary [dosya]": ("Büyük dosyanın bağlamda kullanılan önbellekli model özetini gösterir.", "Örnek: /context summary llm_shell.py"),
+                "/context analyze <dosya|dizin>": ("Dosya veya dizin (paralel, önbellekli) kod analizi yapar.", "Örnek: /context analyze src/"),
+                "/find <pattern>": ("Dosya adlarında bulanık (fzf tarzı) arama yapar.", "Örnek: /find llmsh"),
+                "/where <sembol>": ("Fonksiyon/sınıfın tanımlandığı dosya ve satırı gösterir.", "Örnek: /where chat_loop"),
             }
         },
         "dosya": {
@@ -1790,8 +2093,8 @@ def show_advanced_help(*args):
                 "/cd <dizin>": ("Dizini değiştirir.", ""),
                 "/pwd": ("Mevcut dizini gösterir.", ""),
                 "/tree": ("Dosya ağacını gösterir.", ""),
-                "/search <pattern> <dosya>": ("Dosya içeriğinde arama yapar.", ""),
-                "/grep <regex> <dosya>": ("Regex ile arama yapar.", ""),
+                "/search <pattern> [yol]": ("Dosyada veya proje genelinde metin arar.", "Örnek: /search invoice src --page 2"),
+                "/grep <regex> [yol]": ("Regex ile satır araması yapar.", "Örnek: /grep def\\s+\\w+ src"),
                 "/diff <dosya1> <dosya2>": ("İki dosya arasındaki farkı gösterir.", ""),
                 "/stats <dosya>": ("Dosya istatistiklerini gösterir.", ""),
             }
@@ -1965,9 +2268,19 @@ def handle_advanced_commands(command: str, args: List[str]) -> bool:
     elif command == '/reset':
         global chat_history
         chat_history = []
+        conversation_manager.reset(CLI_SESSION)
         console.print("[green]✅ Sohbet geçmişi sıfırlandı[/green]")
         return True
         
+    elif command == '/cancel':
+        # Sohbet sırasında Ctrl+C aynı işi yapar; burada arka planda sürenler iptal edilir
+        cancelled = generation_manager.cancel()
+        if cancelled:
+            console.print(f"[yellow]⏹️ {cancelled} üretim iptal edildi[/yellow]")
+        else:
+            console.print("[dim]Süren üretim yok (yanıt sırasında Ctrl+C ile iptal edebilirsiniz)[/dim]")
+        return True
+        
     elif command == '/clear':
         os.system('clear' if os.name == 'posix' else 'cls')
         return True
@@ -2365,24 +2678,42 @@ def handle_model_commands(command: str, args: List[str]) -> bool:
             return True
             
         new_model = args[0]
-        if new_model in get_available_models():
+        if model_catalog.has(new_model):
             current_model = new_model
             console.print(f"[green]✅ Model değiştirildi: {current_model}[/green]")
+            # İlk sorgu soğuk yüklemeyi beklemesin
+            if not model_residency.is_loaded(new_model) and model_residency.preload([new_model]):
+                console.print(f"[dim]🔥 {new_model} arka planda belleğe yükleniyor...[/dim]")
         else:
             console.print(f"[red]❌ Model bulunamadı: {new_model}[/red]")
             console.print("[dim]Kullanılabilir modeller için /models yazın[/dim]")
         return True
         
     elif command == '/models':
-        available = get_available_models()
+        refresh = bool(args) and args[0] == 'refresh'
+        try:
+            available = model_catalog.models(refresh)
+        except OllamaError:
+            available = {}
         if available:
             table = Table(title="📋 Kullanılabilir Modeller")
             table.add_column("Model", style="cyan")
+            table.add_column("Boyut", style="yellow")
+            table.add_column("Parametre", style="magenta")
             table.add_column("Durum", style="green")
             
-            for model in available:
+            try:
+                loaded = model_residency.loaded()
+            except OllamaError:
+                loaded = {}
+            for model, info in available.items():
                 status = "✅ Aktif" if model == current_model else "📋 Kullanılabilir"
-                table.add_row(model, status)
+                if model in model_residency.pinned:
+                    status += " 📌"
+                elif model in loaded:
+                    status += " 🔥"
+                size = f"{info.size_gb:.1f} GB" if info.size else "-"
+                table.add_row(model, size, info.parameter_size or "-", status)
             
             console.print(table)
         else:
@@ -2402,6 +2733,7 @@ def handle_model_commands(command: str, args: List[str]) -> bool:
                 task = progress.add_task("Model yükleniyor...", total=None)
                 subprocess.run(["ollama", "pull", model_name], check=True)
                 progress.update(task, completed=True)
+            model_catalog.invalidate()
             
             console.print(f"[green]✅ Model başarıyla yüklendi: {model_name}[/green]")
         except Exception as e:
@@ -2450,8 +2782,12 @@ def handle_chat_commands(command: str, args: List[str]) -> bool:
         filename = args[0] if args else f"chat_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
         try:
+            data = {
+                'history': chat_history,
+                'conversation': conversation_manager.get(CLI_SESSION, system_prompt).to_dict()
+            }
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(chat_history, f, ensure_ascii=False, indent=2)
+                json.dump(data, f, ensure_ascii=False, indent=2)
             console.print(f"[green]✅ Sohbet geçmişi kaydedildi: {filename}[/green]")
         except Exception as e:
             console.print(f"[red]❌ Kaydetme hatası: {e}[/red]")
@@ -2465,8 +2801,17 @@ def handle_chat_commands(command: str, args: List[str]) -> bool:
         filename = args[0]
         try:
             with open(filename, 'r', encoding='utf-8') as f:
-                loaded_history = json.load(f)
-            chat_history = loaded_history
+                data = json.load(f)
+            
+            if isinstance(data, list):
+                # Eski biçim: yalnızca sohbet kayıtları
+                chat_history = data
+                conversation = Conversation.from_history(data, system_prompt)
+            else:
+                chat_history = data.get('history', [])
+                conversation = Conversation.from_dict(data.get('conversation', {}))
+                conversation.system_prompt = system_prompt
+            conversation_manager.set(CLI_SESSION, conversation)
             console.print(f"[green]✅ Sohbet geçmişi yüklendi: {filename}[/green]")
             console.print(f"[dim]{len(chat_history)} mesaj yüklendi[/dim]")
         except Exception as e:
@@ -2597,9 +2942,13 @@ def handle_multi_model_commands(command: str, args: List[str]) -> bool:
         if result.error:
             console.print(f"[red]❌ Hata: {result.error}[/red]")
         else:
+            subtitle = None
+            if result.tokens_per_second:
+                subtitle = f"İlk token {result.ttft:.2f}s · {result.tokens_per_second:.1f} token/s"
             console.print(Panel(
                 result.response,
                 title=f"🤖 {alias} ({result.model_name}) - {result.response_time:.2f}s",
+                subtitle=subtitle,
                 border_style="blue"
             ))
         return True
@@ -2619,6 +2968,127 @@ def handle_multi_model_commands(command: str, args: List[str]) -> bool:
         
     return False
 
+def handle_cache_commands(command: str, args: List[str]) -> bool:
+    """Yanıt önbelleği komutlarını işler"""
+    if command != '/cache':
+        return False
+        
+    subcommand = args[0].lower() if args else 'stats'
+    
+    if subcommand == 'stats':
+        stats = response_cache.stats()
+        table = Table(title="🗄️ Yanıt Önbelleği")
+        table.add_column("Metrik", style="cyan")
+        table.add_column("Değer", style="yellow")
+        
+        table.add_row("Durum", "Açık" if stats['enabled'] else "Kapalı")
+        table.add_row("Kapsam", "Tüm istekler" if stats['cache_nondeterministic'] else "Sadece temperature 0")
+        table.add_row("Bellekteki Kayıt", str(stats['memory_entries']))
+        table.add_row("Diskteki Kayıt", str(stats['disk_entries']))
+        table.add_row("İsabet / Iska", f"{stats['hits']} / {stats['misses']}")
+        table.add_row("İsabet Oranı", f"{stats['hit_rate']:.0%}")
+        table.add_row("Birleştirilen İstek", str(request_coalescer.coalesced))
+        semantic = semantic_cache.stats()
+        table.add_row("Anlamsal Önbellek", f"{'Açık' if semantic['enabled'] else 'Kapalı'} ({semantic['mode']})")
+        table.add_row("Anlamsal Kayıt / İsabet", f"{semantic['entries']} / {semantic['hits']}")
+        
+        for alias, metrics in multi_model_manager.performance_metrics.items():
+            table.add_row(f"İsabet ({alias})", str(metrics.get('cache_hits', 0)))
+        
+        console.print(table)
+        
+    elif subcommand == 'clear':
+        response_cache.clear()
+        console.print("[green]✅ Yanıt önbelleği temizlendi[/green]")
+        
+    elif subcommand in ['on', 'off']:
+        # Sıcaklıktan bağımsız önbelleklemeyi aç/kapat
+        config.RESPONSE_CACHE_CONFIG["cache_nondeterministic"] = subcommand == 'on'
+        state = "tüm istekler için açıldı" if subcommand == 'on' else "sadece temperature 0 isteklerine sınırlandı"
+        console.print(f"[green]✅ Önbellek {state}[/green]")
+        
+    elif subcommand == 'semantic':
+        # Benzer sorular için gömme tabanlı önbellek
+        action = args[1].lower() if len(args) > 1 else ''
+        if action in ['on', 'off']:
+            if action == 'on' and not semantic_cache.stats()['available']:
+                console.print("[red]❌ Anlamsal önbellek için numpy gerekli[/red]")
+                console.print("Kurulum: pip install numpy")
+                return True
+            config.SEMANTIC_CACHE_CONFIG["enabled"] = action == 'on'
+            console.print(f"[green]✅ Anlamsal önbellek {'açıldı' if action == 'on' else 'kapatıldı'}[/green]")
+        elif action in ['answer', 'draft']:
+            config.SEMANTIC_CACHE_CONFIG["mode"] = action
+            mode = "yanıt olarak döndürülecek" if action == 'answer' else "modele taslak olarak verilecek"
+            console.print(f"[green]✅ Benzer sorunun yanıtı {mode}[/green]")
+        elif action == 'clear':
+            semantic_cache.clear()
+            console.print("[green]✅ Anlamsal önbellek temizlendi[/green]")
+        else:
+            console.print("[red]Kullanım: /cache semantic on|off|answer|draft|clear[/red]")
+        
+    else:
+        console.print("[red]Kullanım: /cache stats|clear|on|off|semantic[/red]")
+    return True
+
+def handle_residency_commands(command: str, args: List[str]) -> bool:
+    """Model bellek (ön yükleme/sabitleme) komutlarını işler"""
+    if command != '/resident':
+        return False
+        
+    subcommand = args[0].lower() if args else 'list'
+    model = args[1] if len(args) > 1 else current_model
+    
+    if subcommand == 'list':
+        try:
+            loaded = model_residency.loaded(refresh=True)
+        except OllamaError as e:
+            console.print(f"[red]❌ Yüklü modeller alınamadı: {e}[/red]")
+            return True
+        table = Table(title="🔥 Bellekteki Modeller")
+        table.add_column("Model", style="cyan")
+        table.add_column("Bellek", style="yellow")
+        table.add_column("Bitiş", style="magenta")
+        table.add_column("Durum", style="green")
+        
+        for name, info in loaded.items():
+            status = "📌 Sabit" if name in model_residency.pinned else "⏳ Süreli"
+            expires = "-" if name in model_residency.pinned else (info.expires_at[:19] or "-")
+            table.add_row(name, f"{info.size_gb:.1f} GB", expires, status)
+        
+        console.print(table)
+        budget = config.RESIDENCY_CONFIG["memory_budget_gb"]
+        console.print(f"[dim]Bellek bütçesi: {f'{budget} GB' if budget else 'Sınırsız'}[/dim]")
+        
+    elif subcommand == 'pin':
+        if model_residency.pin(model):
+            console.print(f"[green]📌 {model} bellekte sabitlendi[/green]")
+        else:
+            console.print(f"[red]❌ {model} sabitlenemedi (bellek bütçesi veya bağlantı)[/red]")
+            
+    elif subcommand == 'unpin':
+        model_residency.unpin(model)
+        console.print(f"[green]✅ {model} sabitlemesi kaldırıldı[/green]")
+        
+    elif subcommand == 'load':
+        with console.status(f"[yellow]🔄 {model} belleğe yükleniyor...[/yellow]"):
+            loaded = model_residency.load(model)
+        if loaded:
+            console.print(f"[green]🔥 {model} bellekte[/green]")
+        else:
+            console.print(f"[red]❌ {model} yüklenemedi (bellek bütçesi veya bağlantı)[/red]")
+            
+    elif subcommand == 'unload':
+        model_residency.pinned.discard(model)
+        if model_residency.unload(model):
+            console.print(f"[green]✅ {model} bellekten çıkarıldı[/green]")
+        else:
+            console.print(f"[red]❌ {model} bellekten çıkarılamadı[/red]")
+            
+    else:
+        console.print("[red]Kullanım: /resident list|pin|unpin|load|unload [model][/red]")
+    return True
+
 def chat_loop():
     """Ana sohbet döngüsü"""
     global chat_history, current_model, system_prompt
@@ -2635,6 +3105,13 @@ def chat_loop():
     console.print(f"[dim]Context-aware mod: {'Açık' if context_enabled else 'Kapalı'}[/dim]")
     console.print(f"[dim]Yardım için /help yazın[/dim]\n")
     
+    # Sık kullanılan modelleri arka planda belleğe yükle (soğuk yükleme beklemesin)
+    preloading = model_residency.warm_up(
+        current_model, multi_model_manager.active_models.values(), user_settings.stats.models_used
+    )
+    if preloading:
+        console.print(f"[dim]🔥 Arka planda yükleniyor: {', '.join(preloading)}[/dim]\n")
+    
     while True:
         try:
             # Gelişmiş prompt ile kullanıcı girişi
@@ -2656,48 +3133,96 @@ def chat_loop():
                         console.print(f"[cyan]Context durumu: {'Açık' if context_enabled else 'Kapalı'}[/cyan]")
                         if current_file:
                             console.print(f"[cyan]Mevcut dosya: {current_file}[/cyan]")
-                        return True
+                        console.print(f"[cyan]Önek önbelleği: {'Açık' if config.PREFIX_CACHE_CONFIG['enabled'] else 'Kapalı'}[/cyan]")
+                        console.print(f"[cyan]Dosya farkları: {'Açık' if config.CONTEXT_DIFF_CONFIG['enabled'] else 'Kapalı'}[/cyan]")
+                        continue
+                    elif args[0] == 'prefix' and len(args) > 1 and args[1] in ['on', 'off']:
+                        config.PREFIX_CACHE_CONFIG["enabled"] = args[1] == 'on'
+                        state = "açıldı" if args[1] == 'on' else "kapatıldı"
+                        console.print(f"[green]✅ Bağlam öneki önbelleği {state}[/green]")
+                        continue
+                    elif args[0] == 'diff' and len(args) > 1 and args[1] in ['on', 'off']:
+                        config.CONTEXT_DIFF_CONFIG["enabled"] = args[1] == 'on'
+                        state = "açıldı" if args[1] == 'on' else "kapatıldı"
+                        console.print(f"[green]✅ Düzenlenen dosya için fark gönderimi {state}[/green]")
+                        continue
                     elif args[0] == 'on':
                         context_enabled = True
                         console.print("[green]✅ Context-aware mod açıldı[/green]")
-                        return True
+                        continue
                     elif args[0] == 'off':
                         context_enabled = False
                         console.print("[yellow]⚠️ Context-aware mod kapatıldı[/yellow]")
-                        return True
+                        continue
                     elif args[0] == 'file' and len(args) > 1:
                         file_path = args[1]
                         if os.path.exists(file_path):
                             current_file = file_path
                             console.print(f"[green]✅ Context dosyası ayarlandı: {file_path}[/green]")
-                            console.print(Panel(get_file_context(file_path, 20), title="📄 Dosya Context'i", border_style="blue"))
+                            console.print(Panel(get_file_context(file_path, 20, summarize=False), title="📄 Dosya Context'i", border_style="blue"))
                         else:
                             console.print(f"[red]❌ Dosya bulunamadı: {file_path}[/red]")
-                        return True
+                        continue
                     elif args[0] == 'clear':
                         current_file = None
                         console.print("[green]✅ Context dosyası temizlendi[/green]")
-                        return True
+                        continue
                     elif args[0] == 'project':
                         console.print(Panel(get_project_context(), title="📁 Proje Context'i", border_style="blue"))
-                        return True
+                        continue
+                    elif args[0] == 'report':
+                        show_context_report()
+                        continue
+                    elif args[0] == 'rag':
+                        show_retrieval(' '.join(args[1:]) or None)
+                        continue
+                    elif args[0] == 'graph':
+                        file_path = args[1] if len(args) > 1 else current_file
+                        if not file_path:
+                            console.print("[red]Kullanım: /context graph <dosya> (veya önce /context file)[/red]")
+                        elif os.path.exists(file_path):
+                            show_import_graph(file_path)
+                        else:
+                            console.print(f"[red]❌ Dosya bulunamadı: {file_path}[/red]")
+                        continue
+                    elif args[0] == 'summary':
+                        file_path = args[1] if len(args) > 1 else current_file
+                        if not file_path:
+                            console.print("[red]Kullanım: /context summary <dosya> (veya önce /context file)[/red]")
+                        elif os.path.isfile(file_path):
+                            show_file_summary(file_path)
+                        else:
+                            console.print(f"[red]❌ Dosya bulunamadı: {file_path}[/red]")
+                        continue
                     elif args[0] == 'analyze' and len(args) > 1:
                         file_path = args[1]
-                        if os.path.exists(file_path):
+                        if os.path.isdir(file_path):
+                            show_directory_analysis(file_path)
+                        elif os.path.exists(file_path):
                             console.print(Panel(analyze_code_structure(file_path), title="🔍 Kod Analizi", border_style="green"))
                         else:
                             console.print(f"[red]❌ Dosya bulunamadı: {file_path}[/red]")
-                        return True
+                        continue
                 
                 # Akıllı dosya navigasyonu
                 elif command == '/find':
                     if not args:
                         console.print("[red]Kullanım: /find <dosya_adı_veya_pattern>[/red]")
-                        return True
+                        continue
                     query = ' '.join(args)
+                    if show_file_matches(query):
+                        continue
                     result = smart_file_navigation(query)
                     console.print(Panel(result, title="🔍 Dosya Arama", border_style="blue"))
-                    return True
+                    continue
+                
+                # Sembol tanımı arama
+                elif command == '/where':
+                    if not args:
+                        console.print("[red]Kullanım: /where <sembol_adı>[/red]")
+                        continue
+                    show_definitions(args[0])
+                    continue
                 
                 # Komut işleme
                 if handle_advanced_commands(command, args):
@@ -2716,6 +3241,10 @@ def chat_loop():
                     continue
                 elif handle_advanced_code_commands(command, args):
                     continue
+                elif handle_cache_commands(command, args):
+                    continue
+                elif handle_residency_commands(command, args):
+                    continue
                 elif command in ['/exit', '/quit']:
                     console.print("[yellow]👋 Görüşürüz![/yellow]")
                     break
@@ -2725,27 +3254,84 @@ def chat_loop():
                     continue
             
             # LLM sorgusu
-            console.print(f"[dim]🔄 {current_model} düşünüyor...[/dim]")
+            stream = config.get_setting("stream")
+            if not stream:
+                console.print(f"[dim]🔄 {current_model} düşünüyor...[/dim]")
             
             try:
                 # Context-aware prompt oluştur
-                if context_enabled:
-                    enhanced_prompt = create_context_aware_prompt(user_input, current_file, include_project=True)
+                context_prefix = None
+                keep_alive = None
+                if context_enabled and config.PREFIX_CACHE_CONFIG["enabled"]:
+                    # Sabit bağlam sistem mesajında önek olarak gider; yalnızca soru değişir
+                    context_prefix = create_context_prefix(current_file, include_project=True, model=current_model)
+                    keep_alive = config.PREFIX_CACHE_CONFIG["keep_alive"]
+                    enhanced_prompt = create_relevant_context(user_input, current_file, model=current_model)
+                    if _context_prefix_cache["delta"]:
+                        console.print(f"[dim]🩹 Fark: {_context_prefix_cache['delta'].summary()}[/dim]")
+                elif context_enabled:
+                    enhanced_prompt = create_context_aware_prompt(user_input, current_file, include_project=True,
+                                                                  model=current_model)
                 else:
                     enhanced_prompt = user_input
+                if context_enabled and config.CONTEXT_PACKER_CONFIG["enabled"] and "soru" in context_packer.last:
+                    console.print(f"[dim]📦 Bağlam: {context_packer.last['soru'].summary()}[/dim]")
+                
+                # Önceki turları token bütçesine sığacak şekilde ekle
+                conversation = conversation_manager.get(CLI_SESSION, system_prompt)
+                messages, options = conversation.build_messages(current_model, enhanced_prompt, context_prefix)
                 
-                response = query_ollama(enhanced_prompt, current_model, system_prompt)
+                generation_stats: Dict[str, Any] = {}
+                generation = generation_manager.start(CLI_SESSION, current_model)
+                try:
+                    if stream:
+                        # Token'lar geldikçe göster, sonra kod bloklarını işle
+                        chunks = stream_chat(messages, current_model, options, keep_alive, generation_stats,
+                                             CLI_SESSION, generation)
+                        try:
+                            response = render_stream(chunks, title=f"🤖 {current_model}")
+                        except KeyboardInterrupt:
+                            # Ctrl+C yalnızca üretimi durdurur; bağlantı kapanır, gelen kısım korunur
+                            generation.cancel()
+                            chunks.close()
+                            response = generation.text
+                        if response and not generation.cancelled:
+                            enhance_llm_response(response)
+                    else:
+                        try:
+                            response = query_chat(messages, current_model, options, keep_alive,
+                                                  generation_stats, CLI_SESSION)
+                        except KeyboardInterrupt:
+                            generation.cancel()
+                            response = ""
+                finally:
+                    generation_manager.finish(generation)
+                
+                if generation.cancelled:
+                    kept = f", {len(response)} karakter korundu" if response else ""
+                    console.print(f"[yellow]⏹️ Üretim iptal edildi{kept}[/yellow]")
                 
                 if response:
-                    # Yanıtı geliştir
-                    enhanced_response = enhance_llm_response(response)
+                    # Geçmişte bağlam eklenmemiş soru tutulur; bağlam her turda yeniden eklenir
+                    conversation.add_exchange(user_input, response)
+                    
+                    if not stream:
+                        # Yanıtı geliştir
+                        enhanced_response = enhance_llm_response(response)
+                        
+                        # Yanıtı göster
+                        console.print(Panel(
+                            Markdown(enhanced_response),
+                            title=f"🤖 {current_model}",
+                            border_style="green"
+                        ))
                     
-                    # Yanıtı göster
-                    console.print(Panel(
-                        Markdown(enhanced_response),
-                        title=f"🤖 {current_model}",
-                        border_style="green"
-                    ))
+                    stats_line = format_generation_stats(generation_stats)
+                    if stats_line:
+                        console.print(f"[dim]⏱️  {stats_line}[/dim]")
+                    
+                    # İstatistik kaydet
+                    user_settings.record_query(current_model)
                     
                     # Geçmişe ekle
                     if config.SAVE_HISTORY:
@@ -2757,7 +3343,7 @@ def chat_loop():
                             'context_file': current_file
                         })
                         
-                else:
+                elif not generation.cancelled:
                     console.print("[red]❌ Yanıt alınamadı[/red]")
                     
             except Exception as e:
@@ -2777,16 +3363,7 @@ def chat_loop():
 def query_ollama(prompt: str, model: str, system_prompt: str = None) -> str:
     """Ollama API'si ile LLM sorgusu yapar"""
     try:
-        url = f"http://localhost:11434/api/generate"
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "system": system_prompt or "Sen yardımcı bir AI asistanısın.",
-            "stream": False
-        }
-        response = requests.post(url, json=payload, timeout=120)
-        response.raise_for_status()
-        data = response.json()
+        data = ollama_client.generate(model, prompt, system=system_prompt or "Sen yardımcı bir AI asistanısın.")
         return data.get("response") or data.get("message") or ""
     except Exception as e:
         raise RuntimeError(f"Ollama API hatası: {e}")
@@ -0,0 +1,161 @@
+"""
+CortexCLI Model Kataloğu
+Ollama model listesini ve ayrıntılarını TTL ile önbelleğe alan katalog
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
+
+import config
+from ollama_client import ollama_client, OllamaError
+
+
+@dataclass
+class ModelInfo:
+    """Yüklü bir modelin katalog bilgisi"""
+    name: str
+    digest: str = ""
+    size: int = 0
+    modified_at: str = ""
+    family: str = ""
+    parameter_size: str = ""
+    quantization_level: str = ""
+    context_length: Optional[int] = None
+    details_loaded: bool = False
+    raw_details: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def size_gb(self) -> float:
+        """Disk boyutu (GB)"""
+        return self.size / (1024 ** 3)
+
+
+class ModelCatalog:
+    """/api/tags ve /api/show sonuçlarını TTL ile önbelleğe alan model kataloğu"""
+
+    def __init__(self, ttl: Optional[float] = None, health_ttl: Optional[float] = None):
+        catalog_config = config.MODEL_CATALOG_CONFIG
+        self.ttl = ttl if ttl is not None else catalog_config["ttl"]
+        self.health_ttl = health_ttl if health_ttl is not None else catalog_config["health_ttl"]
+
+        self._models: Dict[str, ModelInfo] = {}
+        self._fetched_at = 0.0
+        self._health: Optional[bool] = None
+        self._health_checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return bool(self._fetched_at) and time.time() - self._fetched_at < self.ttl
+
+    def refresh(self) -> Dict[str, ModelInfo]:
+        """Model listesini Ollama'dan yeniden çeker"""
+        models = ollama_client.list_models()
+        with self._lock:
+            previous = self._models
+            catalog = {}
+            for model in models:
+                name = model["name"]
+                details = model.get("details") or {}
+                info = ModelInfo(
+                    name=name,
+                    digest=model.get("digest", ""),
+                    size=model.get("size", 0),
+                    modified_at=model.get("modified_at", ""),
+                    family=details.get("family", ""),
+                    parameter_size=details.get("parameter_size", ""),
+                    quantization_level=details.get("quantization_level", "")
+                )
+                # Özeti değişmeyen modellerin /api/show ayrıntılarını koru
+                old = previous.get(name)
+                if old and old.details_loaded and old.digest == info.digest:
+                    info.context_length = old.context_length
+                    info.raw_details = old.raw_details
+                    info.details_loaded = True
+                catalog[name] = info
+
+            self._models = catalog
+            self._fetched_at = time.time()
+            # Başarılı liste isteği servisin ayakta olduğunu da gösterir
+            self._health = True
+            self._health_checked_at = self._fetched_at
+            return dict(catalog)
+
+    def invalidate(self) -> None:
+        """Katalog önbelleğini geçersiz kılar (ör. model yükleme sonrası)"""
+        with self._lock:
+            self._fetched_at = 0.0
+            self._health = None
+
+    def models(self, refresh: bool = False) -> Dict[str, ModelInfo]:
+        """Model adı -> ModelInfo sözlüğü; TTL dolmadıkça ağ isteği yapılmaz"""
+        if refresh or not self._is_fresh():
+            return self.refresh()
+        with self._lock:
+            return dict(self._models)
+
+    def names(self, refresh: bool = False) -> List[str]:
+        """Yüklü model adlarını döndürür"""
+        return list(self.models(refresh))
+
+    def has(self, name: str) -> bool:
+        """Model yüklü mü? Bilinmeyen model için katalog bir kez tazelenir"""
+        if name in self.models():
+            return True
+        return name in self.models(refresh=True)
+
+    def get(self, name: str, with_details: bool = False) -> Optional[ModelInfo]:
+        """Model bilgisini döndürür; istenirse /api/show ayrıntılarını yükler"""
+        info = self.models().get(name)
+        if info and with_details and not info.details_loaded:
+            self._load_details(info)
+        return info
+
+    def _load_details(self, info: ModelInfo) -> None:
+        """/api/show ile bağlam uzunluğu gibi ayrıntıları doldurur"""
+        data = ollama_client.show_model(info.name)
+        details = data.get("details") or {}
+        model_info = data.get("model_info") or {}
+
+        context_length = None
+        for key, value in model_info.items():
+            if key.endswith(".context_length"):
+                context_length = int(value)
+                break
+
+        with self._lock:
+            info.family = details.get("family", info.family)
+            info.parameter_size = details.get("parameter_size", info.parameter_size)
+            info.quantization_level = details.get("quantization_level", info.quantization_level)
+            info.context_length = context_length
+            info.raw_details = details
+            info.details_loaded = True
+
+    def context_length(self, name: str) -> Optional[int]:
+        """Modelin bağlam penceresi uzunluğunu döndürür (bilinmiyorsa None)"""
+        try:
+            info = self.get(name, with_details=True)
+        except OllamaError:
+            return None
+        return info.context_length if info else None
+
+    def is_healthy(self, force: bool = False) -> bool:
+        """Ollama servisinin ayakta olup olmadığını hafif bir HTTP isteğiyle kontrol eder"""
+        if not force and self._health is not None and time.time() - self._health_checked_at < self.health_ttl:
+            return self._health
+
+        try:
+            ollama_client.version(timeout=config.MODEL_CATALOG_CONFIG["probe_timeout"])
+            healthy = True
+        except OllamaError:
+            healthy = False
+
+        with self._lock:
+            self._health = healthy
+            self._health_checked_at = time.time()
+        return healthy
+
+
+# Global model kataloğu
+model_catalog = ModelCatalog()
@@ -0,0 +1,223 @@
+"""
+CortexCLI Model Bellek Yönetimi
+/api/ps ile yüklü modelleri izler; ön yükleme, keep_alive sabitleme ve bellek bütçesiyle boşaltma
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Iterable
+
+import config
+from ollama_client import OllamaClient, OllamaError, ollama_client, set_keep_alive_policy
+from model_catalog import model_catalog
+
+PIN_KEEP_ALIVE = -1  # Ollama'da süresiz bellekte tutma
+
+
+@dataclass
+class LoadedModel:
+    """Bellekte yüklü bir model (/api/ps kaydı)"""
+    name: str
+    size: int = 0
+    size_vram: int = 0
+    expires_at: str = ""
+
+    @property
+    def size_gb(self) -> float:
+        """Bellekte kapladığı alan (GB)"""
+        return self.size / (1024 ** 3)
+
+
+class ResidencyManager:
+    """Modelleri soğuk yükleme beklemeden kullanılabilir tutan bellek yöneticisi"""
+
+    def __init__(self, client: Optional[OllamaClient] = None):
+        self.client = client or ollama_client
+        self.pinned: set = set()
+        self._last_used: Dict[str, float] = {}
+        self._loaded: Dict[str, LoadedModel] = {}
+        self._loaded_at = 0.0
+        self._preloading: List[str] = []
+        self._lock = threading.Lock()
+
+    def loaded(self, refresh: bool = False) -> Dict[str, LoadedModel]:
+        """Model adı -> LoadedModel; ps_ttl dolmadıkça ağ isteği yapılmaz"""
+        if refresh or time.time() - self._loaded_at > config.RESIDENCY_CONFIG["ps_ttl"]:
+            models = self.client.running_models()
+            with self._lock:
+                self._loaded = {
+                    model["name"]: LoadedModel(
+                        name=model["name"],
+                        size=model.get("size", 0),
+                        size_vram=model.get("size_vram", 0),
+                        expires_at=model.get("expires_at", "")
+                    )
+                    for model in models
+                }
+                self._loaded_at = time.time()
+        with self._lock:
+            return dict(self._loaded)
+
+    def is_loaded(self, model: str) -> bool:
+        """Model şu anda bellekte mi?"""
+        try:
+            return model in self.loaded()
+        except OllamaError:
+            return False
+
+    def keep_alive(self, model: str, requested: Any = None) -> Any:
+        """İstekte gönderilecek keep_alive; sabitlenmiş modeller süresiz tutulur"""
+        self._last_used[model] = time.time()
+        if model in self.pinned:
+            return PIN_KEEP_ALIVE
+        return requested if requested is not None else config.RESIDENCY_CONFIG["keep_alive"]
+
+    def estimate_size(self, model: str) -> int:
+        """Modelin bellekte kaplayacağı alan (yüklüyse gerçek, değilse disk boyutu)"""
+        loaded = self._loaded.get(model)
+        if loaded:
+            return loaded.size
+        info = model_catalog.models().get(model)
+        return info.size if info else 0
+
+    def _make_room(self, model: str) -> bool:
+        """Bütçe aşılacaksa en uzun süredir kullanılmayan sabitlenmemiş modelleri boşaltır"""
+        budget_gb = config.RESIDENCY_CONFIG["memory_budget_gb"]
+        if budget_gb is None:
+            return True
+
+        loaded = self.loaded(refresh=True)
+        if model in loaded:
+            return True
+        budget = budget_gb * 1024 ** 3
+        used = sum(info.size for info in loaded.values())
+        needed = self.estimate_size(model)
+
+        # Önce plan: bütçe ancak sabitlenmiş modeller boşaltılarak açılıyorsa hiçbir şeyi boşaltma
+        evict = []
+        candidates = sorted((name for name in loaded if name not in self.pinned),
+                            key=lambda name: self._last_used.get(name, 0.0))
+        for name in candidates:
+            if used + needed <= budget:
+                break
+            evict.append(name)
+            used -= loaded[name].size
+        if used + needed > budget:
+            return False
+
+        for name in evict:
+            self.unload(name)
+        return True
+
+    def fits(self, model: str) -> bool:
+        """Model hiçbir modeli boşaltmadan bütçeye sığıyor mu? (arka plan işleri sohbet modelini boşaltmasın)"""
+        budget_gb = config.RESIDENCY_CONFIG["memory_budget_gb"]
+        if budget_gb is None:
+            return True
+        try:
+            loaded = self.loaded(refresh=True)
+            if model in loaded:
+                return True
+            used = sum(info.size for info in loaded.values())
+            return used + self.estimate_size(model) <= budget_gb * 1024 ** 3
+        except OllamaError:
+            return False
+
+    def load(self, model: str) -> bool:
+        """Modeli belleğe yükler (yüklüyse keep_alive süresini yeniler)"""
+        try:
+            if not self._make_room(model):
+                return False
+            self.client.load_model(model, self.keep_alive(model))
+        except OllamaError:
+            return False
+        self._loaded_at = 0.0
+        return True
+
+    def unload(self, model: str) -> bool:
+        """Modeli bellekten çıkarır"""
+        try:
+            self.client.load_model(model, 0)
+        except OllamaError:
+            return False
+        self._loaded_at = 0.0
+        return True
+
+    def pin(self, model: str) -> bool:
+        """Modeli süresiz bellekte tutar; bütçeye sığmazsa sabitlemez"""
+        self.pinned.add(model)
+        if not self.load(model):
+            self.pinned.discard(model)
+            return False
+        return True
+
+    def unpin(self, model: str) -> None:
+        """Sabitlemeyi kaldırır; model normal keep_alive süresine döner"""
+        self.pinned.discard(model)
+        if self.is_loaded(model):
+            self.load(model)
+
+    def predict_next(self, usage: Dict[str, int], exclude: Iterable[str] = ()) -> List[str]:
+        """Kullanım sayılarına göre sıradaki olası modelleri döndürür (yüklü olmayanlar)"""
+        exclude = set(exclude)
+        try:
+            installed = set(model_catalog.names())
+        except OllamaError:
+            return []
+        ranked = sorted(usage.items(), key=lambda item: item[1], reverse=True)
+        candidates = [model for model, _ in ranked if model in installed and model not in exclude]
+        return candidates[:config.RESIDENCY_CONFIG["predict_count"]]
+
+    def preload(self, models: Iterable[str]) -> List[str]:
+        """Modelleri arka planda sırayla yükler; kuyruğa alınan modelleri döndürür"""
+        with self._lock:
+            queued = []
+            for model in models:
+                if model and model not in queued and model not in self._preloading:
+                    queued.append(model)
+            self._preloading.extend(queued)
+        if queued:
+            thread = threading.Thread(target=self._preload_worker, args=(queued,), daemon=True)
+            thread.start()
+        return queued
+
+    def _preload_worker(self, models: List[str]) -> None:
+        # Modeller sırayla yüklenir; aynı anda yüklemek bellek ve disk için daha yavaştır
+        for model in models:
+            try:
+                if not self.is_loaded(model):
+                    self.load(model)
+            finally:
+                with self._lock:
+                    self._preloading.remove(model)
+
+    def warm_up(self, default_model: str, active_models: Iterable[str],
+                usage: Optional[Dict[str, int]] = None) -> List[str]:
+        """Başlangıçta çağrılır: keep_alive politikasını kurar, sık kullanılan modelleri ısıtır"""
+        set_keep_alive_policy(self.keep_alive)
+        if not config.RESIDENCY_CONFIG["preload"]:
+            return []
+        models = [default_model, *active_models]
+        models += self.predict_next(usage or {}, exclude=models)
+        return self.preload(models)
+
+    def stats(self) -> Dict[str, Any]:
+        """Yüklü, sabitlenmiş ve yüklenmekte olan modeller"""
+        try:
+            loaded = self.loaded()
+        except OllamaError:
+            loaded = {}
+        with self._lock:
+            preloading = list(self._preloading)
+        return {
+            'loaded': {name: {'size': info.size, 'expires_at': info.expires_at,
+                              'pinned': name in self.pinned} for name, info in loaded.items()},
+            'pinned': sorted(self.pinned),
+            'preloading': preloading,
+            'memory_budget_gb': config.RESIDENCY_CONFIG["memory_budget_gb"]
+        }
+
+
+# Global model bellek yöneticisi
+model_residency = ResidencyManager()
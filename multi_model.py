@@ -4,7 +4,6 @@ Aynı anda birden fazla modelle sohbet ve karşılaştırma özellikleri
 """
 
 import asyncio
-import threading
 import time
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
@@ -13,9 +12,19 @@ import json
 from rich.table import Table
 from rich.panel import Panel
 from rich.console import Console
+import config
+from ollama_client import ollama_client, GenerationMetrics
+from model_catalog import model_catalog
+from async_ollama_client import AsyncOllamaClient
 
 console = Console()
 
+def _format_seconds(value: Optional[float]) -> str:
+    """Saniye değerini tabloda gösterilecek biçime çevirir"""
+    if value is None:
+        return "N/A"
+    return f"{value * 1000:.0f}ms" if value < 1 else f"{value:.2f}s"
+
 @dataclass
 class ModelResponse:
     """Model yanıtı için veri yapısı"""
@@ -24,6 +33,13 @@ class ModelResponse:
     response_time: float
     token_count: Optional[int] = None
     error: Optional[str] = None
+    cached: bool = False
+    prompt_tokens: Optional[int] = None
+    load_time: Optional[float] = None
+    prompt_eval_time: Optional[float] = None
+    eval_time: Optional[float] = None
+    ttft: Optional[float] = None
+    tokens_per_second: Optional[float] = None
     timestamp: datetime = None
     
     def __post_init__(self):
@@ -43,10 +59,7 @@ class MultiModelManager:
         """Yeni model ekle"""
         try:
             # Model'in mevcut olup olmadığını kontrol et
-            from llm_shell import get_available_models
-            available_models = get_available_models()
-            
-            if model_name not in available_models:
+            if not model_catalog.has(model_name):
                 console.print(f"[red]❌ Model bulunamadı: {model_name}[/red]")
                 return False
                 
@@ -87,56 +100,108 @@ class MultiModelManager:
         start_time = time.time()
         
         try:
-            from llm_shell import query_ollama
-            response = query_ollama(prompt, model_name, system_prompt)
-            response_time = time.time() - start_time
-            
-            # Token sayısını tahmin et (yaklaşık)
-            token_count = len(response.split()) * 1.3  # Yaklaşık hesaplama
+            data = ollama_client.generate(model_name, prompt, system=system_prompt or "Sen yardımcı bir AI asistanısın.")
+            return self._record_response(alias, model_name, data, time.time() - start_time)
             
-            model_response = ModelResponse(
+        except Exception as e:
+            response_time = time.time() - start_time
+            return ModelResponse(
                 model_name=model_name,
-                response=response,
+                response="",
                 response_time=response_time,
-                token_count=int(token_count)
+                error=str(e)
             )
             
-            # Yanıtı kaydet
-            self.model_responses[alias].append(model_response)
-            
-            # Performans metriklerini güncelle
-            self._update_performance_metrics(alias, response_time, token_count)
+    async def query_single_model_async(self, client: AsyncOllamaClient, alias: str, prompt: str,
+                                       system_prompt: str = None) -> ModelResponse:
+        """Tek modelle asenkron sorgu yap"""
+        if alias not in self.active_models:
+            return ModelResponse(
+                model_name=alias,
+                response="",
+                response_time=0,
+                error=f"Model bulunamadı: {alias}"
+            )
             
-            return model_response
+        model_name = self.active_models[alias]
+        start_time = time.time()
+        
+        try:
+            data = await client.generate(model_name, prompt, system=system_prompt or "Sen yardımcı bir AI asistanısın.")
+            return self._record_response(alias, model_name, data, time.time() - start_time)
             
         except Exception as e:
-            response_time = time.time() - start_time
             return ModelResponse(
                 model_name=model_name,
                 response="",
-                response_time=response_time,
+                response_time=time.time() - start_time,
                 error=str(e)
             )
             
-    def query_all_models(self, prompt: str, system_prompt: str = None) -> Dict[str, ModelResponse]:
-        """Tüm aktif modellerle paralel sorgu yap"""
-        results = {}
-        threads = []
+    def _record_response(self, alias: str, model_name: str, data: Dict[str, Any],
+                         response_time: float) -> ModelResponse:
+        """Başarılı yanıtı Ollama'nın döndürdüğü metriklerle kaydet"""
+        cached = data.get("cached", False)
+        metrics = GenerationMetrics.from_response(data)
+        
+        model_response = ModelResponse(
+            model_name=model_name,
+            response=data.get("response", ""),
+            response_time=response_time,
+            token_count=metrics.completion_tokens,
+            cached=cached,
+            prompt_tokens=metrics.prompt_tokens
+        )
+        # Önbellekten gelen yanıtta süreler orijinal üretime aittir; bu çağrıya yazılmaz
+        if not cached:
+            model_response.load_time = metrics.load_time
+            model_response.prompt_eval_time = metrics.prompt_eval_time
+            model_response.eval_time = metrics.eval_time
+            model_response.ttft = metrics.ttft
+            model_response.tokens_per_second = metrics.tokens_per_second
+        
+        # Yanıtı kaydet
+        self.model_responses.setdefault(alias, []).append(model_response)
+        
+        # Performans metriklerini güncelle
+        self._update_performance_metrics(alias, model_response)
         
-        def query_model(alias):
-            results[alias] = self.query_single_model(alias, prompt, system_prompt)
+        return model_response
             
-        # Her model için ayrı thread başlat
-        for alias in self.active_models:
-            thread = threading.Thread(target=query_model, args=(alias,))
-            threads.append(thread)
-            thread.start()
+    async def query_all_models_async(self, prompt: str, system_prompt: str = None,
+                                      timeout: Optional[float] = None,
+                                      max_concurrency: Optional[int] = None) -> Dict[str, ModelResponse]:
+        """Tüm aktif modellerle eşzamanlı sorgu yap (model başına süre sınırı, sınırlı eşzamanlılık)"""
+        timeout = timeout or config.MULTI_MODEL_CONFIG["model_timeout"]
+        semaphore = asyncio.Semaphore(max_concurrency or config.MULTI_MODEL_CONFIG["max_concurrency"])
+        aliases = list(self.active_models)
+        
+        async with AsyncOllamaClient() as client:
+            async def query_model(alias: str) -> ModelResponse:
+                # Süre, sırada beklemeyi değil yalnızca modelin yanıt süresini kapsar
+                async with semaphore:
+                    try:
+                        return await asyncio.wait_for(
+                            self.query_single_model_async(client, alias, prompt, system_prompt),
+                            timeout
+                        )
+                    except asyncio.TimeoutError:
+                        return ModelResponse(
+                            model_name=self.active_models.get(alias, alias),
+                            response="",
+                            response_time=timeout,
+                            error=f"Zaman aşımı ({timeout:.0f}s)"
+                        )
             
-        # Tüm thread'lerin bitmesini bekle
-        for thread in threads:
-            thread.join()
+            # gather iptal edilirse tüm alt görevler de iptal edilir
+            responses = await asyncio.gather(*(query_model(alias) for alias in aliases))
             
-        return results
+        return dict(zip(aliases, responses))
+        
+    def query_all_models(self, prompt: str, system_prompt: str = None,
+                         timeout: Optional[float] = None) -> Dict[str, ModelResponse]:
+        """Tüm aktif modellerle paralel sorgu yap (CLI için senkron sarmalayıcı)"""
+        return asyncio.run(self.query_all_models_async(prompt, system_prompt, timeout=timeout))
         
     def compare_models(self, prompt: str, system_prompt: str = None) -> None:
         """Model karşılaştırması yap"""
@@ -152,19 +217,27 @@ class MultiModelManager:
         table = Table(title="🤖 Model Karşılaştırması")
         table.add_column("Model", style="cyan")
         table.add_column("Yanıt Süresi", style="green")
-        table.add_column("Token Sayısı", style="magenta")
+        table.add_column("İlk Token", style="green")
+        table.add_column("Token (Prompt/Yanıt)", style="magenta")
+        table.add_column("Token/s", style="magenta")
+        table.add_column("Yükleme", style="blue")
         table.add_column("Durum", style="yellow")
         
         for alias, result in results.items():
             if result.error:
                 status = f"❌ {result.error}"
+            elif result.cached:
+                status = "✅ Önbellekten"
             else:
                 status = "✅ Başarılı"
                 
             table.add_row(
                 f"{alias} ({result.model_name})",
                 f"{result.response_time:.2f}s",
-                str(result.token_count or "N/A"),
+                _format_seconds(result.ttft),
+                f"{result.prompt_tokens or 'N/A'} / {result.token_count or 'N/A'}",
+                f"{result.tokens_per_second:.1f}" if result.tokens_per_second else "N/A",
+                _format_seconds(result.load_time),
                 status
             )
             
@@ -188,42 +261,80 @@ class MultiModelManager:
         table = Table(title="📊 Model Performans Metrikleri")
         table.add_column("Model", style="cyan")
         table.add_column("Ortalama Süre", style="green")
+        table.add_column("Ort. İlk Token", style="green")
+        table.add_column("Token/s", style="magenta")
+        table.add_column("Ort. Yükleme", style="blue")
         table.add_column("Ortalama Token", style="magenta")
         table.add_column("Toplam Sorgu", style="yellow")
+        table.add_column("Önbellek İsabeti", style="blue")
         
         for alias, metrics in self.performance_metrics.items():
             avg_time = metrics.get('avg_response_time', 0)
             avg_tokens = metrics.get('avg_token_count', 0)
             total_queries = metrics.get('total_queries', 0)
+            cache_hits = metrics.get('cache_hits', 0)
+            measured = metrics.get('measured_queries', 0)
+            tokens_per_second = metrics.get('tokens_per_second', 0)
             
             table.add_row(
                 alias,
                 f"{avg_time:.2f}s",
+                _format_seconds(metrics.get('avg_ttft')) if measured else "N/A",
+                f"{tokens_per_second:.1f}" if tokens_per_second else "N/A",
+                _format_seconds(metrics.get('avg_load_time')) if measured else "N/A",
                 f"{avg_tokens:.0f}",
-                str(total_queries)
+                str(total_queries),
+                f"{cache_hits} ({cache_hits / total_queries:.0%})" if total_queries else "0"
             )
             
         console.print(table)
         
-    def _update_performance_metrics(self, alias: str, response_time: float, token_count: int) -> None:
+    def _update_performance_metrics(self, alias: str, result: ModelResponse) -> None:
         """Performans metriklerini güncelle"""
         if alias not in self.performance_metrics:
             self.performance_metrics[alias] = {
                 'total_response_time': 0,
                 'total_token_count': 0,
+                'total_prompt_tokens': 0,
                 'total_queries': 0,
+                'cache_hits': 0,
+                'measured_queries': 0,
+                'total_ttft': 0,
+                'total_load_time': 0,
+                'total_eval_tokens': 0,
+                'total_eval_time': 0,
                 'avg_response_time': 0,
-                'avg_token_count': 0
+                'avg_token_count': 0,
+                'avg_ttft': 0,
+                'avg_load_time': 0,
+                'tokens_per_second': 0
             }
             
         metrics = self.performance_metrics[alias]
-        metrics['total_response_time'] += response_time
-        metrics['total_token_count'] += token_count
+        metrics['total_response_time'] += result.response_time
+        metrics['total_token_count'] += result.token_count or 0
+        metrics['total_prompt_tokens'] += result.prompt_tokens or 0
         metrics['total_queries'] += 1
+        if result.cached:
+            metrics['cache_hits'] += 1
+        
+        # Sunucu süreleri yalnızca gerçekten üretilen (önbellekten gelmeyen) yanıtlar için
+        if result.ttft is not None:
+            metrics['measured_queries'] += 1
+            metrics['total_ttft'] += result.ttft
+            metrics['total_load_time'] += result.load_time or 0
+            if result.eval_time:
+                metrics['total_eval_tokens'] += result.token_count or 0
+                metrics['total_eval_time'] += result.eval_time
         
         # Ortalamaları hesapla
         metrics['avg_response_time'] = metrics['total_response_time'] / metrics['total_queries']
         metrics['avg_token_count'] = metrics['total_token_count'] / metrics['total_queries']
+        if metrics['measured_queries']:
+            metrics['avg_ttft'] = metrics['total_ttft'] / metrics['measured_queries']
+            metrics['avg_load_time'] = metrics['total_load_time'] / metrics['measured_queries']
+        if metrics['total_eval_time']:
+            metrics['tokens_per_second'] = metrics['total_eval_tokens'] / metrics['total_eval_time']
         
     def save_comparison(self, filename: str = None) -> None:
         """Karşılaştırma sonuçlarını kaydet"""
@@ -247,6 +358,10 @@ class MultiModelManager:
                     'response': last_response.response,
                     'response_time': last_response.response_time,
                     'token_count': last_response.token_count,
+                    'prompt_tokens': last_response.prompt_tokens,
+                    'ttft': last_response.ttft,
+                    'tokens_per_second': last_response.tokens_per_second,
+                    'load_time': last_response.load_time,
                     'timestamp': last_response.timestamp.isoformat()
                 }
                 
@@ -0,0 +1,489 @@
+"""
+CortexCLI Ollama İstemcisi
+Tüm LLM çağrıları için ortak, bağlantı havuzlu (keep-alive) HTTP istemcisi
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Iterator, Callable, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+
+import config
+from response_cache import response_cache
+from request_coalescer import request_coalescer, flight_key
+from ollama_router import OllamaRouter, Backend, ollama_router
+
+
+class OllamaError(RuntimeError):
+    """Ollama API hatası"""
+
+
+class OllamaTimeoutError(OllamaError):
+    """Ollama yanıtı zaman aşımına uğradı"""
+
+
+class OllamaConnectionError(OllamaError):
+    """Ollama servisine bağlanılamadı"""
+
+
+@dataclass
+class GenerationMetrics:
+    """Ollama'nın yanıtla döndürdüğü sayaç ve süreler (süreler saniye cinsinden)"""
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    load_time: float = 0.0
+    prompt_eval_time: float = 0.0
+    eval_time: float = 0.0
+    total_time: float = 0.0
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any]) -> "GenerationMetrics":
+        """done=True taşıyan yanıt gövdesinden metrikleri okur (nanosaniye -> saniye)"""
+        return cls(
+            prompt_tokens=data.get("prompt_eval_count"),
+            completion_tokens=data.get("eval_count"),
+            load_time=data.get("load_duration", 0) / 1e9,
+            prompt_eval_time=data.get("prompt_eval_duration", 0) / 1e9,
+            eval_time=data.get("eval_duration", 0) / 1e9,
+            total_time=data.get("total_duration", 0) / 1e9
+        )
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Sunucu tarafı ilk token süresi: model yükleme + prompt değerlendirme"""
+        if not self.total_time:
+            return None
+        return self.load_time + self.prompt_eval_time
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Üretim hızı (yanıt token'ı / saniye)"""
+        if not self.completion_tokens or not self.eval_time:
+            return None
+        return self.completion_tokens / self.eval_time
+
+    @property
+    def prompt_tokens_per_second(self) -> Optional[float]:
+        """Prompt değerlendirme hızı (token / saniye)"""
+        if not self.prompt_tokens or not self.prompt_eval_time:
+            return None
+        return self.prompt_tokens / self.prompt_eval_time
+
+
+# Model başına keep_alive değerini belirleyen kanca; model_residency tarafından kurulur
+_keep_alive_policy: Optional[Callable[[str, Any], Any]] = None
+
+
+def model_tag(model: str) -> str:
+    """Etiketsiz model adına Ollama'nın varsayılan etiketini ekler (qwen -> qwen:latest)"""
+    return model if ":" in model.rsplit("/", 1)[-1] else f"{model}:latest"
+
+
+def set_keep_alive_policy(policy: Optional[Callable[[str, Any], Any]]) -> None:
+    """policy(model, istenen_keep_alive) -> gönderilecek keep_alive (None: alan gönderilmez)"""
+    global _keep_alive_policy
+    _keep_alive_policy = policy
+
+
+def _apply_keep_alive(payload: Dict[str, Any]) -> Dict[str, Any]:
+    if _keep_alive_policy is not None:
+        keep_alive = _keep_alive_policy(payload["model"], payload.get("keep_alive"))
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+    return payload
+
+
+def build_generate_payload(model: str, prompt: str, system: Optional[str],
+                           options: Optional[Dict[str, Any]], stream: bool, **extra) -> Dict[str, Any]:
+    """/api/generate gövdesini oluşturur"""
+    payload = {"model": model, "prompt": prompt, "stream": stream}
+    if system:
+        payload["system"] = system
+    if options:
+        payload["options"] = options
+    payload.update({key: value for key, value in extra.items() if value is not None})
+    return _apply_keep_alive(payload)
+
+
+def build_chat_payload(model: str, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]],
+                       stream: bool, **extra) -> Dict[str, Any]:
+    """/api/chat gövdesini oluşturur"""
+    payload = {"model": model, "messages": messages, "stream": stream}
+    if options:
+        payload["options"] = options
+    payload.update({key: value for key, value in extra.items() if value is not None})
+    return _apply_keep_alive(payload)
+
+
+def cacheable_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Önbelleğe yazılacak yanıt gövdesi (KV context dizisi hariç)"""
+    return {key: value for key, value in data.items() if key not in ("context", "cached")}
+
+
+def _until_cancelled(chunks: Iterator[Dict[str, Any]], cancel: threading.Event) -> Iterator[Dict[str, Any]]:
+    """cancel set edilince akışı bırakır; kapanan üreteç bağlantıyı da kapatır"""
+    try:
+        for chunk in chunks:
+            if cancel.is_set():
+                break
+            yield chunk
+    finally:
+        chunks.close()
+
+
+class OllamaClient:
+    """Ollama API'si için paylaşılan, keep-alive bağlantı havuzlu istemci"""
+
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, pool_size: Optional[int] = None,
+                 router: Optional[OllamaRouter] = None):
+        # base_url verilirse doğrudan o sunucu kullanılır; aksi halde istekler
+        # config.OLLAMA_CONFIG["backends"] arasında yönlendirilir
+        self._base_url = base_url
+        self.router = router or ollama_router
+        self._timeout = timeout
+        self.max_retries = max_retries if max_retries is not None else config.OLLAMA_CONFIG.get("max_retries", 2)
+        self.pool_size = pool_size or config.OLLAMA_CONFIG.get("pool_size", 10)
+        self.model_digests: Dict[str, str] = {}
+        self._digests_at = 0.0
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """Yeniden deneme politikası ve bağlantı havuzu ile oturum oluşturur"""
+        # Sadece bağlantı kurulamayan veya servisin geçici olarak meşgul olduğu
+        # durumlar tekrar denenir; okuma hatasında üretim iki kez başlatılmaz.
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=self.max_retries,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @property
+    def base_url(self) -> str:
+        """Aktif Ollama adresi (config.OLLAMA_CONFIG'e göre)"""
+        return (self._base_url or config.OLLAMA_CONFIG["base_url"]).rstrip("/")
+
+    @property
+    def timeout(self) -> tuple:
+        """(bağlantı, okuma) zaman aşımı çifti"""
+        read_timeout = self._timeout or config.OLLAMA_CONFIG["timeout"]
+        return (config.OLLAMA_CONFIG.get("connect_timeout", 5), read_timeout)
+
+    def _request(self, method: str, endpoint: str, base_url: Optional[str] = None, **kwargs) -> requests.Response:
+        """HTTP isteği yapar ve hataları OllamaError türlerine çevirir"""
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            response = self.session.request(method, f"{base_url or self.base_url}{endpoint}", **kwargs)
+        except requests.exceptions.Timeout as e:
+            raise OllamaTimeoutError("Yanıt zaman aşımına uğradı") from e
+        except requests.exceptions.ConnectionError as e:
+            # Tekrar denenmeyen okuma zaman aşımını requests MaxRetryError içinde ConnectionError olarak iletir
+            if isinstance(getattr(e.args[0] if e.args else None, "reason", None), ReadTimeoutError):
+                raise OllamaTimeoutError("Yanıt zaman aşımına uğradı") from e
+            raise OllamaConnectionError("Ollama servisine bağlanılamıyor. Ollama çalışıyor mu?") from e
+        except requests.exceptions.RequestException as e:
+            raise OllamaError(str(e)) from e
+
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get("error", response.text)
+            except ValueError:
+                detail = response.text
+            response.close()
+            raise OllamaError(f"HTTP {response.status_code}: {detail}")
+
+        return response
+
+    def _open(self, method: str, endpoint: str, model: Optional[str] = None,
+              session_id: Optional[str] = None, **kwargs) -> Tuple[requests.Response, Optional[Backend]]:
+        """İsteği seçilen sunucuya gönderir; bağlanılamayan sunucuyu işaretleyip diğerini dener
+
+        Dönen sunucu için iş bitince _close çağrılmalıdır.
+        """
+        if self._base_url:
+            return self._request(method, endpoint, **kwargs), None
+
+        if model and len(self.router.backends()) > 1 and self.router.stale_backends():
+            # Model farkındalıklı yerleşim için sunucuların model listelerini tazele
+            try:
+                self.list_models()
+            except OllamaError:
+                pass
+
+        tried = []
+        last_error: OllamaError = OllamaConnectionError("Kullanılabilir Ollama sunucusu yok")
+        while True:
+            backend = self.router.select(model, session_id, exclude=tried)
+            if backend is None:
+                raise last_error
+            self.router.acquire(backend)
+            start_time = time.time()
+            try:
+                response = self._request(method, endpoint, base_url=backend.url, **kwargs)
+            except OllamaTimeoutError:
+                # Yavaş ama ayakta sunucu (ör. model yüklüyor) devre dışı bırakılmaz; üretim
+                # başlamış olabileceğinden başka sunucuda da denenmez
+                self.router.release(backend)
+                raise
+            except OllamaConnectionError as e:
+                self.router.release(backend)
+                self.router.record_failure(backend)
+                tried.append(backend.url)
+                last_error = e
+                continue
+            except OllamaError:
+                self.router.release(backend)
+                raise
+            self.router.record_success(backend, time.time() - start_time)
+            return response, backend
+
+    def _close(self, backend: Optional[Backend]) -> None:
+        if backend is not None:
+            self.router.release(backend)
+
+    def _gather_models(self, endpoint: str) -> List[Dict[str, Any]]:
+        """Model listesi döndüren uç noktayı tüm sağlıklı sunucularda çağırıp birleştirir"""
+        if self._base_url:
+            return self._request("GET", endpoint).json().get("models", [])
+
+        models = {}
+        last_error = None
+        backends = self.router.backends()
+        for backend in [backend for backend in backends if backend.healthy] or backends:
+            try:
+                response = self._request("GET", endpoint, base_url=backend.url)
+            except (OllamaConnectionError, OllamaTimeoutError) as e:
+                self.router.record_failure(backend)
+                last_error = e
+                continue
+            backend_models = response.json().get("models", [])
+            if endpoint == config.OLLAMA_CONFIG["tags_endpoint"]:
+                self.router.update_models(backend, [model["name"] for model in backend_models])
+            for model in backend_models:
+                models.setdefault(model["name"], model)
+        if not models and last_error:
+            raise last_error
+        return list(models.values())
+
+    def list_models(self) -> List[Dict[str, Any]]:
+        """Yüklü modelleri (/api/tags) döndürür; birden fazla sunucu varsa birleşimini"""
+        models = self._gather_models(config.OLLAMA_CONFIG["tags_endpoint"])
+        self.model_digests = {model["name"]: model.get("digest", "") for model in models}
+        self._digests_at = time.time()
+        return models
+
+    def running_models(self) -> List[Dict[str, Any]]:
+        """Bellekte yüklü modelleri (/api/ps) döndürür"""
+        return self._gather_models(config.OLLAMA_CONFIG["ps_endpoint"])
+
+    def load_model(self, model: str, keep_alive: Any) -> None:
+        """Modeli üretim yapmadan belleğe yükler; keep_alive=0 modeli bellekten çıkarır"""
+        payload = {"model": model, "keep_alive": keep_alive}
+        response, backend = self._open("POST", config.OLLAMA_CONFIG["api_endpoint"], model=model, json=payload)
+        try:
+            data = response.json()
+        finally:
+            self._close(backend)
+        if data.get("error"):
+            raise OllamaError(data["error"])
+
+    def show_model(self, model: str) -> Dict[str, Any]:
+        """Model ayrıntılarını (/api/show) döndürür"""
+        response, backend = self._open("POST", config.OLLAMA_CONFIG["show_endpoint"], model=model,
+                                       json={"model": model})
+        try:
+            return response.json()
+        finally:
+            self._close(backend)
+
+    def embed(self, model: str, text: str) -> List[float]:
+        """Metnin gömme vektörünü (/api/embeddings) döndürür"""
+        response, backend = self._open("POST", config.OLLAMA_CONFIG["embeddings_endpoint"], model=model,
+                                       json={"model": model, "prompt": text})
+        try:
+            data = response.json()
+        finally:
+            self._close(backend)
+        if data.get("error") or not data.get("embedding"):
+            raise OllamaError(data.get("error") or "Boş gömme vektörü")
+        return data["embedding"]
+
+    def version(self, timeout: Optional[float] = None) -> str:
+        """Ollama sürümünü döndürür; servisin ayakta olduğunu doğrulayan hafif istek"""
+        kwargs = {"timeout": timeout} if timeout else {}
+        response, backend = self._open("GET", config.OLLAMA_CONFIG["version_endpoint"], **kwargs)
+        try:
+            return response.json().get("version", "")
+        finally:
+            self._close(backend)
+
+    def model_digest(self, model: str) -> Optional[str]:
+        """Modelin içerik özetini döndürür (önbellek anahtarı için)
+
+        Özetler katalog TTL'i kadar tutulur; ollama pull ile güncellenen model
+        yeni özetle yeni önbellek anahtarları üretir.
+        """
+        if time.time() - self._digests_at >= config.MODEL_CATALOG_CONFIG["ttl"]:
+            try:
+                self.list_models()
+            except OllamaError:
+                return None
+        return self.model_digests.get(model_tag(model))
+
+    def _cache_key(self, model: str, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]],
+                   use_cache: Optional[bool], extra: Dict[str, Any]) -> Optional[str]:
+        """İstek önbelleğe uygunsa anahtarını, değilse None döndürür"""
+        if not response_cache.should_cache(options, use_cache):
+            return None
+        return response_cache.make_key(model, prompt, system, options, self.model_digest(model), extra)
+
+    def generate(self, model: str, prompt: str, system: Optional[str] = None,
+                 options: Optional[Dict[str, Any]] = None, use_cache: Optional[bool] = None,
+                 **extra) -> Dict[str, Any]:
+        """Tek parça (stream=False) üretim yapar ve Ollama'nın yanıt gövdesini döndürür
+
+        Önbellekten gelen yanıtlarda "cached": True bulunur.
+        """
+        cache_key = self._cache_key(model, prompt, system, options, use_cache, extra)
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                cached["cached"] = True
+                return cached
+
+        def remember(data: Dict[str, Any]) -> None:
+            if cache_key:
+                response_cache.put(cache_key, model, cacheable_data(data))
+
+        payload = build_generate_payload(model, prompt, system, options, False, **extra)
+        return self._post(config.OLLAMA_CONFIG["api_endpoint"], payload, remember)
+
+    def generate_stream(self, model: str, prompt: str, system: Optional[str] = None,
+                        options: Optional[Dict[str, Any]] = None, use_cache: Optional[bool] = None,
+                        cancel: Optional[threading.Event] = None, **extra) -> Iterator[Dict[str, Any]]:
+        """NDJSON parçalarını sırayla üretir; son parça done=True taşır
+
+        cancel olayı set edilirse akış done beklemeden biter ve upstream bağlantı kapatılır.
+        """
+        cache_key = self._cache_key(model, prompt, system, options, use_cache, extra)
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                yield {"model": model, "response": cached.get("response", ""), "done": False, "cached": True}
+                yield dict(cached, response="", done=True, cached=True)
+                return
+
+        def remember(chunks: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            text = ""
+            for data in chunks:
+                text += data.get("response", "")
+                yield data
+                if data.get("done") and cache_key:
+                    response_cache.put(cache_key, model, cacheable_data(dict(data, response=text)))
+
+        payload = build_generate_payload(model, prompt, system, options, True, **extra)
+        yield from self._post_stream(config.OLLAMA_CONFIG["api_endpoint"], payload, remember, cancel=cancel)
+
+    def chat(self, model: str, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]] = None,
+             session_id: Optional[str] = None, **extra) -> Dict[str, Any]:
+        """Mesaj listesiyle (/api/chat) tek parça yanıt üretir
+
+        session_id verilirse sohbet, KV önbelleğini tutan aynı sunucuya yönlendirilir.
+        """
+        payload = build_chat_payload(model, messages, options, False, **extra)
+        return self._post(config.OLLAMA_CONFIG["chat_endpoint"], payload, session_id=session_id)
+
+    def chat_stream(self, model: str, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]] = None,
+                    session_id: Optional[str] = None, cancel: Optional[threading.Event] = None,
+                    **extra) -> Iterator[Dict[str, Any]]:
+        """/api/chat NDJSON parçalarını sırayla üretir; içerik message.content alanındadır"""
+        payload = build_chat_payload(model, messages, options, True, **extra)
+        yield from self._post_stream(config.OLLAMA_CONFIG["chat_endpoint"], payload,
+                                     session_id=session_id, cancel=cancel)
+
+    def _flight_key(self, endpoint: str, payload: Dict[str, Any]) -> str:
+        # Yönlendirmede sunucuyu ilk istek seçer; anahtar sunucudan bağımsızdır
+        return flight_key(self._base_url or "router", endpoint, payload)
+
+    def _post(self, endpoint: str, payload: Dict[str, Any],
+              on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+              session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Tek parça üretim isteği; özdeş eşzamanlı istekler tek upstream isteği paylaşır"""
+        def fetch() -> Dict[str, Any]:
+            response, backend = self._open("POST", endpoint, model=payload.get("model"),
+                                           session_id=session_id, json=payload)
+            try:
+                data = response.json()
+            finally:
+                self._close(backend)
+            if data.get("error"):
+                raise OllamaError(data["error"])
+            if on_result:
+                on_result(data)
+            return data
+
+        if not config.OLLAMA_CONFIG.get("coalesce", True):
+            return fetch()
+        return dict(request_coalescer.run(self._flight_key(endpoint, payload), fetch))
+
+    def _post_stream(self, endpoint: str, payload: Dict[str, Any],
+                     wrap: Optional[Callable[[Iterator[Dict[str, Any]]], Iterator[Dict[str, Any]]]] = None,
+                     session_id: Optional[str] = None,
+                     cancel: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        """Akışlı üretim isteği; özdeş eşzamanlı istekler aynı token akışına abone olur"""
+        def upstream() -> Iterator[Dict[str, Any]]:
+            response, backend = self._open("POST", endpoint, model=payload.get("model"),
+                                           session_id=session_id, json=payload, stream=True)
+            # Tüm aboneler vazgeçerse okuma beklenmeden bağlantı kapatılır; Ollama üretimi durdurur
+            request_coalescer.on_abort(response.close)
+            try:
+                chunks = self._iter_chunks(response)
+                yield from (wrap(chunks) if wrap else chunks)
+            finally:
+                self._close(backend)
+
+        if not config.OLLAMA_CONFIG.get("coalesce", True):
+            chunks = upstream()
+            return _until_cancelled(chunks, cancel) if cancel is not None else chunks
+        return request_coalescer.stream(self._flight_key(endpoint, payload), upstream, cancel)
+
+    def _iter_chunks(self, response: requests.Response) -> Iterator[Dict[str, Any]]:
+        """Akış yanıtındaki NDJSON satırlarını done=True gelene kadar çözer"""
+        with response:
+            try:
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise OllamaError(data["error"])
+                    yield data
+                    if data.get("done"):
+                        break
+            except requests.exceptions.RequestException as e:
+                raise OllamaConnectionError(f"Akış kesildi: {e}") from e
+
+    def close(self):
+        """Bağlantı havuzunu kapatır"""
+        self.session.close()
+
+
+# Global Ollama istemcisi
+ollama_client = OllamaClient()
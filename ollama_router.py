@@ -0,0 +1,160 @@
+"""
+CortexCLI Ollama Yönlendiricisi
+Birden fazla Ollama sunucusu arasında sağlık ve yük ağırlıklı istek yönlendirme
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Set, Iterable
+
+import config
+
+
+@dataclass
+class Backend:
+    """Tek bir Ollama sunucusunun yönlendirme durumu"""
+    url: str
+    weight: float = 1.0
+    outstanding: int = 0                 # Süren istek sayısı
+    latency: Optional[float] = None      # İlk yanıt süresinin hareketli ortalaması (s)
+    failures: int = 0                    # Art arda başarısız istek sayısı
+    down_until: float = 0.0              # Bu zamana kadar sağlıksız kabul edilir
+    models: Optional[Set[str]] = None    # Sunucuda yüklü modeller (bilinmiyorsa None)
+    models_fetched_at: float = 0.0
+    requests: int = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.time() >= self.down_until
+
+    def has_model(self, model: str) -> bool:
+        """Model bu sunucuda var mı? Liste bilinmiyorsa var kabul edilir"""
+        if self.models is None:
+            return True
+        return model in self.models or f"{model}:latest" in self.models
+
+
+class OllamaRouter:
+    """Model farkındalıklı, yapışkan oturumlu ve pasif sağlık kontrollü yönlendirici"""
+
+    def __init__(self):
+        self._backends: Dict[str, Backend] = {}
+        self._sticky: "OrderedDict[str, str]" = OrderedDict()  # oturum -> sunucu adresi
+        self._lock = threading.Lock()
+
+    def backends(self) -> List[Backend]:
+        """config.OLLAMA_CONFIG["backends"] (boşsa base_url) listesindeki sunucular"""
+        entries = config.OLLAMA_CONFIG.get("backends") or [config.OLLAMA_CONFIG["base_url"]]
+        with self._lock:
+            backends = []
+            for entry in entries:
+                if isinstance(entry, dict):
+                    url, weight = entry["url"], entry.get("weight", 1.0)
+                else:
+                    url, weight = entry, 1.0
+                url = url.rstrip("/")
+                backend = self._backends.get(url)
+                if backend is None:
+                    backend = self._backends[url] = Backend(url)
+                backend.weight = weight
+                backends.append(backend)
+            return backends
+
+    def stale_backends(self) -> List[Backend]:
+        """Model listesi hiç alınmamış veya süresi dolmuş sağlıklı sunucular"""
+        ttl = config.MODEL_CATALOG_CONFIG["ttl"]
+        now = time.time()
+        return [backend for backend in self.backends()
+                if backend.healthy and (backend.models is None or now - backend.models_fetched_at > ttl)]
+
+    def update_models(self, backend: Backend, names: Iterable[str]) -> None:
+        with self._lock:
+            backend.models = set(names)
+            backend.models_fetched_at = time.time()
+
+    def select(self, model: Optional[str] = None, session_id: Optional[str] = None,
+               exclude: Iterable[str] = ()) -> Optional[Backend]:
+        """İstek için sunucu seçer; uygun sunucu kalmadıysa None döndürür"""
+        backends = [backend for backend in self.backends() if backend.url not in exclude]
+        if not backends:
+            return None
+
+        with self._lock:
+            # Hepsi sağlıksızsa en erken düzelecek olan denenir
+            candidates = [backend for backend in backends if backend.healthy]
+            candidates = candidates or [min(backends, key=lambda backend: backend.down_until)]
+
+            if model:
+                candidates = [backend for backend in candidates if backend.has_model(model)] or candidates
+
+            # Sohbet, KV önbelleğini tutan sunucuda kalır
+            if session_id and session_id in self._sticky:
+                url = self._sticky[session_id]
+                for backend in candidates:
+                    if backend.url == url:
+                        self._sticky.move_to_end(session_id)
+                        return backend
+
+            chosen = min(candidates, key=self._score)
+            if session_id:
+                self._sticky[session_id] = chosen.url
+                while len(self._sticky) > config.ROUTER_CONFIG["sticky_sessions"]:
+                    self._sticky.popitem(last=False)
+            return chosen
+
+    @staticmethod
+    def _score(backend: Backend) -> tuple:
+        """Küçük skor önce seçilir; hiç denenmemiş sunucunun gecikmesi 0 sayılır"""
+        latency = backend.latency or 0.0
+        if config.ROUTER_CONFIG["policy"] == "latency":
+            return ((backend.outstanding + 1) * max(latency, 0.001) / backend.weight, backend.requests)
+        return ((backend.outstanding + 1) / backend.weight, latency, backend.requests)
+
+    def acquire(self, backend: Backend) -> None:
+        """Sunucuya giden isteği sayar"""
+        with self._lock:
+            backend.outstanding += 1
+            backend.requests += 1
+
+    def release(self, backend: Backend) -> None:
+        """Tamamlanan (veya vazgeçilen) isteği düşer"""
+        with self._lock:
+            backend.outstanding = max(0, backend.outstanding - 1)
+
+    def record_success(self, backend: Backend, latency: float) -> None:
+        """Başarılı yanıt: sağlığı sıfırla, gecikme ortalamasını güncelle"""
+        with self._lock:
+            backend.failures = 0
+            backend.down_until = 0.0
+            alpha = 0.3
+            backend.latency = latency if backend.latency is None else alpha * latency + (1 - alpha) * backend.latency
+
+    def record_failure(self, backend: Backend) -> None:
+        """Bağlantı hatası: sunucuyu artan sürelerle devre dışı bırak (pasif sağlık kontrolü)"""
+        router_config = config.ROUTER_CONFIG
+        with self._lock:
+            backend.failures += 1
+            cooldown = min(router_config["failure_cooldown"] * 2 ** (backend.failures - 1),
+                           router_config["max_cooldown"])
+            backend.down_until = time.time() + cooldown
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Sunucu başına yönlendirme durumu"""
+        return [
+            {
+                'url': backend.url,
+                'healthy': backend.healthy,
+                'outstanding': backend.outstanding,
+                'latency': backend.latency,
+                'failures': backend.failures,
+                'requests': backend.requests,
+                'models': sorted(backend.models) if backend.models is not None else None
+            }
+            for backend in self.backends()
+        ]
+
+
+# Global Ollama yönlendiricisi
+ollama_router = OllamaRouter()
@@ -8,6 +8,7 @@ import hashlib
 import mimetypes
 from pathlib import Path
 from plugin_system import PluginBase
+from file_walker import file_walker
 from typing import Dict, Callable
 
 class FileAnalyzerPlugin(PluginBase):
@@ -151,12 +152,11 @@ class FileAnalyzerPlugin(PluginBase):
             if not os.path.exists(directory):
                 return f"❌ Dizin bulunamadı: {directory}"
                 
-            found_files = []
-            for root, dirs, files in os.walk(directory):
-                for file in files:
-                    if pattern.lower() in file.lower():
-                        full_path = os.path.join(root, file)
-                        found_files.append(full_path)
+            found_files = [
+                os.path.join(directory, *entry.path.split("/"))
+                for entry in file_walker.walk(directory).files
+                if pattern.lower() in entry.name.lower()
+            ]
                         
             if found_files:
                 result = f"🔍 '{pattern}' için {len(found_files)} dosya bulundu:\n"
@@ -21,6 +21,10 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import fnmatch
+import config
+from file_walker import file_walker
+from text_index import get_text_index, search_file
+from filename_index import get_filename_index
 
 class FileManagerPlugin:
     """Gelişmiş dosya yönetimi plugin'i"""
@@ -151,6 +155,24 @@ def preview_file(file_path: str, max_lines: int = 50) -> str:
     except Exception as e:
         return f"[HATA] Dosya önizleme hatası: {e}"
 
+def _scan_files(dir_path: Path, keyword: str, limit: int) -> tuple:
+    """İndekssiz arama: gezgin bütçesi içindeki dosyalarda ilk eşleşen satırlar; ((yol, satır) listesi, devamı_var)"""
+    walk = file_walker.walk(str(dir_path))
+    max_bytes = config.TEXT_INDEX_CONFIG["max_file_bytes"]
+    hits = []
+    for entry in walk.files:
+        if entry.size > max_bytes:
+            continue
+        try:
+            found = search_file(str(dir_path / entry.path), keyword)
+        except OSError:
+            continue
+        if found:
+            if len(hits) >= limit:
+                return hits, True
+            hits.append((entry.path, found[0].line))
+    return hits, walk.truncated
+
 def search_files(keyword: str, directory: str = ".") -> str:
     """Dosya içeriğinde arama yapar."""
     try:
@@ -158,71 +180,64 @@ def search_files(keyword: str, directory: str = ".") -> str:
         if not dir_path.exists():
             return f"[HATA] Dizin bulunamadı: {directory}"
         
-        keyword = keyword.lower()
-        found_files = []
-        
-        for file_path in dir_path.rglob("*"):
-            if file_path.is_file():
-                try:
-                    # Dosya boyutunu kontrol et
-                    if file_path.stat().st_size > 5 * 1024 * 1024:  # 5MB
-                        continue
-                    
-                    # MIME tipini kontrol et
-                    mime_type, _ = mimetypes.guess_type(str(file_path))
-                    if mime_type and not mime_type.startswith('text/'):
-                        continue
-                    
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read().lower()
-                        if keyword in content:
-                            found_files.append(file_path)
-                except:
-                    continue
-        
-        if not found_files:
+        project_root = Path.cwd().resolve()
+        if dir_path == project_root or project_root in dir_path.parents:
+            # Proje içi: kalıcı trigram indeksi aday dosyaları süzer; dosya başına ilk eşleşme yeterli
+            prefix = dir_path.relative_to(project_root).as_posix() if dir_path != project_root else ""
+            result_page = get_text_index(str(project_root)).search(keyword, limit=20, per_file=1, path=prefix)
+            hits = [(os.path.relpath(hit.path, prefix or "."), hit.line) for hit in result_page.hits]
+            has_more = result_page.has_more
+        else:
+            # Proje dışı dizinler için kalıcı indeks kurulmaz; gezgin bütçesiyle sınırlı tek seferlik tarama
+            hits, has_more = _scan_files(dir_path, keyword, limit=20)
+        if not hits:
             return f"[yellow]'{keyword}' için sonuç bulunamadı.[/yellow]"
         
         result = f"[bold]'{keyword}' için bulunan dosyalar:[/bold]\n"
-        for file_path in found_files[:20]:  # En fazla 20 sonuç
-            result += f"📄 {file_path.relative_to(dir_path)}\n"
+        for path, line in hits:
+            result += f"📄 {path}:{line}\n"
         
-        if len(found_files) > 20:
-            result += f"\n... ve {len(found_files) - 20} dosya daha"
+        if has_more:
+            result += "\n... ve daha fazla dosya"
         
         return result
     except Exception as e:
         return f"[HATA] Arama hatası: {e}"
 
 def find_files(filename: str, directory: str = ".") -> str:
-    """Dosya adına göre arama yapar."""
+    """Dosya adına göre arama yapar (joker desen veya bulanık sıralama)."""
     try:
         dir_path = Path(directory).resolve()
         if not dir_path.exists():
             return f"[HATA] Dizin bulunamadı: {directory}"
         
-        found_files = list(dir_path.rglob(filename))
+        # Bellek içi dosya adı indeksi; her çağrıda dizin taranmaz
+        index = get_filename_index(str(dir_path))
+        if any(char in filename for char in "*?["):
+            found_paths = index.glob(filename)
+        else:
+            found_paths = [match.path for match in index.search(filename)]
         
-        if not found_files:
+        if not found_paths:
             return f"[yellow]'{filename}' adında dosya bulunamadı.[/yellow]"
         
         result = f"[bold]'{filename}' adında bulunan dosyalar:[/bold]\n"
-        for file_path in found_files:
+        for path in found_paths:
             try:
-                stat = file_path.stat()
-                size = stat.st_size
-                modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
-                
-                if size < 1024:
-                    size_str = f"{size} B"
-                elif size < 1024**2:
-                    size_str = f"{size/1024:.1f} KB"
-                else:
-                    size_str = f"{size/1024**2:.1f} MB"
-                
-                result += f"📄 {file_path.relative_to(dir_path)} - {size_str} - {modified}\n"
-            except:
-                result += f"📄 {file_path.relative_to(dir_path)}\n"
+                stat = (dir_path / path).stat()
+            except OSError:
+                continue
+            size = stat.st_size
+            modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
+            
+            if size < 1024:
+                size_str = f"{size} B"
+            elif size < 1024**2:
+                size_str = f"{size/1024:.1f} KB"
+            else:
+                size_str = f"{size/1024**2:.1f} MB"
+            
+            result += f"📄 {Path(path)} - {size_str} - {modified}\n"
         
         return result
     except Exception as e:
@@ -277,9 +292,9 @@ def file_info(file_path: str) -> str:
         
         if file_path.is_dir():
             try:
-                file_count = len(list(file_path.rglob("*")))
-                dir_count = len([x for x in file_path.rglob("*") if x.is_dir()])
-                result += f"📊 İçerik: {file_count} dosya, {dir_count} dizin\n"
+                walk = file_walker.walk(file_path)
+                more = "+" if walk.truncated else ""
+                result += f"📊 İçerik: {len(walk.files)}{more} dosya, {len(walk.dirs)}{more} dizin\n"
             except:
                 pass
         
@@ -382,25 +397,31 @@ def tree_view(directory: str = ".", max_depth: int = 3) -> str:
         
         result = f"[bold]Dizin Ağacı: {directory}[/bold]\n"
         
-        def print_tree(path: Path, prefix: str = "", depth: int = 0):
+        walk = file_walker.walk(dir_path, max_depth=max_depth)
+        listings = {listing.path: listing for listing in walk.listings}
+        
+        def print_tree(path: str, prefix: str = ""):
             nonlocal result
-            if depth > max_depth:
+            listing = listings.get(path)
+            if listing is None:
                 return
             
-            items = sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
+            items = sorted(listing.dirs + listing.files, key=lambda x: (not x.is_dir, x.name.lower()))
             
             for i, item in enumerate(items):
                 is_last = i == len(items) - 1
                 current_prefix = "└── " if is_last else "├── "
                 next_prefix = "    " if is_last else "│   "
                 
-                if item.is_dir():
+                if item.is_dir:
                     result += f"{prefix}{current_prefix}[blue]{item.name}/[/blue]\n"
-                    print_tree(item, prefix + next_prefix, depth + 1)
+                    print_tree(item.path, prefix + next_prefix)
                 else:
                     result += f"{prefix}{current_prefix}{item.name}\n"
         
-        print_tree(dir_path)
+        print_tree("")
+        if walk.truncated:
+            result += "[yellow]... tarama sınırına ulaşıldı[/yellow]\n"
         return result
     except Exception as e:
         return f"[HATA] Ağaç görünümü hatası: {e}"
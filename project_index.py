@@ -0,0 +1,520 @@
+"""
+CortexCLI Proje İndeksi
+Proje dosyalarının SQLite'ta kalıcı, dizin mtime taramasıyla artımlı güncellenen indeksi
+"""
+
+import json
+import os
+import posixpath
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set, Iterable, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog yoksa dizin mtime taraması kullanılır
+    Observer = None
+    FileSystemEventHandler = object
+
+import config
+from file_walker import file_walker, DirListing
+
+LANGUAGES = {
+    ".py": "python", ".js": "javascript", ".jsx": "javascript", ".ts": "typescript", ".tsx": "typescript",
+    ".html": "html", ".htm": "html", ".css": "css", ".scss": "css", ".sass": "css",
+    ".json": "json", ".yaml": "yaml", ".yml": "yaml", ".toml": "toml", ".md": "markdown",
+    ".txt": "text", ".sh": "shell", ".go": "go", ".rs": "rust", ".java": "java",
+    ".c": "c", ".h": "c", ".cpp": "cpp", ".hpp": "cpp", ".rb": "ruby", ".php": "php", ".sql": "sql"
+}
+
+
+def detect_language(name: str) -> str:
+    """Dosya uzantısından dil adı (bilinmiyorsa boş)"""
+    return LANGUAGES.get(os.path.splitext(name)[1].lower(), "")
+
+
+@dataclass
+class FileEntry:
+    """İndeksteki tek bir dosya (yol kökten göreli, / ayraçlı)"""
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    language: str = ""
+
+    @property
+    def name(self) -> str:
+        return posixpath.basename(self.path)
+
+    @property
+    def directory(self) -> str:
+        return posixpath.dirname(self.path)
+
+
+@dataclass
+class _DirState:
+    mtime_ns: int
+    files: Set[str] = field(default_factory=set)
+    subdirs: Set[str] = field(default_factory=set)
+    ignore_state: Tuple = ()
+
+
+class _DirtyHandler(FileSystemEventHandler):
+    """watchdog olaylarını değişen dizin kümesine çevirir"""
+
+    def __init__(self, index: "ProjectIndex"):
+        self.index = index
+
+    def on_any_event(self, event):
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path:
+                self.index._mark_dirty(os.path.dirname(path) if not event.is_directory else path)
+
+
+class ProjectIndex:
+    """Tek bir proje kökünün dosya indeksi
+
+    İlk açılışta diskteki indeks yüklenir; sonraki çağrılarda yalnızca dizinlerin
+    mtime değerleri kontrol edilir ve değişen dizinler yeniden taranır. watchdog
+    kuruluysa ve izleme açıksa yalnızca olay gelen dizinler taranır.
+    """
+
+    def __init__(self, root: str = ".", db_path: Optional[str] = None):
+        index_config = config.PROJECT_INDEX_CONFIG
+        self.root = os.path.abspath(root)
+        self.db_path = Path(db_path or index_config["db_path"]).absolute()
+        self._files: Dict[str, FileEntry] = {}
+        self._dirs: Dict[str, _DirState] = {}
+        self._loaded = False
+        self._swept_at = 0.0
+        self._dirty: Set[str] = set()
+        self._removed: List[str] = []  # Diskten silinecek alt ağaçlar
+        self._observer = None
+        self._lock = threading.RLock()
+        self._db_ready = False
+        self.scans = 0  # Yeniden taranan dizin sayısı
+        self.truncated = False  # max_files sınırına takıldı; bazı dosyalar indekste yok (sonraki tam taramaya kadar)
+        # Değişiklik günlüğü: her değişen taramada nesil artar; bellek içi türev indeksler
+        # (dosya adı indeksi) yalnızca eklenen/silinen yolları uygular
+        self.generation = 0
+        self._added: Set[str] = set()
+        self._dropped: Set[str] = set()
+        self._reset = False
+        self._journal: deque = deque(maxlen=index_config["journal_size"])
+
+    # --- Veritabanı ---
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        # Günlük dosyası oluşturup silmek kök dizinin mtime'ını değiştirip gereksiz tarama yaptırırdı
+        conn.execute('PRAGMA journal_mode=MEMORY')
+        if not self._db_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS index_files (
+                    root TEXT NOT NULL,
+                    dir TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    inode INTEGER,
+                    language TEXT,
+                    PRIMARY KEY (root, path)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_index_files_dir ON index_files(root, dir)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS index_roots (
+                    root TEXT PRIMARY KEY,
+                    truncated INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS index_dirs (
+                    root TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    mtime_ns INTEGER,
+                    ignore_state TEXT,
+                    PRIMARY KEY (root, path)
+                )
+            ''')
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _load(self) -> None:
+        """Diskteki indeksi belleğe alır"""
+        try:
+            conn = self._connect()
+            try:
+                dirs = conn.execute(
+                    'SELECT path, mtime_ns, ignore_state FROM index_dirs WHERE root = ?', (self.root,)
+                ).fetchall()
+                files = conn.execute(
+                    'SELECT path, size, mtime_ns, inode, language FROM index_files WHERE root = ?', (self.root,)
+                ).fetchall()
+                truncated = conn.execute('SELECT truncated FROM index_roots WHERE root = ?', (self.root,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            dirs, files, truncated = [], [], None
+
+        self.truncated = bool(truncated and truncated[0])
+
+        self._dirs = {
+            path: _DirState(mtime_ns, ignore_state=tuple(tuple(item) for item in json.loads(ignore_state or "[]")))
+            for path, mtime_ns, ignore_state in dirs
+        }
+        self._reset = True
+        self._files = {}
+        for row in files:
+            entry = FileEntry(*row)
+            self._files[entry.path] = entry
+            if entry.directory in self._dirs:
+                self._dirs[entry.directory].files.add(entry.path)
+        for path in self._dirs:
+            parent = posixpath.dirname(path)
+            if path and parent in self._dirs:
+                self._dirs[parent].subdirs.add(path)
+        self._loaded = True
+
+    def _save(self, changed: Iterable[str], removed: Iterable[str]) -> None:
+        """Değişen dizinlerin doğrudan içeriğini ve silinen alt ağaçları diske yazar"""
+        try:
+            conn = self._connect()
+            try:
+                for path in removed:
+                    if not path:
+                        conn.execute('DELETE FROM index_files WHERE root = ?', (self.root,))
+                        conn.execute('DELETE FROM index_dirs WHERE root = ?', (self.root,))
+                        continue
+                    like = path.replace("%", r"\%").replace("_", r"\_") + "/%"
+                    conn.execute("DELETE FROM index_files WHERE root = ? AND (dir = ? OR dir LIKE ? ESCAPE '\\')",
+                                 (self.root, path, like))
+                    conn.execute("DELETE FROM index_dirs WHERE root = ? AND (path = ? OR path LIKE ? ESCAPE '\\')",
+                                 (self.root, path, like))
+                for path in changed:
+                    state = self._dirs.get(path)
+                    if state is None:
+                        continue
+                    conn.execute('DELETE FROM index_files WHERE root = ? AND dir = ?', (self.root, path))
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO index_files (root, dir, path, size, mtime_ns, inode, language) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        [(self.root, path, entry.path, entry.size, entry.mtime_ns, entry.inode, entry.language)
+                         for entry in (self._files[file] for file in state.files)]
+                    )
+                    conn.execute(
+                        'INSERT OR REPLACE INTO index_dirs (root, path, mtime_ns, ignore_state) VALUES (?, ?, ?, ?)',
+                        (self.root, path, state.mtime_ns, json.dumps(state.ignore_state))
+                    )
+                conn.execute('INSERT OR REPLACE INTO index_roots (root, truncated) VALUES (?, ?)',
+                             (self.root, int(self.truncated)))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    # --- Tarama ---
+
+    def _abs(self, path: str) -> str:
+        return os.path.join(self.root, *path.split("/")) if path else self.root
+
+    def _apply(self, listing: DirListing) -> List[str]:
+        """Gezginden gelen dizin listesini indekse işler; yeni alt dizinleri döndürür (kilit altında)"""
+        self.scans += 1
+        path = listing.path
+        old = self._dirs.get(path)
+        files = {
+            entry.path: FileEntry(entry.path, entry.size, entry.mtime_ns, entry.inode, detect_language(entry.name))
+            for entry in listing.files if self._abs(entry.path) != str(self.db_path)
+        }
+        subdirs = {entry.path for entry in listing.dirs}
+        self._added.update(file for file in files if file not in self._files)
+        if old:
+            for file in old.files - set(files):
+                self._files.pop(file, None)
+                self._dropped.add(file)
+            # Ignore kuralları değiştiyse alt ağaçlar yeni kurallarla baştan taranır
+            stale_subdirs = old.subdirs if old.ignore_state != listing.ignore_state else old.subdirs - subdirs
+            for subdir in stale_subdirs:
+                self._remove_tree(subdir)
+        self._files.update(files)
+        self._dirs[path] = _DirState(listing.mtime_ns, set(files), subdirs, listing.ignore_state)
+        return [subdir for subdir in subdirs if subdir not in self._dirs]
+
+    def _scan_dir(self, path: str) -> List[str]:
+        """Tek bir dizinin doğrudan içeriğini yeniden tarar (kilit altında)"""
+        listing = file_walker.list_dir(self.root, path)
+        if listing is None:
+            self._remove_tree(path)
+            return []
+        return self._apply(listing)
+
+    def _remove_tree(self, path: str) -> None:
+        state = self._dirs.pop(path, None)
+        if state is None:
+            return
+        self._removed.append(path)
+        for file in state.files:
+            self._files.pop(file, None)
+            self._dropped.add(file)
+        for subdir in state.subdirs:
+            self._remove_tree(subdir)
+
+    def _scan_tree(self, paths: List[str], changed: List[str]) -> None:
+        """Yeni dizinleri alt ağaçlarıyla birlikte dosya sınırına kadar tarar; sınıra takılırsa truncated olur"""
+        for path in sorted(paths):
+            remaining = config.PROJECT_INDEX_CONFIG["max_files"] - len(self._files)
+            if remaining <= 0:
+                self.truncated = True
+                break
+            # İndeks eksik kalmasın diye süre sınırı uygulanmaz
+            walk = file_walker.walk(self.root, path, max_entries=remaining, time_budget=None)
+            self.truncated = self.truncated or walk.truncated
+            for listing in walk.listings:
+                self._apply(listing)
+                changed.append(listing.path)
+
+    def _ignore_changed(self, path: str) -> bool:
+        """Dizindeki ignore dosyaları yerinde düzenlendi mi? (dizin mtime'ı değişmez)"""
+        for name, mtime_ns, size in self._dirs[path].ignore_state:
+            try:
+                stat = os.stat(os.path.join(self._abs(path), name))
+            except OSError:
+                return True
+            if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+                return True
+        return False
+
+    def refresh(self, force: bool = False) -> int:
+        """İndeksi günceller; yeniden taranan dizin sayısını döndürür"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            interval = config.PROJECT_INDEX_CONFIG["sweep_interval"]
+            if not force and self._dirs and time.time() - self._swept_at < interval and not self._dirty:
+                return 0
+
+            changed: List[str] = []
+            if force or not self._dirs:
+                self._dirs, self._files = {}, {}
+                self.truncated = False
+                self._reset = True
+                self._removed.append("")
+                self._scan_tree([""], changed)
+            else:
+                candidates = self._dirty_dirs() if self._observer else list(self._dirs)
+                stale = []
+                for path in candidates:
+                    if path not in self._dirs:
+                        continue
+                    try:
+                        mtime_ns = os.stat(self._abs(path)).st_mtime_ns
+                    except OSError:
+                        self._remove_tree(path)
+                        continue
+                    if mtime_ns != self._dirs[path].mtime_ns or self._observer or self._ignore_changed(path):
+                        stale.append(path)
+                for path in stale:
+                    if path in self._dirs:
+                        new_dirs = self._scan_dir(path)
+                        changed.append(path)
+                        self._scan_tree(new_dirs, changed)
+
+            self._swept_at = time.time()
+            removed, self._removed = self._removed, []
+            if changed or removed:
+                self._save(changed, removed)
+            self._record_changes()
+            return len(changed)
+
+    def _record_changes(self) -> None:
+        """Biriken yol değişikliklerini yeni bir nesil olarak günlüğe yazar (kilit altında)"""
+        if not (self._reset or self._added or self._dropped):
+            return
+        self.generation += 1
+        if self._reset:
+            self._journal.append((self.generation, None, None))
+        else:
+            # Aynı taramada silinip yeniden eklenen yol eklenmiş sayılır
+            added = {path for path in self._added if path in self._files}
+            self._journal.append((self.generation, added, self._dropped - added))
+        self._added, self._dropped, self._reset = set(), set(), False
+
+    def changes_since(self, generation: int) -> Optional[Tuple[int, Set[str], Set[str]]]:
+        """Verilen nesilden bu yana eklenen ve silinen yollar: (güncel nesil, eklenen, silinen)
+
+        Günlük o nesli kapsamıyorsa veya arada tam tarama olduysa None döner;
+        çağıran taraf files() ile baştan kurmalıdır.
+        """
+        self.refresh()
+        with self._lock:
+            if generation == self.generation:
+                return self.generation, set(), set()
+            entries = [entry for entry in self._journal if entry[0] > generation]
+            if not entries or entries[0][0] != generation + 1 or any(entry[1] is None for entry in entries):
+                return None
+            added: Set[str] = set()
+            dropped: Set[str] = set()
+            for _, entry_added, entry_dropped in entries:
+                added = (added - entry_dropped) | entry_added
+                dropped = (dropped - entry_added) | entry_dropped
+            return self.generation, added, dropped
+
+    # --- İzleme ---
+
+    def _mark_dirty(self, abs_path: str) -> None:
+        rel = os.path.relpath(abs_path, self.root)
+        with self._lock:
+            self._dirty.add("" if rel == "." else rel.replace(os.sep, "/"))
+
+    def _dirty_dirs(self) -> List[str]:
+        dirty, self._dirty = self._dirty, set()
+        return list(dirty)
+
+    def watch(self) -> bool:
+        """watchdog kuruluysa dosya sistemi olaylarıyla güncellemeyi başlatır"""
+        if Observer is None or self._observer is not None:
+            return self._observer is not None
+        observer = Observer()
+        observer.schedule(_DirtyHandler(self), self.root, recursive=True)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        return True
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+    # --- Sorgular ---
+
+    def files(self) -> List[FileEntry]:
+        """Güncel dosya listesi (yola göre sıralı)"""
+        self.refresh()
+        with self._lock:
+            return [self._files[path] for path in sorted(self._files)]
+
+    def restat(self, entries: Iterable[FileEntry]) -> List[FileEntry]:
+        """Yerinde düzenlenen dosyaların boyut/mtime bilgisini tazeler; değişenleri döndürür
+
+        Dosya içeriği değişince dizinin mtime'ı değişmez; içeriğe bağlı önbellekler
+        (sembol indeksi, bağlam parçaları) kullanmadan önce adaylarını tazeler.
+        """
+        changed = []
+        for entry in entries:
+            try:
+                stat = os.stat(self._abs(entry.path))
+            except OSError:
+                continue
+            if (stat.st_mtime_ns, stat.st_size) != (entry.mtime_ns, entry.size):
+                with self._lock:
+                    entry.size, entry.mtime_ns, entry.inode = stat.st_size, stat.st_mtime_ns, stat.st_ino
+                changed.append(entry)
+        if changed:
+            try:
+                conn = self._connect()
+                try:
+                    conn.executemany(
+                        'UPDATE index_files SET size = ?, mtime_ns = ?, inode = ? WHERE root = ? AND path = ?',
+                        [(entry.size, entry.mtime_ns, entry.inode, self.root, entry.path) for entry in changed]
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                pass
+        return changed
+
+    def paths(self) -> List[str]:
+        return [entry.path for entry in self.files()]
+
+    def directories(self) -> List[str]:
+        """Kök dışındaki indekslenmiş dizinler"""
+        self.refresh()
+        with self._lock:
+            return sorted(path for path in self._dirs if path)
+
+    def get(self, path: str) -> Optional[FileEntry]:
+        """Dosya kaydı; içerik değişmiş olabileceğinden boyut/mtime yeniden okunur"""
+        self.refresh()
+        rel = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+        with self._lock:
+            entry = self._files.get(rel)
+            if entry is None:
+                return None
+            try:
+                stat = os.stat(self._abs(rel))
+            except OSError:
+                return None
+            entry.size, entry.mtime_ns, entry.inode = stat.st_size, stat.st_mtime_ns, stat.st_ino
+            return entry
+
+    def find(self, term: str = "", extensions: Optional[Iterable[str]] = None, exact: bool = False,
+             limit: Optional[int] = None) -> List[FileEntry]:
+        """Adında term geçen (exact ise adı term olan) dosyalar"""
+        term = term.lower()
+        extensions = {extension.lower() for extension in extensions or []}
+        results = []
+        for entry in self.files():
+            name = entry.name.lower()
+            if (name == term) if exact else (term in name):
+                if extensions and os.path.splitext(name)[1] not in extensions:
+                    continue
+                results.append(entry)
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+    def tree(self, path: str = "", max_depth: int = 3) -> Dict[str, Any]:
+        """İç içe sözlük biçiminde dizin ağacı"""
+        self.refresh()
+        with self._lock:
+            def build(current: str, depth: int) -> Dict[str, Any]:
+                node = {'name': posixpath.basename(current) or os.path.basename(self.root),
+                        'type': 'directory', 'path': current or "."}
+                state = self._dirs.get(current)
+                if state is None or depth >= max_depth:
+                    node['children'] = []
+                    return node
+                children = [build(subdir, depth + 1) for subdir in sorted(state.subdirs)]
+                children += [{'name': posixpath.basename(file), 'type': 'file', 'path': file}
+                             for file in sorted(state.files)]
+                node['children'] = children
+                return node
+
+            return build(path.strip("/") if path not in (".", "./") else "", 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'root': self.root,
+                'files': len(self._files),
+                'directories': len(self._dirs),
+                'scans': self.scans,
+                'truncated': self.truncated,
+                'watching': self._observer is not None
+            }
+
+
+_indexes: Dict[str, ProjectIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_project_index(directory: str = ".") -> ProjectIndex:
+    """Dizinin (yoksa oluşturulan) paylaşılan indeksini döndürür"""
+    root = os.path.abspath(directory)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = ProjectIndex(root)
+            if config.PROJECT_INDEX_CONFIG["watch"]:
+                index.watch()
+        return index
@@ -0,0 +1,207 @@
+"""
+CortexCLI İstek Birleştirici
+Aynı anda yapılan özdeş LLM isteklerini tek bir upstream üretimde birleştirir (single-flight)
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, List, Any, Optional, Callable, Iterator, Iterable
+
+
+def flight_key(*parts: Any) -> str:
+    """İstek parçalarından (uç nokta, gövde vb.) birleştirme anahtarı üretir"""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """Süren tek bir upstream isteğin paylaşılan durumu"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.chunks: List[Any] = []
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self.subscribers = 0
+        self.cancelled = False
+        self.abort: Optional[Callable[[], None]] = None  # Upstream bağlantıyı hemen kapatır
+
+
+class _Subscription:
+    """Bir abonenin akış yineleyicisi
+
+    Abonelik stream() çağrısında sayılır; hiç okunmayan yineleyici de close()
+    veya çöp toplama ile aboneliği bırakır (başlamamış bir üretecin finally
+    bloğu çalışmaz).
+    """
+
+    def __init__(self, coalescer: "RequestCoalescer", key: str, flight: _Flight,
+                 cancel: Optional[threading.Event] = None):
+        self._coalescer = coalescer
+        self._key = key
+        self._flight = flight
+        self._chunks = coalescer._read(flight, cancel)
+        self._released = False
+
+    def __iter__(self) -> "_Subscription":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return next(self._chunks)
+        except BaseException:
+            # Akış bitti, hata verdi veya iptal edildi
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Aboneliği bırakır; son abone ayrılırsa upstream akış durdurulur"""
+        if self._released:
+            return
+        self._released = True
+        self._chunks.close()
+        self._coalescer._leave(self._key, self._flight)
+
+    def __del__(self):
+        self.close()
+
+
+class RequestCoalescer:
+    """Özdeş eşzamanlı istekleri tek üretime bağlayan single-flight katmanı"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()  # Pump iş parçacığının akışı
+        self.coalesced = 0  # Başka bir isteğe bağlanan istek sayısı
+
+    def _join(self, key: str) -> tuple:
+        """Süren isteğe katılır ya da yeni bir istek başlatır; (flight, lider_mi) döndürür"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                flight.subscribers += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            flight.subscribers = 1
+            return flight, True
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        with flight.condition:
+            flight.done = True
+            flight.condition.notify_all()
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Any:
+        """fn() sonucunu, aynı anahtarla süren bir çağrı varsa onunla paylaşır"""
+        flight, leader = self._join(key)
+        if leader:
+            try:
+                flight.result = fn()
+            except BaseException as e:
+                flight.error = e
+            finally:
+                self._finish(key, flight)
+        else:
+            with flight.condition:
+                flight.condition.wait_for(lambda: flight.done)
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def stream(self, key: str, fn: Callable[[], Iterable[Any]],
+               cancel: Optional[threading.Event] = None) -> Iterator[Any]:
+        """fn() akışını tüm eşzamanlı abonelere baştan itibaren dağıtır
+
+        Upstream akış arka plandaki bir iş parçacığında okunur; böylece bir abonenin
+        yavaş okuması veya erken çıkması diğerlerini etkilemez. Tüm aboneler
+        ayrılırsa upstream akış kapatılır. cancel set edilince bu abone ayrılır.
+        """
+        flight, leader = self._join(key)
+        if leader:
+            thread = threading.Thread(target=self._pump, args=(key, flight, fn), daemon=True)
+            thread.start()
+        return _Subscription(self, key, flight, cancel)
+
+    def on_abort(self, fn: Callable[[], None]) -> None:
+        """Upstream kodu (pump iş parçacığında) iptalde çağrılacak kapatıcıyı kaydeder"""
+        flight = getattr(self._local, "flight", None)
+        if flight is not None:
+            flight.abort = fn
+
+    def _pump(self, key: str, flight: _Flight, fn: Callable[[], Iterable[Any]]) -> None:
+        """Upstream akışı okuyup paylaşılan tampona yazar"""
+        self._local.flight = flight
+        iterator = None
+        try:
+            iterator = iter(fn())
+            for chunk in iterator:
+                with flight.condition:
+                    flight.chunks.append(chunk)
+                    flight.condition.notify_all()
+                    if flight.cancelled:
+                        break
+        except BaseException as e:
+            flight.error = e
+        finally:
+            self._local.flight = None
+            if hasattr(iterator, "close"):
+                iterator.close()
+            self._finish(key, flight)
+
+    @staticmethod
+    def _read(flight: _Flight, cancel: Optional[threading.Event] = None) -> Iterator[Any]:
+        """Paylaşılan tampondaki parçaları baştan itibaren üretir"""
+        index = 0
+        while True:
+            with flight.condition:
+                ready = lambda: index < len(flight.chunks) or flight.done
+                if cancel is None:
+                    flight.condition.wait_for(ready)
+                else:
+                    # İptal olayı koşulu uyandırmaz; kısa aralıklarla kontrol edilir
+                    while not ready() and not cancel.is_set():
+                        flight.condition.wait(0.1)
+                    if cancel.is_set():
+                        return
+                pending = flight.chunks[index:]
+                finished = flight.done
+            index += len(pending)
+            for chunk in pending:
+                yield chunk
+            if finished and index >= len(flight.chunks):
+                break
+        if flight.error is not None:
+            raise flight.error
+
+    def _leave(self, key: str, flight: _Flight) -> None:
+        """Aboneyi düşer; kimse kalmadıysa upstream akışı durdurur"""
+        abort = None
+        with self._lock:
+            flight.subscribers -= 1
+            if flight.subscribers <= 0 and not flight.done:
+                # Kimse dinlemiyor: upstream'i durdur, yeni istekler bu akışa bağlanmasın
+                flight.cancelled = True
+                abort = flight.abort
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+        if abort is not None:
+            try:
+                abort()
+            except Exception:
+                pass
+
+    def in_flight(self) -> int:
+        """Şu anda süren upstream istek sayısı"""
+        with self._lock:
+            return len(self._flights)
+
+
+# Global istek birleştirici
+request_coalescer = RequestCoalescer()
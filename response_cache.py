@@ -0,0 +1,200 @@
+"""
+CortexCLI LLM Yanıt Önbelleği
+İçerik adresli, bellek (LRU) + SQLite katmanlı yanıt önbelleği
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import config
+
+# Önbellek anahtarına girmeyen (yanıt içeriğini değiştirmeyen) istek alanları
+NON_KEY_FIELDS = {"keep_alive", "stream"}
+
+
+class ResponseCache:
+    """İki katmanlı (bellek LRU + disk SQLite) LLM yanıt önbelleği"""
+
+    def __init__(self, db_path: Optional[str] = None, memory_entries: Optional[int] = None,
+                 disk_entries: Optional[int] = None, ttl: Optional[float] = None):
+        cache_config = config.RESPONSE_CACHE_CONFIG
+        self.db_path = Path(db_path or cache_config["db_path"])
+        self.memory_entries = memory_entries or cache_config["memory_entries"]
+        self.disk_entries = disk_entries or cache_config["disk_entries"]
+        self.ttl = ttl if ttl is not None else cache_config["ttl"]
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (created_at, data)
+        self._lock = threading.Lock()
+        self._db_ready = False
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Veritabanı bağlantısı açar, gerekirse tabloyu oluşturur"""
+        conn = sqlite3.connect(self.db_path)
+        if not self._db_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_response_cache_access ON response_cache(last_access)')
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    @staticmethod
+    def make_key(model: str, prompt: str, system: Optional[str] = None,
+                 options: Optional[Dict[str, Any]] = None, digest: Optional[str] = None,
+                 extra: Optional[Dict[str, Any]] = None) -> str:
+        """Model özeti, sistem promptu, prompt ve seçeneklerden içerik adresli anahtar üretir"""
+        material = {
+            "model": model,
+            "digest": digest or "",
+            "system": system or "",
+            "prompt": prompt,
+            "options": options or {},
+            "extra": {k: v for k, v in (extra or {}).items() if k not in NON_KEY_FIELDS and v is not None}
+        }
+        encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def should_cache(options: Optional[Dict[str, Any]] = None, use_cache: Optional[bool] = None) -> bool:
+        """Önbellek yalnızca temperature 0 iken veya kullanıcı açıkça isterse uygulanır"""
+        cache_config = config.RESPONSE_CACHE_CONFIG
+        if not cache_config["enabled"] or use_cache is False:
+            return False
+        if use_cache or cache_config["cache_nondeterministic"]:
+            return True
+        return (options or {}).get("temperature") == 0
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl) and time.time() - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Anahtara karşılık gelen yanıtı döndürür (yoksa None)"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, data = entry
+                if not self._expired(created_at):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return dict(data)
+                del self._memory[key]
+
+            try:
+                conn = self._connect()
+                try:
+                    row = conn.execute(
+                        'SELECT data, created_at FROM response_cache WHERE key = ?', (key,)
+                    ).fetchone()
+                    if row and self._expired(row[1]):
+                        conn.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+                        conn.commit()
+                        row = None
+                    elif row:
+                        conn.execute('UPDATE response_cache SET last_access = ? WHERE key = ?', (time.time(), key))
+                        conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            data = json.loads(row[0])
+            self._remember(key, row[1], data)
+            self.hits += 1
+            return dict(data)
+
+    def put(self, key: str, model: str, data: Dict[str, Any]) -> None:
+        """Yanıtı iki katmana da yazar ve boyut sınırlarını uygular"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, data)
+            try:
+                conn = self._connect()
+                try:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO response_cache (key, model, data, created_at, last_access) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (key, model, json.dumps(data, ensure_ascii=False), now, now)
+                    )
+                    if self.ttl:
+                        conn.execute('DELETE FROM response_cache WHERE created_at < ?', (now - self.ttl,))
+                    # En uzun süredir kullanılmayan kayıtları sil
+                    conn.execute(
+                        'DELETE FROM response_cache WHERE key IN ('
+                        'SELECT key FROM response_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+                        (self.disk_entries,)
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                pass
+
+    def _remember(self, key: str, created_at: float, data: Dict[str, Any]) -> None:
+        """Bellek katmanına ekler (LRU tahliyesi ile)"""
+        self._memory[key] = (created_at, dict(data))
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Tüm önbelleği temizler"""
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+            try:
+                conn = self._connect()
+                try:
+                    conn.execute('DELETE FROM response_cache')
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Önbellek istatistiklerini döndürür"""
+        with self._lock:
+            disk_entries = 0
+            try:
+                conn = self._connect()
+                try:
+                    disk_entries = conn.execute('SELECT COUNT(*) FROM response_cache').fetchone()[0]
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                pass
+
+            lookups = self.hits + self.misses
+            return {
+                'enabled': config.RESPONSE_CACHE_CONFIG["enabled"],
+                'cache_nondeterministic': config.RESPONSE_CACHE_CONFIG["cache_nondeterministic"],
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+# Global yanıt önbelleği
+response_cache = ResponseCache()
@@ -0,0 +1,316 @@
+"""
+CortexCLI Anlamsal Yanıt Önbelleği
+Benzer (yeniden ifade edilmiş) sorular için gömme vektörleri ve kosinüs benzerliğiyle yanıt önbelleği
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy yoksa anlamsal önbellek devre dışı kalır
+    np = None
+
+import config
+from ollama_client import ollama_client, OllamaError
+
+HASHING_EMBEDDER = "hashing"
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def available() -> bool:
+    """Anlamsal önbellek için numpy kurulu mu?"""
+    return np is not None
+
+
+class HashingEmbedder:
+    """Model gerektirmeyen hashing vektörleştirici (kelime + karakter üçlüleri)
+
+    Ollama'ya ulaşılamadığında ve çevrimdışı testlerde kullanılır; yalnızca
+    yüzeysel benzerliği yakalar.
+    """
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim or config.SEMANTIC_CACHE_CONFIG["hashing_dim"]
+
+    @property
+    def name(self) -> str:
+        return f"{HASHING_EMBEDDER}-{self.dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD_RE.findall(text.lower())
+        features = [f"w:{word}" for word in words]
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, text: str) -> "np.ndarray":
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.md5(feature.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dim
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        return vector
+
+
+@dataclass
+class SemanticHit:
+    """Benzer bir önceki sorunun önbellekteki yanıtı"""
+    prompt: str
+    response: str
+    similarity: float
+
+
+class VectorIndex:
+    """Birim vektörlerin numpy matrisinde tutulduğu kosinüs benzerliği indeksi"""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.ids: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, entry_id: int, vector: "np.ndarray") -> None:
+        if len(self.ids) == len(self._vectors):
+            # Kapasiteyi ikiye katla (amortize O(1) ekleme)
+            grown = np.zeros((len(self._vectors) * 2, self.dim), dtype=np.float32)
+            grown[:len(self.ids)] = self._vectors[:len(self.ids)]
+            self._vectors = grown
+        self._vectors[len(self.ids)] = vector
+        self.ids.append(entry_id)
+
+    def remove_oldest(self, count: int) -> List[int]:
+        """En eski kayıtları çıkarır; çıkarılan kimlikleri döndürür"""
+        removed = self.ids[:count]
+        size = len(self.ids)
+        self._vectors[:size - count] = self._vectors[count:size]
+        self.ids = self.ids[count:]
+        return removed
+
+    def search(self, vector: "np.ndarray") -> Optional[Tuple[int, float]]:
+        """En benzer kaydın (kimlik, kosinüs benzerliği) çiftini döndürür"""
+        if not self.ids:
+            return None
+        scores = self._vectors[:len(self.ids)] @ vector
+        best = int(np.argmax(scores))
+        return self.ids[best], float(scores[best])
+
+
+class SemanticCache:
+    """Model + sistem promptu başına vektör indeksli, SQLite kalıcı anlamsal önbellek"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or config.RESPONSE_CACHE_CONFIG["db_path"])
+        self._indexes: Dict[str, VectorIndex] = {}  # ad alanı -> indeks
+        self._embeddings: "OrderedDict[tuple, np.ndarray]" = OrderedDict()  # Son gömmeler
+        self._lock = threading.Lock()
+        self._db_ready = False
+        self._ollama_failed_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return config.SEMANTIC_CACHE_CONFIG["enabled"] and available()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        if not self._db_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS semantic_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    namespace TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_semantic_cache_ns ON semantic_cache(namespace, id)')
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    @staticmethod
+    def _namespace(model: str, system: Optional[str], embedder: str) -> str:
+        """Yalnızca aynı model, sistem promptu ve gömme uzayındaki sorular karşılaştırılır"""
+        material = f"{model}\0{system or ''}\0{embedder}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _embed(self, text: str) -> Tuple[str, "np.ndarray"]:
+        """(gömme adı, birim vektör); Ollama'ya ulaşılamazsa ollama_retry_interval boyunca hashing kullanılır"""
+        semantic_config = config.SEMANTIC_CACHE_CONFIG
+        embedder = semantic_config["embedder"]
+        if embedder != HASHING_EMBEDDER:
+            if time.time() - self._ollama_failed_at < semantic_config["ollama_retry_interval"]:
+                embedder = HashingEmbedder().name
+            else:
+                embedder = f"ollama-{semantic_config['embedding_model']}"
+
+        cache_key = (embedder, text)
+        with self._lock:
+            if cache_key in self._embeddings:
+                self._embeddings.move_to_end(cache_key)
+                return embedder, self._embeddings[cache_key]
+
+        vector = None
+        if embedder.startswith("ollama-"):
+            try:
+                vector = np.asarray(ollama_client.embed(semantic_config["embedding_model"], text), dtype=np.float32)
+            except OllamaError:
+                self._ollama_failed_at = time.time()
+        if vector is None:
+            hashing = HashingEmbedder()
+            embedder, vector = hashing.name, hashing.embed(text)
+
+        norm = float(np.linalg.norm(vector))
+        vector = vector / norm if norm else vector
+        with self._lock:
+            self._embeddings[(embedder, text)] = vector
+            while len(self._embeddings) > 128:
+                self._embeddings.popitem(last=False)
+        return embedder, vector
+
+    def _index(self, namespace: str, dim: int) -> VectorIndex:
+        """Ad alanının indeksini döndürür; ilk erişimde diskten yükler (kilit altında)"""
+        index = self._indexes.get(namespace)
+        if index is not None and index.dim == dim:
+            return index
+
+        index = VectorIndex(dim)
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    'SELECT id, vector FROM semantic_cache WHERE namespace = ? ORDER BY id', (namespace,)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            rows = []
+        for entry_id, blob in rows:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            if len(vector) == dim:
+                index.add(entry_id, vector)
+        self._indexes[namespace] = index
+        return index
+
+    def lookup(self, model: str, prompt: str, system: Optional[str] = None) -> Optional[SemanticHit]:
+        """Eşik üzerindeki en benzer önceki sorunun yanıtını döndürür (yoksa None)"""
+        if not self.enabled:
+            return None
+        embedder, vector = self._embed(prompt)
+        namespace = self._namespace(model, system, embedder)
+
+        with self._lock:
+            found = self._index(namespace, len(vector)).search(vector)
+            if found is None or found[1] < config.SEMANTIC_CACHE_CONFIG["threshold"]:
+                self.misses += 1
+                return None
+            entry_id, similarity = found
+            try:
+                conn = self._connect()
+                try:
+                    row = conn.execute(
+                        'SELECT prompt, response FROM semantic_cache WHERE id = ?', (entry_id,)
+                    ).fetchone()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return SemanticHit(row[0], row[1], similarity)
+
+    def store(self, model: str, prompt: str, system: Optional[str], response: str) -> None:
+        """Soruyu ve yanıtını indekse ekler; sınır aşılırsa en eski kayıtları siler"""
+        if not self.enabled or not response:
+            return
+        embedder, vector = self._embed(prompt)
+        namespace = self._namespace(model, system, embedder)
+
+        with self._lock:
+            index = self._index(namespace, len(vector))
+            try:
+                conn = self._connect()
+                try:
+                    cursor = conn.execute(
+                        'INSERT INTO semantic_cache (namespace, prompt, response, vector, created_at) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (namespace, prompt, response, vector.astype(np.float32).tobytes(), time.time())
+                    )
+                    index.add(cursor.lastrowid, vector)
+                    overflow = len(index) - config.SEMANTIC_CACHE_CONFIG["max_entries"]
+                    if overflow > 0:
+                        removed = index.remove_oldest(overflow)
+                        conn.executemany('DELETE FROM semantic_cache WHERE id = ?', [(i,) for i in removed])
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                pass
+
+    @staticmethod
+    def draft_prompt(prompt: str, hit: SemanticHit) -> str:
+        """Önbellekteki yanıtı taslak olarak kullanan istem ("draft" modu)"""
+        return (
+            f"Benzer bir soruya daha önce verilen yanıt aşağıdadır. Doğruysa kullan, "
+            f"yeni soruya göre düzelt veya tamamla.\n\n"
+            f"ÖNCEKİ SORU: {hit.prompt}\n\nTASLAK YANIT:\n{hit.response}\n\nSORU: {prompt}"
+        )
+
+    def clear(self) -> None:
+        """Tüm anlamsal önbelleği temizler"""
+        with self._lock:
+            self._indexes.clear()
+            self._embeddings.clear()
+            self.hits = 0
+            self.misses = 0
+            try:
+                conn = self._connect()
+                try:
+                    conn.execute('DELETE FROM semantic_cache')
+                    conn.commit()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Anlamsal önbellek istatistikleri"""
+        with self._lock:
+            entries = 0
+            try:
+                conn = self._connect()
+                try:
+                    entries = conn.execute('SELECT COUNT(*) FROM semantic_cache').fetchone()[0]
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                pass
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'available': available(),
+                'mode': config.SEMANTIC_CACHE_CONFIG["mode"],
+                'entries': entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+# Global anlamsal yanıt önbelleği
+semantic_cache = SemanticCache()
@@ -54,7 +54,29 @@ setup(
         "plugin_system",
         "multi_model",
         "advanced_code_execution",
-        "web_interface"
+        "web_interface",
+        "ollama_client",
+        "async_ollama_client",
+        "response_cache",
+        "model_catalog",
+        "conversation",
+        "request_coalescer",
+        "llm_scheduler",
+        "ollama_router",
+        "model_residency",
+        "generation_manager",
+        "semantic_cache",
+        "project_index",
+        "file_walker",
+        "context_packer",
+        "symbol_index",
+        "text_index",
+        "code_retriever",
+        "code_analysis",
+        "import_graph",
+        "filename_index",
+        "context_diff",
+        "file_summaries"
     ],
     include_package_data=True,
     package_data={
@@ -84,10 +106,14 @@ setup(
         "docker": [
             "docker>=6.0.0",
         ],
+        "semantic": [
+            "numpy>=1.24.0",
+        ],
         "full": [
             "flask>=2.3.0",
             "flask-socketio>=5.3.0",
             "docker>=6.0.0",
+            "numpy>=1.24.0",
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
             "black>=23.0.0",
@@ -0,0 +1,451 @@
+"""
+CortexCLI Sembol İndeksi
+Proje genelinde tanım/sınıf/fonksiyon/import indeksi; dosya içerik özetine göre kalıcı, yalnızca değişen dosyalar yeniden ayrıştırılır
+"""
+
+import ast
+import bisect
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+import config
+from project_index import get_project_index, detect_language, FileEntry
+
+SUPPORTED_LANGUAGES = {"python", "javascript", "typescript", "html", "css"}
+
+_JS_IMPORT_RE = re.compile(r'(?:\bimport|\bfrom|\brequire)\s*\(?[\'"]([^\'"]+)[\'"]')
+_JS_FUNCTION_RE = re.compile(r'(?:function|const|let|var)\s+(\w+)\s*[=\(]')
+_JS_CLASS_RE = re.compile(r'class\s+(\w+)')
+_HTML_TAG_RE = re.compile(r'<(\w+)')
+_CSS_SELECTOR_RE = re.compile(r'([.#]?\w+(?:[^\n{]*?))\s*{')
+
+
+@dataclass
+class Symbol:
+    """Bir tanım: fonksiyon, sınıf, metot veya seçici"""
+    name: str
+    kind: str             # function, class, method, selector
+    path: str
+    line: int
+    end_line: int
+    parent: str = ""      # Metotlar için sınıf adı
+
+    @property
+    def location(self) -> str:
+        return f"{self.path}:{self.line}"
+
+
+@dataclass
+class FileSymbols:
+    """Tek bir dosyanın ayrıştırma sonucu"""
+    path: str
+    language: str
+    line_count: int
+    symbols: List[Symbol] = field(default_factory=list)
+    imports: List[str] = field(default_factory=list)
+    tags: Dict[str, int] = field(default_factory=dict)   # HTML tag sayıları
+    syntax_error: bool = False
+
+    def of_kind(self, *kinds: str) -> List[str]:
+        return [symbol.name for symbol in self.symbols if symbol.kind in kinds]
+
+    def summary(self) -> str:
+        """Kod analizi metni (/context analyze ve bağlamdaki analiz bölümü)"""
+        titles = {"python": "Python", "javascript": "JavaScript", "typescript": "JavaScript",
+                  "html": "HTML", "css": "CSS"}
+        analysis = f"Dil: {titles.get(self.language, self.language)}\n"
+        analysis += f"Satır sayısı: {self.line_count}\n"
+        if self.syntax_error:
+            return analysis + "Syntax hatası var\n"
+        if self.imports:
+            analysis += f"Import'lar: {', '.join(self.imports[:10])}\n"
+        functions = self.of_kind("function", "method")
+        if functions:
+            analysis += f"Fonksiyonlar: {', '.join(functions[:10])}\n"
+        classes = self.of_kind("class")
+        if classes:
+            analysis += f"Sınıflar: {', '.join(classes[:10])}\n"
+        selectors = self.of_kind("selector")
+        if selectors:
+            analysis += f"Selector'lar: {', '.join(selectors[:10])}\n"
+        if self.tags:
+            analysis += "Kullanılan tag'ler:\n"
+            for tag, count in sorted(self.tags.items(), key=lambda x: x[1], reverse=True)[:10]:
+                analysis += f"  - {tag}: {count} kez\n"
+        return analysis
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data: str, path: Optional[str] = None) -> "FileSymbols":
+        raw = json.loads(data)
+        path = path or raw["path"]
+        raw["path"] = path
+        raw["symbols"] = [Symbol(**{**symbol, "path": path}) for symbol in raw["symbols"]]
+        return cls(**raw)
+
+
+def _python_symbols(path: str, content: str, result: FileSymbols) -> None:
+    """Tek ağaç geçişinde import, sınıf, fonksiyon ve metotları toplar"""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        result.syntax_error = True
+        return
+
+    stack: List[Tuple[ast.AST, str]] = [(tree, "")]
+    while stack:
+        node, parent = stack.pop()
+        for child in ast.iter_child_nodes(node):
+            child_parent = parent
+            if isinstance(child, ast.Import):
+                result.imports.extend(alias.name for alias in child.names)
+            elif isinstance(child, ast.ImportFrom):
+                # Göreli importlar seviyeleri kadar noktayla başlar (from ..a import b -> ..a.b)
+                module = "." * (child.level or 0) + (child.module or "")
+                result.imports.extend(f"{module}.{alias.name}" if child.module else f"{module}{alias.name}"
+                                      for alias in child.names)
+            elif isinstance(child, ast.ClassDef):
+                result.symbols.append(Symbol(child.name, "class", path, child.lineno,
+                                             getattr(child, "end_lineno", child.lineno), parent))
+                child_parent = child.name
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = "method" if isinstance(node, ast.ClassDef) else "function"
+                result.symbols.append(Symbol(child.name, kind, path, child.lineno,
+                                             getattr(child, "end_lineno", child.lineno), parent))
+            stack.append((child, child_parent))
+    # Ağaç yığınla gezildiği için kaynak sırasına dizilir
+    result.symbols.sort(key=lambda symbol: symbol.line)
+
+
+def _regex_symbols(path: str, content: str, language: str, result: FileSymbols) -> None:
+    """JS/HTML/CSS için regex tabanlı tanım çıkarımı (satır numaralarıyla)"""
+    line_starts = [0] + [match.end() for match in re.finditer("\n", content)]
+
+    def line_of(offset: int) -> int:
+        return bisect.bisect_right(line_starts, offset)
+
+    if language in ("javascript", "typescript"):
+        result.imports = _JS_IMPORT_RE.findall(content)
+        for match in _JS_FUNCTION_RE.finditer(content):
+            line = line_of(match.start())
+            result.symbols.append(Symbol(match.group(1), "function", path, line, line))
+        for match in _JS_CLASS_RE.finditer(content):
+            line = line_of(match.start())
+            result.symbols.append(Symbol(match.group(1), "class", path, line, line))
+        result.symbols.sort(key=lambda symbol: symbol.line)
+    elif language == "html":
+        result.tags = dict(Counter(_HTML_TAG_RE.findall(content)))
+    elif language == "css":
+        for match in _CSS_SELECTOR_RE.finditer(content):
+            line = line_of(match.start())
+            result.symbols.append(Symbol(match.group(1), "selector", path, line, line))
+
+
+def extract_symbols(path: str, content: str, language: Optional[str] = None) -> FileSymbols:
+    """Dosya içeriğinden sembolleri çıkarır (süreç havuzunda da çalışır)"""
+    language = language or detect_language(path)
+    result = FileSymbols(path, language, len(content.splitlines()))
+    if language == "python":
+        _python_symbols(path, content, result)
+    elif language in SUPPORTED_LANGUAGES:
+        _regex_symbols(path, content, language, result)
+    return result
+
+
+def _extract_file(abs_path: str, path: str, language: str) -> Optional[FileSymbols]:
+    """Dosyayı okuyup sembollerini çıkarır (süreç havuzu işçisi)"""
+    try:
+        with open(abs_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    return extract_symbols(path, data.decode("utf-8", errors="ignore"), language)
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+@dataclass
+class _FileState:
+    mtime_ns: int
+    size: int
+    content_hash: str
+    symbols: FileSymbols
+
+
+class SymbolIndex:
+    """Tek bir proje kökünün sembol indeksi
+
+    Dosyalar proje indeksinden alınır; mtime/boyutu değişmeyen dosyalar hiç
+    okunmaz, değişip içerik özeti aynı kalanlar ayrıştırılmaz. Aynı içerikli
+    dosyalar (kopyalar) önceki ayrıştırmayı paylaşır. Büyük dosyalar süreç
+    havuzunda ayrıştırılır.
+    """
+
+    def __init__(self, root: str = ".", db_path: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.db_path = Path(db_path or config.PROJECT_INDEX_CONFIG["db_path"]).absolute()
+        self._files: Dict[str, _FileState] = {}
+        self._definitions: Dict[str, List[Symbol]] = {}  # küçük harfli ad -> tanımlar
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._db_ready = False
+        self.parsed = 0  # Ayrıştırılan dosya sayısı
+
+    # --- Veritabanı ---
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=MEMORY')
+        if not self._db_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS symbol_files (
+                    root TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    mtime_ns INTEGER,
+                    size INTEGER,
+                    content_hash TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (root, path)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_symbol_files_hash ON symbol_files(content_hash)')
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _load(self) -> None:
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    'SELECT path, mtime_ns, size, content_hash, data FROM symbol_files WHERE root = ?', (self.root,)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            rows = []
+        self._files = {
+            path: _FileState(mtime_ns, size, content_hash, FileSymbols.from_json(data, path))
+            for path, mtime_ns, size, content_hash, data in rows
+        }
+        self._loaded = True
+        self._rebuild_definitions()
+
+    def _rebuild_definitions(self) -> None:
+        definitions: Dict[str, List[Symbol]] = {}
+        for state in self._files.values():
+            for symbol in state.symbols.symbols:
+                definitions.setdefault(symbol.name.lower(), []).append(symbol)
+        self._definitions = definitions
+
+    def _known_hashes(self, hashes: Iterable[str]) -> Dict[str, str]:
+        """Başka köklerde/yollarda daha önce ayrıştırılmış içerikler: özet -> JSON"""
+        hashes = list(set(hashes))
+        if not hashes:
+            return {}
+        try:
+            conn = self._connect()
+            try:
+                found = {}
+                for start in range(0, len(hashes), 500):
+                    batch = hashes[start:start + 500]
+                    rows = conn.execute(
+                        f'SELECT content_hash, data FROM symbol_files WHERE content_hash IN '
+                        f'({",".join("?" * len(batch))})', batch
+                    ).fetchall()
+                    found.update(rows)
+                return found
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return {}
+
+    # --- Güncelleme ---
+
+    def _parse(self, items: List[Tuple[FileEntry, bytes]]) -> Dict[str, FileSymbols]:
+        """Dosyaları ayrıştırır; büyük dosyalar süreç havuzuna gider"""
+        symbol_config = config.SYMBOL_INDEX_CONFIG
+        large = [entry for entry, data in items if len(data) >= symbol_config["process_pool_min_bytes"]]
+        results: Dict[str, FileSymbols] = {}
+        if large and symbol_config["workers"] > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=min(symbol_config["workers"], len(large))) as pool:
+                    futures = {
+                        entry.path: pool.submit(_extract_file, self._abs(entry.path), entry.path, entry.language)
+                        for entry in large
+                    }
+                    for path, future in futures.items():
+                        symbols = future.result()
+                        if symbols is not None:
+                            results[path] = symbols
+            except (OSError, RuntimeError):
+                # Süreç oluşturulamıyorsa (kısıtlı ortam) aynı süreçte devam et
+                results = {}
+        for entry, data in items:
+            if entry.path not in results:
+                results[entry.path] = extract_symbols(entry.path, data.decode("utf-8", errors="ignore"),
+                                                      entry.language)
+        self.parsed += len(results)
+        return results
+
+    def _abs(self, path: str) -> str:
+        return os.path.join(self.root, *path.split("/"))
+
+    def refresh(self) -> int:
+        """Değişen dosyaları yeniden indeksler; ayrıştırılan dosya sayısını döndürür"""
+        project_index = get_project_index(self.root)
+        entries = [entry for entry in project_index.files() if entry.language in SUPPORTED_LANGUAGES]
+        project_index.restat(entries)
+        entries = [entry for entry in entries if entry.size <= config.SYMBOL_INDEX_CONFIG["max_file_bytes"]]
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            current = {entry.path for entry in entries}
+            removed = [path for path in self._files if path not in current]
+            stale = [entry for entry in entries
+                     if entry.path not in self._files
+                     or (self._files[entry.path].mtime_ns, self._files[entry.path].size) != (entry.mtime_ns, entry.size)]
+            if not removed and not stale:
+                return 0
+
+            for path in removed:
+                del self._files[path]
+
+            # Yalnızca içerik özeti yeni olan dosyalar ayrıştırılır
+            changed: List[Tuple[FileEntry, str, FileSymbols]] = []
+            unknown: List[Tuple[FileEntry, str, bytes]] = []
+            for entry in stale:
+                try:
+                    with open(self._abs(entry.path), "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+                digest = _content_hash(data)
+                state = self._files.get(entry.path)
+                if state is not None and state.content_hash == digest:
+                    changed.append((entry, digest, state.symbols))
+                else:
+                    unknown.append((entry, digest, data))
+
+            known = self._known_hashes(digest for _, digest, _ in unknown)
+            to_parse = []
+            for entry, digest, data in unknown:
+                if digest in known:
+                    changed.append((entry, digest, FileSymbols.from_json(known[digest], entry.path)))
+                else:
+                    to_parse.append((entry, digest, data))
+
+            parsed = self._parse([(entry, data) for entry, _, data in to_parse])
+            for entry, digest, _ in to_parse:
+                if entry.path in parsed:
+                    changed.append((entry, digest, parsed[entry.path]))
+
+            for entry, digest, symbols in changed:
+                self._files[entry.path] = _FileState(entry.mtime_ns, entry.size, digest, symbols)
+            self._rebuild_definitions()
+            self._save(changed, removed)
+            return len(to_parse)
+
+    def _save(self, changed: List[Tuple[FileEntry, str, FileSymbols]], removed: List[str]) -> None:
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany('DELETE FROM symbol_files WHERE root = ? AND path = ?',
+                                 [(self.root, path) for path in removed])
+                conn.executemany(
+                    'INSERT OR REPLACE INTO symbol_files (root, path, mtime_ns, size, content_hash, data) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [(self.root, entry.path, entry.mtime_ns, entry.size, digest, symbols.to_json())
+                     for entry, digest, symbols in changed]
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    # --- Sorgular ---
+
+    def file_symbols(self, path: str) -> Optional[FileSymbols]:
+        """Dosyanın sembolleri; indeks dışındaki dosyalar içerik özetiyle önbelleklenir"""
+        self.refresh()
+        rel = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+        with self._lock:
+            state = self._files.get(rel)
+            if state is not None:
+                return state.symbols
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        known = self._known_hashes([_content_hash(data)])
+        if known:
+            return FileSymbols.from_json(next(iter(known.values())), rel)
+        return extract_symbols(rel, data.decode("utf-8", errors="ignore"), detect_language(path))
+
+    def define(self, name: str) -> List[Symbol]:
+        """X nerede tanımlı? Tam ad eşleşmeleri, yoksa büyük/küçük harf duyarsız"""
+        self.refresh()
+        with self._lock:
+            matches = self._definitions.get(name.lower(), [])
+            exact = [symbol for symbol in matches if symbol.name == name]
+            return sorted(exact or matches, key=lambda symbol: (symbol.path, symbol.line))
+
+    def lookup(self, names: Iterable[str]) -> List[Symbol]:
+        """Verilen adlardan (küçük harfli) tanımlı olanların tüm tanımları"""
+        self.refresh()
+        with self._lock:
+            return [symbol for name in set(names) for symbol in self._definitions.get(name.lower(), [])]
+
+    def file_imports(self) -> Dict[str, Tuple[str, str, List[str]]]:
+        """Dosya -> (içerik özeti, dil, importlar); içe aktarma grafiği bunları özetle karşılaştırır"""
+        self.refresh()
+        with self._lock:
+            return {path: (state.content_hash, state.symbols.language, state.symbols.imports)
+                    for path, state in self._files.items()}
+
+    def complete(self, prefix: str, limit: int = 20) -> List[str]:
+        """Önekle başlayan sembol adları (tamamlayıcı için; tarama yapmaz)"""
+        prefix = prefix.lower()
+        with self._lock:
+            if not self._loaded:
+                return []
+            names = sorted({symbol.name for key, symbols in self._definitions.items() if key.startswith(prefix)
+                            for symbol in symbols})
+        return names[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'files': len(self._files),
+                'symbols': sum(len(symbols) for symbols in self._definitions.values()),
+                'parsed': self.parsed
+            }
+
+
+_indexes: Dict[str, SymbolIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_symbol_index(directory: str = ".") -> SymbolIndex:
+    """Dizinin (yoksa oluşturulan) paylaşılan sembol indeksini döndürür"""
+    root = os.path.abspath(directory)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = SymbolIndex(root)
+        return index
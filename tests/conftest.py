@@ -0,0 +1,51 @@
+"""
+Shared pytest fixtures
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import project_index
+import symbol_index
+import text_index
+import code_retriever
+import import_graph
+import filename_index
+from code_analysis import analysis_engine
+from file_summaries import summary_store
+from response_cache import response_cache
+from semantic_cache import semantic_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_response_cache(tmp_path, monkeypatch):
+    """Each test gets empty response caches outside the working tree"""
+    monkeypatch.setattr(response_cache, "db_path", tmp_path / "cortex_cache.db")
+    monkeypatch.setattr(response_cache, "_db_ready", False)
+    monkeypatch.setattr(semantic_cache, "db_path", tmp_path / "cortex_cache.db")
+    monkeypatch.setattr(semantic_cache, "_db_ready", False)
+    monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "db_path", str(tmp_path / "cortex_index.db"))
+    monkeypatch.setattr(project_index, "_indexes", {})
+    monkeypatch.setattr(symbol_index, "_indexes", {})
+    monkeypatch.setitem(config.TEXT_INDEX_CONFIG, "index_dir", str(tmp_path / "search"))
+    monkeypatch.setattr(text_index, "_indexes", {})
+    monkeypatch.setitem(config.RETRIEVAL_CONFIG, "embedder", "hashing")
+    monkeypatch.setattr(code_retriever, "_retrievers", {})
+    monkeypatch.setattr(import_graph, "_graphs", {})
+    monkeypatch.setattr(filename_index, "_indexes", {})
+    monkeypatch.setattr(analysis_engine, "db_path", tmp_path / "cortex_index.db")
+    monkeypatch.setattr(analysis_engine, "_db_ready", False)
+    monkeypatch.setattr(summary_store, "db_path", tmp_path / "cortex_index.db")
+    monkeypatch.setattr(summary_store, "_db_ready", False)
+    # Özetler yalnızca açıkça etkinleştiren testlerde üretilir (arka planda model çağrısı yapılmasın)
+    monkeypatch.setitem(config.FILE_SUMMARY_CONFIG, "enabled", False)
+    response_cache.clear()
+    semantic_cache.clear()
+    yield response_cache
+    response_cache.clear()
+    semantic_cache.clear()
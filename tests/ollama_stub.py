@@ -0,0 +1,153 @@
+"""
+Testler için yerel Ollama stub sunucusu
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class OllamaStub:
+    """Ollama API'sinin küçük bir alt kümesini taklit eden HTTP sunucusu"""
+
+    def __init__(self, models=None, tokens=None, status=200, delays=None, token_delay=0):
+        self.models = models if models is not None else ["qwen2.5:7b"]
+        self.tokens = tokens if tokens is not None else ["Merhaba", " dünya"]
+        self.status = status
+        self.delays = delays or {}  # model -> saniye
+        self.token_delay = token_delay  # Akışta token'lar arası bekleme
+        self.aborted = 0  # İstemcinin yarıda kapattığı akışlar
+        # Son parçada dönen Ollama sayaçları (süreler nanosaniye)
+        self.metrics = {
+            "prompt_eval_count": 12,
+            "eval_count": len(self.tokens),
+            "load_duration": 100_000_000,
+            "prompt_eval_duration": 200_000_000,
+            "eval_duration": 500_000_000,
+            "total_duration": 900_000_000
+        }
+        self.requests = []
+        self.loaded = {}  # model -> son keep_alive (/api/ps)
+        self.connections = set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, data, status=200):
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_chunk(self, data):
+                line = (json.dumps(data) + "\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+
+            def do_GET(self):
+                stub.connections.add(self.client_address)
+                stub.requests.append((self.path, None))
+                if self.path == "/api/tags":
+                    self._send_json({"models": [
+                        {"name": name, "digest": f"sha-{name}", "size": 4 * 1024 ** 3,
+                         "details": {"family": "qwen2", "parameter_size": "7.6B"}}
+                        for name in stub.models
+                    ]})
+                elif self.path == "/api/ps":
+                    self._send_json({"models": [
+                        {"name": name, "model": name, "size": 4 * 1024 ** 3, "size_vram": 4 * 1024 ** 3,
+                         "expires_at": "2099-01-01T00:00:00Z"}
+                        for name in stub.loaded
+                    ]})
+                elif self.path == "/api/version":
+                    self._send_json({"version": "0.0.0-stub"})
+                else:
+                    self._send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                stub.connections.add(self.client_address)
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests.append((self.path, payload))
+
+                if self.path == "/api/show":
+                    self._send_json({
+                        "details": {"family": "qwen2", "parameter_size": "7.6B", "quantization_level": "Q4_K_M"},
+                        "model_info": {"qwen2.context_length": 32768}
+                    })
+                    return
+
+                if self.path == "/api/embeddings":
+                    # Harf sayıları: büyük/küçük harf ve noktalama farkları aynı vektörü verir
+                    text = payload.get("prompt", "").lower()
+                    self._send_json({"embedding": [float(text.count(c)) for c in "abcdefghijklmnopqrstuvwxyz"]})
+                    return
+
+                # Ollama gibi: keep_alive 0 modeli boşaltır, istemsiz istek yalnızca yükler
+                model = payload.get("model")
+                if payload.get("keep_alive") == 0:
+                    stub.loaded.pop(model, None)
+                    self._send_json({"model": model, "done": True, "done_reason": "unload"})
+                    return
+                stub.loaded[model] = payload.get("keep_alive")
+                if "prompt" not in payload and "messages" not in payload:
+                    self._send_json({"model": model, "response": "", "done": True, "done_reason": "load"})
+                    return
+
+                time.sleep(stub.delays.get(model, 0))
+
+                if stub.status != 200:
+                    self._send_json({"error": "stub hatası"}, stub.status)
+                    return
+
+                if self.path == "/api/chat":
+                    def body(text):
+                        return {"message": {"role": "assistant", "content": text}}
+                else:
+                    def body(text):
+                        return {"response": text}
+
+                text = "".join(stub.tokens)
+                done = dict(model=payload.get("model"), done=True, **stub.metrics)
+                if not payload.get("stream", True):
+                    self._send_json(dict(body(text), **done))
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for token in stub.tokens:
+                        self._send_chunk(dict(body(token), done=False))
+                        time.sleep(stub.token_delay)
+                    self._send_chunk(dict(body(""), **done))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    stub.aborted += 1
+                    self.close_connection = True
+
+        return Handler
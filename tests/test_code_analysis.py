@@ -0,0 +1,110 @@
+"""
+Tests for code_analysis module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from code_analysis import CodeAnalysisEngine, analyze_source
+
+SOURCE = '''import os
+import subprocess
+from pathlib import Path
+
+
+class Runner:
+    def run(self, command):
+        if command and os.path.exists(command):
+            return subprocess.run(command, shell=True)
+        return eval(command)
+
+    async def stream(self):
+        for line in Path(".").iterdir():
+            print(line)
+
+
+def helper():
+    def inner():
+        return os.system("ls")
+    return inner
+'''
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Small package with a risky module, a clean one and a broken one"""
+    root = tmp_path / "project"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "runner.py").write_text(SOURCE)
+    (root / "pkg" / "clean.py").write_text("import json\n\ndef dump(data):\n    return json.dumps(data)\n")
+    (root / "broken.py").write_text("def broken(:\n")
+    (root / "notes.txt").write_text("eval(x)\n")
+    return root
+
+
+def make_engine(tmp_path):
+    return CodeAnalysisEngine(tmp_path / "analysis.db")
+
+
+class TestVisitor:
+    """Test the single-pass AST visitor"""
+
+    def test_collects_everything_in_one_pass(self):
+        """Imports, qualified definitions, calls, branches and findings come from one traversal"""
+        result = analyze_source("runner.py", SOURCE)
+        assert result.imports == ["os", "subprocess", "pathlib.Path"]
+        assert result.definitions == [("class", "Runner", 6), ("method", "Runner.run", 7),
+                                      ("method", "Runner.stream", 12), ("function", "helper", 17),
+                                      ("function", "helper.inner", 18)]
+        assert result.calls["os.path.exists"] == 1 and result.calls["print"] == 1
+        assert [(finding.line, finding.rule) for finding in result.findings] == [
+            (9, "subprocess.run(shell=True)"), (10, "eval"), (19, "os.system")]
+        # if + and + for
+        assert result.complexity == 4
+
+    def test_syntax_error(self):
+        """Unparseable files are reported instead of raising"""
+        assert analyze_source("broken.py", "def broken(:\n").syntax_error
+
+
+class TestCodeAnalysisEngine:
+    """Test the cached directory analysis"""
+
+    def test_directory_report(self, project, tmp_path):
+        """Only Python files are analyzed and merged into one report"""
+        report = make_engine(tmp_path).analyze(str(project))
+        assert [item.path for item in report.files] == ["broken.py", "pkg/clean.py", "pkg/runner.py"]
+        assert [finding.location for finding in report.findings] == [
+            "pkg/runner.py:9", "pkg/runner.py:10", "pkg/runner.py:19"]
+        assert [item.path for item in report.syntax_errors] == ["broken.py"]
+        assert dict(report.top_imports())["os"] == 1
+        assert report.definition_counts()["method"] == 2
+        assert report.analyzed == 3 and report.cached == 0
+
+    def test_results_are_cached_by_content(self, project, tmp_path):
+        """Unchanged, touched and copied files are not reparsed"""
+        engine = make_engine(tmp_path)
+        engine.analyze(str(project))
+
+        os.utime(project / "pkg" / "clean.py", ns=(0, 10_000_000_000))
+        (project / "pkg" / "copy.py").write_text(SOURCE)
+        (project / "broken.py").write_text("def fixed():\n    pass\n")
+        report = engine.analyze(str(project))
+        assert report.analyzed == 1 and report.cached == 3
+        copied = next(item for item in report.files if item.path == "pkg/copy.py")
+        assert copied.findings[0].location == "pkg/copy.py:9"
+        assert report.syntax_errors == []
+
+    def test_process_pool(self, project, tmp_path, monkeypatch):
+        """Above the threshold files are fanned out to worker processes with identical results"""
+        monkeypatch.setitem(config.ANALYSIS_CONFIG, "process_pool_min_files", 1)
+        monkeypatch.setitem(config.ANALYSIS_CONFIG, "workers", 2)
+        progress = []
+        report = make_engine(tmp_path).analyze(str(project), progress=lambda done, total: progress.append(done))
+        assert progress[-1] == 3
+        assert [finding.rule for finding in report.findings] == ["subprocess.run(shell=True)", "eval", "os.system"]
@@ -0,0 +1,144 @@
+"""
+Tests for code_retriever module
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import code_retriever
+from code_retriever import CodeRetriever, RetrievedChunk
+from context_packer import ContextPacker
+from ollama_client import OllamaError
+
+pytestmark = pytest.mark.skipif(not code_retriever.available(), reason="numpy not installed")
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Project where the relevant code shares no file name with the question"""
+    monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "sweep_interval", 0)
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "security.py").write_text(
+        "import jwt\n\n"
+        "def validate_token(token):\n"
+        "    claims = jwt.decode(token, verify=True)\n"
+        "    return claims['exp'] > now()\n\n"
+        "def hash_password(password):\n"
+        "    return bcrypt.hash(password)\n"
+    )
+    (root / "reports.py").write_text("def monthly_report(rows):\n    return sum(row.amount for row in rows)\n")
+    (root / "ui.js").write_text("function renderButton(label) {\n  return `<button>${label}</button>`;\n}\n")
+    return root
+
+
+def make_retriever(root, tmp_path):
+    return CodeRetriever(root, tmp_path / "index.db")
+
+
+class TestCodeRetriever:
+    """Test chunk embedding and retrieval"""
+
+    def test_retrieves_semantically_close_chunk(self, project, tmp_path):
+        """The token validation chunk ranks first for a question about tokens"""
+        retriever = make_retriever(project, tmp_path)
+        results = retriever.search("where do we validate tokens?")
+        assert results[0].label == "security.py:3-6"
+        assert results == sorted(results, key=lambda chunk: -chunk.similarity)
+
+    def test_only_changed_chunks_are_embedded(self, project, tmp_path):
+        """Unchanged files and unchanged chunks of edited files are not re-embedded"""
+        retriever = make_retriever(project, tmp_path)
+        assert retriever.refresh() == 5
+        assert retriever.refresh() == 0
+
+        source = (project / "security.py").read_text()
+        (project / "security.py").write_text(source.replace("bcrypt.hash", "argon2.hash"))
+        assert retriever.refresh() == 1
+
+        fresh = make_retriever(project, tmp_path)
+        assert fresh.refresh() == 0
+        assert fresh.search("password hashing")[0].path == "security.py"
+
+    def test_time_budget_defers_embedding(self, project, tmp_path, monkeypatch):
+        """Files and chunks left over when the budget runs out are processed on the next refresh"""
+        class Clock:
+            """Advances one second per reading"""
+            now = 0.0
+
+            def time(self):
+                self.now += 1.0
+                return self.now
+
+        retriever = make_retriever(project, tmp_path)
+        monkeypatch.setattr(code_retriever, "time", Clock())
+        # Rechunking is cut off too: one file is chunked, nothing is embedded yet
+        assert retriever.refresh(time_budget=1.5) == 0
+        assert retriever.stats()["files"] == 1
+        # With the remaining files chunked, the rest of the budget embeds one file's chunks
+        assert retriever.refresh(time_budget=3.5) == 1
+        assert retriever.stats()["files"] == 3
+        monkeypatch.setattr(code_retriever, "time", time)
+        retriever.refresh(time_budget=None)
+        assert retriever.stats()["embedded_chunks"] == 5
+
+    def test_ivf_partitioning(self, project, tmp_path, monkeypatch):
+        """With IVF enabled only the nearest lists are probed and results stay correct"""
+        monkeypatch.setitem(config.RETRIEVAL_CONFIG, "ivf_min_chunks", 10)
+        monkeypatch.setitem(config.RETRIEVAL_CONFIG, "ivf_probe", 2)
+        for i in range(30):
+            (project / f"module_{i}.py").write_text(f"def compute_{i}(value):\n    return value * {i}\n")
+        retriever = make_retriever(project, tmp_path)
+        results = retriever.search("validate token claims")
+        assert retriever.stats()["ivf_lists"] == 5
+        assert results[0].path == "security.py"
+
+    def test_falls_back_to_hashing_when_ollama_is_down(self, project, tmp_path, monkeypatch):
+        """An unreachable embedding model switches to the offline hashing embedder"""
+        monkeypatch.setitem(config.RETRIEVAL_CONFIG, "embedder", "ollama")
+
+        def fail(model, text):
+            raise OllamaError("bağlantı yok")
+
+        monkeypatch.setattr(code_retriever.model_catalog, "has", lambda name: True)
+        monkeypatch.setattr(code_retriever.ollama_client, "embed", fail)
+        retriever = make_retriever(project, tmp_path)
+        results = retriever.search("validate token")
+        assert retriever.stats()["embedder"].startswith("hashing")
+        assert results[0].path == "security.py"
+
+        # Probing Ollama again keeps the hashing vectors in memory: nothing is reloaded or re-embedded
+        loaded = []
+        original = retriever._load_vectors
+        monkeypatch.setattr(retriever, "_load_vectors", lambda hashes: (loaded.extend(
+            retriever._embedder for digest in hashes if digest not in retriever._vectors), original(hashes)))
+        retriever._ollama_failed_at = 0.0
+        embedded = retriever.embedded
+        assert retriever.search("validate token")[0].path == "security.py"
+        assert retriever.embedded == embedded
+        assert retriever.stats()["embedder"].startswith("hashing")
+        assert loaded and not any(embedder.startswith("hashing") for embedder in loaded)
+
+    def test_missing_embedding_model_uses_hashing(self, project, tmp_path, monkeypatch):
+        """An embedding model that is not installed is never called"""
+        monkeypatch.setitem(config.RETRIEVAL_CONFIG, "embedder", "ollama")
+        asked = []
+        monkeypatch.setattr(code_retriever.model_catalog, "has", lambda name: asked.append(name) or False)
+        monkeypatch.setattr(code_retriever.ollama_client, "embed", lambda model, text: pytest.fail("embed called"))
+        retriever = make_retriever(project, tmp_path)
+        assert retriever.search("validate token")[0].path == "security.py"
+        retriever.search("hash password")
+        assert asked == ["nomic-embed-text:latest"]
+
+    def test_packer_uses_retrieved_chunks(self, project):
+        """A retrieved chunk is packed even without lexical overlap with the question"""
+        retrieved = [RetrievedChunk("ui.js", 1, 3, 0.9)]
+        packed = ContextPacker().pack("arayüz öğesi", "m", directory=str(project), budget=400,
+                                      include_overview=False, retrieved=retrieved)
+        assert [chunk.label for chunk in packed.chunks] == ["ui.js:1-3"]
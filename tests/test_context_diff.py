@@ -0,0 +1,94 @@
+"""
+Tests for context_diff module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from context_diff import ContextDiffTracker, diff_text
+
+SOURCE = "".join(f"def function_{i}(value):\n    return value + {i}\n\n" for i in range(40))
+
+
+class TestDiffText:
+    """Test the hunk generation"""
+
+    def test_small_edit_yields_hunk(self):
+        """A one-line edit becomes a single hunk much smaller than the file"""
+        delta = diff_text("app.py", SOURCE, SOURCE.replace("value + 7", "value * 7"))
+        assert delta.kind == "diff"
+        assert (delta.added, delta.removed) == (1, 1)
+        assert delta.hunks.startswith("@@ -20,7 +20,7 @@")
+        assert "-    return value + 7" in delta.hunks and "+    return value * 7" in delta.hunks
+        assert delta.tokens < delta.full_tokens / 4
+        assert "DEĞİŞİKLİK: app.py" in delta.render()
+
+    def test_large_rewrite_falls_back_to_full(self):
+        """A diff larger than the configured share of the file asks for a full resend"""
+        delta = diff_text("app.py", SOURCE, SOURCE.replace("value", "item"))
+        assert delta.kind == "full"
+
+    def test_unchanged(self):
+        """Identical content produces no hunks"""
+        delta = diff_text("app.py", SOURCE, SOURCE)
+        assert delta.kind == "unchanged" and delta.tokens == 0
+
+
+class TestContextDiffTracker:
+    """Test remembering what was sent"""
+
+    def test_delta_is_relative_to_remembered_text(self, tmp_path):
+        """Edits accumulate against the remembered content until it is remembered again"""
+        path = tmp_path / "app.py"
+        path.write_text(SOURCE)
+        tracker = ContextDiffTracker()
+        assert tracker.delta(str(path)) is None
+        assert tracker.remember(str(path))
+
+        path.write_text(SOURCE.replace("value + 1\n", "value - 1\n"))
+        path.write_text(path.read_text().replace("value + 30", "value - 30"))
+        assert tracker.delta(str(path)).removed == 2
+
+        tracker.remember(str(path))
+        assert tracker.delta(str(path)).kind == "unchanged"
+        tracker.forget()
+        assert tracker.delta(str(path)) is None
+
+
+class TestPromptIntegration:
+    """Test the conversation prefix keeping the sent file and adding hunks"""
+
+    @pytest.fixture
+    def shell(self, tmp_path, monkeypatch):
+        import llm_shell
+        from context_diff import context_diffs
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "sweep_interval", 0)
+        monkeypatch.setattr(llm_shell, "_context_prefix_cache", dict(llm_shell._context_prefix_cache, key=None,
+                                                                     delta=None))
+        context_diffs.forget()
+        yield llm_shell
+        context_diffs.forget()
+
+    def test_edit_keeps_prefix_and_sends_hunks(self, shell, tmp_path, monkeypatch):
+        """A small edit reuses the prefix byte for byte; a large one rebuilds it"""
+        path = tmp_path / "app.py"
+        path.write_text(SOURCE)
+        prefix = shell.create_context_prefix("app.py", include_project=False)
+        assert shell.create_relevant_context("neden?", "app.py") == "neden?"
+
+        path.write_text(SOURCE.replace("value + 7", "value * 7"))
+        assert shell.create_context_prefix("app.py", include_project=False) == prefix
+        message = shell.create_relevant_context("neden?", "app.py")
+        assert "+    return value * 7" in message and message.endswith("KULLANICI SORUSU: neden?")
+
+        monkeypatch.setitem(config.CONTEXT_DIFF_CONFIG, "max_ratio", 0.01)
+        path.write_text(SOURCE.replace("value + 8", "value * 8"))
+        rebuilt = shell.create_context_prefix("app.py", include_project=False)
+        assert rebuilt != prefix and "value * 8" in rebuilt
+        assert shell.create_relevant_context("neden?", "app.py") == "neden?"
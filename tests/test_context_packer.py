@@ -0,0 +1,112 @@
+"""
+Tests for context_packer module
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from context_packer import ContextPacker, tokenize
+from model_catalog import model_catalog
+from tests.ollama_stub import OllamaStub
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Project with one relevant module and several unrelated ones"""
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "billing.py").write_text(
+        '"""Fatura modülü"""\n\n'
+        "def calculate_invoice_total(items):\n"
+        "    return sum(item.price for item in items)\n\n"
+        "def send_invoice(invoice):\n"
+        "    mailer.send(invoice)\n"
+    )
+    for i in range(5):
+        (root / f"misc_{i}.py").write_text(f"def helper_{i}():\n    return {i}\n" + "# dolgu\n" * 50)
+    (root / "main.py").write_text("from billing import send_invoice\n")
+    monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "sweep_interval", 0)
+    return root
+
+
+class TestContextPacker:
+    """Test cases for relevance-ranked, token-budgeted packing"""
+
+    def test_tokenize_splits_identifiers(self):
+        """snake_case and camelCase identifiers also yield their parts"""
+        terms = tokenize("calculateInvoiceTotal ve send_invoice nedir")
+        assert {"calculateinvoicetotal", "calculate", "invoice", "total", "send_invoice", "send"} <= set(terms)
+        assert "nedir" not in terms
+
+    def test_relevant_chunks_are_selected(self, project):
+        """Chunks that mention the question's symbols win; unrelated files are left out"""
+        packed = ContextPacker().pack("calculate_invoice_total neden yanlış?", "m", directory=str(project),
+                                      budget=400)
+        labels = [chunk.label for chunk in packed.chunks]
+        assert labels[0] == "billing.py:3-5"
+        assert not any(label.startswith("misc_") for label in labels)
+        assert "calculate_invoice_total" in packed.text
+        assert packed.used_tokens <= packed.budget
+
+    def test_budget_is_respected(self, project):
+        """Nothing beyond the budget is included, and the overview is capped"""
+        packer = ContextPacker()
+        packed = packer.pack("invoice", "m", directory=str(project), budget=60)
+        assert packed.used_tokens <= 60
+        assert "DOSYA YAPISI" in packed.text
+
+        tight = packer.pack("invoice", "m", directory=str(project), budget=10, include_overview=False)
+        assert tight.chunks == []
+
+    def test_current_file_without_query(self, project, monkeypatch):
+        """Stable prefix mode packs the selected file top to bottom, then the files importing it"""
+        packed = ContextPacker().pack(None, "m", current_file=str(project / "billing.py"),
+                                      directory=str(project), budget=1000, include_overview=False, label="önek")
+        assert [chunk.label for chunk in packed.chunks] == ["billing.py:1-2", "billing.py:3-5", "billing.py:6-7",
+                                                            "main.py:1-1"]
+
+        monkeypatch.setitem(config.IMPORT_GRAPH_CONFIG, "enabled", False)
+        packed = ContextPacker().pack(None, "m", current_file=str(project / "billing.py"),
+                                      directory=str(project), budget=1000, include_overview=False, label="önek")
+        assert [chunk.path for chunk in packed.chunks] == ["billing.py"] * 3
+
+    def test_exclude_and_report(self, project):
+        """Already-sent chunks are skipped and the report lists what was packed"""
+        packer = ContextPacker()
+        packed = packer.pack("send_invoice", "m", directory=str(project), budget=400, include_overview=False,
+                             exclude=["billing.py:6-7"])
+        assert "billing.py:6-7" not in [chunk.label for chunk in packed.chunks]
+        assert packer.last["soru"] is packed
+        assert packed.summary().startswith(f"{len(packed.chunks)} parça")
+        assert packed.rows()[0]['tokens'] > 0
+
+    def test_recently_modified_ranked_first(self, project):
+        """File overview prefers recently modified files"""
+        old = time.time() - 30 * 24 * 3600
+        for path in project.iterdir():
+            os.utime(path, (old, old))
+        os.utime(project / "misc_3.py", None)
+        packer = ContextPacker()
+        from project_index import get_project_index
+        ranked = packer.rank_files(get_project_index(str(project)).files())
+        assert ranked[0].path == "main.py"  # Giriş dosyası
+        assert ranked[1].path == "misc_3.py"
+
+    def test_budget_from_model_context(self, monkeypatch):
+        """Budget follows the model's num_ctx from /api/show"""
+        with OllamaStub(models=["m"]) as stub:
+            monkeypatch.setitem(config.OLLAMA_CONFIG, "base_url", stub.url)
+            monkeypatch.setitem(config.CONVERSATION_CONFIG, "num_ctx", 65536)
+            model_catalog.invalidate()
+            try:
+                expected = int((32768 - config.CONVERSATION_CONFIG["response_reserve"])
+                               * config.CONTEXT_PACKER_CONFIG["budget_ratio"])
+                assert ContextPacker().budget_for("m") == expected
+            finally:
+                model_catalog.invalidate()
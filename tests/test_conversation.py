@@ -0,0 +1,113 @@
+"""
+Tests for conversation module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from conversation import Conversation, ConversationManager, estimate_tokens
+from ollama_client import OllamaClient
+from tests.ollama_stub import OllamaStub
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Ollama stub server wired into config"""
+    with OllamaStub(models=["m"]) as server:
+        monkeypatch.setitem(config.OLLAMA_CONFIG, "base_url", server.url)
+        yield server
+
+
+class TestConversation:
+    """Test cases for the token-budgeted conversation window"""
+
+    def test_history_is_sent(self, stub):
+        """Previous turns are sent before the new user message"""
+        conversation = Conversation("sys")
+        conversation.add_exchange("soru 1", "yanıt 1")
+        messages, options = conversation.build_messages("m", "soru 2")
+
+        assert [m["role"] for m in messages] == ["system", "user", "assistant", "user"]
+        assert messages[-1]["content"] == "soru 2"
+        assert options == {"num_ctx": 8192}
+
+    def test_context_length_caps_window(self, stub, monkeypatch):
+        """Model context length from /api/show caps num_ctx"""
+        monkeypatch.setitem(config.CONVERSATION_CONFIG, "num_ctx", 65536)
+        assert Conversation().context_window("m") == 32768
+
+    def test_old_turns_are_summarized(self, stub, monkeypatch):
+        """Turns outside the budget are dropped into the summary"""
+        monkeypatch.setitem(config.CONVERSATION_CONFIG, "num_ctx", 1200)
+        monkeypatch.setitem(config.CONVERSATION_CONFIG, "response_reserve", 1000)
+        conversation = Conversation()
+        for i in range(5):
+            conversation.add_exchange(f"soru {i}\n" + "x" * 200, f"yanıt {i}")
+
+        messages, _ = conversation.build_messages("m", "yeni")
+        assert sum(estimate_tokens(m["content"]) + 4 for m in messages) <= 200
+        assert conversation.turn_count < 5
+        assert "soru 0" in messages[0]["content"]
+        assert "soru 4" in messages[-3]["content"]
+
+    def test_context_prefix_is_stable(self, stub):
+        """Context goes into the system message and stays byte-identical across turns"""
+        conversation = Conversation("sys")
+        first, _ = conversation.build_messages("m", "soru 1", context="PROJE")
+        conversation.add_exchange("soru 1", "yanıt 1")
+        second, _ = conversation.build_messages("m", "soru 2", context="PROJE")
+
+        assert first[0] == second[0] == {"role": "system", "content": "sys\n\nPROJE"}
+        assert second[:2] == first[:2] and second[-1]["content"] == "soru 2"
+
+    def test_round_trip(self):
+        """to_dict/from_dict and legacy history keep the messages"""
+        conversation = Conversation("sys")
+        conversation.add_exchange("a", "b")
+        restored = Conversation.from_dict(conversation.to_dict())
+        assert restored.messages == conversation.messages
+
+        legacy = Conversation.from_history([{"user": "a", "assistant": "b", "model": "m"}])
+        assert legacy.messages == conversation.messages
+
+    def test_manager_sessions(self):
+        """Sessions are isolated and can be reset"""
+        manager = ConversationManager()
+        manager.get("a").add_exchange("x", "y")
+        assert manager.get("b").turn_count == 0
+        manager.reset("a")
+        assert manager.get("a").turn_count == 0
+
+
+    def test_manager_evicts_idle_and_excess_sessions(self, monkeypatch):
+        """Client-chosen session ids cannot grow the manager without bound"""
+        monkeypatch.setitem(config.CONVERSATION_CONFIG, "max_sessions", 3)
+        manager = ConversationManager()
+        manager.pinned.add("cli")
+        manager.get("cli")
+        for i in range(5):
+            manager.get(f"s{i}")
+        assert list(manager.sessions) == ["cli", "s3", "s4"]
+
+        monkeypatch.setitem(config.CONVERSATION_CONFIG, "session_ttl", -1)
+        manager.get("new")
+        assert list(manager.sessions) == ["cli", "new"]
+
+
+def test_client_chat(stub):
+    """chat and chat_stream talk to /api/chat"""
+    client = OllamaClient(base_url=stub.url)
+    messages = [{"role": "user", "content": "hi"}]
+    assert client.chat("m", messages)["message"]["content"] == "Merhaba dünya"
+    chunks = list(client.chat_stream("m", messages))
+    assert "".join(chunk["message"]["content"] for chunk in chunks) == "Merhaba dünya"
+    assert stub.requests[-1] == ("/api/chat", {"model": "m", "messages": messages, "stream": True})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
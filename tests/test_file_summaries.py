@@ -0,0 +1,146 @@
+"""
+Tests for file_summaries module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import file_summaries
+from file_summaries import SummaryStore
+from ollama_client import OllamaError
+
+SOURCE = "".join(f"def function_{i}(value):\n    return value + {i}\n\n" for i in range(50))
+
+
+class FakeModel:
+    """Records summarization prompts instead of calling Ollama"""
+
+    def __init__(self, error=None):
+        self.prompts = []
+        self.error = error
+
+    def generate(self, model, prompt, system=None, options=None):
+        if self.error:
+            raise self.error
+        self.prompts.append(prompt)
+        return {"response": f"- özet {len(self.prompts)}"}
+
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setitem(config.FILE_SUMMARY_CONFIG, "enabled", True)
+    fake = FakeModel()
+    monkeypatch.setattr(file_summaries, "ollama_client", fake)
+    return fake
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SummaryStore(tmp_path / "summaries.db")
+
+
+class TestSummaryStore:
+    """Test content-addressed summaries generated in the background"""
+
+    def test_summarized_once_in_background(self, model, store, tmp_path):
+        """The first lookup schedules the summary; later lookups reuse it without a model call"""
+        path = tmp_path / "big.py"
+        path.write_text(SOURCE)
+        (tmp_path / "small.py").write_text("x = 1\n")
+        assert store.get(str(tmp_path / "small.py")) is None
+
+        assert store.get(str(path)) is None
+        assert store.wait(5)
+        summary = store.get(str(path))
+        assert (summary.text, summary.lines, summary.stale) == ("- özet 1", 150, False)
+        assert store.get(str(path)).text == "- özet 1"
+        assert len(model.prompts) == 1
+
+        # Copies and reverted edits share the stored summary
+        (tmp_path / "copy.py").write_text(SOURCE)
+        assert store.get(str(tmp_path / "copy.py")).text == "- özet 1"
+        assert len(model.prompts) == 1
+
+    def test_changed_file_serves_previous_summary_until_regenerated(self, model, store, tmp_path):
+        """After an edit the old summary is marked stale and replaced once the new one is ready"""
+        path = tmp_path / "big.py"
+        path.write_text(SOURCE)
+        store.summarize(str(path))
+
+        path.write_text(SOURCE.replace("value + 7", "value * 7"))
+        stale = store.get(str(path))
+        assert stale.stale and stale.text == "- özet 1"
+        assert store.wait(5)
+        fresh = store.get(str(path))
+        assert not fresh.stale and fresh.text == "- özet 2"
+        assert store.stats()["stored"] == 2
+
+    def test_reverted_edit_reuses_unreferenced_summary(self, model, store, tmp_path, monkeypatch):
+        """Summaries no file uses are kept up to keep_unreferenced, newest first"""
+        path = tmp_path / "big.py"
+        path.write_text(SOURCE)
+        store.summarize(str(path))
+        path.write_text(SOURCE.replace("value + 7", "value * 7"))
+        store.summarize(str(path))
+
+        path.write_text(SOURCE)
+        assert store.get(str(path)).text == "- özet 1"
+        assert len(model.prompts) == 2
+
+        monkeypatch.setitem(config.FILE_SUMMARY_CONFIG, "keep_unreferenced", 0)
+        path.write_text(SOURCE.replace("value + 8", "value * 8"))
+        store.summarize(str(path))
+        assert store.stats()["stored"] == 1
+
+    def test_background_work_respects_memory_budget(self, model, store, tmp_path, monkeypatch):
+        """The worker backs off instead of evicting models when the summary model does not fit"""
+        monkeypatch.setattr(file_summaries.model_residency, "fits", lambda name: False)
+        path = tmp_path / "big.py"
+        path.write_text(SOURCE)
+        assert store.get(str(path)) is None
+        assert store.wait(5)
+        assert model.prompts == []
+        assert "bütçe" in store.stats()["last_error"]
+
+    def test_large_files_are_summarized_by_section(self, model, store, tmp_path, monkeypatch):
+        """Files larger than one request are summarized section by section with line ranges"""
+        monkeypatch.setitem(config.FILE_SUMMARY_CONFIG, "section_chars", 2000)
+        path = tmp_path / "big.py"
+        path.write_text(SOURCE)
+        summary = store.summarize(str(path))
+        assert len(model.prompts) == 2
+        assert "(satır 1-" in model.prompts[0]
+        assert summary.text.startswith("Satır 1-") and "\n\nSatır " in summary.text
+
+    def test_model_failure_backs_off(self, model, store, tmp_path):
+        """An unreachable model stops new background work for the retry interval"""
+        model.error = OllamaError("bağlantı yok")
+        path = tmp_path / "big.py"
+        path.write_text(SOURCE)
+        assert store.get(str(path)) is None
+        assert store.wait(5)
+        assert store.stats()["last_error"] == "bağlantı yok"
+
+        model.error = None
+        assert store.get(str(path)) is None
+        assert store.wait(5)
+        assert model.prompts == []
+
+    def test_file_context_uses_summary(self, model, tmp_path, monkeypatch):
+        """Oversized context files are described by their summary instead of truncated text"""
+        import llm_shell
+        store = SummaryStore(tmp_path / "summaries.db")
+        monkeypatch.setattr(llm_shell, "summary_store", store)
+        path = tmp_path / "big.py"
+        path.write_text(SOURCE)
+
+        assert "... ve 50 satır daha" in llm_shell.get_file_context(str(path))
+        assert store.wait(5)
+        context = llm_shell.get_file_context(str(path))
+        assert "ÖZET" in context and "- özet 1" in context and "function_0" not in context
+        assert "function_0" in llm_shell.get_file_context(str(path), summarize=False)
@@ -0,0 +1,107 @@
+"""
+Tests for file_walker module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from file_walker import FileWalker, IgnoreRules, parse_ignore
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Project tree with nested ignore files and vendored directories"""
+    root = tmp_path / "project"
+    for directory in ["src/gen", "docs", "logs", "node_modules/pkg", ".git"]:
+        (root / directory).mkdir(parents=True)
+    files = {
+        ".gitignore": "*.log\n/logs/\n!keep.log\n",
+        "main.py": "", "debug.log": "", "keep.log": "",
+        "src/app.py": "", "src/.cortexignore": "gen/\n", "src/gen/out.py": "",
+        "docs/guide.md": "", "logs/today.txt": "",
+        "node_modules/pkg/index.js": "", ".git/HEAD": "",
+    }
+    for path, content in files.items():
+        (root / path).write_text(content)
+    return root
+
+
+def ignored(lines, path, is_dir=False):
+    return IgnoreRules(parse_ignore(lines)).is_ignored(path, is_dir)
+
+
+class TestIgnoreRules:
+    """Test cases for gitignore pattern semantics"""
+
+    def test_basename_and_anchored_patterns(self):
+        """Slash-free patterns match at any depth; others are anchored"""
+        assert ignored(["*.pyc"], "a/b/c.pyc")
+        assert ignored(["/build"], "build", True)
+        assert not ignored(["/build"], "src/build", True)
+        assert ignored(["doc/*.txt"], "doc/a.txt")
+        assert not ignored(["doc/*.txt"], "doc/sub/a.txt")
+
+    def test_double_star_negation_and_dir_only(self):
+        """** spans directories, ! re-includes, trailing / only matches dirs"""
+        assert ignored(["**/cache"], "a/b/cache", True)
+        assert ignored(["out/**"], "out/x/y.py")
+        assert not ignored(["*.log", "!keep.log"], "keep.log")
+        assert ignored(["tmp/"], "tmp", True)
+        assert not ignored(["tmp/"], "tmp", False)
+
+
+class TestFileWalker:
+    """Test cases for the shared directory walker"""
+
+    def test_applies_ignore_files_and_prunes(self, project):
+        """Nested .gitignore/.cortexignore rules and vendored dirs are honoured"""
+        result = FileWalker().walk(project)
+        assert sorted(entry.path for entry in result.files) == [
+            "docs/guide.md", "keep.log", "main.py", "src/app.py"
+        ]
+        assert sorted(entry.path for entry in result.dirs) == ["docs", "src"]
+        assert not result.truncated
+
+    def test_single_stat_metadata(self, project):
+        """Entries carry size, mtime and depth from one scandir pass"""
+        (project / "src" / "app.py").write_text("print(1)\n")
+        entry = next(e for e in FileWalker().walk(project).files if e.path == "src/app.py")
+        assert entry.size == 9
+        assert entry.depth == 1
+        assert entry.mtime_ns == os.stat(project / "src" / "app.py").st_mtime_ns
+
+    def test_list_dir_inherits_rules(self, project):
+        """Listing a subdirectory on its own still applies ancestor rules"""
+        (project / "src" / "trace.log").write_text("")
+        listing = FileWalker().list_dir(project, "src")
+        assert [entry.name for entry in listing.files] == ["app.py"]
+        assert listing.dirs == []
+        assert listing.ignore_state[0][0] == ".cortexignore"
+
+    def test_budgets(self, project, monkeypatch):
+        """Depth and entry budgets stop the walk and flag truncation"""
+        walker = FileWalker()
+        assert [entry.path for entry in walker.walk(project, max_depth=0).files] == ["keep.log", "main.py"]
+
+        result = walker.walk(project, max_entries=3)
+        assert result.truncated
+        assert len(result.entries) <= 3
+
+    def test_parallel_matches_sequential(self, tmp_path, monkeypatch):
+        """Wide levels scanned on the thread pool give the same result"""
+        root = tmp_path / "wide"
+        for i in range(40):
+            (root / f"d{i:02d}").mkdir(parents=True)
+            (root / f"d{i:02d}" / "f.py").write_text("")
+        walker = FileWalker()
+        monkeypatch.setitem(config.WALKER_CONFIG, "parallel_threshold", 1000)
+        sequential = [entry.path for entry in walker.walk(root).files]
+        monkeypatch.setitem(config.WALKER_CONFIG, "parallel_threshold", 4)
+        parallel = [entry.path for entry in walker.walk(root).files]
+        assert parallel == sequential
+        assert len(parallel) == 40
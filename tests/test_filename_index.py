@@ -0,0 +1,108 @@
+"""
+Tests for filename_index module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from filename_index import FilenameIndex, fuzzy_match
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Project whose file names share characters in different orders"""
+    monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "sweep_interval", 0)
+    root = tmp_path / "project"
+    for path in ["llm_shell.py", "shell/helpers.py", "src/models/user_model.py", "src/views/user_list.js",
+                 "docs/SHELL.md", "tests/test_llm_shell.py"]:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text("\n")
+    return root
+
+
+def bump_mtime(path):
+    """Directory mtime granularity can be coarse: force a visible change"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+
+
+class TestFuzzyMatch:
+    """Test the fzf-style scorer"""
+
+    def test_boundaries_and_consecutive_matches_score_higher(self):
+        """Word starts and runs beat scattered characters; non-subsequences do not match"""
+        # The shortest window ending at the first complete match
+        assert fuzzy_match("ls", "llm_shell.py")[1] == [1, 4]
+        assert fuzzy_match("shell", "llm_shell.py")[0] > fuzzy_match("shell", "sxhxexlxl.py")[0]
+        assert fuzzy_match("um", "user_model.py")[0] > fuzzy_match("um", "museum.py")[0]
+        assert fuzzy_match("xyz", "llm_shell.py") is None
+
+    def test_non_ascii_paths_keep_offsets(self):
+        """Characters whose lowercase form is longer ('İ') do not shift match positions"""
+        assert fuzzy_match("py", "İstanbul.py")[1] == [9, 10]
+        assert fuzzy_match("iz", "İzmir_rapor.py")[1] == [0, 1]
+
+
+class TestFilenameIndex:
+    """Test the in-memory filename index"""
+
+    def test_fuzzy_ranking(self, project):
+        """Basename matches rank first; every space-separated term must match"""
+        index = FilenameIndex(project)
+        results = index.search("llmsh")
+        assert [match.path for match in results] == ["llm_shell.py", "tests/test_llm_shell.py"]
+        assert results[0].highlighted().startswith("[bold yellow]l[/bold yellow]")
+        # Equal word-start scores are broken by path length
+        assert [match.path for match in index.search("shell")] == [
+            "llm_shell.py", "docs/SHELL.md", "shell/helpers.py", "tests/test_llm_shell.py"]
+        assert [match.path for match in index.search("user js")] == ["src/views/user_list.js"]
+        assert [match.path for match in index.search("model", directory="src")] == ["src/models/user_model.py"]
+        assert [match.path for match in index.search("user", extensions=[".py"])] == ["src/models/user_model.py"]
+
+    def test_non_ascii_paths(self, project):
+        """Turkish file names are searchable and highlighted at the right characters"""
+        (project / "İzmir_rapor.py").write_text("\n")
+        results = FilenameIndex(project).search("izrap")
+        assert results[0].path == "İzmir_rapor.py"
+        assert results[0].highlighted().startswith("[bold yellow]İ[/bold yellow][bold yellow]z[/bold yellow]")
+        assert "İzmir_rapor.py" in [match.path for match in FilenameIndex(project).search("py")]
+
+    def test_incremental_updates(self, project):
+        """Added and removed files are applied from the project index journal without a rebuild"""
+        index = FilenameIndex(project)
+        index.search("x")
+        assert index.stats()["rebuilds"] == 1
+
+        (project / "src" / "models" / "invoice.py").write_text("\n")
+        (project / "llm_shell.py").unlink()
+        bump_mtime(project / "src" / "models")
+        bump_mtime(project)
+        assert index.refresh() == 2
+        assert [match.path for match in index.search("invoice")] == ["src/models/invoice.py"]
+        assert [match.path for match in index.search("llmsh")] == ["tests/test_llm_shell.py"]
+        assert index.stats() == {"paths": 6, "trigrams": index.stats()["trigrams"],
+                                 "generation": index.generation, "rebuilds": 1}
+
+    def test_glob_and_completion(self, project):
+        """Wildcards match basenames; completion walks the path trie"""
+        index = FilenameIndex(project)
+        assert index.glob("*.py") == ["llm_shell.py", "shell/helpers.py", "src/models/user_model.py",
+                                      "tests/test_llm_shell.py"]
+        assert index.glob("user_*", directory="src/views") == ["src/views/user_list.js"]
+        assert index.complete("src/") == ["src/models/", "src/views/"]
+        assert index.complete("sh") == ["shell/"]
+
+    def test_candidates_are_narrowed_on_large_trees(self, project, monkeypatch):
+        """With more matches than the candidate budget, contiguous basename hits are kept"""
+        monkeypatch.setitem(config.FILENAME_INDEX_CONFIG, "max_candidates", 3)
+        monkeypatch.setitem(config.FILENAME_INDEX_CONFIG, "rescore", 3)
+        for i in range(20):
+            (project / "src" / f"s_h_e_l_l_{i}.py").write_text("\n")
+        index = FilenameIndex(project)
+        assert [match.path for match in index.search("shell", limit=3)] == [
+            "llm_shell.py", "docs/SHELL.md", "tests/test_llm_shell.py"]
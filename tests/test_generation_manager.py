@@ -0,0 +1,115 @@
+"""
+Tests for generation_manager module
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from generation_manager import GenerationManager
+from ollama_client import OllamaClient
+from request_coalescer import request_coalescer
+from tests.ollama_stub import OllamaStub
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def messages(text="merhaba"):
+    return [{"role": "user", "content": text}]
+
+
+class TestGenerationManager:
+    """Test cases for generation handles"""
+
+    def test_cancel_by_owner(self):
+        """Only the owner's generations are cancelled"""
+        manager = GenerationManager()
+        first = manager.start("a", "m")
+        second = manager.start("b", "m")
+
+        assert manager.cancel("a") == 1
+        assert first.cancelled and not second.cancelled
+        assert [handle.owner for handle in manager.active()] == ["b"]
+
+        manager.finish(second)
+        assert manager.active() == []
+        assert manager.cancel() == 0
+
+    def test_partial_text_kept(self):
+        """Chunks appended before cancel stay on the handle"""
+        handle = GenerationManager().start("a", "m")
+        handle.append("Mer")
+        handle.append("haba")
+        handle.cancel()
+        assert handle.text == "Merhaba"
+
+
+class TestStreamCancellation:
+    """Test cases for aborting in-flight streams"""
+
+    @pytest.fixture
+    def stub(self):
+        with OllamaStub(tokens=["x"] * 50, token_delay=0.1) as server:
+            yield server
+
+    def test_cancel_closes_upstream(self, stub):
+        """Cancelling the only subscriber closes the Ollama connection"""
+        client = OllamaClient(base_url=stub.url)
+        handle = GenerationManager().start("a", "qwen2.5:7b")
+        start = time.time()
+        for data in client.chat_stream("qwen2.5:7b", messages(), cancel=handle.cancel_event):
+            handle.append(data["message"]["content"])
+            if len(handle.text) == 3:
+                handle.cancel()
+
+        assert handle.text == "xxx"
+        assert time.time() - start < 2
+        wait_for(lambda: stub.aborted == 1 and request_coalescer.in_flight() == 0)
+        client.close()
+
+    def test_cancel_without_coalescing(self, stub, monkeypatch):
+        """The uncoalesced path stops reading and closes the connection too"""
+        monkeypatch.setitem(config.OLLAMA_CONFIG, "coalesce", False)
+        client = OllamaClient(base_url=stub.url)
+        cancel = threading.Event()
+        received = 0
+        for _ in client.chat_stream("qwen2.5:7b", messages(), cancel=cancel):
+            received += 1
+            cancel.set()
+
+        assert received == 1
+        wait_for(lambda: stub.aborted == 1)
+        client.close()
+
+    def test_other_subscribers_continue(self, stub):
+        """A cancelled subscriber does not stop a coalesced stream others still read"""
+        stub.tokens = ["x"] * 10
+        client = OllamaClient(base_url=stub.url)
+        results = {}
+
+        def reader():
+            results["full"] = [data for data in client.chat_stream("qwen2.5:7b", messages("ortak"))]
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        wait_for(lambda: request_coalescer.in_flight() == 1)
+
+        cancel = threading.Event()
+        for _ in client.chat_stream("qwen2.5:7b", messages("ortak"), cancel=cancel):
+            cancel.set()
+
+        thread.join(timeout=5)
+        assert results["full"][-1]["done"]
+        assert stub.aborted == 0
+        client.close()
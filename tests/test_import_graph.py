@@ -0,0 +1,82 @@
+"""
+Tests for import_graph module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from import_graph import ImportGraph
+from context_packer import ContextPacker
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Package with absolute, relative and JS imports"""
+    monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "sweep_interval", 0)
+    root = tmp_path / "project"
+    (root / "app").mkdir(parents=True)
+    (root / "web").mkdir()
+    (root / "app" / "__init__.py").write_text("")
+    (root / "app" / "models.py").write_text("import os\n\nclass Invoice:\n    pass\n")
+    (root / "app" / "billing.py").write_text(
+        "from .models import Invoice\nfrom app.models import os\nfrom . import utils\n\n"
+        "def total_amount(invoice):\n    return utils.rounded(invoice)\n")
+    (root / "app" / "utils.py").write_text("def rounded(value):\n    return round(value, 2)\n")
+    (root / "main.py").write_text("from app.billing import total_amount\n\nprint(total_amount(None))\n")
+    (root / "web" / "index.js").write_text("import api from './api'\nconst React = require('react')\n")
+    (root / "web" / "api.js").write_text("export default function fetchInvoices() {}\n")
+    return root
+
+
+class TestImportGraph:
+    """Test edge resolution and neighbourhood ranking"""
+
+    def test_edges_and_weights(self, project):
+        """Relative, absolute and JS imports resolve to project files; externals are ignored"""
+        graph = ImportGraph(project)
+        assert graph.imports_of(str(project / "app" / "billing.py")) == {"app/models.py": 2, "app/utils.py": 1}
+        assert graph.importers_of(str(project / "app" / "billing.py")) == {"main.py": 1}
+        assert graph.imports_of(str(project / "web" / "index.js")) == {"web/api.js": 1}
+
+    def test_neighborhood_is_ranked(self, project):
+        """Direct neighbours rank by edge weight; indirect ones follow within the hop limit"""
+        graph = ImportGraph(project)
+        neighbors = graph.neighbors(str(project / "app" / "billing.py"))
+        assert [(n.path, n.relation) for n in neighbors] == [
+            ("app/models.py", "imports"), ("app/utils.py", "imports"), ("main.py", "imported_by")]
+        assert neighbors[0].score > neighbors[1].score
+
+        two_hops = graph.neighbors(str(project / "main.py"))
+        assert [(n.path, n.hops) for n in two_hops] == [
+            ("app/billing.py", 1), ("app/models.py", 2), ("app/utils.py", 2)]
+        assert [n.path for n in graph.neighbors(str(project / "main.py"), hops=1)] == ["app/billing.py"]
+
+    def test_only_changed_files_are_resolved(self, project):
+        """Edits re-resolve the edited file; a new module re-resolves only the imports waiting for it"""
+        graph = ImportGraph(project)
+        assert graph.refresh() == 7
+        assert graph.refresh() == 0
+
+        (project / "main.py").write_text("from app.billing import total_amount\nimport reports\n")
+        assert graph.refresh() == 1
+        (project / "reports.py").write_text("from app import utils\n")
+        assert graph.refresh() == 2
+        assert graph.imports_of(str(project / "main.py")) == {"app/billing.py": 1, "reports.py": 1}
+
+        (project / "app" / "utils.py").unlink()
+        graph.refresh()
+        assert graph.importers_of(str(project / "app" / "utils.py")) == {}
+        # from . import utils now names the package itself
+        assert graph.imports_of(str(project / "app" / "billing.py")) == {"app/models.py": 2, "app/__init__.py": 1}
+
+    def test_packer_includes_neighbors_of_current_file(self, project):
+        """With a focus file set, the files it imports are packed without lexical overlap"""
+        packed = ContextPacker().pack(None, "m", str(project / "app" / "billing.py"), directory=str(project),
+                                      budget=400, include_overview=False)
+        assert list(dict.fromkeys(chunk.path for chunk in packed.chunks)) == ["app/billing.py", "app/models.py", "app/utils.py",
+                                                          "main.py"]
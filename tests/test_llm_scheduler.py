@@ -0,0 +1,139 @@
+"""
+Tests for llm_scheduler module
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_scheduler import (
+    LLMScheduler, SchedulerFullError, SchedulerCancelledError, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+)
+
+
+class TestLLMScheduler:
+    """Test cases for the fair LLM scheduler"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.scheduler = LLMScheduler(default_concurrency=1, model_concurrency={}, client_weights={},
+                                      max_queue=10)
+        self.order = []
+        self.release = threading.Event()
+        self.threads = []
+
+    def teardown_method(self):
+        self.release.set()
+        for thread in self.threads:
+            thread.join(2)
+
+    def hold_slot(self):
+        """Occupy the only slot of model m until release is set"""
+        started = threading.Event()
+
+        def run():
+            with self.scheduler.slot("m", "holder"):
+                started.set()
+                self.release.wait(2)
+
+        self.start(run)
+        started.wait(1)
+
+    def start(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def enqueue(self, name, client, priority=PRIORITY_INTERACTIVE, **kwargs):
+        """Queue a request and wait until the scheduler has seen it"""
+        waiting = self.scheduler.stats().get("m", {}).get("waiting", 0)
+        self.start(lambda: self.scheduler.run(lambda: self.order.append(name), "m", client, priority, **kwargs))
+        while self.scheduler.stats()["m"]["waiting"] == waiting:
+            time.sleep(0.01)
+
+    def drain(self):
+        self.release.set()
+        for thread in self.threads:
+            thread.join(2)
+
+    def test_concurrency_limit(self):
+        """No more than the model's limit run at once"""
+        active = []
+        peak = []
+
+        def work():
+            active.append(1)
+            peak.append(len(active))
+            time.sleep(0.05)
+            active.pop()
+
+        for i in range(4):
+            self.start(lambda: self.scheduler.run(work, "m", f"c{i}"))
+        self.drain()
+        assert max(peak) == 1
+
+    def test_interactive_before_batch(self):
+        """Interactive requests jump ahead of queued batch work"""
+        self.hold_slot()
+        self.enqueue("batch", "a", PRIORITY_BATCH)
+        self.enqueue("chat", "b", PRIORITY_INTERACTIVE)
+        self.drain()
+        assert self.order == ["chat", "batch"]
+
+    def test_fair_between_clients(self):
+        """A client with a backlog does not starve a newcomer"""
+        self.hold_slot()
+        for i in range(3):
+            self.enqueue(f"a{i}", "a")
+        self.enqueue("b0", "b")
+        self.drain()
+        assert self.order.index("b0") < self.order.index("a1")
+
+    def test_queue_position_reported(self):
+        """on_update reports queue position and then start (position 0)"""
+        updates = []
+        self.hold_slot()
+        self.enqueue("x", "a")
+        self.enqueue("y", "b", on_update=lambda position, wait: updates.append(position))
+        self.drain()
+        assert updates == [2, 1, 0]
+
+    def test_cancel_while_queued(self):
+        """Setting the cancel event dequeues a waiting request without waiting for a slot"""
+        self.hold_slot()
+        cancel = threading.Event()
+        errors = []
+
+        def run():
+            try:
+                self.scheduler.run(lambda: self.order.append("cancelled"), "m", "a", cancel=cancel)
+            except SchedulerCancelledError as e:
+                errors.append(e)
+
+        self.start(run)
+        while self.scheduler.stats()["m"]["waiting"] == 0:
+            time.sleep(0.01)
+        cancel.set()
+        self.threads[-1].join(2)
+        assert len(errors) == 1 and self.scheduler.stats()["m"]["waiting"] == 0
+
+        self.enqueue("next", "b")
+        self.drain()
+        assert self.order == ["next"]
+
+    def test_queue_full(self):
+        """Requests beyond max_queue are rejected"""
+        self.scheduler.max_queue = 1
+        self.hold_slot()
+        self.enqueue("x", "a")
+        with pytest.raises(SchedulerFullError):
+            self.scheduler.run(lambda: None, "m", "b")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
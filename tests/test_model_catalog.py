@@ -0,0 +1,69 @@
+"""
+Tests for model_catalog module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from model_catalog import ModelCatalog
+from tests.ollama_stub import OllamaStub
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Ollama stub server wired into config"""
+    with OllamaStub(models=["a:1", "b:2"]) as server:
+        monkeypatch.setitem(config.OLLAMA_CONFIG, "base_url", server.url)
+        yield server
+
+
+def count(stub, path):
+    return len([p for p, _ in stub.requests if p == path])
+
+
+class TestModelCatalog:
+    """Test cases for the TTL model catalog"""
+
+    def test_models_cached_within_ttl(self, stub):
+        """Repeated lookups hit /api/tags once"""
+        catalog = ModelCatalog(ttl=60)
+        assert catalog.names() == ["a:1", "b:2"]
+        assert catalog.has("a:1")
+        catalog.names()
+        assert count(stub, "/api/tags") == 1
+        assert catalog.get("a:1").parameter_size == "7.6B"
+
+    def test_refresh_and_unknown_model(self, stub):
+        """Explicit refresh and unknown models re-fetch the list"""
+        catalog = ModelCatalog(ttl=60)
+        catalog.names()
+        catalog.names(refresh=True)
+        assert not catalog.has("missing")
+        assert count(stub, "/api/tags") == 3
+
+    def test_details_loaded_once(self, stub):
+        """/api/show details are fetched lazily and kept"""
+        catalog = ModelCatalog(ttl=60)
+        assert catalog.context_length("a:1") == 32768
+        assert catalog.context_length("a:1") == 32768
+        assert catalog.get("a:1").quantization_level == "Q4_K_M"
+        assert count(stub, "/api/show") == 1
+
+    def test_health_probe(self, stub, monkeypatch):
+        """Health check is a cached HTTP probe"""
+        catalog = ModelCatalog(health_ttl=60)
+        assert catalog.is_healthy()
+        assert catalog.is_healthy()
+        assert count(stub, "/api/version") == 1
+
+        monkeypatch.setitem(config.OLLAMA_CONFIG, "base_url", "http://127.0.0.1:9")
+        assert not catalog.is_healthy(force=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,107 @@
+"""
+Tests for model_residency module
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import ollama_client as ollama_client_module
+from model_residency import ResidencyManager, PIN_KEEP_ALIVE
+from model_catalog import model_catalog
+from ollama_client import build_chat_payload
+from tests.ollama_stub import OllamaStub
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Ollama stub server wired into config"""
+    with OllamaStub(models=["a:1", "b:1", "c:1"]) as server:
+        monkeypatch.setitem(config.OLLAMA_CONFIG, "base_url", server.url)
+        monkeypatch.setitem(config.RESIDENCY_CONFIG, "ps_ttl", 0)
+        monkeypatch.setattr(ollama_client_module, "_keep_alive_policy", None)
+        model_catalog.invalidate()
+        yield server
+    model_catalog.invalidate()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+class TestResidencyManager:
+    """Test cases for preload, pinning and eviction"""
+
+    def test_load_and_unload(self, stub):
+        """Loaded models are reported via /api/ps"""
+        manager = ResidencyManager()
+        assert manager.load("a:1")
+        assert manager.is_loaded("a:1")
+        assert stub.loaded["a:1"] == config.RESIDENCY_CONFIG["keep_alive"]
+        assert manager.loaded()["a:1"].size_gb == 4
+
+        assert manager.unload("a:1")
+        assert not manager.is_loaded("a:1")
+
+    def test_pin_keeps_model_forever(self, stub):
+        """Pinned models get keep_alive -1 on every request"""
+        manager = ResidencyManager()
+        assert manager.pin("a:1")
+        assert stub.loaded["a:1"] == PIN_KEEP_ALIVE
+
+        ollama_client_module.set_keep_alive_policy(manager.keep_alive)
+        payload = build_chat_payload("a:1", [], None, False, keep_alive="5m")
+        assert payload["keep_alive"] == PIN_KEEP_ALIVE
+
+        manager.unpin("a:1")
+        assert stub.loaded["a:1"] == config.RESIDENCY_CONFIG["keep_alive"]
+        assert build_chat_payload("a:1", [], None, False, keep_alive="5m")["keep_alive"] == "5m"
+
+    def test_budget_evicts_least_recently_used(self, stub, monkeypatch):
+        """Loading past the memory budget unloads the oldest unpinned model"""
+        monkeypatch.setitem(config.RESIDENCY_CONFIG, "memory_budget_gb", 10)
+        manager = ResidencyManager()
+        assert manager.pin("a:1")
+        assert manager.load("b:1")
+        assert manager.load("c:1")
+        assert set(stub.loaded) == {"a:1", "c:1"}
+
+        # Evicting every unpinned model would not be enough: refuse without evicting
+        monkeypatch.setitem(config.RESIDENCY_CONFIG, "memory_budget_gb", 5)
+        assert not manager.pin("b:1")
+        assert set(stub.loaded) == {"a:1", "c:1"}
+        assert manager.pinned == {"a:1"}
+
+    def test_fits_never_evicts(self, stub, monkeypatch):
+        """fits() only reports whether a model fits next to the loaded ones"""
+        manager = ResidencyManager()
+        assert manager.fits("a:1")
+        monkeypatch.setitem(config.RESIDENCY_CONFIG, "memory_budget_gb", 10)
+        assert manager.load("a:1")
+        assert manager.fits("a:1") and manager.fits("b:1")
+        assert manager.load("b:1")
+        assert not manager.fits("c:1")
+        assert set(stub.loaded) == {"a:1", "b:1"}
+
+    def test_predict_next_from_usage(self, stub):
+        """Most used installed models are predicted first"""
+        manager = ResidencyManager()
+        usage = {"b:1": 5, "c:1": 9, "missing:1": 20, "a:1": 1}
+        assert manager.predict_next(usage) == ["c:1"]
+        assert manager.predict_next(usage, exclude=["c:1"]) == ["b:1"]
+
+    def test_warm_up_preloads_in_background(self, stub):
+        """Default, active and predicted models are loaded at startup"""
+        manager = ResidencyManager()
+        queued = manager.warm_up("a:1", ["b:1", "a:1"], {"c:1": 3})
+        assert queued == ["a:1", "b:1", "c:1"]
+        wait_for(lambda: set(stub.loaded) == {"a:1", "b:1", "c:1"} and not manager.stats()['preloading'])
+        assert ollama_client_module._keep_alive_policy == manager.keep_alive
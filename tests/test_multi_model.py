@@ -0,0 +1,87 @@
+"""
+Tests for multi_model module
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from multi_model import MultiModelManager
+from tests.ollama_stub import OllamaStub
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Ollama stub server wired into config"""
+    with OllamaStub(delays={"slow": 2}) as server:
+        monkeypatch.setitem(config.OLLAMA_CONFIG, "base_url", server.url)
+        yield server
+
+
+class TestQueryAllModels:
+    """Test cases for the async multi-model fan-out"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.manager = MultiModelManager()
+        self.manager.active_models = {"a": "fast-a", "b": "fast-b"}
+
+    def test_query_all_models(self, stub):
+        """Every active model gets a response"""
+        results = self.manager.query_all_models("hi")
+        assert set(results) == {"a", "b"}
+        assert all(result.error is None for result in results.values())
+        assert results["a"].response == "Merhaba dünya"
+        assert self.manager.performance_metrics["a"]["total_queries"] == 1
+
+    def test_ollama_metrics_recorded(self, stub):
+        """Token counts and timings come from Ollama's response counters"""
+        result = self.manager.query_all_models("hi")["a"]
+        assert result.prompt_tokens == 12
+        assert result.token_count == 2
+        assert result.ttft == pytest.approx(0.3)
+        assert result.load_time == pytest.approx(0.1)
+        assert result.tokens_per_second == pytest.approx(4.0)
+
+        metrics = self.manager.performance_metrics["a"]
+        assert metrics["avg_ttft"] == pytest.approx(0.3)
+        assert metrics["tokens_per_second"] == pytest.approx(4.0)
+
+    def test_per_model_timeout(self, stub):
+        """A slow model times out without blocking the others"""
+        self.manager.active_models["s"] = "slow"
+        start = time.time()
+        results = self.manager.query_all_models("hi", timeout=0.5)
+        assert time.time() - start < 2
+        assert "Zaman aşımı" in results["s"].error
+        assert results["a"].error is None
+
+    def test_bounded_concurrency(self, stub):
+        """Concurrency limit serialises requests"""
+        self.manager.active_models = {"s1": "slow", "s2": "slow"}
+        start = time.time()
+        asyncio.run(self.manager.query_all_models_async("hi", max_concurrency=1, timeout=5))
+        assert time.time() - start >= 4
+
+    def test_cancellation(self, stub):
+        """Cancelling the fan-out cancels in-flight model queries"""
+        self.manager.active_models = {"s": "slow"}
+
+        async def run():
+            task = asyncio.ensure_future(self.manager.query_all_models_async("hi"))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,85 @@
+"""
+Tests for ollama_client module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from ollama_client import OllamaClient, OllamaError, OllamaConnectionError
+from tests.ollama_stub import OllamaStub
+
+
+class TestOllamaClient:
+    """Test cases for the pooled Ollama client"""
+
+    def test_list_models(self):
+        """Model list comes from /api/tags"""
+        with OllamaStub(models=["a:1", "b:2"]) as stub:
+            client = OllamaClient(base_url=stub.url)
+            names = [model["name"] for model in client.list_models()]
+            assert names == ["a:1", "b:2"]
+
+    def test_model_digest(self, monkeypatch):
+        """Untagged names resolve to :latest and digests are refetched after the catalog TTL"""
+        with OllamaStub(models=["qwen:latest", "b:2"]) as stub:
+            client = OllamaClient(base_url=stub.url)
+            assert client.model_digest("qwen") == "sha-qwen:latest"
+            assert client.model_digest("b:2") == "sha-b:2"
+            assert client.model_digest("missing") is None
+            tags = [path for path, _ in stub.requests if path == "/api/tags"]
+            assert len(tags) == 1
+
+            monkeypatch.setitem(config.MODEL_CATALOG_CONFIG, "ttl", 0)
+            client.model_digest("qwen")
+            assert len([path for path, _ in stub.requests if path == "/api/tags"]) == 2
+
+    def test_generate_sends_options(self):
+        """Options and system prompt are sent in the Ollama format"""
+        with OllamaStub() as stub:
+            client = OllamaClient(base_url=stub.url)
+            data = client.generate("m", "hi", system="sys", options={"temperature": 0})
+            assert data["response"] == "Merhaba dünya"
+
+            path, payload = stub.requests[-1]
+            assert path == "/api/generate"
+            assert payload["stream"] is False
+            assert payload["system"] == "sys"
+            assert payload["options"] == {"temperature": 0}
+
+    def test_generate_stream(self):
+        """Stream yields NDJSON chunks until done"""
+        with OllamaStub(tokens=["a", "b", "c"]) as stub:
+            client = OllamaClient(base_url=stub.url)
+            chunks = list(client.generate_stream("m", "hi"))
+            assert "".join(chunk["response"] for chunk in chunks) == "abc"
+            assert chunks[-1]["done"] is True
+
+    def test_connection_is_reused(self):
+        """Consecutive calls share one keep-alive connection"""
+        with OllamaStub() as stub:
+            client = OllamaClient(base_url=stub.url)
+            for _ in range(3):
+                client.generate("m", "hi")
+            assert len(stub.connections) == 1
+
+    def test_http_error(self):
+        """HTTP errors are raised as OllamaError"""
+        with OllamaStub(status=404) as stub:
+            client = OllamaClient(base_url=stub.url, max_retries=0)
+            with pytest.raises(OllamaError):
+                client.generate("m", "hi")
+
+    def test_connection_error(self):
+        """Unreachable servers raise OllamaConnectionError"""
+        client = OllamaClient(base_url="http://127.0.0.1:9", max_retries=0)
+        with pytest.raises(OllamaConnectionError):
+            client.list_models()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,135 @@
+"""
+Tests for ollama_router module
+"""
+
+import pytest
+import sys
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from ollama_router import OllamaRouter
+from ollama_client import OllamaClient, OllamaConnectionError, OllamaTimeoutError
+from tests.ollama_stub import OllamaStub
+
+
+def dead_url():
+    """Address of a port nobody listens on"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
+
+
+def chat_messages(text):
+    return [{"role": "user", "content": text}]
+
+
+class TestOllamaRouter:
+    """Test cases for multi-backend routing"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.router = OllamaRouter()
+        self.client = OllamaClient(max_retries=0, router=self.router)
+
+    def teardown_method(self):
+        self.client.close()
+
+    def use_backends(self, monkeypatch, *urls):
+        monkeypatch.setitem(config.OLLAMA_CONFIG, "backends", list(urls))
+
+    def test_default_backend_is_base_url(self):
+        """Without configured backends the router uses base_url"""
+        backends = self.router.backends()
+        assert [backend.url for backend in backends] == [config.OLLAMA_CONFIG["base_url"].rstrip("/")]
+
+    def test_list_models_merges_backends(self, monkeypatch):
+        """Model list is the union of all backends"""
+        with OllamaStub(models=["a:1"]) as first, OllamaStub(models=["b:1"]) as second:
+            self.use_backends(monkeypatch, first.url, second.url)
+            names = {model["name"] for model in self.client.list_models()}
+        assert names == {"a:1", "b:1"}
+
+    def test_model_aware_placement(self, monkeypatch):
+        """Requests go to the backend that has the model"""
+        with OllamaStub(models=["a:1"]) as first, OllamaStub(models=["b:1"]) as second:
+            self.use_backends(monkeypatch, first.url, second.url)
+            self.client.generate("b:1", "merhaba", use_cache=False)
+            self.client.generate("a:1", "merhaba", use_cache=False)
+
+            assert [path for path, _ in second.requests if path == "/api/generate"] == ["/api/generate"]
+            assert [path for path, _ in first.requests if path == "/api/generate"] == ["/api/generate"]
+
+    def test_failover_marks_backend_down(self, monkeypatch):
+        """A backend that refuses connections is skipped and put on cooldown"""
+        down = dead_url()
+        with OllamaStub() as stub:
+            self.use_backends(monkeypatch, down, stub.url)
+            for index in range(3):
+                data = self.client.generate("qwen2.5:7b", f"soru {index}", use_cache=False)
+                assert data["response"] == "Merhaba dünya"
+
+        stats = {entry["url"]: entry for entry in self.router.stats()}
+        assert not stats[down]["healthy"]
+        assert stats[down]["failures"] >= 1
+        assert stats[stub.url]["outstanding"] == 0
+
+    def test_timeout_does_not_demote_backend(self, monkeypatch):
+        """A slow but reachable backend times out without being put on cooldown"""
+        with OllamaStub(delays={"qwen2.5:7b": 1.0}) as slow:
+            self.use_backends(monkeypatch, slow.url)
+            client = OllamaClient(max_retries=0, router=self.router, timeout=0.2)
+            try:
+                with pytest.raises(OllamaTimeoutError):
+                    client.generate("qwen2.5:7b", "merhaba", use_cache=False)
+            finally:
+                client.close()
+
+        stats = {entry["url"]: entry for entry in self.router.stats()}
+        assert stats[slow.url]["healthy"] and stats[slow.url]["failures"] == 0
+        assert stats[slow.url]["outstanding"] == 0
+
+    def test_all_backends_down_raises(self, monkeypatch):
+        """Connection errors surface once every backend has failed"""
+        self.use_backends(monkeypatch, dead_url(), dead_url())
+        with pytest.raises(OllamaConnectionError):
+            self.client.generate("qwen2.5:7b", "merhaba", use_cache=False)
+
+    def test_least_outstanding_spreads_load(self, monkeypatch):
+        """Concurrent requests are spread over idle backends"""
+        delays = {"qwen2.5:7b": 0.3}
+        with OllamaStub(delays=delays) as first, OllamaStub(delays=delays) as second:
+            self.use_backends(monkeypatch, first.url, second.url)
+            self.client.list_models()
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(lambda i: self.client.generate("qwen2.5:7b", f"soru {i}", use_cache=False),
+                              range(4)))
+
+            first_count = len([path for path, _ in first.requests if path == "/api/generate"])
+            second_count = len([path for path, _ in second.requests if path == "/api/generate"])
+        assert first_count == 2
+        assert second_count == 2
+
+    def test_sticky_session(self, monkeypatch):
+        """Turns of one conversation stay on the same backend"""
+        with OllamaStub() as first, OllamaStub() as second:
+            self.use_backends(monkeypatch, first.url, second.url)
+            for turn in range(3):
+                self.client.chat("qwen2.5:7b", chat_messages(f"tur {turn}"), session_id="oturum")
+
+            chats = [len([path for path, _ in stub.requests if path == "/api/chat"]) for stub in (first, second)]
+        assert sorted(chats) == [0, 3]
+
+    def test_stream_releases_backend(self, monkeypatch):
+        """Finished streams do not leave outstanding requests behind"""
+        with OllamaStub() as stub:
+            self.use_backends(monkeypatch, stub.url)
+            chunks = list(self.client.chat_stream("qwen2.5:7b", chat_messages("merhaba")))
+        assert chunks[-1]["done"]
+        assert self.router.stats()[0]["outstanding"] == 0
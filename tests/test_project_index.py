@@ -0,0 +1,156 @@
+"""
+Tests for project_index module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from project_index import ProjectIndex, get_project_index
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Small project tree with hidden and excluded directories"""
+    monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "sweep_interval", 0)
+    root = tmp_path / "project"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / ".git").mkdir()
+    (root / "node_modules" / "lib").mkdir(parents=True)
+    (root / "main.py").write_text("print('hi')\n")
+    (root / "README.md").write_text("# proje\n")
+    (root / ".env").write_text("SECRET=1\n")
+    (root / "src" / "app.js").write_text("console.log(1)\n")
+    (root / "src" / "pkg" / "util.py").write_text("x = 1\n")
+    (root / ".git" / "HEAD").write_text("ref\n")
+    (root / "node_modules" / "lib" / "index.js").write_text("\n")
+    return root
+
+
+def bump_mtime(path):
+    """Directory mtime granularity can be coarse: force a visible change"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+
+
+class TestProjectIndex:
+    """Test cases for the persistent incremental file index"""
+
+    def test_initial_scan_skips_hidden_and_excluded(self, project, tmp_path):
+        """Hidden files and excluded directories are not indexed"""
+        index = ProjectIndex(project, tmp_path / "index.db")
+        assert index.paths() == ["README.md", "main.py", "src/app.js", "src/pkg/util.py"]
+        assert index.get(project / "main.py").language == "python"
+        assert index.get(project / "src" / "app.js").language == "javascript"
+
+    def test_incremental_updates(self, project, tmp_path):
+        """Only directories whose mtime changed are rescanned"""
+        index = ProjectIndex(project, tmp_path / "index.db")
+        index.refresh()
+        scans = index.scans
+        assert index.refresh() == 0
+
+        (project / "src" / "new.py").write_text("y = 2\n")
+        bump_mtime(project / "src")
+        assert index.refresh() == 1
+        assert "src/new.py" in index.paths()
+
+        (project / "src" / "pkg" / "util.py").unlink()
+        (project / "docs").mkdir()
+        (project / "docs" / "guide.md").write_text("rehber\n")
+        bump_mtime(project / "src" / "pkg")
+        bump_mtime(project)
+        index.refresh()
+        assert "src/pkg/util.py" not in index.paths()
+        assert "docs/guide.md" in index.paths()
+        assert index.scans - scans == 4  # src, src/pkg, root, docs
+
+    def test_removed_directory_is_dropped(self, project, tmp_path):
+        """Deleting a directory removes its whole subtree"""
+        index = ProjectIndex(project, tmp_path / "index.db")
+        index.refresh()
+        (project / "src" / "pkg" / "util.py").unlink()
+        (project / "src" / "pkg").rmdir()
+        bump_mtime(project / "src")
+        assert index.paths() == ["README.md", "main.py", "src/app.js"]
+        assert "src/pkg" not in index.directories()
+
+    def test_persistent_across_instances(self, project, tmp_path):
+        """A new instance loads the index from disk without a full scan"""
+        ProjectIndex(project, tmp_path / "index.db").refresh()
+
+        reopened = ProjectIndex(project, tmp_path / "index.db")
+        assert reopened.paths() == ["README.md", "main.py", "src/app.js", "src/pkg/util.py"]
+        assert reopened.scans == 0
+
+        (project / "extra.txt").write_text("ek\n")
+        bump_mtime(project)
+        assert "extra.txt" in ProjectIndex(project, tmp_path / "index.db").paths()
+
+    def test_file_cap_is_recorded(self, project, tmp_path, monkeypatch):
+        """Hitting max_files marks the index truncated, also after reopening"""
+        monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "max_files", 2)
+        index = ProjectIndex(project, tmp_path / "index.db")
+        assert len(index.paths()) <= 2
+        assert index.stats()["truncated"]
+        reopened = ProjectIndex(project, tmp_path / "index.db")
+        reopened.refresh()
+        assert reopened.scans == 0 and reopened.truncated
+
+        monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "max_files", 100)
+        index.refresh(force=True)
+        assert len(index.paths()) == 4 and not index.truncated
+        reopened = ProjectIndex(project, tmp_path / "index.db")
+        reopened.refresh()
+        assert not reopened.truncated
+
+    def test_find_and_tree(self, project, tmp_path):
+        """Name search and nested tree are served from the index"""
+        index = ProjectIndex(project, tmp_path / "index.db")
+        assert [entry.path for entry in index.find("util")] == ["src/pkg/util.py"]
+        assert [entry.path for entry in index.find("", extensions=[".js"])] == ["src/app.js"]
+        assert [entry.path for entry in index.find("", extensions=[".JS", ".Md"])] == ["README.md", "src/app.js"]
+        assert [entry.path for entry in index.find("main.py", exact=True)] == ["main.py"]
+
+        tree = index.tree(max_depth=1)
+        src = next(child for child in tree['children'] if child['name'] == 'src')
+        assert src['type'] == 'directory' and src['children'] == []
+        assert [child['name'] for child in index.tree()['children']] == ["src", "README.md", "main.py"]
+
+    def test_change_journal(self, project, tmp_path):
+        """Added and removed paths are reported per generation; a full rescan forces a rebuild"""
+        index = ProjectIndex(project, tmp_path / "index.db")
+        assert index.changes_since(-1) is None
+        generation = index.generation
+        assert index.changes_since(generation) == (generation, set(), set())
+
+        (project / "src" / "new.py").write_text("y = 2\n")
+        bump_mtime(project / "src")
+        index.refresh()
+        (project / "main.py").unlink()
+        bump_mtime(project)
+        index.refresh()
+        assert index.changes_since(generation) == (generation + 2, {"src/new.py"}, {"main.py"})
+
+        index.refresh(force=True)
+        assert index.changes_since(generation) is None
+
+    def test_shared_instance_per_root(self, project):
+        """get_project_index returns one index per directory"""
+        assert get_project_index(str(project)) is get_project_index(str(project / "src" / ".."))
+
+    def test_gitignore_edit_rescans_subtree(self, project, tmp_path):
+        """Editing .gitignore in place re-applies the rules to the index"""
+        index = ProjectIndex(project, tmp_path / "index.db")
+        assert "src/pkg/util.py" in index.paths()
+
+        (project / ".gitignore").write_text("pkg/\n")
+        assert "src/pkg/util.py" not in index.paths()
+        assert "src/pkg/util.py" not in ProjectIndex(project, tmp_path / "index.db").paths()
+
+        (project / ".gitignore").write_text("# boş\n")
+        assert "src/pkg/util.py" in index.paths()
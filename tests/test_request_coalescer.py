@@ -0,0 +1,110 @@
+"""
+Tests for request_coalescer module
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from request_coalescer import RequestCoalescer
+from ollama_client import OllamaClient
+from tests.ollama_stub import OllamaStub
+
+
+class TestRequestCoalescer:
+    """Test cases for single-flight coalescing"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.coalescer = RequestCoalescer()
+        self.calls = 0
+
+    def slow_call(self):
+        self.calls += 1
+        time.sleep(0.3)
+        return {"response": "ok"}
+
+    def test_concurrent_calls_share_result(self):
+        """Identical concurrent calls run the function once"""
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: self.coalescer.run("k", self.slow_call), range(5)))
+        assert self.calls == 1
+        assert all(result == {"response": "ok"} for result in results)
+        assert self.coalescer.in_flight() == 0
+
+    def test_errors_reach_every_caller(self):
+        """A failing call raises in every waiter"""
+        def failing():
+            time.sleep(0.2)
+            raise RuntimeError("boom")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(self.coalescer.run, "k", failing) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    def test_stream_replays_to_late_subscriber(self):
+        """Late subscribers receive the stream from the beginning"""
+        release = threading.Event()
+
+        def upstream():
+            yield "a"
+            release.wait(2)
+            yield "b"
+
+        first = self.coalescer.stream("k", upstream)
+        assert next(first) == "a"
+        second = self.coalescer.stream("k", upstream)
+        release.set()
+        assert list(first) == ["b"]
+        assert list(second) == ["a", "b"]
+        assert self.coalescer.coalesced == 1
+
+    def test_unread_subscription_is_released(self):
+        """A subscriber that never iterates still leaves on close() or garbage collection"""
+        release = threading.Event()
+        stopped = threading.Event()
+
+        def upstream():
+            try:
+                yield "a"
+                release.wait(2)
+                yield "b"
+            finally:
+                stopped.set()
+
+        first = self.coalescer.stream("k", upstream)
+        second = self.coalescer.stream("k", upstream)
+        first.close()
+        del second
+        assert self.coalescer.in_flight() == 0
+        release.set()
+        assert stopped.wait(2)
+
+
+def test_client_coalesces_identical_requests():
+    """Concurrent identical requests reach Ollama once"""
+    with OllamaStub(delays={"slow": 0.5}) as stub:
+        client = OllamaClient(base_url=stub.url)
+
+        def stream_text(_):
+            return "".join(chunk.get("response", "") for chunk in client.generate_stream("slow", "hi"))
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            generated = list(pool.map(lambda _: client.generate("slow", "hi")["response"], range(4)))
+            streamed = list(pool.map(stream_text, range(4)))
+
+    assert generated == ["Merhaba dünya"] * 4
+    assert streamed == ["Merhaba dünya"] * 4
+    assert len([path for path, _ in stub.requests if path == "/api/generate"]) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,92 @@
+"""
+Tests for response_cache module
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from response_cache import ResponseCache
+from ollama_client import OllamaClient
+from tests.ollama_stub import OllamaStub
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache"""
+
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.data = {"model": "m", "response": "yanıt", "done": True}
+
+    def test_key_is_stable_and_content_addressed(self):
+        """Same request gives the same key, any field change gives another"""
+        key = ResponseCache.make_key("m", "p", "s", {"temperature": 0}, "sha-m")
+        assert key == ResponseCache.make_key("m", "p", "s", {"temperature": 0}, "sha-m")
+        assert key != ResponseCache.make_key("m", "p", "s", {"temperature": 0}, "sha-other")
+        assert key != ResponseCache.make_key("m", "p", "other", {"temperature": 0}, "sha-m")
+        assert key == ResponseCache.make_key("m", "p", "s", {"temperature": 0}, "sha-m",
+                                             {"keep_alive": "5m"})
+
+    def test_lru_eviction(self, tmp_path):
+        """Memory tier evicts the least recently used entry"""
+        cache = ResponseCache(db_path=str(tmp_path / "c.db"), memory_entries=2)
+        cache.put("a", "m", self.data)
+        cache.put("b", "m", self.data)
+        cache.get("a")
+        cache.put("c", "m", self.data)
+        assert list(cache._memory) == ["a", "c"]
+
+    def test_disk_limit(self, tmp_path):
+        """Disk tier keeps at most disk_entries rows"""
+        cache = ResponseCache(db_path=str(tmp_path / "c.db"), disk_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, "m", self.data)
+        assert cache.stats()["disk_entries"] == 2
+
+    def test_ttl(self, tmp_path):
+        """Expired entries are not returned"""
+        cache = ResponseCache(db_path=str(tmp_path / "c.db"), ttl=0.05)
+        cache.put("a", "m", self.data)
+        time.sleep(0.1)
+        assert cache.get("a") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        """Disk tier survives a restart"""
+        db_path = str(tmp_path / "c.db")
+        ResponseCache(db_path=db_path).put("a", "m", self.data)
+        assert ResponseCache(db_path=db_path).get("a") == self.data
+
+    def test_should_cache(self, monkeypatch):
+        """Only deterministic requests are cached unless forced"""
+        monkeypatch.setitem(config.RESPONSE_CACHE_CONFIG, "cache_nondeterministic", False)
+        assert ResponseCache.should_cache({"temperature": 0})
+        assert not ResponseCache.should_cache({"temperature": 0.7})
+        assert ResponseCache.should_cache({"temperature": 0.7}, use_cache=True)
+        assert not ResponseCache.should_cache({"temperature": 0}, use_cache=False)
+        monkeypatch.setitem(config.RESPONSE_CACHE_CONFIG, "cache_nondeterministic", True)
+        assert ResponseCache.should_cache({"temperature": 0.7})
+
+
+def test_client_serves_repeat_from_cache():
+    """A repeated temperature-0 request does not reach Ollama"""
+    with OllamaStub() as server:
+        client = OllamaClient(base_url=server.url)
+        first = client.generate("qwen2.5:7b", "merhaba", options={"temperature": 0})
+        second = client.generate("qwen2.5:7b", "merhaba", options={"temperature": 0})
+        streamed = "".join(chunk.get("response", "") for chunk in
+                           client.generate_stream("qwen2.5:7b", "merhaba", options={"temperature": 0}))
+        client.close()
+
+    assert "cached" not in first
+    assert second["cached"] is True
+    assert second["response"] == first["response"] == streamed
+    assert len([path for path, _ in server.requests if path == "/api/generate"]) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,138 @@
+"""
+Tests for semantic_cache module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+
+import config
+import semantic_cache
+from ollama_client import OllamaError
+from semantic_cache import SemanticCache, SemanticHit, HashingEmbedder, VectorIndex
+from tests.ollama_stub import OllamaStub
+
+
+@pytest.fixture
+def semantic_config(monkeypatch):
+    """Semantic cache enabled with the offline hashing embedder"""
+    monkeypatch.setitem(config.SEMANTIC_CACHE_CONFIG, "enabled", True)
+    monkeypatch.setitem(config.SEMANTIC_CACHE_CONFIG, "embedder", "hashing")
+    return config.SEMANTIC_CACHE_CONFIG
+
+
+QUESTION = "Python'da bir liste nasıl sıralanır?"
+
+
+class TestVectorIndex:
+    """Test cases for the numpy cosine index"""
+
+    def test_search_and_growth(self):
+        """Index grows past its capacity and returns the closest vector"""
+        index = VectorIndex(dim=3, capacity=1)
+        for entry_id, vector in enumerate([[1, 0, 0], [0, 1, 0], [0, 0, 1]]):
+            index.add(entry_id, np.array(vector, dtype=np.float32))
+        found_id, score = index.search(np.array([0, 0.6, 0.8], dtype=np.float32))
+        assert found_id == 2
+        assert score == pytest.approx(0.8)
+
+        assert index.remove_oldest(2) == [0, 1]
+        assert index.search(np.array([1, 0, 0], dtype=np.float32)) == (2, 0.0)
+
+
+class TestSemanticCache:
+    """Test cases for near-duplicate question lookup"""
+
+    def test_disabled_by_default(self, tmp_path):
+        """Nothing is stored or returned unless enabled"""
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.store("m", QUESTION, None, "sorted() kullan")
+        assert cache.lookup("m", QUESTION) is None
+
+    def test_near_duplicate_hit(self, tmp_path, semantic_config):
+        """Case and punctuation variants hit; unrelated questions miss"""
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.store("m", QUESTION, "sistem", "sorted() kullan")
+
+        hit = cache.lookup("m", "python'da bir liste nasıl sıralanır", "sistem")
+        assert hit.response == "sorted() kullan"
+        assert hit.prompt == QUESTION
+        assert hit.similarity > semantic_config["threshold"]
+
+        assert cache.lookup("m", "Docker imajı nasıl oluşturulur?", "sistem") is None
+        assert cache.stats()['hits'] == 1
+
+    def test_scoped_by_model_and_system(self, tmp_path, semantic_config):
+        """Answers are not shared across models or system prompts"""
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.store("m", QUESTION, "sistem", "yanıt")
+        assert cache.lookup("n", QUESTION, "sistem") is None
+        assert cache.lookup("m", QUESTION, "başka sistem") is None
+
+    def test_persistent_and_bounded(self, tmp_path, semantic_config, monkeypatch):
+        """Entries survive a restart and the oldest are evicted past max_entries"""
+        monkeypatch.setitem(semantic_config, "max_entries", 2)
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.store("m", "birinci soru burada", None, "1")
+        cache.store("m", "ikinci soru burada", None, "2")
+        cache.store("m", "üçüncü soru burada", None, "3")
+
+        reopened = SemanticCache(tmp_path / "cache.db")
+        assert reopened.stats()['entries'] == 2
+        assert reopened.lookup("m", "üçüncü soru burada").response == "3"
+        hit = reopened.lookup("m", "birinci soru burada")
+        assert hit is None or hit.response != "1"
+
+    def test_ollama_embeddings(self, tmp_path, semantic_config, monkeypatch):
+        """Ollama /api/embeddings is used when reachable"""
+        monkeypatch.setitem(semantic_config, "embedder", "ollama")
+        with OllamaStub() as stub:
+            monkeypatch.setitem(config.OLLAMA_CONFIG, "base_url", stub.url)
+            cache = SemanticCache(tmp_path / "cache.db")
+            cache.store("m", "Merhaba dünya", None, "selam")
+            assert cache.lookup("m", "merhaba, DÜNYA!").response == "selam"
+        assert [path for path, _ in stub.requests].count("/api/embeddings") == 2
+
+    def test_offline_fallback(self, tmp_path, semantic_config, monkeypatch):
+        """Without Ollama the hashing embedder keeps the cache working"""
+        monkeypatch.setitem(semantic_config, "embedder", "ollama")
+        monkeypatch.setitem(config.OLLAMA_CONFIG, "base_url", "http://127.0.0.1:9")
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.store("m", QUESTION, None, "sorted() kullan")
+        assert cache.lookup("m", QUESTION.rstrip("?")).response == "sorted() kullan"
+
+    def test_unreachable_ollama_backs_off(self, tmp_path, semantic_config, monkeypatch):
+        """After a failed embedding request Ollama is not retried until the retry interval passes"""
+        calls = []
+
+        class DownClient:
+            def embed(self, model, text):
+                calls.append(text)
+                raise OllamaError("bağlantı yok")
+
+        monkeypatch.setitem(semantic_config, "embedder", "ollama")
+        monkeypatch.setattr(semantic_cache, "ollama_client", DownClient())
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.store("m", QUESTION, None, "sorted() kullan")
+        assert cache.lookup("m", QUESTION.rstrip("?")).response == "sorted() kullan"
+        assert cache.lookup("m", "başka bir soru") is None
+        assert len(calls) == 1
+
+        monkeypatch.setitem(semantic_config, "ollama_retry_interval", 0)
+        cache.lookup("m", "üçüncü soru")
+        assert len(calls) == 2
+
+    def test_draft_prompt(self):
+        """Draft mode embeds the cached answer in the new prompt"""
+        prompt = SemanticCache.draft_prompt("yeni soru", SemanticHit("eski", "taslak", 0.95))
+        assert "taslak" in prompt and prompt.endswith("SORU: yeni soru")
+
+    def test_hashing_embedder_is_deterministic(self):
+        """Same text always maps to the same vector"""
+        embedder = HashingEmbedder(dim=64)
+        assert np.array_equal(embedder.embed("merhaba dünya"), embedder.embed("merhaba dünya"))
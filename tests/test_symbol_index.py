@@ -0,0 +1,115 @@
+"""
+Tests for symbol_index module
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from symbol_index import SymbolIndex, extract_symbols
+
+SOURCE = '''import os
+from typing import List
+
+
+class Invoice:
+    def total(self):
+        return 0
+
+    async def send(self):
+        pass
+
+
+def load_invoices(path):
+    return []
+'''
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Small mixed-language project"""
+    monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "sweep_interval", 0)
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "billing.py").write_text(SOURCE)
+    (root / "app.js").write_text("import x from 'lib'\nfunction render() {}\nclass View {}\n")
+    (root / "style.css").write_text(".button {\n  color: red;\n}\n")
+    return root
+
+
+class TestExtractSymbols:
+    """Test cases for single-pass symbol extraction"""
+
+    def test_python_definitions_with_ranges(self):
+        """Classes, methods and functions carry line ranges and parents"""
+        result = extract_symbols("billing.py", SOURCE)
+        found = [(s.name, s.kind, s.line, s.end_line, s.parent) for s in result.symbols]
+        assert found == [
+            ("Invoice", "class", 5, 10, ""),
+            ("total", "method", 6, 7, "Invoice"),
+            ("send", "method", 9, 10, "Invoice"),
+            ("load_invoices", "function", 13, 14, ""),
+        ]
+        assert result.imports == ["os", "typing.List"]
+        assert "Sınıflar: Invoice" in result.summary()
+
+    def test_syntax_error_and_regex_languages(self):
+        """Broken Python is flagged; JS symbols get line numbers"""
+        assert extract_symbols("x.py", "def (:\n").syntax_error
+        js = extract_symbols("app.js", "import 'lib'\nfunction render() {}\nclass View {}\n")
+        assert [(s.name, s.line) for s in js.symbols] == [("render", 2), ("View", 3)]
+        assert js.imports == ["lib"]
+
+
+class TestSymbolIndex:
+    """Test cases for the persistent project-wide index"""
+
+    def test_where_is_defined(self, project, tmp_path):
+        """Definitions are found by exact or case-insensitive name"""
+        index = SymbolIndex(project, tmp_path / "index.db")
+        assert [s.location for s in index.define("load_invoices")] == ["billing.py:13"]
+        assert [s.location for s in index.define("view")] == ["app.js:3"]
+        assert index.define("missing") == []
+        assert index.complete("load") == ["load_invoices"]
+
+    def test_only_changed_files_are_reparsed(self, project, tmp_path):
+        """Unchanged files are skipped; touched-but-identical files are not reparsed"""
+        index = SymbolIndex(project, tmp_path / "index.db")
+        assert index.refresh() == 3
+        assert index.refresh() == 0
+
+        os.utime(project / "billing.py", ns=(0, 10_000_000_000))
+        assert index.refresh() == 0
+
+        (project / "billing.py").write_text(SOURCE + "\ndef pay():\n    pass\n")
+        assert index.refresh() == 1
+        assert [s.location for s in index.define("pay")] == ["billing.py:16"]
+
+        (project / "app.js").unlink()
+        os.utime(project, ns=(0, os.stat(project).st_mtime_ns + 10_000_000))
+        index.refresh()
+        assert index.define("render") == []
+
+    def test_persistent_and_content_addressed(self, project, tmp_path):
+        """A restart loads from disk; a copied file reuses the stored parse"""
+        SymbolIndex(project, tmp_path / "index.db").refresh()
+
+        reopened = SymbolIndex(project, tmp_path / "index.db")
+        assert [s.location for s in reopened.define("Invoice")] == ["billing.py:5"]
+        assert reopened.parsed == 0
+
+        (project / "copy.py").write_text(SOURCE)
+        os.utime(project, ns=(0, os.stat(project).st_mtime_ns + 10_000_000))
+        assert reopened.refresh() == 0
+        assert sorted(s.location for s in reopened.define("Invoice")) == ["billing.py:5", "copy.py:5"]
+
+    def test_large_files_use_process_pool(self, project, tmp_path, monkeypatch):
+        """Files above the threshold are parsed in worker processes"""
+        monkeypatch.setitem(config.SYMBOL_INDEX_CONFIG, "process_pool_min_bytes", 100)
+        index = SymbolIndex(project, tmp_path / "index.db")
+        assert index.refresh() == 3
+        assert [s.location for s in index.define("send")] == ["billing.py:9"]
@@ -0,0 +1,153 @@
+"""
+Tests for text_index module
+"""
+
+import pytest
+import sys
+import os
+import time
+import types
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import text_index
+from text_index import TextIndex, query_trigrams, trigrams, search_file
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Small project with text and binary files"""
+    monkeypatch.setitem(config.PROJECT_INDEX_CONFIG, "sweep_interval", 0)
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "billing.py").write_text("def load_invoices():\n    return Invoice.query()\n")
+    (root / "src" / "views.py").write_text("from billing import load_invoices\n\nprint('Şeker')\n")
+    (root / "README.md").write_text("Invoices are loaded lazily.\n")
+    (root / "logo.png").write_bytes(b"\x89PNG\0\0invoice")
+    return root
+
+
+def make_index(root, tmp_path):
+    return TextIndex(root, tmp_path / "index.db", tmp_path / "segments")
+
+
+class TestTrigrams:
+    """Test query trigram extraction"""
+
+    def test_substring_query_needs_all_trigrams(self):
+        """A literal query requires every trigram of its lowercased text"""
+        assert query_trigrams("Load") == trigrams("load")
+        assert len(trigrams("load")) == 2
+
+    def test_regex_literals_are_required(self):
+        """Only literal runs that every match contains become filters"""
+        assert query_trigrams(r"def\s+load_\w+", regex=True) == trigrams("def") | trigrams("load_")
+        assert query_trigrams(r"(foo|bar)", regex=True) == set()
+        assert query_trigrams(r"a.b", regex=True) == set()
+
+
+class TestTextIndex:
+    """Test the trigram inverted index"""
+
+    def test_substring_search_returns_line_hits(self, project, tmp_path):
+        """Hits carry path, line and column; binary files are never matched"""
+        index = make_index(project, tmp_path)
+        result = index.search("invoice")
+        assert [hit.location for hit in result.hits] == ["README.md:1", "src/billing.py:1",
+                                                     "src/billing.py:2", "src/views.py:1"]
+        assert result.hits[1].column == 9
+        assert result.candidates == 3
+
+        assert [hit.location for hit in index.search("ŞEKER").hits] == ["src/views.py:3"]
+        assert [hit.location for hit in index.search("Invoice.", case_sensitive=True).hits] == ["src/billing.py:2"]
+
+    def test_regex_search_and_filters(self, project, tmp_path):
+        """Regex queries are verified per line and can be limited to a path or extension"""
+        index = make_index(project, tmp_path)
+        result = index.search(r"^def \w+\(", regex=True)
+        assert [hit.location for hit in result.hits] == ["src/billing.py:1"]
+        assert [hit.path for hit in index.search("load", path="src").hits] == ["src/billing.py", "src/views.py"]
+        assert [hit.path for hit in index.search("load", extensions=["md"]).hits] == ["README.md"]
+
+    def test_pagination(self, project, tmp_path):
+        """Pages are contiguous and report whether more hits exist"""
+        index = make_index(project, tmp_path)
+        first = index.search("o", limit=2)
+        assert first.has_more and first.next_offset == 2
+        second = index.search("o", offset=2, limit=2)
+        all_hits = index.search("o", limit=100).hits
+        assert first.hits + second.hits == all_hits[:4]
+        assert len(index.search("o", limit=-1).hits) == 1
+        assert index.search("o", offset=-5, limit=2).hits == first.hits
+        assert [hit.path for hit in index.search("invoice", per_file=1).hits] == ["README.md", "src/billing.py",
+                                                                                "src/views.py"]
+
+    def test_time_budget_returns_partial_page(self, project, tmp_path, monkeypatch):
+        """An exhausted time budget stops the scan and reports where to continue"""
+        index = make_index(project, tmp_path)
+        index.refresh(force=True)
+        clock = iter(range(0, 1000, 10))
+        monkeypatch.setattr(text_index, "time", types.SimpleNamespace(time=lambda: next(clock)))
+        result = index.search("invoice", time_budget=5)
+        assert result.timed_out and result.has_more and result.hits == []
+        assert result.next_offset == 0
+        monkeypatch.setattr(text_index, "time", time)
+        assert not index.search("invoice", time_budget=5).timed_out
+
+    def test_refresh_stops_at_deadline(self, project, tmp_path, monkeypatch):
+        """A deadline indexes in small batches and leaves the rest for the next refresh"""
+        monkeypatch.setitem(config.TEXT_INDEX_CONFIG, "budget_batch_files", 1)
+        index = make_index(project, tmp_path)
+        index_batch = index._index_batch
+
+        def slow_batch(entries):
+            time.sleep(0.3)
+            return index_batch(entries)
+
+        monkeypatch.setattr(index, "_index_batch", slow_batch)
+        assert index.refresh(force=True, deadline=time.time() + 0.1) == 1
+        assert index.pending == 3
+        page = index.search("invoice", time_budget=0.1)
+        assert page.timed_out and page.has_more
+        assert index.pending == 2
+        assert index.refresh(force=True) == 2 and index.pending == 0
+        assert index.stats()["files"] == 4
+
+    def test_incremental_update(self, project, tmp_path):
+        """Only changed files are reindexed; removed files disappear from results"""
+        index = make_index(project, tmp_path)
+        assert index.refresh(force=True) == 4
+        assert index.refresh(force=True) == 0
+
+        (project / "src" / "billing.py").write_text("def pay():\n    return Payment()\n")
+        (project / "README.md").unlink()
+        assert index.refresh(force=True) == 1
+        assert [hit.path for hit in index.search("invoice").hits] == ["src/views.py"]
+        assert [hit.location for hit in index.search("payment").hits] == ["src/billing.py:2"]
+        assert index.stats()["segments"] == 2
+
+    def test_persisted_segments_are_reused(self, project, tmp_path):
+        """A new instance reads the memory-mapped segments without rereading files"""
+        make_index(project, tmp_path).refresh(force=True)
+        index = make_index(project, tmp_path)
+        assert index.refresh(force=True) == 0
+        assert index.indexed == 0
+        assert [hit.location for hit in index.search("lazily").hits] == ["README.md:1"]
+
+    def test_small_segments_are_merged(self, project, tmp_path, monkeypatch):
+        """Many small segments are compacted into one"""
+        monkeypatch.setitem(config.TEXT_INDEX_CONFIG, "max_small_segments", 1)
+        index = make_index(project, tmp_path)
+        index.refresh(force=True)
+        for i in range(3):
+            (project / f"note{i}.txt").write_text(f"note number {i}\n")
+            index.refresh(force=True)
+            assert index.stats()["segments"] == 1
+        assert [hit.path for hit in index.search("number").hits] == ["note0.txt", "note1.txt", "note2.txt"]
+
+    def test_search_single_file(self, project):
+        """Single-file search needs no index"""
+        hits = search_file(str(project / "src" / "billing.py"), r"return \w+", regex=True)
+        assert [hit.line for hit in hits] == [2]
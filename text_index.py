@@ -0,0 +1,581 @@
+"""
+CortexCLI Metin Arama İndeksi
+Proje metin dosyaları üzerinde trigram ters indeksi; segmentler diskte durur ve mmap ile okunur,
+yalnızca değişen dosyalar yeniden indekslenir. Sorgular aday süzme + satır doğrulaması ile yanıtlanır
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, Iterable, Set, Tuple
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+import config
+from project_index import FileEntry, get_project_index
+
+SEGMENT_MAGIC = b"CTRI"
+SEGMENT_VERSION = 1
+_HEADER = struct.Struct("=4sIII")  # sihir, sürüm, anahtar sayısı, dosya sayısı
+_BINARY_SNIFF = 8192
+
+
+def trigrams(text: str) -> Set[int]:
+    """Metnin küçük harfli UTF-8 trigramları (3 bayt -> tamsayı)"""
+    data = text.lower().encode("utf-8")
+    grams = {data[i:i + 3] for i in range(len(data) - 2)}
+    return {int.from_bytes(gram, "big") for gram in grams}
+
+
+def _literal_runs(parsed) -> List[str]:
+    """Ayrıştırılmış regex'te her eşleşmede bulunması gereken düz metin parçaları"""
+    runs: List[str] = []
+    current: List[str] = []
+
+    def flush():
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    for op, arg in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(chr(arg))
+        elif op is sre_parse.AT:
+            continue  # ^, $, \b karakter tüketmez
+        elif op is sre_parse.SUBPATTERN:
+            flush()
+            runs.extend(_literal_runs(arg[-1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and arg[0] >= 1:
+            flush()
+            runs.extend(_literal_runs(arg[2]))
+        else:
+            flush()
+    flush()
+    return runs
+
+
+def query_trigrams(pattern: str, regex: bool = False) -> Set[int]:
+    """Eşleşen her satırın içermesi gereken trigramlar; boş küme süzme yapılamayacağını gösterir"""
+    if not regex:
+        return trigrams(pattern)
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, TypeError):
+        return set()
+    required: Set[int] = set()
+    for run in _literal_runs(parsed):
+        required |= trigrams(run)
+    return required
+
+
+def compile_matcher(pattern: str, regex: bool = False,
+                    case_sensitive: bool = False) -> Callable[[str], int]:
+    """Satırda eşleşmenin sütununu (0 tabanlı) veya -1 döndüren fonksiyon; geçersiz regex re.error fırlatır"""
+    if regex:
+        compiled = re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+
+        def match(line: str) -> int:
+            found = compiled.search(line)
+            return found.start() if found else -1
+        return match
+    if case_sensitive:
+        return lambda line: line.find(pattern)
+    lowered = pattern.lower()
+    return lambda line: line.lower().find(lowered)
+
+
+@dataclass
+class SearchHit:
+    """Satır düzeyinde arama sonucu"""
+    path: str
+    line: int
+    column: int
+    text: str
+
+    @property
+    def location(self) -> str:
+        return f"{self.path}:{self.line}"
+
+
+@dataclass
+class SearchResult:
+    """Bir arama sayfası"""
+    query: str
+    hits: List[SearchHit] = field(default_factory=list)
+    offset: int = 0
+    limit: int = 20
+    has_more: bool = False
+    candidates: int = 0   # Trigram süzgecinden geçen dosya sayısı
+    scanned: int = 0      # Doğrulama için okunan dosya sayısı
+    elapsed: float = 0.0
+    timed_out: bool = False  # Süre bütçesi doldu; kalan sonuçlar next_offset ile istenebilir
+
+    @property
+    def next_offset(self) -> Optional[int]:
+        return self.offset + len(self.hits) if self.has_more else None
+
+
+def scan_lines(path: str, text: str, matcher: Callable[[str], int],
+               max_line: int = 200) -> Iterable[SearchHit]:
+    """Metni satır satır doğrular ve eşleşen satırları üretir"""
+    for number, line in enumerate(text.splitlines(), 1):
+        column = matcher(line)
+        if column >= 0:
+            yield SearchHit(path, number, column, line.strip()[:max_line])
+
+
+def search_file(path: str, pattern: str, regex: bool = False, case_sensitive: bool = False) -> List[SearchHit]:
+    """İndeks kullanmadan tek bir dosyada satır araması"""
+    matcher = compile_matcher(pattern, regex, case_sensitive)
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return list(scan_lines(path, f.read(), matcher))
+
+
+def _file_trigrams(abs_path: str) -> Optional[Tuple[bool, array]]:
+    """(ikili_mi, sıralı trigramlar); okunamazsa None (süreç havuzunda da çalışır)"""
+    try:
+        with open(abs_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b"\0" in data[:_BINARY_SNIFF]:
+        return True, array("I")
+    return False, array("I", sorted(trigrams(data.decode("utf-8", errors="ignore"))))
+
+
+class _Segment:
+    """Diskteki değişmez trigram segmenti
+
+    Düzen: başlık | sıralı anahtarlar | anahtar başına ofsetler | dosya kimlikleri.
+    Dosya mmap ile eşlenir; anahtar araması ikili arama, belleğe yalnızca
+    dokunulan sayfalar gelir.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.name = path.name
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, self.file_count = _HEADER.unpack_from(self._map, 0)
+        if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+            self._map.close()
+            raise ValueError(f"Geçersiz segment: {path}")
+        self._view = memoryview(self._map)
+        start = _HEADER.size
+        self.keys = self._view[start:start + 4 * count].cast("I")
+        self.offsets = self._view[start + 4 * count:start + 8 * count + 4].cast("I")
+        self.postings = self._view[start + 8 * count + 4:].cast("I")
+
+    @staticmethod
+    def write(path: Path, postings: Dict[int, List[int]], file_count: int) -> "_Segment":
+        keys = sorted(postings)
+        offsets, ids = array("I", [0]), array("I")
+        for key in keys:
+            ids.extend(sorted(postings[key]))
+            offsets.append(len(ids))
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, len(keys), file_count))
+            array("I", keys).tofile(f)
+            offsets.tofile(f)
+            ids.tofile(f)
+        os.replace(tmp, path)
+        return _Segment(path)
+
+    def lookup(self, key: int):
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+    def candidates(self, keys: Set[int]) -> Set[int]:
+        """Tüm anahtarları içeren dosya kimlikleri (en kısa listeden başlayarak kesişim)"""
+        lists = []
+        for key in keys:
+            ids = self.lookup(key)
+            if ids is None:
+                return set()
+            lists.append(ids)
+        lists.sort(key=len)
+        result = set(lists[0])
+        for ids in lists[1:]:
+            result.intersection_update(ids)
+            if not result:
+                break
+        return result
+
+    def items(self) -> Iterable[Tuple[int, List[int]]]:
+        for i, key in enumerate(self.keys):
+            yield key, self.postings[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+    def close(self) -> None:
+        for view in (self.keys, self.offsets, self.postings, self._view):
+            view.release()
+        self._map.close()
+
+
+@dataclass
+class _TextFile:
+    file_id: int
+    mtime_ns: int
+    size: int
+    segment: str      # İkili dosyalar için boş
+
+
+class TextIndex:
+    """Tek bir proje kökünün trigram metin indeksi
+
+    Dosya listesi proje indeksinden alınır. Yeni/değişen dosyalar yeni bir
+    segmente yazılır, eski kayıtları ölü sayılır; küçük veya çoğu ölü
+    segmentler biriktikçe tek segmentte birleştirilir. Dosya meta verisi
+    proje indeksiyle aynı SQLite veritabanında tutulur.
+    """
+
+    def __init__(self, root: str = ".", db_path: Optional[str] = None, index_dir: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.db_path = Path(db_path or config.PROJECT_INDEX_CONFIG["db_path"]).absolute()
+        base = Path(index_dir or config.TEXT_INDEX_CONFIG["index_dir"]).absolute()
+        self.segment_dir = base / hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:16]
+        self._files: Dict[str, _TextFile] = {}
+        self._paths: Dict[int, str] = {}  # canlı dosya kimliği -> yol
+        self._segments: Dict[str, _Segment] = {}
+        self._next_id = 1
+        self._next_segment = 1
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._lock = threading.RLock()
+        self._db_ready = False
+        self.indexed = 0  # İndekslenen dosya sayısı
+        self.pending = 0  # Süre sınırlı son yenilemede sıraya kalan değişmiş dosya sayısı
+
+    # --- Veritabanı ---
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=MEMORY')
+        if not self._db_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS text_files (
+                    root TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    file_id INTEGER NOT NULL,
+                    mtime_ns INTEGER,
+                    size INTEGER,
+                    segment TEXT NOT NULL,
+                    PRIMARY KEY (root, path)
+                )
+            ''')
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _load(self) -> None:
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    'SELECT path, file_id, mtime_ns, size, segment FROM text_files WHERE root = ?', (self.root,)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            rows = []
+
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.segment_dir.glob("*.tri"):
+            try:
+                self._segments[path.name] = _Segment(path)
+            except (OSError, ValueError):
+                path.unlink(missing_ok=True)
+        numbers = [int(name.split(".")[0]) for name in self._segments if name.split(".")[0].isdigit()]
+        self._next_segment = max(numbers, default=0) + 1
+
+        # Segmenti kaybolan dosyalar indekslenmemiş sayılır ve yeniden okunur
+        for path, file_id, mtime_ns, size, segment in rows:
+            if segment and segment not in self._segments:
+                continue
+            self._files[path] = _TextFile(file_id, mtime_ns, size, segment)
+            self._paths[file_id] = path
+        self._next_id = max((state.file_id for state in self._files.values()), default=0) + 1
+        self._loaded = True
+
+    def _save(self, changed: List[str], removed: List[str]) -> None:
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany('DELETE FROM text_files WHERE root = ? AND path = ?',
+                                 [(self.root, path) for path in removed])
+                rows = []
+                for path in changed:
+                    state = self._files[path]
+                    rows.append((self.root, path, state.file_id, state.mtime_ns, state.size, state.segment))
+                conn.executemany(
+                    'INSERT OR REPLACE INTO text_files (root, path, file_id, mtime_ns, size, segment) '
+                    'VALUES (?, ?, ?, ?, ?, ?)', rows
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    # --- Güncelleme ---
+
+    def _abs(self, path: str) -> str:
+        return os.path.join(self.root, *path.split("/"))
+
+    def _extract(self, entries: List[FileEntry]) -> Dict[str, Optional[Tuple[bool, array]]]:
+        """Dosyaların trigramları; çok dosya varsa süreç havuzunda"""
+        text_config = config.TEXT_INDEX_CONFIG
+        paths = [self._abs(entry.path) for entry in entries]
+        if len(entries) >= text_config["process_pool_min_files"] and text_config["workers"] > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=text_config["workers"]) as pool:
+                    results = pool.map(_file_trigrams, paths, chunksize=64)
+                    return {entry.path: result for entry, result in zip(entries, results)}
+            except (OSError, RuntimeError):
+                # Süreç oluşturulamıyorsa (kısıtlı ortam) aynı süreçte devam et
+                pass
+        return {entry.path: _file_trigrams(path) for entry, path in zip(entries, paths)}
+
+    def _new_segment_path(self) -> Path:
+        path = self.segment_dir / f"{self._next_segment:010d}.tri"
+        self._next_segment += 1
+        return path
+
+    def _index_batch(self, entries: List[FileEntry]) -> List[str]:
+        """Bir dosya grubunu yeni bir segmente yazar; kaydedilen yolları döndürür"""
+        postings: Dict[int, List[int]] = {}
+        states: Dict[str, _TextFile] = {}
+        segment_path = self._new_segment_path()
+        for path, result in self._extract(entries).items():
+            if result is None:
+                continue
+            binary, keys = result
+            file_id = self._next_id
+            self._next_id += 1
+            states[path] = _TextFile(file_id, 0, 0, "" if binary else segment_path.name)
+            for key in keys:
+                postings.setdefault(key, []).append(file_id)
+        if not states:
+            return []
+        indexed = sum(1 for state in states.values() if state.segment)
+        if indexed:
+            self._segments[segment_path.name] = _Segment.write(segment_path, postings, indexed)
+        by_path = {entry.path: entry for entry in entries}
+        for path, state in states.items():
+            state.mtime_ns, state.size = by_path[path].mtime_ns, by_path[path].size
+            self._files[path] = state
+            self._paths[state.file_id] = path
+        self.indexed += len(states)
+        return list(states)
+
+    def _drop(self, path: str) -> None:
+        state = self._files.pop(path, None)
+        if state is not None:
+            self._paths.pop(state.file_id, None)
+
+    def _compact(self) -> List[str]:
+        """Boş segmentleri siler, küçük/çoğu ölü segmentleri birleştirir; yeri değişen yolları döndürür"""
+        text_config = config.TEXT_INDEX_CONFIG
+        live = Counter(state.segment for state in self._files.values() if state.segment)
+        for name in [name for name in self._segments if not live[name]]:
+            self._remove_segment(name)
+
+        small = [name for name, segment in self._segments.items()
+                 if live[name] < text_config["segment_files"] // 2 or segment.file_count > 2 * live[name]]
+        if len(small) <= text_config["max_small_segments"]:
+            return []
+
+        merged: Dict[int, List[int]] = {}
+        members = set(small)
+        for name in small:
+            for key, ids in self._segments[name].items():
+                alive = [file_id for file_id in ids
+                         if file_id in self._paths and self._files[self._paths[file_id]].segment in members]
+                if alive:
+                    merged.setdefault(key, []).extend(alive)
+        moved = [path for path, state in self._files.items() if state.segment in members]
+        segment_path = self._new_segment_path()
+        self._segments[segment_path.name] = _Segment.write(segment_path, merged, len(moved))
+        for path in moved:
+            self._files[path].segment = segment_path.name
+        for name in small:
+            self._remove_segment(name)
+        return moved
+
+    def _remove_segment(self, name: str) -> None:
+        segment = self._segments.pop(name)
+        segment.close()
+        segment.path.unlink(missing_ok=True)
+
+    def refresh(self, force: bool = False, deadline: Optional[float] = None) -> int:
+        """Değişen dosyaları yeniden indeksler; indekslenen dosya sayısını döndürür
+
+        deadline (time.time() cinsinden) verilirse dosyalar küçük gruplar halinde
+        indekslenir ve süre dolunca durulur: kalanlar eski kayıtlarıyla aranabilir
+        kalır, sayıları pending'e yazılır ve sonraki yenilemede devam edilir.
+        """
+        if not force and time.time() - self._last_refresh < config.PROJECT_INDEX_CONFIG["sweep_interval"]:
+            return 0
+        text_config = config.TEXT_INDEX_CONFIG
+        project_index = get_project_index(self.root)
+        own = str(self.segment_dir.parent) + os.sep
+        entries = [entry for entry in project_index.files()
+                   if entry.size <= text_config["max_file_bytes"] and not self._abs(entry.path).startswith(own)]
+        project_index.restat(entries)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._last_refresh = time.time()
+            current = {entry.path for entry in entries if entry.size <= text_config["max_file_bytes"]}
+            removed = [path for path in self._files if path not in current]
+            stale = [entry for entry in entries if entry.path in current
+                     and (entry.path not in self._files
+                          or (self._files[entry.path].mtime_ns, self._files[entry.path].size)
+                          != (entry.mtime_ns, entry.size))]
+            self.pending = 0
+            if not removed and not stale:
+                return 0
+
+            for path in removed:
+                self._drop(path)
+
+            changed: List[str] = []
+            done: List[FileEntry] = []
+            batch = text_config["segment_files"]
+            if deadline:
+                batch = min(batch, text_config["budget_batch_files"])
+            for start in range(0, len(stale), batch):
+                if deadline and time.time() > deadline:
+                    self.pending = len(stale) - start
+                    self._last_refresh = 0.0  # Sonraki aramada kalan dosyalarla devam edilir
+                    break
+                group = stale[start:start + batch]
+                for entry in group:
+                    self._drop(entry.path)
+                changed.extend(self._index_batch(group))
+                done.extend(group)
+            if not self.pending:
+                changed.extend(self._compact())
+            unreadable = [entry.path for entry in done if entry.path not in self._files]
+            self._save(list(dict.fromkeys(changed)), removed + unreadable)
+            return len(set(changed) & {entry.path for entry in done})
+
+    # --- Sorgular ---
+
+    def candidates(self, pattern: str, regex: bool = False) -> List[str]:
+        """Trigram süzgecinden geçen metin dosyaları (yola göre sıralı)"""
+        required = query_trigrams(pattern, regex)
+        with self._lock:
+            if not required:
+                return sorted(path for path, state in self._files.items() if state.segment)
+            ids: Set[int] = set()
+            for segment in self._segments.values():
+                ids |= segment.candidates(required)
+            return sorted(self._paths[file_id] for file_id in ids if file_id in self._paths)
+
+    def search(self, pattern: str, regex: bool = False, case_sensitive: bool = False,
+               offset: int = 0, limit: Optional[int] = None, path: str = "",
+               extensions: Optional[List[str]] = None, per_file: Optional[int] = None,
+               time_budget: Optional[float] = None) -> SearchResult:
+        """Proje genelinde satır araması (sayfalı)
+
+        path verilirse yalnızca o dizin/dosya altında aranır. per_file dosya
+        başına en fazla kaç satır döneceğini sınırlar. time_budget indeksin
+        yenilenmesini de kapsar: süre dolunca yenileme ve tarama o ana kadarki
+        sonuçlarla durur (timed_out). Geçersiz regex re.error fırlatır.
+        """
+        started = time.time()
+        deadline = started + time_budget if time_budget else None
+        limit = max(1, limit or config.TEXT_INDEX_CONFIG["page_size"])
+        offset = max(0, offset)
+        matcher = compile_matcher(pattern, regex, case_sensitive)
+        self.refresh(deadline=deadline)
+        prefix = path.strip("/")
+        suffixes = tuple(ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in extensions or [])
+        paths = [candidate for candidate in self.candidates(pattern, regex)
+                 if (not prefix or candidate == prefix or candidate.startswith(prefix + "/"))
+                 and (not suffixes or candidate.lower().endswith(suffixes))]
+
+        result = SearchResult(pattern, offset=offset, limit=limit, candidates=len(paths))
+        pending = self.pending if deadline else 0
+        skipped = 0
+        for candidate in paths:
+            if deadline and time.time() > deadline:
+                result.has_more = result.timed_out = True
+                break
+            try:
+                with open(self._abs(candidate), "r", encoding="utf-8", errors="ignore") as f:
+                    text = f.read()
+            except OSError:
+                continue
+            result.scanned += 1
+            for count, hit in enumerate(scan_lines(candidate, text, matcher), 1):
+                if deadline and time.time() > deadline:
+                    result.has_more = result.timed_out = True
+                    break
+                if per_file is not None and count > per_file:
+                    break
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                if len(result.hits) >= limit:
+                    result.has_more = True
+                    break
+                result.hits.append(hit)
+            if result.has_more:
+                break
+        if pending:
+            # İndeks yarım kaldı: bulunanlar döner, sonraki sayfa isteği yenilemeyi sürdürür
+            result.has_more = result.timed_out = True
+        result.elapsed = time.time() - started
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'files': len(self._files),
+                'text_files': sum(1 for state in self._files.values() if state.segment),
+                'segments': len(self._segments),
+                'trigrams': sum(len(segment.keys) for segment in self._segments.values()),
+                'disk_bytes': sum(segment.path.stat().st_size for segment in self._segments.values()
+                                  if segment.path.exists()),
+                'indexed': self.indexed
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments = {}
+            self._files, self._paths = {}, {}
+            self._loaded = False
+
+
+_indexes: Dict[str, TextIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_text_index(directory: str = ".") -> TextIndex:
+    """Dizinin (yoksa oluşturulan) paylaşılan metin indeksini döndürür"""
+    root = os.path.abspath(directory)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = TextIndex(root)
+        return index
@@ -7,14 +7,27 @@ import os
 import json
 import asyncio
 import threading
+from contextlib import ExitStack
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from flask import Flask, render_template, request, jsonify, redirect, url_for, session, send_from_directory
 from flask_socketio import SocketIO, emit, join_room, leave_room
-import requests
 from rich.console import Console
 from themes import theme_manager, get_theme_css
+from ollama_client import ollama_client
+from model_catalog import model_catalog
+from conversation import conversation_manager
+from llm_scheduler import (
+    llm_scheduler, SchedulerFullError, SchedulerCancelledError, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+)
+from ollama_router import ollama_router
+from model_residency import model_residency
+from generation_manager import GenerationHandle, generation_manager
+from semantic_cache import semantic_cache
+from project_index import get_project_index
+from text_index import get_text_index
+import config
 
 console = Console()
 
@@ -48,6 +61,9 @@ class WebInterface:
         self.static_dir = Path("web_static")
         self.static_dir.mkdir(exist_ok=True)
         
+        # İndeksli dosya API'leri yalnızca bu dizin altında çalışır
+        self.project_root = Path.cwd().resolve()
+        
         self._setup_routes()
         self._setup_socketio()
         
@@ -106,9 +122,26 @@ class WebInterface:
                 data = request.get_json()
                 message = data.get('message', '')
                 model = data.get('model', current_model)
-                
-                # LLM sorgusu yap
-                response = self._query_llm(message, model)
+                session_id = data.get('session_id')
+                client_id = f"api:{session_id or request.remote_addr}"
+                
+                # LLM sorgusu yap (session_id verilirse çok turlu sohbet)
+                generation = generation_manager.start(client_id, model)
+                try:
+                    with llm_scheduler.slot(model, client_id, PRIORITY_INTERACTIVE,
+                                            cancel=generation.cancel_event) as wait_time:
+                        if generation.cancelled:
+                            # Slot alındığı anda iptal edildi
+                            response = ""
+                        elif session_id:
+                            response = self._chat_llm(f"api:{session_id}", message, model, generation)
+                        else:
+                            response = self._query_llm(message, model, generation)
+                except SchedulerCancelledError:
+                    # Kuyrukta beklerken iptal edildi
+                    response, wait_time = "", None
+                finally:
+                    generation_manager.finish(generation)
                 
                 # Geçmişe ekle
                 chat_entry = {
@@ -122,9 +155,16 @@ class WebInterface:
                 return jsonify({
                     'success': True,
                     'response': response,
-                    'timestamp': chat_entry['timestamp']
+                    'timestamp': chat_entry['timestamp'],
+                    'wait_time': wait_time,
+                    'cancelled': generation.cancelled
                 })
                 
+            except SchedulerFullError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 503
             except Exception as e:
                 return jsonify({
                     'success': False,
@@ -135,11 +175,21 @@ class WebInterface:
         def api_models():
             """Model listesi API"""
             try:
-                from llm_shell import get_available_models
-                models = get_available_models()
+                refresh = request.args.get('refresh') == '1'
+                catalog = model_catalog.models(refresh)
                 return jsonify({
                     'success': True,
-                    'models': models,
+                    'models': list(catalog),
+                    'details': {
+                        name: {
+                            'size': info.size,
+                            'digest': info.digest,
+                            'family': info.family,
+                            'parameter_size': info.parameter_size,
+                            'quantization_level': info.quantization_level
+                        }
+                        for name, info in catalog.items()
+                    },
                     'current_model': current_model
                 })
             except Exception as e:
@@ -148,6 +198,99 @@ class WebInterface:
                     'error': str(e)
                 }), 500
                 
+        @app.route('/api/compare', methods=['POST'])
+        def api_compare():
+            """Çoklu model karşılaştırma API"""
+            try:
+                data = request.get_json()
+                message = data.get('message', '')
+                timeout = data.get('timeout')
+
+                from multi_model import multi_model_manager
+                
+                # Karşılaştırma toplu iş önceliğinde; slotlar kilitlenmeyi önlemek için sıralı alınır
+                client_id = f"api:{request.remote_addr}"
+                with ExitStack() as stack:
+                    for model in sorted(set(multi_model_manager.active_models.values())):
+                        stack.enter_context(llm_scheduler.slot(model, client_id, PRIORITY_BATCH))
+                    results = multi_model_manager.query_all_models(message, system_prompt, timeout=timeout)
+
+                return jsonify({
+                    'success': True,
+                    'results': {
+                        alias: {
+                            'model': result.model_name,
+                            'response': result.response,
+                            'response_time': result.response_time,
+                            'token_count': result.token_count,
+                            'prompt_tokens': result.prompt_tokens,
+                            'ttft': result.ttft,
+                            'tokens_per_second': result.tokens_per_second,
+                            'load_time': result.load_time,
+                            'prompt_eval_time': result.prompt_eval_time,
+                            'eval_time': result.eval_time,
+                            'cached': result.cached,
+                            'error': result.error
+                        }
+                        for alias, result in results.items()
+                    }
+                })
+            except Exception as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 500
+
+        @app.route('/api/cancel', methods=['POST'])
+        def api_cancel():
+            """Süren sohbet üretimini iptal et API (kısmi yanıt /api/chat'ten döner)"""
+            data = request.get_json(silent=True) or {}
+            session_id = data.get('session_id')
+            cancelled = generation_manager.cancel(f"api:{session_id or request.remote_addr}")
+            return jsonify({
+                'success': True,
+                'cancelled': cancelled
+            })
+
+        @app.route('/api/queue')
+        def api_queue():
+            """LLM kuyruk durumu API"""
+            return jsonify({
+                'success': True,
+                'models': llm_scheduler.stats()
+            })
+
+        @app.route('/api/backends')
+        def api_backends():
+            """Ollama sunucularının yönlendirme durumu API"""
+            return jsonify({
+                'success': True,
+                'backends': ollama_router.stats()
+            })
+
+        @app.route('/api/residency')
+        def api_residency():
+            """Bellekte yüklü ve sabitlenmiş modeller API"""
+            return jsonify({
+                'success': True,
+                'residency': model_residency.stats()
+            })
+
+        @app.route('/api/metrics')
+        def api_metrics():
+            """Model performans metrikleri API"""
+            try:
+                from multi_model import multi_model_manager
+                return jsonify({
+                    'success': True,
+                    'metrics': multi_model_manager.performance_metrics
+                })
+            except Exception as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 500
+
         @app.route('/api/files')
         def api_files():
             """Dosya listesi API"""
@@ -564,24 +707,52 @@ class WebInterface:
             try:
                 data = request.get_json()
                 search_term = data.get('search_term', '')
-                path = data.get('path', '.')
                 file_types = data.get('file_types', [])
+                prefix = self._project_path(data.get('path', '.'))
+                if prefix is None:
+                    return jsonify({'success': False, 'error': 'Yol proje dizini dışında'}), 403
+                
+                if data.get('content'):
+                    # İçerik araması: trigram indeksi, satır düzeyinde ve sayfalı; süre ve boyut sınırlı
+                    text_config = config.TEXT_INDEX_CONFIG
+                    if len(search_term) > text_config["max_pattern_chars"]:
+                        return jsonify({'success': False, 'error': 'Arama ifadesi çok uzun'}), 400
+                    try:
+                        limit = int(data.get('limit') or text_config["page_size"])
+                        offset = int(data.get('offset') or 0)
+                    except (TypeError, ValueError):
+                        return jsonify({'success': False, 'error': 'Geçersiz limit veya offset'}), 400
+                    limit = max(1, min(limit, text_config["max_page_size"]))
+                    page = get_text_index(str(self.project_root)).search(
+                        search_term, regex=bool(data.get('regex')),
+                        case_sensitive=bool(data.get('case_sensitive')),
+                        offset=max(0, offset), limit=limit, path=prefix, extensions=file_types,
+                        time_budget=text_config["web_time_budget"]
+                    )
+                    return jsonify({
+                        'success': True,
+                        'results': [{'path': hit.path, 'line': hit.line,
+                                     'column': hit.column, 'text': hit.text} for hit in page.hits],
+                        'next_offset': page.next_offset,
+                        'timed_out': page.timed_out,
+                        'truncated': get_project_index(str(self.project_root)).truncated
+                    })
                 
                 results = []
-                for item in Path(path).rglob('*'):
-                    if item.is_file() and search_term.lower() in item.name.lower():
-                        if file_types and item.suffix not in file_types:
-                            continue
-                        results.append({
-                            'name': item.name,
-                            'path': str(item),
-                            'size': item.stat().st_size,
-                            'modified': datetime.fromtimestamp(item.stat().st_mtime).isoformat()
-                        })
+                for entry in get_project_index(str(self.project_root)).find(search_term, file_types):
+                    if prefix and entry.path != prefix and not entry.path.startswith(prefix + "/"):
+                        continue
+                    results.append({
+                        'name': entry.name,
+                        'path': entry.path,
+                        'size': entry.size,
+                        'modified': datetime.fromtimestamp(entry.mtime_ns / 1e9).isoformat()
+                    })
                 
                 return jsonify({
                     'success': True,
-                    'results': results
+                    'results': results,
+                    'truncated': get_project_index(str(self.project_root)).truncated
                 })
             except Exception as e:
                 return jsonify({
@@ -625,35 +796,18 @@ class WebInterface:
             """Dosya ağacı API"""
             try:
                 data = request.get_json()
-                path = data.get('path', '.')
                 max_depth = data.get('max_depth', 3)
+                prefix = self._project_path(data.get('path', '.'))
+                if prefix is None:
+                    return jsonify({'success': False, 'error': 'Yol proje dizini dışında'}), 403
                 
-                def build_tree(p, depth=0):
-                    if depth > max_depth:
-                        return None
-                    
-                    tree = {
-                        'name': p.name,
-                        'type': 'directory' if p.is_dir() else 'file',
-                        'path': str(p)
-                    }
-                    
-                    if p.is_dir():
-                        children = []
-                        for child in p.iterdir():
-                            if not child.name.startswith('.'):
-                                child_tree = build_tree(child, depth + 1)
-                                if child_tree:
-                                    children.append(child_tree)
-                        tree['children'] = children
-                    
-                    return tree
-                
-                root_tree = build_tree(Path(path))
+                # Yollar proje köküne göreli
+                root_tree = get_project_index(str(self.project_root)).tree(path=prefix, max_depth=max_depth)
                 
                 return jsonify({
                     'success': True,
-                    'tree': root_tree
+                    'tree': root_tree,
+                    'truncated': get_project_index(str(self.project_root)).truncated
                 })
             except Exception as e:
                 return jsonify({
@@ -661,6 +815,19 @@ class WebInterface:
                     'error': str(e)
                 }), 500
                 
+    def _project_path(self, path: str) -> Optional[str]:
+        """İstemcinin verdiği yolu proje köküne göreli hale getirir; kök dışındaysa None
+        
+        İndeksler kalıcı ve dizin başına tutulduğundan web API'leri yalnızca proje
+        kökünün indeksini kullanır; alt dizinler bu indekste önek olarak süzülür.
+        """
+        resolved = (self.project_root / (path or '.')).resolve()
+        if resolved == self.project_root:
+            return ""
+        if self.project_root not in resolved.parents:
+            return None
+        return resolved.relative_to(self.project_root).as_posix()
+        
     def _setup_socketio(self):
         """SocketIO event'lerini ayarla"""
         
@@ -674,6 +841,9 @@ class WebInterface:
         def handle_disconnect():
             """Kullanıcı ayrıldığında"""
             console.print(f"[yellow]🌐 Web kullanıcısı ayrıldı: {request.sid}[/yellow]")
+            # Yanıtı bekleyen kalmadı: sunucu kapasitesini bekleyen diğer kullanıcılara bırak
+            generation_manager.cancel(request.sid)
+            conversation_manager.remove(request.sid)
             
         @socketio.on('join_chat')
         def handle_join_chat(data):
@@ -682,6 +852,18 @@ class WebInterface:
             join_room(room)
             emit('status', {'message': f'{room} odasına katıldınız'})
             
+        @socketio.on('reset_chat')
+        def handle_reset_chat():
+            """Bağlantının sohbet geçmişini sıfırla"""
+            conversation_manager.reset(request.sid)
+            emit('status', {'message': 'Sohbet geçmişi sıfırlandı'})
+            
+        @socketio.on('cancel')
+        def handle_cancel():
+            """Bağlantının süren üretimini iptal et"""
+            cancelled = generation_manager.cancel(request.sid)
+            emit('status', {'message': f'{cancelled} üretim iptal edildi' if cancelled else 'Süren üretim yok'})
+            
         @socketio.on('send_message')
         def handle_send_message(data):
             """Mesaj gönder"""
@@ -690,8 +872,31 @@ class WebInterface:
                 model = data.get('model', current_model)
                 room = data.get('room', 'general')
                 
-                # LLM sorgusu yap
-                response = self._query_llm(message, model)
+                sid = request.sid
+                
+                if message.strip() == '/cancel':
+                    handle_cancel()
+                    return
+                
+                def report_queue(position: int, wait_time: float):
+                    # Sıra bilgisini yalnızca bu bağlantıya gönder
+                    socketio.emit('queue_status', {
+                        'position': position,
+                        'wait_time': round(wait_time, 2),
+                        'model': model
+                    }, to=sid)
+                
+                # LLM sorgusu yap (bağlantı başına çok turlu sohbet)
+                generation = generation_manager.start(sid, model)
+                try:
+                    with llm_scheduler.slot(model, sid, PRIORITY_INTERACTIVE, on_update=report_queue,
+                                            cancel=generation.cancel_event):
+                        response = "" if generation.cancelled else self._chat_llm(sid, message, model, generation)
+                except SchedulerCancelledError:
+                    # Kuyrukta beklerken iptal edildi veya bağlantı koptu
+                    response = ""
+                finally:
+                    generation_manager.finish(generation)
                 
                 # Geçmişe ekle
                 chat_entry = {
@@ -709,23 +914,78 @@ class WebInterface:
                     'assistant': response,
                     'timestamp': chat_entry['timestamp'],
                     'model': model,
-                    'user_id': request.sid
+                    'user_id': request.sid,
+                    'cancelled': generation.cancelled
                 }, room=room)
                 
             except Exception as e:
                 emit('error', {'message': str(e)})
                 
-    def _query_llm(self, message: str, model: str) -> str:
-        """LLM sorgusu yap"""
+    def _semantic_prompt(self, message: str, model: str) -> Tuple[Optional[str], str]:
+        """Benzer bir soru önbellekteyse (hazır yanıt, modele gidecek istem) döndürür"""
+        hit = semantic_cache.lookup(model, message, system_prompt)
+        if hit is None:
+            return None, message
+        if config.SEMANTIC_CACHE_CONFIG["mode"] == "draft":
+            return None, semantic_cache.draft_prompt(message, hit)
+        return hit.response, message
+        
+    def _query_llm(self, message: str, model: str, handle: Optional[GenerationHandle] = None) -> str:
+        """LLM sorgusu yap; handle verilirse iptal edilebilir (kısmi yanıt döner)"""
+        try:
+            answer, prompt = self._semantic_prompt(message, model)
+            if answer is not None:
+                return answer
+            if handle is None:
+                data = ollama_client.generate(model, prompt, system=system_prompt)
+                response = data.get("response", "")
+            else:
+                for data in ollama_client.generate_stream(model, prompt, system=system_prompt,
+                                                          cancel=handle.cancel_event):
+                    handle.append(data.get("response", ""))
+                response = handle.text
+            if not (handle and handle.cancelled):
+                semantic_cache.store(model, message, system_prompt, response)
+            return response
+        except Exception as e:
+            return f"Hata: {str(e)}"
+            
+    def _chat_llm(self, session_id: str, message: str, model: str,
+                  handle: Optional[GenerationHandle] = None) -> str:
+        """Oturum geçmişiyle birlikte /api/chat sorgusu yap; handle verilirse iptal edilebilir"""
         try:
-            from llm_shell import query_llm
-            return query_llm(message, model)
+            conversation = conversation_manager.get(session_id, system_prompt)
+            # Anlamsal önbellek yalnızca ilk turda: sonraki turların yanıtı geçmişe bağlı
+            first_turn = conversation.turn_count == 0
+            prompt = message
+            if first_turn:
+                answer, prompt = self._semantic_prompt(message, model)
+                if answer is not None:
+                    conversation.add_exchange(message, answer)
+                    return answer
+            messages, options = conversation.build_messages(model, prompt)
+            if handle is None:
+                data = ollama_client.chat(model, messages, options=options, session_id=session_id)
+                response = (data.get("message") or {}).get("content", "")
+            else:
+                # Akışla okunur; iptalde bağlantı hemen kapanır ve gelen kısım korunur
+                for data in ollama_client.chat_stream(model, messages, options=options, session_id=session_id,
+                                                      cancel=handle.cancel_event):
+                    handle.append((data.get("message") or {}).get("content", ""))
+                response = handle.text
+            if response:
+                conversation.add_exchange(message, response)
+            if first_turn and not (handle and handle.cancelled):
+                semantic_cache.store(model, message, system_prompt, response)
+            return response
         except Exception as e:
             return f"Hata: {str(e)}"
             
     def start(self):
         """Web sunucusunu başlat"""
         console.print(f"[green]🌐 Web arayüzü başlatılıyor: http://{self.host}:{self.port}[/green]")
+        from multi_model import multi_model_manager
+        model_residency.warm_up(current_model, multi_model_manager.active_models.values())
         socketio.run(app, host=self.host, port=self.port, debug=False)
         
     def stop(self):